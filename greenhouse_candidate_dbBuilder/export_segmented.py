@@ -15,6 +15,10 @@ import psycopg2
 from datetime import datetime
 from dotenv import load_dotenv
 
+# Shared keyset pagination helper
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "greenhouse_sharepoint_mapper"))
+from db_batches import iter_keyset_frames
+
 load_dotenv()
 
 # Database configuration
@@ -129,64 +133,60 @@ def export_segmented():
             log("")
             
             # Export in segments
-            segment_num = 1
-            offset = 0
             segment_files = []
             
-            while offset < total_count:
+            # Query for each segment (keyset paged: starts after the previous segment's last ID)
+            segment_query = """
+            WITH indexed_data AS (
+              SELECT
+                candidate_id,
+                full_name,
+                email,
+                phone_numbers,
+                addresses,
+                created_at,
+                updated_at,
+                resume_links,
+                resume_filenames,
+                degrees,
+                jobs_name,
+                resume_content,
+                ARRAY(
+                  SELECT title || '[' || (idx - 1)::text || ']'
+                  FROM unnest(employment_titles) WITH ORDINALITY AS t(title, idx)
+                ) AS employment_titles_indexed,
+                ARRAY(
+                  SELECT company || '[' || (idx - 1)::text || ']'
+                  FROM unnest(employment_companies) WITH ORDINALITY AS c(company, idx)
+                ) AS employment_companies_indexed
+              FROM gh.candidates
+              WHERE {keyset}
+              ORDER BY candidate_id
+              LIMIT %(batch_size)s
+            )
+            SELECT
+              candidate_id,
+              full_name,
+              email,
+              phone_numbers,
+              addresses,
+              created_at,
+              updated_at,
+              array_to_string(resume_links, E'\\n') AS resume_links,
+              array_to_string(resume_filenames, ', ') AS resume_filenames,
+              array_to_string(degrees, ', ') AS degrees,
+              array_to_string(employment_titles_indexed, ', ') AS employment_titles,
+              array_to_string(employment_companies_indexed, ', ') AS employment_companies,
+              array_to_string(jobs_name, ', ') AS jobs_name,
+              resume_content
+            FROM indexed_data;
+            """
+            
+            for segment_num, segment_df in enumerate(
+                iter_keyset_frames(connection, segment_query, batch_size=rows_per_segment), 1
+            ):
                 log(f"Exporting segment {segment_num}/{estimated_segments}...")
                 
-                # Query for this segment
-                segment_query = f"""
-                WITH indexed_data AS (
-                  SELECT
-                    candidate_id,
-                    full_name,
-                    email,
-                    phone_numbers,
-                    addresses,
-                    created_at,
-                    updated_at,
-                    resume_links,
-                    resume_filenames,
-                    degrees,
-                    jobs_name,
-                    resume_content,
-                    ARRAY(
-                      SELECT title || '[' || (idx - 1)::text || ']'
-                      FROM unnest(employment_titles) WITH ORDINALITY AS t(title, idx)
-                    ) AS employment_titles_indexed,
-                    ARRAY(
-                      SELECT company || '[' || (idx - 1)::text || ']'
-                      FROM unnest(employment_companies) WITH ORDINALITY AS c(company, idx)
-                    ) AS employment_companies_indexed
-                  FROM gh.candidates
-                  ORDER BY candidate_id
-                  LIMIT {rows_per_segment} OFFSET {offset}
-                )
-                SELECT
-                  candidate_id,
-                  full_name,
-                  email,
-                  phone_numbers,
-                  addresses,
-                  created_at,
-                  updated_at,
-                  array_to_string(resume_links, E'\\n') AS resume_links,
-                  array_to_string(resume_filenames, ', ') AS resume_filenames,
-                  array_to_string(degrees, ', ') AS degrees,
-                  array_to_string(employment_titles_indexed, ', ') AS employment_titles,
-                  array_to_string(employment_companies_indexed, ', ') AS employment_companies,
-                  array_to_string(jobs_name, ', ') AS jobs_name,
-                  resume_content
-                FROM indexed_data;
-                """
-                
-                segment_df = pd.read_sql_query(segment_query, connection)
-                
-                if len(segment_df) == 0:
-                    break
-                
                 # Generate filename
                 segment_filename = f"segment_{segment_num:03d}_of_{estimated_segments:03d}.csv"
                 segment_path = os.path.join(export_dir, segment_filename)
@@ -208,9 +208,6 @@ def export_segmented():
                     'size_mb': file_size_mb,
                     'id_range': f"{segment_df['candidate_id'].min()} to {segment_df['candidate_id'].max()}"
                 })
-                
-                offset += rows_per_segment
-                segment_num += 1
             
             cursor.close()
         
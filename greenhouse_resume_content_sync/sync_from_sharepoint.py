@@ -30,9 +30,13 @@ GREENHOUSE_USER_ID = os.getenv("GREENHOUSE_USER_ID", "4371230008")
 GREENHOUSE_RESUME_CONTENT_FIELD_ID = int(os.getenv("GREENHOUSE_RESUME_CONTENT_FIELD_ID", "11138961008"))
 GREENHOUSE_BASE_URL = "https://harvest.greenhouse.io/v1"
 
-# Local AI_Access folder path
-LOCAL_AI_ACCESS_DIR = os.getenv("LOCAL_AI_ACCESS_DIR", 
+# Local AI_Access folder path (read by the mapper's ai_access_layout, which knows the flat/sharded layout)
+os.environ.setdefault("LOCAL_AI_ACCESS_DIR",
     "/Users/chasepoulton/Library/CloudStorage/OneDrive-CookSystems/AI Operator - Greenhouse_Resumes/AI_Access")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "greenhouse_sharepoint_mapper"))
+import ai_access_layout
+
+LOCAL_AI_ACCESS_DIR = ai_access_layout.LOCAL_AI_ACCESS_DIR
 
 if not GREENHOUSE_API_KEY:
     print("ERROR: GREENHOUSE_API_KEY not found in .env file")
@@ -65,7 +69,7 @@ def get_greenhouse_headers(include_on_behalf_of=False):
 def find_metadata_file(candidate_id):
     """Find metadata JSON file for a candidate in local AI_Access folder"""
     # Metadata files are named: {candidate_id}_*_metadata.json
-    pattern = os.path.join(LOCAL_AI_ACCESS_DIR, f"{candidate_id}_*_metadata.json")
+    pattern = os.path.join(ai_access_layout.local_ai_access_dir(candidate_id), f"{candidate_id}_*_metadata.json")
     matches = glob.glob(pattern)
     
     if matches:
@@ -79,9 +83,8 @@ def get_candidates_from_local_files():
     """
     log(f"Scanning local AI_Access folder: {LOCAL_AI_ACCESS_DIR}")
     
-    # Find all metadata JSON files
-    pattern = os.path.join(LOCAL_AI_ACCESS_DIR, "*_metadata.json")
-    metadata_files = glob.glob(pattern)
+    # Find all metadata JSON files (flat root plus numbered shard folders)
+    metadata_files = ai_access_layout.glob_ai_access("*_metadata.json")
     
     log(f"Found {len(metadata_files)} metadata files")
     
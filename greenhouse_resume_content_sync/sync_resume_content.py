@@ -7,41 +7,22 @@ This script processes ALL candidates and overwrites existing resume_content.
 Use this for initial population or complete refresh.
 
 For incremental updates, use update_resume_content.py instead.
+
+Downloads and Greenhouse updates run here; text extraction runs on a pool of
+EXTRACTION_WORKERS processes (results come back in candidate order). Resumes
+already parsed elsewhere are served from gh.extraction_cache by file hash.
 """
 
 import os
 import sys
 import requests
-import tempfile
 import base64
 from datetime import datetime
 from dotenv import load_dotenv
 
-# Text extraction functions
-def extract_text_from_pdf(file_path):
-    """Extract text from PDF file"""
-    try:
-        import PyPDF2
-        text = ""
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text.strip()
-    except Exception as e:
-        print(f"Error extracting PDF text: {e}")
-        return None
-
-def extract_text_from_docx(file_path):
-    """Extract text from DOCX file"""
-    try:
-        from docx import Document
-        doc = Document(file_path)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text.strip()
-    except Exception as e:
-        print(f"Error extracting DOCX text: {e}")
-        return None
+# Shared text extraction (process pool + extraction cache)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "greenhouse_sharepoint_mapper"))
+from resume_extraction import iter_extracted, spool_download, ExtractionCache, EXTRACTION_WORKERS
 
 # Load environment variables
 load_dotenv()
@@ -51,6 +32,7 @@ GREENHOUSE_API_KEY = os.getenv("GREENHOUSE_API_KEY")
 GREENHOUSE_USER_ID = os.getenv("GREENHOUSE_USER_ID", "4371230008")  # Default to Chase Poulton
 GREENHOUSE_RESUME_CONTENT_FIELD_ID = int(os.getenv("GREENHOUSE_RESUME_CONTENT_FIELD_ID", "11138961008"))
 GREENHOUSE_BASE_URL = "https://harvest.greenhouse.io/v1"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 if not GREENHOUSE_API_KEY:
     print("ERROR: GREENHOUSE_API_KEY not found in .env file")
@@ -130,54 +112,30 @@ def get_candidate_details(candidate_id):
         return None
 
 def download_resume(resume_url):
-    """Download resume to temporary file and return file path"""
+    """
+    Stream a resume into memory (spilling to a temp file above EXTRACTION_SPOOL_MB)
+    
+    The parser is picked later from the file's magic bytes, not the URL.
+    
+    Returns:
+        bytes, a temp file path, or None on failure
+    """
     try:
-        response = requests.get(resume_url, timeout=30)
-        response.raise_for_status()
-        
-        # Determine file extension from URL or content-type
-        if resume_url.endswith('.pdf'):
-            suffix = '.pdf'
-        elif resume_url.endswith('.docx') or resume_url.endswith('.doc'):
-            suffix = '.docx'
-        else:
-            # Try to determine from content-type
-            content_type = response.headers.get('content-type', '')
-            if 'pdf' in content_type:
-                suffix = '.pdf'
-            elif 'word' in content_type or 'document' in content_type:
-                suffix = '.docx'
-            else:
-                suffix = '.tmp'
-        
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-            tmp_file.write(response.content)
-            return tmp_file.name
-            
+        with requests.get(resume_url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            return spool_download(response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE))
     except Exception as e:
         log(f"  ❌ Error downloading resume: {e}")
         return None
 
-def extract_text_from_resume(file_path):
-    """Extract text from resume file based on extension"""
-    if not file_path:
-        return None
-    
+def remove_temp_file(job):
+    """Delete a download that was spilled to disk once its text has been collected"""
+    if not isinstance(job["source"], str):
+        return
     try:
-        if file_path.endswith('.pdf'):
-            return extract_text_from_pdf(file_path)
-        elif file_path.endswith('.docx') or file_path.endswith('.doc'):
-            return extract_text_from_docx(file_path)
-        else:
-            log(f"  ⚠️  Unsupported file type: {file_path}")
-            return None
-    finally:
-        # Clean up temporary file
-        try:
-            os.unlink(file_path)
-        except:
-            pass
+        os.unlink(job["source"])
+    except OSError:
+        pass
 
 def update_resume_content(candidate_id, resume_text):
     """Update the resume_content custom field for a candidate"""
@@ -208,8 +166,11 @@ def update_resume_content(candidate_id, resume_text):
             log(f"     Response: {e.response.text}")
         return False
 
-def process_candidate(candidate):
-    """Process a single candidate: download resume, extract text, update field"""
+def download_candidate_resume(candidate):
+    """Fetch candidate details and download the newest resume
+    
+    Returns a job dict for extraction, or False if there is nothing to extract
+    """
     candidate_id = candidate.get('id')
     first_name = candidate.get('first_name', '')
     last_name = candidate.get('last_name', '')
@@ -240,24 +201,31 @@ def process_candidate(candidate):
     
     log(f"  📄 Processing {candidate_id} ({full_name}) - {resume_filename}")
     
-    # Download resume to temp file
-    temp_file = download_resume(resume_url)
-    if not temp_file:
+    # Download resume (kept in memory unless it is very large)
+    source = download_resume(resume_url)
+    if not source:
         return False
     
-    # Extract text
-    resume_text = extract_text_from_resume(temp_file)
+    return {
+        "candidate_id": candidate_id,
+        "full_name": full_name,
+        "resume_filename": resume_filename,
+        "source": source
+    }
+
+def finish_candidate(job, resume_text):
+    """Push extracted text to Greenhouse (runs in the parent process)"""
     if not resume_text:
-        log(f"  ❌ Failed to extract text from {resume_filename}")
+        log(f"  ❌ Failed to extract text from {job['resume_filename']}")
         return False
     
     log(f"  ✅ Extracted {len(resume_text)} characters of text")
     
     # Update Greenhouse
-    success = update_resume_content(candidate_id, resume_text)
+    success = update_resume_content(job["candidate_id"], resume_text)
     
     if success:
-        log(f"  ✅ Updated resume_content for {candidate_id} ({full_name})")
+        log(f"  ✅ Updated resume_content for {job['candidate_id']} ({job['full_name']})")
     
     return success
 
@@ -274,7 +242,7 @@ def sync_resume_content():
         log("❌ No candidates found")
         return
     
-    log(f"\nProcessing {len(candidates)} candidates...")
+    log(f"\nProcessing {len(candidates)} candidates ({EXTRACTION_WORKERS} extraction workers)...")
     log("")
     
     success_count = 0
@@ -282,12 +250,24 @@ def sync_resume_content():
     skipped_count = 0
     no_resume_count = 0
     
-    for i, candidate in enumerate(candidates, 1):
+    # Downloads happen as the pool asks for work; extracted text comes back in order
+    extraction_cache = ExtractionCache()
+    jobs = (download_candidate_resume(candidate) for candidate in candidates)
+    results = iter_extracted(jobs, path_of=lambda job: job["source"] if job else None,
+                             cache=extraction_cache)
+    
+    for i, (job, resume_text, error) in enumerate(results, 1):
         if i % 100 == 0:
             log(f"\nProgress: {i}/{len(candidates)} ({i/len(candidates)*100:.1f}%)")
             log(f"  Success: {success_count} | Failed: {failed_count} | Skipped: {skipped_count} | No Resume: {no_resume_count}\n")
         
-        result = process_candidate(candidate)
+        if error:
+            log(f"  ❌ Extraction error for {job['candidate_id']}: {error}")
+        
+        if job:
+            remove_temp_file(job)
+        
+        result = finish_candidate(job, resume_text) if job else False
         
         if result is True:
             success_count += 1
@@ -296,6 +276,8 @@ def sync_resume_content():
         else:  # None means skipped
             skipped_count += 1
     
+    extraction_cache.close()
+    
     # Final summary
     log("")
     log("="*60)
@@ -306,6 +288,7 @@ def sync_resume_content():
     log(f"Already had content (skipped): {skipped_count}")
     log(f"Failed to update: {failed_count}")
     log(f"No resume attachment: {no_resume_count}")
+    log(extraction_cache.summary())
     
     if success_count > 0:
         log("")
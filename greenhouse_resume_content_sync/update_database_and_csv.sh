@@ -21,10 +21,25 @@ echo ""
 echo "========================================================================"
 echo ""
 
-# Step 2: Export updated CSV
-echo "Step 2: Exporting updated CSV..."
+# Step 2: Re-chunk the resumes whose content changed
+echo "Step 2: Updating resume chunks..."
 echo ""
 cd ../greenhouse_sharepoint_mapper
+python resume_chunks.py
+
+if [ $? -ne 0 ]; then
+    echo ""
+    echo "❌ Resume chunking failed!"
+    exit 1
+fi
+
+echo ""
+echo "========================================================================"
+echo ""
+
+# Step 3: Export updated CSV
+echo "Step 3: Exporting updated CSV..."
+echo ""
 python export_ai_access_csv.py
 
 if [ $? -ne 0 ]; then
@@ -9,7 +9,9 @@ Prefers PDF files and tracks download status to avoid duplicates.
 import os
 import re
 import sys
+import json
 import time
+import threading
 import mimetypes
 import pathlib
 import psycopg2
@@ -34,9 +36,28 @@ SAVE_DIR = os.path.expanduser(os.getenv("RESUME_SAVE_DIR", "./downloads/resumes"
 SKIP_IF_ALREADY_DOWNLOADED = os.getenv("SKIP_IF_ALREADY_DOWNLOADED", "true").lower() == "true"
 PREFER_PDF_FORMAT = os.getenv("PREFER_PDF_FORMAT", "true").lower() == "true"
 
+# Streaming / resume settings
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(256 * 1024)))
+DOWNLOAD_TIMEOUT = int(os.getenv("DOWNLOAD_TIMEOUT", "120"))
+DOWNLOAD_MAX_RETRIES = int(os.getenv("DOWNLOAD_MAX_RETRIES", "5"))
+DOWNLOAD_MAX_BYTES_PER_SEC = int(os.getenv("DOWNLOAD_MAX_BYTES_PER_SEC", "0"))  # 0 = unlimited
+STREAM_ITERSIZE = int(os.getenv("STREAM_ITERSIZE", "500"))                      # Rows per fetch from the candidate scan
+PARTIAL_SUFFIX = ".part"
+
 # File naming helpers
 SAFE_CHARS = re.compile(r"[^A-Za-z0-9_.\- ]+")
 
+# File type sniffing (magic bytes checked on the first downloaded chunk)
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+FILE_SIGNATURES = [
+    (b"%PDF-", "application/pdf", ".pdf"),
+    (b"PK\x03\x04", DOCX_MIME_TYPE, ".docx"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/msword", ".doc"),
+    (b"{\\rtf", "application/rtf", ".rtf"),
+]
+HTML_MARKERS = (b"<!doctype html", b"<html", b"<?xml", b"<error>")
+PDF_PAGE_PATTERN = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+
 def log(message):
     """Simple logging with timestamp"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -129,6 +150,165 @@ def detect_file_extension(response, url, fallback_filename=None):
     ext = pathlib.Path(url.split("?")[0]).suffix
     return ext or ".bin"
 
+def sniff_file_type(first_chunk, fallback_extension=None):
+    """
+    Identify a resume file from its leading bytes
+    
+    Returns:
+        tuple: (mime_type, extension, is_valid, reason)
+    """
+    head = first_chunk[:1024]
+    
+    if not head:
+        return None, fallback_extension, False, "Empty file"
+    
+    for signature, mime_type, extension in FILE_SIGNATURES:
+        # PDF readers tolerate junk before the header, so search rather than match
+        if head.startswith(signature) or (signature == b"%PDF-" and signature in head):
+            if signature == b"PK\x03\x04" and b"[Content_Types].xml" not in first_chunk \
+                    and b"word/" not in first_chunk and fallback_extension != ".docx":
+                return "application/zip", ".zip", False, "ZIP archive is not a Word document"
+            return mime_type, extension, True, None
+    
+    lowered = head.lstrip().lower()
+    if lowered.startswith(HTML_MARKERS):
+        return "text/html", fallback_extension, False, "Server returned an HTML/XML page instead of a resume"
+    
+    if b"\x00" not in head:
+        try:
+            head.decode("utf-8")
+            return "text/plain", ".txt", True, None
+        except UnicodeDecodeError as e:
+            if e.start >= len(head) - 4:    # Just a character cut off at the end of the sample
+                return "text/plain", ".txt", True, None
+    
+    return "application/octet-stream", fallback_extension, False, "Unrecognized file signature"
+
+class StreamInspector:
+    """
+    Validates a resume while it streams to disk
+    
+    Sniffs the file type from the first chunk, counts PDF page objects as the
+    bytes go past, and keeps a small tail so truncated files can be detected
+    without re-reading them.
+    """
+    
+    SNIFF_BYTES = 2048
+    TAIL_BYTES = 2048
+    
+    def __init__(self, fallback_extension=None):
+        self.fallback_extension = fallback_extension
+        self.mime_type = None
+        self.extension = fallback_extension
+        self.is_valid = False
+        self.reason = None
+        self.page_count = 0
+        self.bytes_seen = 0
+        self._sniffed = False
+        self._head = b""
+        self._carry = b""
+        self._last_page_end = 0
+        self._tail = b""
+    
+    def feed(self, chunk):
+        """Inspect the next chunk of the download"""
+        if not self._sniffed:
+            # Buffer small leading chunks so the signature check sees enough bytes
+            self._head += chunk
+            if len(self._head) < self.SNIFF_BYTES:
+                return
+            self._sniff()
+            chunk = self._head
+        
+        self._inspect(chunk)
+    
+    def _sniff(self):
+        """Run the magic-byte check on the buffered head of the file"""
+        self.mime_type, self.extension, self.is_valid, self.reason = sniff_file_type(
+            self._head, self.fallback_extension
+        )
+        self._sniffed = True
+    
+    def _inspect(self, chunk):
+        """Track page objects and the file tail for a chunk"""
+        if self.mime_type == "application/pdf":
+            self._count_pdf_pages(chunk)
+        
+        self.bytes_seen += len(chunk)
+        self._tail = (self._tail + chunk)[-self.TAIL_BYTES:]
+    
+    def _count_pdf_pages(self, chunk):
+        """Count /Type /Page objects, including ones split across chunks"""
+        buffer = self._carry + chunk
+        buffer_start = self.bytes_seen - len(self._carry)
+        
+        for match in PDF_PAGE_PATTERN.finditer(buffer):
+            match_end = buffer_start + match.end()
+            # Need one byte after the match to rule out /Pages
+            if match.end() < len(buffer) and match_end > self._last_page_end:
+                self.page_count += 1
+                self._last_page_end = match_end
+        
+        self._carry = buffer[-64:]
+    
+    def finish(self):
+        """
+        Finalize validation once the stream is complete
+        
+        Returns:
+            dict: detected_mime_type, extension, page_count, file_valid, validation_error
+        """
+        if not self._sniffed:
+            self._sniff()
+            self._inspect(self._head)
+        
+        if self.is_valid and self.mime_type == "application/pdf" and b"%%EOF" not in self._tail:
+            self.is_valid, self.reason = False, "PDF is truncated (no %%EOF trailer)"
+        elif self.is_valid and self.mime_type == DOCX_MIME_TYPE and b"PK\x05\x06" not in self._tail:
+            self.is_valid, self.reason = False, "DOCX is truncated (no ZIP end record)"
+        
+        # Page objects inside compressed object streams can't be counted cheaply
+        page_count = self.page_count if self.mime_type == "application/pdf" and self.page_count else None
+        
+        return {
+            "detected_mime_type": self.mime_type,
+            "extension": self.extension,
+            "page_count": page_count,
+            "file_valid": self.is_valid,
+            "validation_error": self.reason
+        }
+
+class BandwidthLimiter:
+    """
+    Token bucket shared by every download in the process
+    
+    Lets a rebuild share the office uplink with the OneDrive client. A rate of
+    0 disables limiting.
+    """
+    
+    def __init__(self, bytes_per_sec):
+        self.rate = bytes_per_sec
+        self.allowance = bytes_per_sec
+        self.last_check = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def consume(self, nbytes):
+        """Account for nbytes and sleep long enough to stay under the rate"""
+        if self.rate <= 0:
+            return
+        
+        with self.lock:
+            now = time.monotonic()
+            self.allowance = min(self.rate, self.allowance + (now - self.last_check) * self.rate)
+            self.last_check = now
+            self.allowance -= nbytes
+            wait = -self.allowance / self.rate if self.allowance < 0 else 0
+        
+        if wait > 0:
+            time.sleep(wait)
+
+BANDWIDTH_LIMITER = BandwidthLimiter(DOWNLOAD_MAX_BYTES_PER_SEC)
+
 def build_filename(candidate_id, full_name, created_at, extension):
     """Build standardized filename: {candidate_id}_{full_name}_{date}.{ext}"""
     safe_name = sanitize_filename(full_name or "Unknown")
@@ -192,16 +372,19 @@ def already_downloaded(conn, candidate_id):
         result = cur.fetchone()
         return result and result[0] == 'success'
 
-def record_download_attempt(conn, candidate_id, resume_data, status, saved_path=None, error_msg=None, file_size=None):
+def record_download_attempt(conn, candidate_id, resume_data, status, saved_path=None, error_msg=None, file_size=None,
+                            file_info=None):
     """Record download attempt in audit table"""
+    file_info = file_info or {}
     with conn.cursor() as cur:
         cur.execute("""
             INSERT INTO gh.resume_download_audit (
                 candidate_id, attachment_url, attachment_filename, 
                 attachment_created, saved_path, download_status, 
-                error_message, file_size_bytes
+                error_message, file_size_bytes,
+                detected_mime_type, page_count, file_valid, validation_error
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             ON CONFLICT (candidate_id) DO UPDATE SET
                 attachment_url = EXCLUDED.attachment_url,
                 attachment_filename = EXCLUDED.attachment_filename,
@@ -210,7 +393,11 @@ def record_download_attempt(conn, candidate_id, resume_data, status, saved_path=
                 download_status = EXCLUDED.download_status,
                 error_message = EXCLUDED.error_message,
                 downloaded_at = NOW(),
-                file_size_bytes = EXCLUDED.file_size_bytes
+                file_size_bytes = EXCLUDED.file_size_bytes,
+                detected_mime_type = EXCLUDED.detected_mime_type,
+                page_count = EXCLUDED.page_count,
+                file_valid = EXCLUDED.file_valid,
+                validation_error = EXCLUDED.validation_error
         """, (
             candidate_id,
             resume_data.get("url"),
@@ -219,30 +406,183 @@ def record_download_attempt(conn, candidate_id, resume_data, status, saved_path=
             saved_path,
             status,
             error_msg,
-            file_size
+            file_size,
+            file_info.get("detected_mime_type"),
+            file_info.get("page_count"),
+            file_info.get("file_valid"),
+            file_info.get("validation_error")
         ))
     conn.commit()
 
-def download_resume(resume_url, save_path, auth=None):
-    """Download resume file with streaming"""
+def parse_content_range_start(response):
+    """Return the first byte offset from a Content-Range header, or None"""
+    match = re.match(r"bytes (\d+)-", response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+def parse_content_range_total(response):
+    """Return the complete length from a Content-Range header ("bytes 0-9/10" or "bytes */10"), or None"""
+    match = re.match(r"bytes (?:\d+-\d+|\*)/(\d+)", response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+def response_validator(response):
+    """Strong ETag or Last-Modified for If-Range (weak ETags are not allowed there)"""
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+def partial_state_path(save_path):
+    """Hidden sidecar next to the .part file (ignored by the resume index like other dotfiles)"""
+    directory, filename = os.path.split(save_path)
+    return os.path.join(directory, f".{filename}{PARTIAL_SUFFIX}.json")
+
+def load_partial_state(save_path):
+    """Validator and total length saved with a .part file, or {} if there are none"""
     try:
-        # Don't use auth for S3 signed URLs - they have their own signature
-        with requests.get(resume_url, stream=True, timeout=120) as response:
-            response.raise_for_status()
-            
-            total_size = 0
-            with open(save_path, "wb") as file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        file.write(chunk)
-                        total_size += len(chunk)
+        with open(partial_state_path(save_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_partial_state(save_path, validator, total):
+    with open(partial_state_path(save_path), "w", encoding="utf-8") as f:
+        json.dump({"validator": validator, "total": total}, f)
+
+def clear_partial_state(save_path):
+    try:
+        os.unlink(partial_state_path(save_path))
+    except FileNotFoundError:
+        pass
+
+def download_resume(resume_url, save_path, auth=None):
+    """
+    Download resume file with streaming
+    
+    Bytes are written to a .part file. When the connection drops, the download
+    resumes with an HTTP Range request (if the server honours it) instead of
+    starting over. The ETag / Last-Modified and total length are saved in a
+    hidden sidecar, so a .part file left by an earlier run is resumed with
+    If-Range and restarted if the file changed or no validator was saved.
+    The file type is sniffed while streaming, and the file is renamed if the
+    real type disagrees with the guessed extension.
+    
+    Returns:
+        tuple: (total_size, error_msg, file_info) where file_info includes the
+               final saved_path plus the StreamInspector results
+    """
+    part_path = f"{save_path}{PARTIAL_SUFFIX}"
+    fallback_extension = pathlib.Path(save_path).suffix.lower() or None
+    inspector = StreamInspector(fallback_extension)
+    bytes_written = 0
+    
+    # Pick up a partial file from a previous run. Signed URLs change on every
+    # run, so only resume when the file's validator was saved with the .part;
+    # it goes out as If-Range and a changed file comes back whole (200).
+    state = load_partial_state(save_path)
+    validator = state.get("validator")      # ETag / Last-Modified, sent as If-Range on resume
+    total = state.get("total")              # Complete length of the resource, if known
+    if os.path.exists(part_path):
+        if validator:
+            with open(part_path, "rb") as partial:
+                for chunk in iter(lambda: partial.read(DOWNLOAD_CHUNK_SIZE), b""):
+                    inspector.feed(chunk)
+                    bytes_written += len(chunk)
+            if bytes_written:
+                log(f"  Resuming partial download at {bytes_written:,} bytes")
+        else:
+            log("  Partial download has no saved validator, restarting download")
+    
+    last_error = None
+    
+    for attempt in range(DOWNLOAD_MAX_RETRIES + 1):
+        headers = {}
+        if bytes_written:
+            headers["Range"] = f"bytes={bytes_written}-"
+            if validator:
+                headers["If-Range"] = validator
+        
+        try:
+            # Don't use auth for S3 signed URLs - they have their own signature
+            with requests.get(resume_url, stream=True, timeout=DOWNLOAD_TIMEOUT, headers=headers) as response:
+                if response.status_code == 416 and bytes_written:
+                    if parse_content_range_total(response) == bytes_written:
+                        # Partial file already holds the whole resource
+                        last_error = None
+                        break
+                    # Partial file is longer than the resource - it can't be a prefix of it
+                    log("  Partial download does not match the file on the server, restarting download")
+                    bytes_written = 0
+                    inspector = StreamInspector(fallback_extension)
+                    clear_partial_state(save_path)
+                    continue
+                
+                response.raise_for_status()
+                
+                if bytes_written and (response.status_code != 206
+                                      or parse_content_range_start(response) != bytes_written):
+                    # Server ignored the Range request (or the file changed) - start over
+                    log("  Server does not support resume for this file (or it changed), restarting download")
+                    bytes_written = 0
+                    inspector = StreamInspector(fallback_extension)
+                
+                if response.status_code == 206:
+                    total = parse_content_range_total(response) or total
+                else:
+                    content_length = response.headers.get("Content-Length")
+                    total = int(content_length) if content_length and content_length.isdigit() else None
+                    validator = response_validator(response)
+                
+                # Without a validator a later run could not tell whether the file changed
+                if validator:
+                    save_partial_state(save_path, validator, total)
+                else:
+                    clear_partial_state(save_path)
+                
+                with open(part_path, "ab" if bytes_written else "wb") as file:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if chunk:
+                            BANDWIDTH_LIMITER.consume(len(chunk))
+                            inspector.feed(chunk)
+                            file.write(chunk)
+                            bytes_written += len(chunk)
             
-            return total_size, None
+            last_error = None
+            break
             
-    except requests.exceptions.RequestException as e:
-        return 0, f"Download failed: {str(e)}"
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout) as e:
+            last_error = e
+            if attempt < DOWNLOAD_MAX_RETRIES:
+                log(f"  Connection dropped at {bytes_written:,} bytes (attempt {attempt + 1}), retrying: {e}")
+                time.sleep(min(2 ** attempt, 30))
+        except requests.exceptions.RequestException as e:
+            return 0, f"Download failed: {str(e)}", None
+        except Exception as e:
+            return 0, f"Unexpected error: {str(e)}", None
+    
+    if last_error:
+        # Keep the .part file so the next run can resume it
+        return 0, f"Download failed after {DOWNLOAD_MAX_RETRIES} retries: {str(last_error)}", None
+    
+    try:
+        os.replace(part_path, save_path)
+        clear_partial_state(save_path)
+        
+        file_info = inspector.finish()
+        file_info["saved_path"] = save_path
+        
+        # Trust the magic bytes over Content-Disposition / URL suffix
+        detected_ext = file_info["extension"]
+        if detected_ext and detected_ext != pathlib.Path(save_path).suffix.lower():
+            corrected_path = get_unique_filepath(str(pathlib.Path(save_path).with_suffix(detected_ext)))
+            os.replace(save_path, corrected_path)
+            file_info["saved_path"] = corrected_path
+        
+        return bytes_written, None, file_info
+        
     except Exception as e:
-        return 0, f"Unexpected error: {str(e)}"
+        return 0, f"Unexpected error: {str(e)}", None
 
 def get_unique_filepath(base_path):
     """Generate unique filepath if file already exists"""
@@ -271,6 +611,9 @@ def main():
     log(f"Save directory: {SAVE_DIR}")
     log(f"Skip already downloaded: {SKIP_IF_ALREADY_DOWNLOADED}")
     log(f"Prefer PDF format: {PREFER_PDF_FORMAT}")
+    log(f"Chunk size: {DOWNLOAD_CHUNK_SIZE:,} bytes")
+    if DOWNLOAD_MAX_BYTES_PER_SEC > 0:
+        log(f"Bandwidth limit: {DOWNLOAD_MAX_BYTES_PER_SEC:,} bytes/sec")
     
     # Ensure save directory exists
     ensure_directory_exists(SAVE_DIR)
@@ -284,31 +627,35 @@ def main():
     successful_downloads = 0
     skipped_downloads = 0
     failed_downloads = 0
+    invalid_files = 0
     
     try:
         with psycopg2.connect(**PG) as conn:
             log("Connected to database, fetching candidates with resume attachments...")
             
-            with conn.cursor() as cur:
-                # Get candidates that have attachments in their raw JSON
-                # Filter by updated_at to only get recently synced candidates with fresh URLs
-                cur.execute("""
-                    SELECT 
-                        c.candidate_id,
-                        COALESCE(NULLIF(TRIM(c.full_name), ''), 
-                                CONCAT(COALESCE(c.first_name,''), ' ', COALESCE(c.last_name,''))) AS full_name,
-                        c.created_at,
-                        c.raw
-                    FROM gh.candidates c
-                    WHERE c.raw ? 'attachments'
-                      AND c.updated_at >= NOW() - INTERVAL '1 day'
-                    ORDER BY c.candidate_id
-                """)
-                
-                candidates = cur.fetchall()
-                log(f"Found {len(candidates)} candidates with attachments")
+            # Server-side cursor: rows arrive STREAM_ITERSIZE at a time instead of the
+            # whole result set at once. WITH HOLD keeps it open across the audit commits.
+            cur = conn.cursor(name="download_candidates", withhold=True)
+            cur.itersize = STREAM_ITERSIZE
+            
+            # Get candidates that have attachments in their raw JSON (only the attachments
+            # array is transferred). Filter by updated_at to only get recently synced
+            # candidates with fresh URLs
+            cur.execute("""
+                SELECT 
+                    c.candidate_id,
+                    COALESCE(NULLIF(TRIM(c.full_name), ''), 
+                            CONCAT(COALESCE(c.first_name,''), ' ', COALESCE(c.last_name,''))) AS full_name,
+                    c.created_at,
+                    c.raw -> 'attachments'
+                FROM gh.candidates c
+                WHERE c.raw ? 'attachments'
+                  AND c.updated_at >= NOW() - INTERVAL '1 day'
+                ORDER BY c.candidate_id
+            """)
+            log(f"Streaming candidates with attachments ({STREAM_ITERSIZE} rows per fetch)...")
             
-            for candidate_id, full_name, created_at, raw_data in candidates:
+            for candidate_id, full_name, created_at, attachments in cur:
                 total_candidates += 1
                 
                 # Skip if already downloaded successfully
@@ -316,8 +663,8 @@ def main():
                     skipped_downloads += 1
                     continue
                 
-                # Extract attachments from raw JSON
-                attachments = raw_data.get("attachments", []) if isinstance(raw_data, dict) else []
+                if not isinstance(attachments, list):
+                    attachments = []
                 
                 # Find best resume
                 best_resume = choose_best_resume(attachments)
@@ -338,11 +685,11 @@ def main():
                     
                     # Download to temporary location first
                     # Don't use auth for S3 signed URLs - they have their own signature
-                    temp_response = requests.get(resume_url, stream=True, timeout=30)
-                    temp_response.raise_for_status()
-                    
-                    # Detect file extension
-                    extension = detect_file_extension(temp_response, resume_url, best_resume.get("filename"))
+                    with requests.get(resume_url, stream=True, timeout=30) as temp_response:
+                        temp_response.raise_for_status()
+                        
+                        # Detect file extension
+                        extension = detect_file_extension(temp_response, resume_url, best_resume.get("filename"))
                     
                     # Build final filename
                     filename = build_filename(candidate_id, full_name, 
@@ -354,8 +701,8 @@ def main():
                     # Ensure unique filename if file already exists
                     save_path = get_unique_filepath(save_path)
                     
-                    # Download the file
-                    file_size, error_msg = download_resume(resume_url, save_path)
+                    # Download the file (sniffs the real file type while streaming)
+                    file_size, error_msg, file_info = download_resume(resume_url, save_path)
                     
                     if error_msg:
                         # Save failed download info to Failed_Downloads folder
@@ -367,13 +714,19 @@ def main():
                         failed_downloads += 1
                         log(f"  Failed: {error_msg}")
                     else:
+                        save_path = file_info["saved_path"]
                         record_download_attempt(conn, candidate_id, best_resume, "success", 
-                                              saved_path=save_path, file_size=file_size)
+                                              saved_path=save_path, file_size=file_size,
+                                              file_info=file_info)
                         successful_downloads += 1
                         
                         # Show organized path in log
                         relative_path = os.path.relpath(save_path, SAVE_DIR)
-                        log(f"  Success: {relative_path} ({file_size:,} bytes)")
+                        log(f"  Success: {relative_path} ({file_size:,} bytes, {file_info['detected_mime_type']})")
+                        
+                        if not file_info["file_valid"]:
+                            invalid_files += 1
+                            log(f"  ⚠️  Invalid file: {file_info['validation_error']}")
                     
                 except Exception as e:
                     error_msg = f"Unexpected error: {str(e)}"
@@ -384,6 +737,8 @@ def main():
                 
                 # Be gentle on the API and filesystem
                 time.sleep(0.1)
+            
+            cur.close()
     
     except Exception as e:
         log(f"Database connection error: {e}")
@@ -398,6 +753,7 @@ def main():
     log(f"Successful downloads: {successful_downloads:,}")
     log(f"Skipped (already downloaded): {skipped_downloads:,}")
     log(f"Failed downloads: {failed_downloads:,}")
+    log(f"Downloaded but invalid (see file_valid in audit table): {invalid_files:,}")
     log(f"Files saved to: {SAVE_DIR}")
     
     if failed_downloads > 0:
@@ -36,13 +36,26 @@ def setup_audit_table():
       downloaded_at       TIMESTAMPTZ DEFAULT NOW(),
       file_size_bytes     BIGINT,
       
+      -- File validation (magic bytes sniffed while streaming)
+      detected_mime_type  TEXT,
+      page_count          INTEGER,                 -- PDFs only, NULL when not cheaply countable
+      file_valid          BOOLEAN,
+      validation_error    TEXT,
+      
       -- Foreign key to candidates table
       FOREIGN KEY (candidate_id) REFERENCES gh.candidates(candidate_id) ON DELETE CASCADE
     );
     
+    -- Upgrade tables created before file validation was added
+    ALTER TABLE gh.resume_download_audit ADD COLUMN IF NOT EXISTS detected_mime_type TEXT;
+    ALTER TABLE gh.resume_download_audit ADD COLUMN IF NOT EXISTS page_count INTEGER;
+    ALTER TABLE gh.resume_download_audit ADD COLUMN IF NOT EXISTS file_valid BOOLEAN;
+    ALTER TABLE gh.resume_download_audit ADD COLUMN IF NOT EXISTS validation_error TEXT;
+    
     -- Index for quick lookups
     CREATE INDEX IF NOT EXISTS idx_resume_audit_status ON gh.resume_download_audit (download_status);
     CREATE INDEX IF NOT EXISTS idx_resume_audit_downloaded_at ON gh.resume_download_audit (downloaded_at);
+    CREATE INDEX IF NOT EXISTS idx_resume_audit_file_valid ON gh.resume_download_audit (file_valid);
     """
     
     try:
@@ -91,7 +104,8 @@ def verify_setup():
                 expected_columns = [
                     'candidate_id', 'attachment_url', 'attachment_filename', 
                     'attachment_created', 'saved_path', 'download_status',
-                    'error_message', 'downloaded_at', 'file_size_bytes'
+                    'error_message', 'downloaded_at', 'file_size_bytes',
+                    'detected_mime_type', 'page_count', 'file_valid', 'validation_error'
                 ]
                 
                 missing_columns = set(expected_columns) - set(columns)
@@ -61,12 +61,26 @@ def get_database_stats():
                 latest_download = cur.fetchone()
                 latest_download = latest_download[0] if latest_download else None
                 
+                # File validation breakdown (sniffed while downloading)
+                cur.execute("""
+                    SELECT 
+                        COALESCE(detected_mime_type, 'unknown'),
+                        COUNT(*) FILTER (WHERE file_valid),
+                        COUNT(*) FILTER (WHERE NOT file_valid)
+                    FROM gh.resume_download_audit 
+                    WHERE download_status = 'success' AND file_valid IS NOT NULL
+                    GROUP BY 1
+                    ORDER BY 2 DESC
+                """)
+                validation_stats = cur.fetchall()
+                
                 return {
                     'total_candidates': total_candidates,
                     'candidates_with_attachments': candidates_with_attachments,
                     'download_stats': download_stats,
                     'recent_downloads': recent_downloads,
-                    'latest_download': latest_download
+                    'latest_download': latest_download,
+                    'validation_stats': validation_stats
                 }
                 
     except Exception as e:
@@ -162,6 +176,12 @@ def main():
                 size = data['bytes']
                 print(f"   {status.title()}: {count:,} files ({format_bytes(size)})")
         
+        # File validation breakdown
+        if stats['validation_stats']:
+            print("\n🔎 File Validation (by detected type):")
+            for mime_type, valid_count, invalid_count in stats['validation_stats']:
+                print(f"   {mime_type}: {valid_count:,} valid, {invalid_count:,} invalid")
+        
     else:
         print("   ❌ Unable to connect to database")
     
@@ -205,11 +225,15 @@ def main():
         failed_count = stats['download_stats'].get('failed', {}).get('count', 0)
         
         if failed_count > 0:
-            print(f"   1. Review failed downloads: SELECT * FROM gh.resume_download_audit WHERE download_status='failed';")
+            print("   1. Review failed downloads: SELECT * FROM gh.resume_download_audit WHERE download_status='failed';")
+        
+        invalid_count = sum(row[2] for row in stats['validation_stats'])
+        if invalid_count > 0:
+            print("   1. Review invalid files: SELECT * FROM gh.resume_download_audit WHERE file_valid = false;")
         
         if success_count > 0:
-            print(f"   2. Update RESUME_SAVE_DIR to SharePoint path when OneDrive is ready")
-            print(f"   3. Re-run download_resumes.py to sync to SharePoint")
+            print("   2. Update RESUME_SAVE_DIR to SharePoint path when OneDrive is ready")
+            print("   3. Re-run download_resumes.py to sync to SharePoint")
         else:
             print("   1. Run 'python download_resumes.py' to start downloading")
 
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+AI_Access Folder Layout
+
+AI_Access/ is flat by default: every resume and its _metadata.json sit in one
+directory. With hundreds of thousands of entries that slows down listing,
+globbing, OneDrive sync and Graph `children` paging.
+
+The opt-in sharded layout spreads files over a fixed number of subfolders
+keyed by candidate_id:
+
+    AI_Access/042/12345042_Jane_Doe_2024-01-01.pdf
+    AI_Access/042/12345042_Jane_Doe_2024-01-01_metadata.json
+
+The layout is recorded in AI_Access/_layout.json (written by
+migrate_ai_access_layout.py), so every script agrees on it without extra
+configuration. The `ai_access_path` field that AI agents see stays the logical
+"AI_Access/<filename>" in both layouts; the physical location is stored
+separately as `storage_path`.
+"""
+
+import os
+import json
+import glob
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Configuration
+LOCAL_RESUME_DIR = os.getenv("LOCAL_RESUME_DIR")
+AI_ACCESS_FOLDER = "AI_Access"
+# LOCAL_AI_ACCESS_DIR overrides the default (the resume content sync configures the folder that way)
+LOCAL_AI_ACCESS_DIR = os.getenv("LOCAL_AI_ACCESS_DIR") or os.path.join(LOCAL_RESUME_DIR or "", AI_ACCESS_FOLDER)
+LAYOUT_FILE = "_layout.json"
+
+FLAT = "flat"
+SHARDED = "sharded"
+DEFAULT_FANOUT = 256
+
+_layout = None
+
+def load_layout(refresh=False):
+    """
+    Read the AI_Access layout marker
+
+    Returns:
+        dict: {"layout": "flat"} or {"layout": "sharded", "fanout": N}
+    """
+    global _layout
+
+    if _layout is not None and not refresh:
+        return _layout
+
+    layout = {"layout": FLAT}
+    layout_path = os.path.join(LOCAL_AI_ACCESS_DIR, LAYOUT_FILE)
+
+    if os.path.exists(layout_path):
+        with open(layout_path, 'r', encoding='utf-8') as f:
+            layout = json.load(f)
+
+    _layout = layout
+    return layout
+
+def save_layout(layout):
+    """Write the layout marker (used by the migration tool)"""
+    global _layout
+
+    layout_path = os.path.join(LOCAL_AI_ACCESS_DIR, LAYOUT_FILE)
+    with open(layout_path, 'w', encoding='utf-8') as f:
+        json.dump(layout, f, indent=2)
+
+    _layout = layout
+
+def is_sharded():
+    return load_layout().get("layout") == SHARDED
+
+def shard_name(candidate_id, fanout):
+    """Fixed-width shard folder name for a candidate, e.g. '042' for fanout 256"""
+    width = len(str(fanout - 1))
+    return f"{int(candidate_id) % fanout:0{width}d}"
+
+def shard_for(candidate_id, layout=None):
+    """Shard folder for a candidate under the current layout ('' when flat)"""
+    layout = layout or load_layout()
+    if layout.get("layout") != SHARDED:
+        return ""
+    return shard_name(candidate_id, layout.get("fanout", DEFAULT_FANOUT))
+
+def local_ai_access_dir(candidate_id, create=False):
+    """Local directory that holds a candidate's AI_Access files"""
+    shard = shard_for(candidate_id)
+    directory = os.path.join(LOCAL_AI_ACCESS_DIR, shard) if shard else LOCAL_AI_ACCESS_DIR
+
+    if create:
+        os.makedirs(directory, exist_ok=True)
+
+    return directory
+
+def local_ai_access_path(candidate_id, filename, create_dir=False):
+    """Local path for an AI_Access file under the current layout"""
+    return os.path.join(local_ai_access_dir(candidate_id, create=create_dir), filename)
+
+def storage_path(candidate_id, filename):
+    """Physical path relative to the resume folder (what Graph lookups need)"""
+    shard = shard_for(candidate_id)
+    return f"{AI_ACCESS_FOLDER}/{shard}/{filename}" if shard else f"{AI_ACCESS_FOLDER}/{filename}"
+
+def storage_path_for_filename(filename):
+    """storage_path() for an AI_Access filename ({candidate_id}_Name_Date.ext)"""
+    return storage_path(filename.split("_", 1)[0], filename)
+
+def logical_path(filename):
+    """Layout-independent path shown to AI agents"""
+    return f"{AI_ACCESS_FOLDER}/{filename}"
+
+def all_ai_access_dirs():
+    """Every local directory that can hold AI_Access files (flat root plus shards)"""
+    dirs = [LOCAL_AI_ACCESS_DIR]
+
+    if os.path.isdir(LOCAL_AI_ACCESS_DIR):
+        with os.scandir(LOCAL_AI_ACCESS_DIR) as entries:
+            dirs.extend(
+                entry.path for entry in entries
+                if entry.is_dir() and entry.name.isdigit()
+            )
+
+    return dirs
+
+def glob_ai_access(pattern):
+    """glob() a filename pattern across the flat root and all shard folders"""
+    matches = []
+    for directory in all_ai_access_dirs():
+        matches.extend(glob.glob(os.path.join(directory, pattern)))
+    return matches
+
+def sharepoint_ai_access_folders():
+    """AI_Access folder paths (relative to the resume folder) to list in SharePoint"""
+    layout = load_layout()
+
+    if layout.get("layout") != SHARDED:
+        return [AI_ACCESS_FOLDER]
+
+    fanout = layout.get("fanout", DEFAULT_FANOUT)
+    return [AI_ACCESS_FOLDER] + [
+        f"{AI_ACCESS_FOLDER}/{shard_name(i, fanout)}" for i in range(fanout)
+    ]
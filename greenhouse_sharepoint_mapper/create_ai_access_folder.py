@@ -4,35 +4,49 @@ AI Access Folder Creator for SharePoint
 
 This script creates a flat, AI-friendly folder structure in SharePoint:
 1. Creates an AI_Access folder with all resumes in one place (no subfolders)
-2. Extracts text content from PDFs and DOCX files
+2. Extracts text content from PDFs and DOCX files (EXTRACTION_WORKERS processes)
 3. Creates JSON metadata files with extracted text
-4. Generates a master index for quick lookups
+4. Generates a master index for quick lookups (NDJSON shards, see master_index.py)
 5. Updates the database with AI-friendly links
 
 This maintains your organized folder structure while providing simple access for AI agents.
+
+With SHAREPOINT_DIRECT_UPLOAD=true newly copied files (and rewritten metadata) are
+uploaded straight to SharePoint through Graph instead of waiting for OneDrive,
+and their webUrls are written to the AI database (resume_links / metadata_url)
+in the same run.
+
+Extraction is incremental: gh.extraction_state records each source file's
+size, mtime, SHA-256 and the extractor version. A candidate whose file and
+extractor are unchanged keeps its existing metadata file untouched (no
+re-parse, no new extracted_at, nothing for OneDrive to re-upload). The
+mtime check comes first; the file is only hashed when the mtime moved.
+The database-derived metadata fields (name, created_at, links, download
+validation, storage path) are hashed too: when only they change the metadata
+file is rewritten from the text it already holds, without re-parsing.
+Files that do need extraction are looked up in gh.extraction_cache by hash
+first, so bytes already parsed by another script are not parsed again.
 """
 
 import os
 import sys
 import json
 import shutil
+import hashlib
 import psycopg2
+from psycopg2.extras import execute_values
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
-
-# Text extraction libraries
-try:
-    import PyPDF2
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
-
-try:
-    from docx import Document
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
+from resume_index import get_resume_index
+from db_batches import stream_rows
+from graph_client import SHAREPOINT_DIRECT_UPLOAD, UPLOAD_CONCURRENCY
+from resume_extraction import (
+    iter_extracted, extractor_signature, file_sha256, ExtractionCache, ExtractionKilled,
+    PDF_AVAILABLE, DOCX_AVAILABLE, SELECTED_BACKENDS, EXTRACTION_WORKERS
+)
+from master_index import MasterIndexWriter, MASTER_INDEX_DIR
+import ai_access_layout
 
 load_dotenv()
 
@@ -49,102 +63,271 @@ PG = {
     "password": os.getenv("PGPASSWORD", "")
 }
 
+# Source database holds the downloader's audit table (file type / validity)
+SOURCE_PG = {
+    "host": os.getenv("PGHOST", "localhost"),
+    "port": int(os.getenv("PGPORT", "5432")),
+    "dbname": os.getenv("SOURCE_PGDATABASE", "greenhouse_candidates"),
+    "user": os.getenv("PGUSER"),
+    "password": os.getenv("PGPASSWORD", "")
+}
+
+# AI database gets the webUrls of directly uploaded files
+PG_AI = {
+    "host": os.getenv("PGHOST", "localhost"),
+    "port": int(os.getenv("PGPORT", "5432")),
+    "dbname": os.getenv("PGDATABASE_AI", "greenhouse_candidates_ai"),
+    "user": os.getenv("PGUSER"),
+    "password": os.getenv("PGPASSWORD", "")
+}
+
+STATE_BATCH_SIZE = 500
+
 def log(message):
     """Simple logging with timestamp"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {message}")
 
-def extract_text_from_pdf(pdf_path):
-    """Extract text content from PDF file"""
-    if not PDF_AVAILABLE:
-        return None
+def load_download_validation():
+    """
+    Load file validation results recorded by the resume downloader
     
+    Returns:
+        dict: candidate_id -> {detected_mime_type, page_count, file_valid, validation_error}
+    """
     try:
-        text_content = []
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text = page.extract_text()
-                if text:
-                    text_content.append(text)
-        
-        return "\n\n".join(text_content) if text_content else None
+        with psycopg2.connect(**SOURCE_PG) as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT candidate_id, detected_mime_type, page_count, file_valid, validation_error
+                    FROM gh.resume_download_audit
+                    WHERE file_valid IS NOT NULL
+                """)
+                return {
+                    row[0]: {
+                        "detected_mime_type": row[1],
+                        "page_count": row[2],
+                        "file_valid": row[3],
+                        "validation_error": row[4]
+                    }
+                    for row in cur.fetchall()
+                }
     except Exception as e:
-        log(f"  ⚠️  PDF extraction failed: {e}")
-        return None
+        log(f"⚠️  Could not load download validation results: {e}")
+        log("   Continuing without them - every file will be extracted")
+        return {}
 
-def extract_text_from_docx(docx_path):
-    """Extract text content from DOCX file"""
-    if not DOCX_AVAILABLE:
-        return None
+def ensure_extraction_state_table(conn):
+    """Create the extraction state table if needed"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS gh.extraction_state (
+                candidate_id        BIGINT PRIMARY KEY,
+                source_filename     TEXT,
+                size_bytes          BIGINT,
+                mtime_ns            BIGINT,
+                content_hash        TEXT,           -- SHA-256 of the source file
+                extractor_version   TEXT,           -- extractor_signature() at extraction time
+                text_extracted      BOOLEAN,
+                extracted_at        TIMESTAMPTZ DEFAULT NOW(),
+                extraction_error    TEXT,           -- 'timeout' / 'oom' while the file waits in the slow lane
+                metadata_hash       TEXT            -- metadata_fields_hash() of the DB-derived fields written
+            )
+        """)
+        cur.execute("ALTER TABLE gh.extraction_state ADD COLUMN IF NOT EXISTS extraction_error TEXT")
+        cur.execute("ALTER TABLE gh.extraction_state ADD COLUMN IF NOT EXISTS metadata_hash TEXT")
+    conn.commit()
+
+def load_extraction_state(conn):
+    """
+    Load the recorded state of every extracted source file
     
-    try:
-        doc = Document(docx_path)
-        text_content = []
-        
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                text_content.append(paragraph.text)
-        
-        return "\n\n".join(text_content) if text_content else None
-    except Exception as e:
-        log(f"  ⚠️  DOCX extraction failed: {e}")
-        return None
+    Returns:
+        dict: candidate_id -> {size_bytes, mtime_ns, content_hash, extractor_version, text_extracted,
+              extraction_error, metadata_hash}
+    """
+    return {
+        row[0]: {
+            "size_bytes": row[1],
+            "mtime_ns": row[2],
+            "content_hash": row[3],
+            "extractor_version": row[4],
+            "text_extracted": row[5],
+            "extraction_error": row[6],
+            "metadata_hash": row[7]
+        }
+        for row in stream_rows(conn, """
+            SELECT candidate_id, size_bytes, mtime_ns, content_hash, extractor_version, text_extracted,
+                   extraction_error, metadata_hash
+            FROM gh.extraction_state
+        """)
+    }
 
-def extract_text_from_doc(doc_path):
-    """Extract text from .doc file (older Word format)"""
-    # .doc files are harder to parse - we'll skip for now
-    # Could use textract or antiword if needed
-    return None
+def save_extraction_state(conn, rows):
+    """
+    Upsert state rows
+    
+    Rows are (candidate_id, source_filename, size_bytes, mtime_ns, content_hash,
+    extractor_version, text_extracted, extracted_at, extraction_error, metadata_hash);
+    extracted_at is None when only the mtime moved and the recorded extraction
+    time should stay.
+    """
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO gh.extraction_state
+                (candidate_id, source_filename, size_bytes, mtime_ns, content_hash,
+                 extractor_version, text_extracted, extracted_at, extraction_error, metadata_hash)
+            VALUES %s
+            ON CONFLICT (candidate_id) DO UPDATE SET
+                source_filename = EXCLUDED.source_filename,
+                size_bytes = EXCLUDED.size_bytes,
+                mtime_ns = EXCLUDED.mtime_ns,
+                content_hash = EXCLUDED.content_hash,
+                extractor_version = EXCLUDED.extractor_version,
+                text_extracted = EXCLUDED.text_extracted,
+                extracted_at = COALESCE(EXCLUDED.extracted_at, gh.extraction_state.extracted_at),
+                extraction_error = EXCLUDED.extraction_error,
+                metadata_hash = EXCLUDED.metadata_hash
+        """, rows, page_size=STATE_BATCH_SIZE)
+    conn.commit()
 
-def extract_text_from_file(file_path):
-    """Extract text from resume file based on extension"""
-    ext = Path(file_path).suffix.lower()
-    
-    if ext == '.pdf':
-        return extract_text_from_pdf(file_path)
-    elif ext == '.docx':
-        return extract_text_from_docx(file_path)
-    elif ext == '.doc':
-        return extract_text_from_doc(file_path)
-    elif ext == '.txt':
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except:
-            return None
+def classify_source(resume_path, stat, previous, signature, metadata_path):
+    """
+    Decide whether a source file needs extraction
     
-    return None
+    Size and mtime are compared first; the file is only hashed when they
+    don't settle it (new file, or same size with a different mtime). A file
+    that was killed last time is never 'unchanged', so its text is picked up
+    from the extraction cache once the slow lane has parsed it.
+    
+    Returns:
+        tuple: (status, content_hash) with status 'unchanged', 'extracted' (changed) or 'new'
+    """
+    if (previous and os.path.exists(metadata_path)
+            and previous["extractor_version"] == signature
+            and not previous["extraction_error"]
+            and previous["size_bytes"] == stat.st_size):
+        if previous["mtime_ns"] == stat.st_mtime_ns:
+            return "unchanged", previous["content_hash"]
+        
+        content_hash = file_sha256(resume_path)
+        if content_hash == previous["content_hash"]:
+            return "unchanged", content_hash
+    else:
+        content_hash = file_sha256(resume_path)
+    
+    return ("extracted" if previous else "new"), content_hash
 
-def create_metadata_file(resume_path, candidate_info, output_dir):
-    """Create JSON metadata file with extracted text"""
-    filename = Path(resume_path).name
-    base_name = Path(resume_path).stem
-    metadata_filename = f"{base_name}_metadata.json"
-    metadata_path = os.path.join(output_dir, metadata_filename)
+def metadata_path_for(resume_path, output_dir):
+    """Where a resume's metadata JSON lives"""
+    return os.path.join(output_dir, f"{Path(resume_path).stem}_metadata.json")
+
+def metadata_fields(candidate_info, validation, filename):
+    """Metadata fields that come from the database rather than the resume file"""
+    validation = validation or {}
+    return {
+        "candidate_name": candidate_info.get("full_name"),
+        "created_at": candidate_info.get("created_at"),
+        "detected_mime_type": validation.get("detected_mime_type"),
+        "page_count": validation.get("page_count"),
+        "file_valid": validation.get("file_valid"),
+        "original_sharepoint_url": candidate_info.get("sharepoint_url"),
+        "storage_path": ai_access_layout.storage_path(candidate_info.get("candidate_id"), filename)
+    }
+
+def metadata_fields_hash(fields):
+    """Short stable hash of metadata_fields() (stored in gh.extraction_state)"""
+    encoded = json.dumps(fields, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+def read_metadata_file(metadata_path):
+    """Existing metadata JSON, or None if it can't be read"""
+    try:
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_metadata_file(resume_path, candidate_info, output_dir, validation, text_content, extraction_error=None,
+                        extracted_at=None):
+    """
+    Write the JSON metadata file for a resume (text already extracted by a worker)
     
-    # Extract text content
-    text_content = extract_text_from_file(resume_path)
+    extraction_error ('timeout' / 'oom') is recorded when the worker was killed;
+    the file is written with text_extracted false until the slow lane parses it.
+    extracted_at is kept from the old file when only the database fields changed.
+    """
+    filename = Path(resume_path).name
+    metadata_path = metadata_path_for(resume_path, output_dir)
+    fields = metadata_fields(candidate_info, validation, filename)
     
     metadata = {
         "candidate_id": candidate_info.get("candidate_id"),
-        "candidate_name": candidate_info.get("full_name"),
+        "candidate_name": fields["candidate_name"],
         "original_filename": filename,
         "file_extension": Path(resume_path).suffix.lower(),
         "file_size_bytes": os.path.getsize(resume_path),
-        "created_at": candidate_info.get("created_at"),
-        "extracted_at": datetime.now().isoformat(),
+        "created_at": fields["created_at"],
+        "extracted_at": extracted_at or datetime.now().isoformat(),
         "text_extracted": text_content is not None,
         "text_content": text_content,
-        "original_sharepoint_url": candidate_info.get("sharepoint_url"),
-        "ai_access_path": f"{AI_ACCESS_FOLDER}/{filename}"
+        "detected_mime_type": fields["detected_mime_type"],
+        "page_count": fields["page_count"],
+        "file_valid": fields["file_valid"],
+        "original_sharepoint_url": fields["original_sharepoint_url"],
+        "ai_access_path": ai_access_layout.logical_path(filename),
+        "storage_path": fields["storage_path"]
     }
+    if extraction_error:
+        metadata["extraction_error"] = extraction_error
     
     with open(metadata_path, 'w', encoding='utf-8') as f:
         json.dump(metadata, f, indent=2, ensure_ascii=False)
     
     return metadata_path, text_content is not None
 
+def save_uploaded_links(resume_links, metadata_links):
+    """
+    Point the AI database at files just uploaded to SharePoint
+    
+    Args:
+        resume_links: candidate_id -> (filename, webUrl) for uploaded resume copies
+        metadata_links: candidate_id -> webUrl for uploaded metadata files
+        
+    Returns:
+        set: candidate_ids not in the AI database yet (update_ai_access_links.py adds them)
+    """
+    updated = set()
+    
+    with psycopg2.connect(**PG_AI) as conn:
+        with conn.cursor() as cur:
+            cur.execute("ALTER TABLE gh.candidates ADD COLUMN IF NOT EXISTS metadata_url TEXT")
+            
+            if resume_links:
+                rows = execute_values(cur, """
+                    UPDATE gh.candidates c
+                    SET resume_links = ARRAY[v.url],
+                        resume_filenames = ARRAY[v.filename]
+                    FROM (VALUES %s) AS v (candidate_id, filename, url)
+                    WHERE c.candidate_id = v.candidate_id
+                    RETURNING c.candidate_id
+                """, [(cid, filename, url) for cid, (filename, url) in resume_links.items()],
+                    page_size=STATE_BATCH_SIZE, fetch=True)
+                updated.update(row[0] for row in rows)
+            
+            if metadata_links:
+                rows = execute_values(cur, """
+                    UPDATE gh.candidates c
+                    SET metadata_url = v.url
+                    FROM (VALUES %s) AS v (candidate_id, url)
+                    WHERE c.candidate_id = v.candidate_id
+                    RETURNING c.candidate_id
+                """, list(metadata_links.items()), page_size=STATE_BATCH_SIZE, fetch=True)
+                updated.update(row[0] for row in rows)
+        conn.commit()
+    
+    return (set(resume_links) | set(metadata_links)) - updated
+
 def create_ai_access_structure():
     """Create the AI Access folder structure locally"""
     log("Creating AI Access folder structure...")
@@ -156,126 +339,367 @@ def create_ai_access_structure():
     # Get all candidates with resumes from database
     log("Fetching candidates with resumes from database...")
     
-    try:
-        with psycopg2.connect(**PG) as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT 
-                        candidate_id,
-                        full_name,
-                        resume_links,
-                        resume_filenames,
-                        created_at
-                    FROM gh.candidates
-                    WHERE resume_links IS NOT NULL 
-                    AND array_length(resume_links, 1) > 0
-                    ORDER BY candidate_id
-                """)
-                
-                candidates = cur.fetchall()
-                log(f"Found {len(candidates)} candidates with resumes")
+    # Rows are streamed from a server-side cursor while the loop below runs
+    candidate_filter = """
+        FROM gh.candidates
+        WHERE resume_links IS NOT NULL 
+        AND array_length(resume_links, 1) > 0
+    """
     
+    conn = None
+    try:
+        conn = psycopg2.connect(**PG)
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT COUNT(*) {candidate_filter}")
+            total_candidates = cur.fetchone()[0]
+        log(f"Found {total_candidates} candidates with resumes")
     except Exception as e:
         log(f"❌ Database error: {e}")
+        if conn:
+            conn.close()
         return False
     
-    # Process each candidate
-    total_processed = 0
-    total_copied = 0
-    total_metadata_created = 0
-    total_text_extracted = 0
-    
-    master_index = []
+    candidates = stream_rows(conn, f"""
+        SELECT 
+            candidate_id,
+            full_name,
+            resume_links,
+            resume_filenames,
+            created_at
+        {candidate_filter}
+        ORDER BY candidate_id
+    """)
     
-    for candidate_id, full_name, resume_links, resume_filenames, created_at in candidates:
-        total_processed += 1
-        
-        if total_processed % 100 == 0:
-            log(f"Progress: {total_processed}/{len(candidates)} candidates processed...")
-        
-        # Find the local resume file
-        local_file = None
-        for root, dirs, files in os.walk(LOCAL_RESUME_DIR):
-            # Skip AI_Access folder itself
-            if AI_ACCESS_FOLDER in root:
-                continue
+    stream_error = None
+    try:
+        # Resume index replaces a full directory walk per candidate
+        resume_index = get_resume_index()
             
-            for file in files:
-                if file.startswith(f"{candidate_id}_") and not file.startswith("FAILED_"):
-                    local_file = os.path.join(root, file)
-                    break
-            if local_file:
-                break
-        
-        if not local_file or not os.path.exists(local_file):
-            continue
-        
-        # Copy file to AI_Access folder with standardized name
-        filename = Path(local_file).name
-        dest_path = os.path.join(LOCAL_AI_ACCESS_DIR, filename)
-        
+        # Validation results from the downloader let us skip known-bad files
+        validation_results = load_download_validation()
+        log(f"Loaded download validation for {len(validation_results):,} candidates")
+            
+        # Extraction state decides which metadata files need rebuilding
+        signature = extractor_signature()
+        state_conn = None
+        extraction_state = {}
+        pending_state = []
         try:
-            # Copy file if it doesn't exist or is different
-            if not os.path.exists(dest_path) or os.path.getsize(local_file) != os.path.getsize(dest_path):
-                shutil.copy2(local_file, dest_path)
-                total_copied += 1
+            state_conn = psycopg2.connect(**SOURCE_PG)
+            ensure_extraction_state_table(state_conn)
+            extraction_state = load_extraction_state(state_conn)
+            log(f"Loaded extraction state for {len(extraction_state):,} candidates (extractor {signature})")
+        except Exception as e:
+            log(f"⚠️  Could not load extraction state: {e}")
+            log("   Continuing without it - every file will be extracted")
+            state_conn = None
             
-            # Create metadata file
-            candidate_info = {
-                "candidate_id": candidate_id,
-                "full_name": full_name,
-                "created_at": created_at.isoformat() if created_at else None,
-                "sharepoint_url": resume_links[0] if resume_links else None
-            }
+        # Process each candidate
+        total_processed = 0
+        total_copied = 0
+        total_new = 0
+        total_extracted = 0
+        total_unchanged = 0
+        total_refreshed = 0
+        total_text_extracted = 0
+        total_skipped_invalid = 0
+        total_killed = 0
             
-            metadata_path, text_extracted = create_metadata_file(local_file, candidate_info, LOCAL_AI_ACCESS_DIR)
-            total_metadata_created += 1
+        # Spooled per shard; only shards whose content changed replace the ones in AI_Access
+        master_index = MasterIndexWriter()
             
-            if text_extracted:
-                total_text_extracted += 1
+        # Direct upload: queue new files on the Graph client's upload pool
+        graph_client = None
+        uploads = []   # (candidate_id, local_path, storage_path, future)
+        if SHAREPOINT_DIRECT_UPLOAD:
+            from graph_client import GraphClient
+            graph_client = GraphClient()
+            log(f"📤 Direct upload enabled ({UPLOAD_CONCURRENCY} concurrent uploads)")
             
-            # Add to master index
-            master_index.append({
-                "candidate_id": candidate_id,
-                "candidate_name": full_name,
-                "filename": filename,
-                "metadata_file": Path(metadata_path).name,
-                "text_extracted": text_extracted,
-                "ai_access_path": f"{AI_ACCESS_FOLDER}/{filename}"
-            })
+        def prepared_candidates():
+            """Copy each resume into AI_Access and decide whether it needs extraction"""
+            nonlocal total_processed, total_copied
             
+            for candidate_id, full_name, resume_links, resume_filenames, created_at in candidates:
+                total_processed += 1
+                
+                if total_processed % 100 == 0:
+                    log(f"Progress: {total_processed}/{total_candidates} candidates processed...")
+                
+                # Find the local resume file
+                local_file = resume_index.organized_path(candidate_id)
+                
+                if not local_file or not os.path.exists(local_file):
+                    continue
+                
+                # Copy file to AI_Access folder with standardized name
+                filename = Path(local_file).name
+                dest_path = ai_access_layout.local_ai_access_path(candidate_id, filename, create_dir=True)
+                
+                try:
+                    # Copy file if it doesn't exist or is different
+                    copied = False
+                    if not os.path.exists(dest_path) or os.path.getsize(local_file) != os.path.getsize(dest_path):
+                        shutil.copy2(local_file, dest_path)
+                        resume_index.record_file(dest_path)
+                        total_copied += 1
+                        copied = True
+                    
+                    # Skip extraction when the source file and extractor are unchanged
+                    output_dir = os.path.dirname(dest_path)
+                    metadata_path = metadata_path_for(local_file, output_dir)
+                    stat = os.stat(local_file)
+                    previous = extraction_state.get(candidate_id)
+                    status, content_hash = classify_source(local_file, stat, previous, signature, metadata_path)
+                    
+                    candidate_info = {
+                        "candidate_id": candidate_id,
+                        "full_name": full_name,
+                        "created_at": created_at.isoformat() if created_at else None,
+                        "sharepoint_url": resume_links[0] if resume_links else None
+                    }
+                    validation = validation_results.get(candidate_id)
+                    fields = metadata_fields(candidate_info, validation, filename)
+                    metadata_hash = metadata_fields_hash(fields)
+                    
+                    # Same file, but the database fields behind the metadata may have moved
+                    stored_metadata = None
+                    if status == "unchanged" and previous["metadata_hash"] != metadata_hash:
+                        stored_metadata = read_metadata_file(metadata_path)
+                        if stored_metadata is None:
+                            # Metadata unreadable: rebuild it (text comes from the extraction cache when it has it)
+                            status = "extracted"
+                        else:
+                            # State rows from before the hash existed: compare with the file itself
+                            stored_hash = previous["metadata_hash"] or metadata_fields_hash(
+                                {key: stored_metadata.get(key) for key in fields}
+                            )
+                            if stored_hash != metadata_hash:
+                                status = "refreshed"
+                except Exception as e:
+                    log(f"  ❌ Failed to process candidate {candidate_id}: {e}")
+                    continue
+                
+                yield {
+                    "candidate_id": candidate_id,
+                    "full_name": full_name,
+                    "candidate_info": candidate_info,
+                    "local_file": local_file,
+                    "filename": filename,
+                    "dest_path": dest_path,
+                    "output_dir": output_dir,
+                    "metadata_path": metadata_path,
+                    "stat": stat,
+                    "previous": previous,
+                    "status": status,
+                    "content_hash": content_hash,
+                    "copied": copied,
+                    "validation": validation,
+                    "metadata_hash": metadata_hash,
+                    "stored_metadata": stored_metadata
+                }
+            
+        def extraction_path(job):
+            """File to parse in a worker; unchanged, refreshed and known-invalid files pass straight through"""
+            if job["status"] in ("unchanged", "refreshed"):
+                return None
+            if job["validation"] and job["validation"]["file_valid"] is False:
+                return None
+            return job["local_file"]
+            
+        # Workers parse PDF/DOCX; everything below (metadata files, state, uploads) runs here
+        log(f"Extracting text with {EXTRACTION_WORKERS} worker processes")
+        extraction_cache = ExtractionCache(signature)
+            
+        for job, text_content, error in iter_extracted(prepared_candidates(), path_of=extraction_path,
+                                                       cache=extraction_cache,
+                                                       hash_of=lambda job: job["content_hash"]):
+            candidate_id = job["candidate_id"]
+            filename = job["filename"]
+            stat = job["stat"]
+            status = job["status"]
+            metadata_path = job["metadata_path"]
+            
+            # Killed files still get metadata and an index entry (without text); other errors retry next run
+            killed = isinstance(error, ExtractionKilled)
+            if error and not killed:
+                # Leave state untouched so the next run tries again
+                log(f"  ❌ Extraction failed for candidate {candidate_id}: {error}")
+                continue
+            
+            extraction_error = error.reason if killed else None
+            previous = job["previous"]
+            if killed:
+                total_killed += 1
+                if (previous and previous["extraction_error"] == extraction_error
+                        and previous["content_hash"] == job["content_hash"]
+                        and previous["metadata_hash"] == job["metadata_hash"] and os.path.exists(metadata_path)):
+                    # Still waiting in the slow lane: the metadata written last time is current
+                    status = "unchanged"
+                else:
+                    log(f"  ⏱️  Extraction killed ({extraction_error}) for candidate {candidate_id} - "
+                        f"metadata written without text, queued for the slow lane")
+            
+            try:
+                if status == "unchanged":
+                    total_unchanged += 1
+                    text_extracted = previous["text_extracted"]
+                    if previous["mtime_ns"] != stat.st_mtime_ns or previous["metadata_hash"] != job["metadata_hash"]:
+                        # Touched but identical content: store the new mtime so it isn't hashed again
+                        # (or the hash of database fields the existing metadata already matches)
+                        pending_state.append((candidate_id, filename, stat.st_size, stat.st_mtime_ns,
+                                              job["content_hash"], signature, text_extracted, None,
+                                              previous["extraction_error"], job["metadata_hash"]))
+                elif status == "refreshed":
+                    # Only database fields changed: rewrite the metadata around the text it already holds
+                    total_refreshed += 1
+                    stored_metadata = job["stored_metadata"]
+                    metadata_path, text_extracted = write_metadata_file(
+                        job["local_file"], job["candidate_info"], job["output_dir"], job["validation"],
+                        stored_metadata.get("text_content"), extracted_at=stored_metadata.get("extracted_at")
+                    )
+                    resume_index.record_file(metadata_path)
+                    pending_state.append((candidate_id, filename, stat.st_size, stat.st_mtime_ns,
+                                          job["content_hash"], signature, text_extracted, None,
+                                          None, job["metadata_hash"]))
+                else:
+                    validation = job["validation"]
+                    if validation and validation["file_valid"] is False:
+                        total_skipped_invalid += 1
+                    
+                    metadata_path, text_extracted = write_metadata_file(
+                        job["local_file"], job["candidate_info"], job["output_dir"], validation, text_content,
+                        extraction_error
+                    )
+                    resume_index.record_file(metadata_path)
+                    
+                    if status == "new":
+                        total_new += 1
+                    else:
+                        total_extracted += 1
+                    
+                    pending_state.append((candidate_id, filename, stat.st_size, stat.st_mtime_ns,
+                                          job["content_hash"], signature, text_extracted, datetime.now(),
+                                          extraction_error, job["metadata_hash"]))
+                
+                if state_conn and len(pending_state) >= STATE_BATCH_SIZE:
+                    save_extraction_state(state_conn, pending_state)
+                    pending_state.clear()
+                
+                if graph_client:
+                    # New resume copies, and metadata files that were rewritten
+                    changed = ([job["dest_path"]] if job["copied"] else []) + ([metadata_path] if status != "unchanged" else [])
+                    for path in changed:
+                        remote_path = ai_access_layout.storage_path(candidate_id, Path(path).name)
+                        uploads.append((candidate_id, path, remote_path, graph_client.submit_upload(path, remote_path)))
+                
+                if text_extracted:
+                    total_text_extracted += 1
+                
+                # Add to master index
+                index_entry = {
+                    "candidate_id": candidate_id,
+                    "candidate_name": job["full_name"],
+                    "filename": filename,
+                    "metadata_file": Path(metadata_path).name,
+                    "text_extracted": text_extracted,
+                    "ai_access_path": ai_access_layout.logical_path(filename),
+                    "storage_path": ai_access_layout.storage_path(candidate_id, filename)
+                }
+                if extraction_error:
+                    index_entry["extraction_error"] = extraction_error
+                master_index.add(index_entry)
+                
+            except Exception as e:
+                log(f"  ❌ Failed to process candidate {candidate_id}: {e}")
+                continue
+    except psycopg2.Error as e:
+        # The candidate query runs lazily, so its errors surface here rather than at stream_rows()
+        stream_error = e
+        log(f"❌ Database error while reading candidates: {e}")
+    finally:
+        conn.close()
+    
+    extraction_cache.close()
+    
+    if state_conn:
+        if pending_state:
+            save_extraction_state(state_conn, pending_state)
+        state_conn.close()
+    
+    if resume_index.dirty:
+        resume_index.save()
+    
+    uploaded = 0
+    upload_failed = 0
+    candidates_linked = 0
+    not_in_ai_db = set()
+    if uploads:
+        log(f"Waiting for {len(uploads):,} uploads to finish...")
+        uploaded_resumes = {}     # candidate_id -> (filename, webUrl)
+        uploaded_metadata = {}    # candidate_id -> webUrl
+        for candidate_id, path, remote_path, future in uploads:
+            try:
+                web_url = future.result().get("webUrl")
+                uploaded += 1
+            except Exception as e:
+                upload_failed += 1
+                log(f"  ⚠️  Upload failed for {remote_path}: {e}")
+                continue
+            
+            if not web_url:
+                continue
+            if path.endswith("_metadata.json"):
+                uploaded_metadata[candidate_id] = web_url
+            else:
+                uploaded_resumes[candidate_id] = (Path(path).name, web_url)
+        
+        # The upload already returned each file's webUrl; no need to wait for a link mapper run
+        try:
+            not_in_ai_db = save_uploaded_links(uploaded_resumes, uploaded_metadata)
+            candidates_linked = len(set(uploaded_resumes) | set(uploaded_metadata)) - len(not_in_ai_db)
         except Exception as e:
-            log(f"  ❌ Failed to process candidate {candidate_id}: {e}")
-            continue
-    
-    # Create master index file
-    log("Creating master index file...")
-    index_path = os.path.join(LOCAL_AI_ACCESS_DIR, "_master_index.json")
-    
-    index_data = {
-        "created_at": datetime.now().isoformat(),
-        "total_resumes": len(master_index),
-        "text_extracted_count": total_text_extracted,
-        "resumes": master_index
-    }
+            log(f"⚠️  Could not save uploaded links to the AI database: {e}")
+            not_in_ai_db = set(uploaded_resumes) | set(uploaded_metadata)
+    
+    if stream_error:
+        # Candidates after the failure were never seen; writing the index now would drop them
+        log("❌ Stopped before the end of the candidate list - master index left unchanged, re-run to finish")
+        master_index.abort()
+        return False
     
-    with open(index_path, 'w', encoding='utf-8') as f:
-        json.dump(index_data, f, indent=2, ensure_ascii=False)
+    # Write master index shards that changed
+    log("Updating master index...")
+    index_shards_written = master_index.commit()
     
     log("\n" + "="*60)
     log("AI ACCESS FOLDER CREATION SUMMARY")
     log("="*60)
     log(f"Total candidates processed: {total_processed}")
     log(f"Files copied to AI_Access: {total_copied}")
-    log(f"Metadata files created: {total_metadata_created}")
+    log(f"Metadata new: {total_new}")
+    log(f"Metadata re-extracted (file or extractor changed): {total_extracted}")
+    log(f"Metadata unchanged (extraction skipped): {total_unchanged}")
+    log(f"Metadata refreshed (database fields changed, extraction skipped): {total_refreshed}")
     log(f"Text successfully extracted: {total_text_extracted}")
-    log(f"Master index created: {index_path}")
+    log(f"Extraction skipped (invalid file at download): {total_skipped_invalid}")
+    log(f"Extraction killed (time/memory limit, in the slow lane): {total_killed}")
+    log(extraction_cache.summary())
+    log(f"Master index: {MASTER_INDEX_DIR} ({index_shards_written} of {master_index.fanout} shards changed)")
+    if graph_client:
+        log(f"Uploaded to SharePoint: {uploaded} ({upload_failed} failed)")
+        log(f"Candidates linked in AI database: {candidates_linked} ({len(not_in_ai_db)} not in it yet)")
     log(f"\nLocal AI_Access folder: {LOCAL_AI_ACCESS_DIR}")
     log("\n✅ AI Access structure created successfully!")
     log("\n📤 Next steps:")
-    log("1. The AI_Access folder will sync to SharePoint via OneDrive")
-    log("2. Wait for sync to complete (check OneDrive status)")
-    log("3. Run 'python update_ai_access_links.py' to update database with AI-friendly links")
+    if graph_client:
+        log("1. New files are already in SharePoint and linked in the AI database")
+        if not_in_ai_db:
+            log("2. Run 'python update_ai_access_links.py' to add the new candidates to the AI database")
+    else:
+        log("1. The AI_Access folder will sync to SharePoint via OneDrive")
+        log("2. Wait for sync to complete (check OneDrive status)")
+        log("3. Run 'python update_ai_access_links.py' to update database with AI-friendly links")
     log("="*60)
     
     return True
@@ -290,6 +714,10 @@ def check_dependencies():
     if not DOCX_AVAILABLE:
         missing.append("python-docx")
     
+    log("Extraction backends: " + ", ".join(
+        f"{file_type}={backend or 'none'}" for file_type, backend in SELECTED_BACKENDS.items()
+    ))
+    
     if missing:
         log(f"⚠️  Missing optional libraries: {', '.join(missing)}")
         log("   Text extraction will be limited. Install with:")
@@ -316,6 +744,7 @@ def main():
     
     log(f"Source directory: {LOCAL_RESUME_DIR}")
     log(f"Target directory: {LOCAL_AI_ACCESS_DIR}")
+    log(f"AI_Access layout: {ai_access_layout.load_layout().get('layout')}")
     log("")
     
     success = create_ai_access_structure()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Keyset Pagination Helpers
+
+Batch scripts used to page with `ORDER BY candidate_id LIMIT n OFFSET m`.
+Every batch re-reads and throws away all earlier rows (O(N²) for a full
+pass), and rows inserted, deleted or updated out of a filtered set while the
+run is going shift the window so candidates are skipped or seen twice.
+
+These helpers page by key instead: each batch starts after the last key of
+the previous one, so every batch is an index range scan and the walk is
+stable under concurrent writes.
+
+Queries are written with two markers:
+    {keyset}           replaced by "candidate_id > %(last_seen)s" (TRUE for the first batch)
+    %(batch_size)s     the LIMIT
+
+    for rows in iter_keyset_batches(conn, '''
+        SELECT candidate_id, full_name
+        FROM gh.candidates
+        WHERE resume_links IS NOT NULL AND {keyset}
+        ORDER BY candidate_id
+        LIMIT %(batch_size)s
+    '''):
+        ...
+
+The key must be the first selected column (or pass key_index). Each batch
+runs on a fresh cursor, so callers may commit between batches.
+
+For a single pass over a large result, stream_rows() iterates a named
+(server-side) cursor instead of calling fetchall(): rows arrive STREAM_ITERSIZE
+at a time, so memory is bounded by the batch rather than the table.
+
+    for candidate_id, raw in stream_rows(conn, "SELECT candidate_id, raw FROM gh.candidates"):
+        ...
+"""
+
+import os
+import itertools
+
+DEFAULT_BATCH_SIZE = 100
+STREAM_ITERSIZE = int(os.getenv("STREAM_ITERSIZE", "2000"))      # Rows per server round trip
+
+_cursor_names = itertools.count(1)
+
+def render_keyset_query(query, last_seen, key="candidate_id"):
+    """Substitute the {keyset} marker for the current position"""
+    keyset = f"{key} > %(last_seen)s" if last_seen is not None else "TRUE"
+    return query.replace("{keyset}", keyset)
+
+def iter_keyset_batches(conn, query, params=None, batch_size=DEFAULT_BATCH_SIZE,
+                        key="candidate_id", key_index=0, start_after=None):
+    """
+    Yield lists of rows, batch_size at a time, in key order
+
+    Args:
+        conn: psycopg2 connection
+        query: SQL with {keyset} and %(batch_size)s markers (see module docstring)
+        params: Extra named parameters for the query
+        batch_size: Rows per batch
+        key: Column used for paging (must be unique and match ORDER BY)
+        key_index: Position of the key in each row
+        start_after: Only return rows with key > start_after
+    """
+    last_seen = start_after
+
+    while True:
+        args = dict(params or {}, last_seen=last_seen, batch_size=batch_size)
+
+        with conn.cursor() as cur:
+            cur.execute(render_keyset_query(query, last_seen, key), args)
+            rows = cur.fetchall()
+
+        if not rows:
+            return
+
+        yield rows
+
+        if len(rows) < batch_size:
+            return
+
+        last_seen = rows[-1][key_index]
+
+def iter_keyset_frames(conn, query, params=None, batch_size=DEFAULT_BATCH_SIZE,
+                       key="candidate_id", start_after=None):
+    """
+    pandas version of iter_keyset_batches for the CSV exporters
+
+    Yields one DataFrame per batch; the key column must be in the result.
+    """
+    import pandas as pd
+
+    last_seen = start_after
+
+    while True:
+        args = dict(params or {}, last_seen=last_seen, batch_size=batch_size)
+        frame = pd.read_sql_query(render_keyset_query(query, last_seen, key), conn, params=args)
+
+        if len(frame) == 0:
+            return
+
+        yield frame
+
+        if len(frame) < batch_size:
+            return
+
+        # Max rather than last row: the exporters wrap the page in a CTE without an outer ORDER BY
+        last_seen = int(frame[key].max())
+
+def stream_rows(conn, query, params=None, itersize=None, name=None, withhold=False):
+    """
+    Yield rows one at a time from a server-side cursor
+
+    Args:
+        conn: psycopg2 connection
+        query: Any SELECT
+        params: Query parameters
+        itersize: Rows fetched per round trip (default STREAM_ITERSIZE)
+        name: Cursor name (generated if omitted)
+        withhold: Keep the cursor open across conn.commit(); needed when the
+            caller commits while iterating. Without it a commit ends the scan.
+    """
+    cur = conn.cursor(name=name or f"stream_rows_{next(_cursor_names)}", withhold=withhold)
+    cur.itersize = itersize or STREAM_ITERSIZE
+
+    try:
+        cur.execute(query, params)
+        for row in cur:
+            yield row
+    finally:
+        cur.close()
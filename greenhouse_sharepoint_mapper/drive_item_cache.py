@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+SharePoint Drive Item Cache (Graph delta mirror)
+
+Mirrors the site drive into gh.drive_items (item id, parent, name, path,
+webUrl, eTag, size, lastModified) in the source database, kept current with
+Graph `/delta` and a stored delta link. The first sync lists everything once;
+later syncs only transfer items that changed.
+
+GraphClient resolves paths against this table first and only goes to Graph
+for misses (e.g. files OneDrive has uploaded since the last sync).
+
+SharePoint only supports delta on the drive root, so the whole drive is
+mirrored and paths are stored relative to the drive root
+(e.g. "AI Operator - Greenhouse_Resumes/AI_Access/123_Jane_Doe.pdf").
+
+Usage:
+    python drive_item_cache.py            # Incremental sync (full on first run)
+    python drive_item_cache.py --full     # Re-list the whole drive
+    python drive_item_cache.py --status   # Show cache size and last sync
+"""
+
+import os
+import sys
+import threading
+import psycopg2
+from psycopg2.extras import execute_values
+from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DRIVE_CACHE_PG = {
+    "host": os.getenv("PGHOST", "localhost"),
+    "port": int(os.getenv("PGPORT", "5432")),
+    "dbname": os.getenv("SOURCE_PGDATABASE", "greenhouse_candidates"),
+    "user": os.getenv("PGUSER"),
+    "password": os.getenv("PGPASSWORD", "")
+}
+
+DELTA_SELECT = "id,name,parentReference,webUrl,eTag,size,lastModifiedDateTime,file,folder,root,deleted"
+
+def log(message):
+    """Simple logging with timestamp"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+def ensure_tables(conn):
+    """Create the cache tables if needed"""
+    with conn.cursor() as cur:
+        cur.execute("CREATE SCHEMA IF NOT EXISTS gh")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS gh.drive_items (
+                item_id         TEXT PRIMARY KEY,
+                parent_id       TEXT,
+                name            TEXT,
+                path            TEXT,           -- Relative to the drive root; NULL until resolved
+                is_folder       BOOLEAN DEFAULT FALSE,
+                is_root         BOOLEAN DEFAULT FALSE,
+                web_url         TEXT,
+                etag            TEXT,
+                size            BIGINT,
+                last_modified   TIMESTAMPTZ,
+                synced_at       TIMESTAMPTZ DEFAULT NOW()
+            )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_drive_items_path ON gh.drive_items (path)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_drive_items_parent ON gh.drive_items (parent_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_drive_items_web_url ON gh.drive_items (web_url)")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS gh.drive_delta_state (
+                site_id             TEXT PRIMARY KEY,
+                delta_link          TEXT,
+                last_sync_at        TIMESTAMPTZ,
+                last_full_sync_at   TIMESTAMPTZ,
+                items_changed       INTEGER
+            )
+        """)
+    conn.commit()
+
+def _item_row(item):
+    """Graph driveItem -> gh.drive_items row (without path)"""
+    return (
+        item["id"],
+        (item.get("parentReference") or {}).get("id"),
+        item.get("name"),
+        "folder" in item or "root" in item,
+        "root" in item,
+        item.get("webUrl"),
+        item.get("eTag"),
+        item.get("size"),
+        item.get("lastModifiedDateTime")
+    )
+
+def _upsert_items(cur, rows):
+    execute_values(cur, """
+        INSERT INTO gh.drive_items
+            (item_id, parent_id, name, is_folder, is_root, web_url, etag, size, last_modified)
+        VALUES %s
+        ON CONFLICT (item_id) DO UPDATE SET
+            parent_id = EXCLUDED.parent_id,
+            name = EXCLUDED.name,
+            is_folder = EXCLUDED.is_folder,
+            is_root = EXCLUDED.is_root,
+            web_url = EXCLUDED.web_url,
+            etag = EXCLUDED.etag,
+            size = EXCLUDED.size,
+            last_modified = EXCLUDED.last_modified,
+            synced_at = NOW()
+    """, rows, page_size=500)
+
+def _delete_items(cur, item_ids):
+    """Delete items and, for folders, everything below them"""
+    cur.execute("""
+        WITH RECURSIVE doomed AS (
+            SELECT item_id FROM gh.drive_items WHERE item_id = ANY(%s)
+            UNION ALL
+            SELECT c.item_id FROM gh.drive_items c JOIN doomed d ON c.parent_id = d.item_id
+        )
+        DELETE FROM gh.drive_items WHERE item_id IN (SELECT item_id FROM doomed)
+    """, (item_ids,))
+
+def _resolve_all_paths(cur):
+    """Recompute every path from the root (after folder adds/renames/moves)"""
+    cur.execute("""
+        WITH RECURSIVE tree AS (
+            SELECT item_id, ''::text AS path FROM gh.drive_items WHERE is_root
+            UNION ALL
+            SELECT c.item_id,
+                   CASE WHEN t.path = '' THEN c.name ELSE t.path || '/' || c.name END
+            FROM gh.drive_items c JOIN tree t ON c.parent_id = t.item_id
+        )
+        UPDATE gh.drive_items d
+        SET path = tree.path
+        FROM tree
+        WHERE d.item_id = tree.item_id
+        AND d.path IS DISTINCT FROM tree.path
+    """)
+    return cur.rowcount
+
+def _resolve_paths(cur, item_ids):
+    """Compute paths for changed files whose parent folder path is already known"""
+    cur.execute("""
+        UPDATE gh.drive_items c
+        SET path = CASE WHEN p.path = '' THEN c.name ELSE p.path || '/' || c.name END
+        FROM gh.drive_items p
+        WHERE c.parent_id = p.item_id
+        AND p.path IS NOT NULL
+        AND c.item_id = ANY(%s)
+    """, (item_ids,))
+    return cur.rowcount
+
+def sync_drive_items(graph_client, full=False):
+    """
+    Bring gh.drive_items up to date with Graph delta
+
+    Args:
+        graph_client: GraphClient (its pooled, throttling-aware transport is used)
+        full: Ignore the stored delta link and re-list the whole drive
+
+    Returns:
+        int: Number of changed items applied
+    """
+    from graph_client import GRAPH_BASE_URL
+
+    initial_url = (f"{GRAPH_BASE_URL}/sites/{graph_client.site_id}/drive/root/delta"
+                   f"?$select={DELTA_SELECT}")
+
+    with psycopg2.connect(**DRIVE_CACHE_PG) as conn:
+        ensure_tables(conn)
+
+        with conn.cursor() as cur:
+            cur.execute("SELECT delta_link FROM gh.drive_delta_state WHERE site_id = %s",
+                        (graph_client.site_id,))
+            row = cur.fetchone()
+            cur.execute("SELECT NOW()")
+            sync_started = cur.fetchone()[0]
+
+        delta_link = row[0] if row and not full else None
+        full = delta_link is None
+        url = delta_link or initial_url
+        log(f"{'Full' if full else 'Incremental'} drive sync starting...")
+
+        changed = 0
+        changed_file_ids = []
+        folders_changed = False
+        page_count = 0
+
+        while url:
+            response = graph_client.request("GET", url, name="delta")
+
+            if response.status_code == 410 and not full:
+                # Delta link expired - start over with a full listing
+                log("⚠️  Delta link expired, falling back to a full sync")
+                conn.rollback()
+                full = True
+                url = initial_url
+                changed = 0
+                changed_file_ids = []
+                with conn.cursor() as cur:
+                    cur.execute("SELECT NOW()")
+                    sync_started = cur.fetchone()[0]
+                continue
+
+            response.raise_for_status()
+            data = response.json()
+            page_count += 1
+
+            upserts = []
+            deleted_ids = []
+            for item in data.get("value", []):
+                if "deleted" in item:
+                    deleted_ids.append(item["id"])
+                    continue
+
+                upserts.append(_item_row(item))
+                if "folder" in item or "root" in item:
+                    folders_changed = True
+                else:
+                    changed_file_ids.append(item["id"])
+
+            with conn.cursor() as cur:
+                if upserts:
+                    _upsert_items(cur, upserts)
+                if deleted_ids:
+                    _delete_items(cur, deleted_ids)
+
+            changed += len(upserts) + len(deleted_ids)
+
+            if page_count % 20 == 0:
+                log(f"  Page {page_count}: {changed:,} changes so far...")
+
+            url = data.get("@odata.nextLink")
+            new_delta_link = data.get("@odata.deltaLink")
+
+        with conn.cursor() as cur:
+            if full:
+                # Anything not seen during a full listing no longer exists
+                cur.execute("DELETE FROM gh.drive_items WHERE synced_at < %s", (sync_started,))
+                removed = cur.rowcount
+                if removed:
+                    log(f"  Removed {removed:,} items no longer in the drive")
+
+            if folders_changed:
+                resolved = _resolve_all_paths(cur)
+            elif changed_file_ids:
+                resolved = _resolve_paths(cur, changed_file_ids)
+            else:
+                resolved = 0
+
+            cur.execute("""
+                INSERT INTO gh.drive_delta_state
+                    (site_id, delta_link, last_sync_at, last_full_sync_at, items_changed)
+                VALUES (%s, %s, NOW(), CASE WHEN %s THEN NOW() END, %s)
+                ON CONFLICT (site_id) DO UPDATE SET
+                    delta_link = EXCLUDED.delta_link,
+                    last_sync_at = EXCLUDED.last_sync_at,
+                    last_full_sync_at = COALESCE(EXCLUDED.last_full_sync_at,
+                                                 gh.drive_delta_state.last_full_sync_at),
+                    items_changed = EXCLUDED.items_changed
+            """, (graph_client.site_id, new_delta_link, full, changed))
+
+        conn.commit()
+
+    log(f"✅ Drive sync complete: {changed:,} changed items, {resolved:,} paths updated "
+        f"({page_count:,} pages)")
+    return changed
+
+class DriveItemCache:
+    """Indexed path -> driveItem lookups against gh.drive_items"""
+
+    def __init__(self, site_id, folder_path):
+        self.site_id = site_id
+        self.folder_path = folder_path.strip("/")
+        # Upload workers record items from their own threads; each thread gets its own connection
+        self._local = threading.local()
+
+    @property
+    def conn(self):
+        """This thread's connection (opened on first use)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = psycopg2.connect(**DRIVE_CACHE_PG)
+            conn.autocommit = True
+            self._local.conn = conn
+        return conn
+
+    def is_synced(self):
+        """True once a delta sync has completed for this site"""
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('gh.drive_delta_state')")
+            if cur.fetchone()[0] is None:
+                return False
+            cur.execute("SELECT last_sync_at FROM gh.drive_delta_state WHERE site_id = %s",
+                        (self.site_id,))
+            row = cur.fetchone()
+            return bool(row and row[0])
+
+    def _drive_path(self, relative_path):
+        return f"{self.folder_path}/{relative_path}" if self.folder_path else relative_path
+
+    def lookup_many(self, relative_paths):
+        """
+        Resolve paths relative to RESUME_FOLDER_PATH
+
+        Returns:
+            list: Graph-shaped file_info dict (id, name, webUrl, eTag, size,
+                  lastModifiedDateTime) or None, in input order
+        """
+        drive_paths = [self._drive_path(p) for p in relative_paths]
+
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT path, item_id, name, web_url, etag, size, last_modified
+                FROM gh.drive_items
+                WHERE path = ANY(%s)
+                AND NOT is_folder
+            """, (drive_paths,))
+            found = {
+                row[0]: {
+                    "id": row[1],
+                    "name": row[2],
+                    "webUrl": row[3],
+                    "eTag": row[4],
+                    "size": row[5],
+                    "lastModifiedDateTime": row[6].isoformat() if row[6] else None
+                }
+                for row in cur.fetchall()
+            }
+
+        return [found.get(p) for p in drive_paths]
+
+    def lookup_urls(self, web_urls):
+        """
+        Find cached files by webUrl (for link validation)
+
+        Returns:
+            dict: webUrl -> drive path, for the URLs that belong to a cached file
+        """
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT web_url, path
+                FROM gh.drive_items
+                WHERE web_url = ANY(%s)
+                AND NOT is_folder
+            """, (list(web_urls),))
+            return dict(cur.fetchall())
+
+    def record(self, relative_path, file_info):
+        """Store an item fetched from Graph on a cache miss"""
+        row = _item_row(file_info)
+        with self.conn.cursor() as cur:
+            _upsert_items(cur, [row])
+            cur.execute("UPDATE gh.drive_items SET path = %s WHERE item_id = %s",
+                        (self._drive_path(relative_path), file_info["id"]))
+
+    def list_files(self, relative_folder):
+        """name -> webUrl for every file in a folder (relative to RESUME_FOLDER_PATH)"""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT c.name, c.web_url
+                FROM gh.drive_items c
+                JOIN gh.drive_items p ON c.parent_id = p.item_id
+                WHERE p.path = %s
+                AND NOT c.is_folder
+            """, (self._drive_path(relative_folder),))
+            return dict(cur.fetchall())
+
+def get_cache_status():
+    """Summary of the cache for status scripts (None if never synced)"""
+    with psycopg2.connect(**DRIVE_CACHE_PG) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('gh.drive_delta_state')")
+            if cur.fetchone()[0] is None:
+                return None
+
+            cur.execute("""
+                SELECT last_sync_at, last_full_sync_at, items_changed
+                FROM gh.drive_delta_state
+                ORDER BY last_sync_at DESC NULLS LAST
+                LIMIT 1
+            """)
+            state = cur.fetchone()
+            if not state:
+                return None
+
+            cur.execute("""
+                SELECT COUNT(*) FILTER (WHERE NOT is_folder),
+                       COUNT(*) FILTER (WHERE is_folder),
+                       COUNT(*) FILTER (WHERE path IS NULL)
+                FROM gh.drive_items
+            """)
+            files, folders, unresolved = cur.fetchone()
+
+    return {
+        "last_sync_at": state[0],
+        "last_full_sync_at": state[1],
+        "items_changed": state[2],
+        "files": files,
+        "folders": folders,
+        "unresolved": unresolved
+    }
+
+def main():
+    if "--status" in sys.argv:
+        status = get_cache_status()
+        if not status:
+            log("❌ Drive cache has never been synced (run: python drive_item_cache.py)")
+            return
+        log(f"Files cached: {status['files']:,}  Folders: {status['folders']:,}")
+        log(f"Last sync: {status['last_sync_at']} ({status['items_changed']:,} changes)")
+        log(f"Last full sync: {status['last_full_sync_at']}")
+        if status["unresolved"]:
+            log(f"⚠️  {status['unresolved']:,} items without a resolved path")
+        return
+
+    from graph_client import GraphClient
+
+    graph_client = GraphClient(use_cache=False)
+    sync_drive_items(graph_client, full="--full" in sys.argv)
+
+    for line in graph_client.metrics_summary():
+        log(f"Graph {line}")
+
+if __name__ == "__main__":
+    main()
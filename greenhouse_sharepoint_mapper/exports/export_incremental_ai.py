@@ -20,6 +20,9 @@ import psycopg2
 from datetime import datetime
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from db_batches import iter_keyset_frames
+
 load_dotenv()
 
 # Database configuration
@@ -223,66 +226,64 @@ def export_incremental(since_date=None, since_candidate_id=None):
     total_rows_exported = 0
     max_candidate_id = 0
     
-    for segment_num in range(1, num_segments + 1):
-        offset = (segment_num - 1) * rows_per_segment
-        
+    # Keyset paging: each segment starts after the previous segment's last ID
+    keyset_where = f"{where_clause} AND {{keyset}}" if where_clause else "WHERE {keyset}"
+    
+    segment_query = f"""
+        WITH indexed_data AS (
+          SELECT
+            candidate_id,
+            first_name,
+            last_name,
+            full_name,
+            email,
+            phone_numbers,
+            addresses,
+            resume_links[1] as resume_url,
+            metadata_url,
+            resume_filenames[1] as resume_filename,
+            degrees,
+            jobs_name,
+            created_at,
+            updated_at,
+            ARRAY(
+              SELECT title || '[' || (idx - 1)::text || ']'
+              FROM unnest(employment_titles) WITH ORDINALITY AS t(title, idx)
+            ) AS employment_titles_indexed,
+            ARRAY(
+              SELECT company || '[' || (idx - 1)::text || ']'
+              FROM unnest(employment_companies) WITH ORDINALITY AS c(company, idx)
+            ) AS employment_companies_indexed
+          FROM gh.candidates
+          {keyset_where}
+          ORDER BY candidate_id
+          LIMIT %(batch_size)s
+        )
+        SELECT
+          candidate_id,
+          first_name,
+          last_name,
+          full_name,
+          email,
+          phone_numbers,
+          addresses,
+          resume_url,
+          metadata_url,
+          resume_filename,
+          array_to_string(employment_titles_indexed, ', ') as employment_titles,
+          array_to_string(employment_companies_indexed, ', ') as employment_companies,
+          array_to_string(degrees, ', ') as degrees,
+          array_to_string(jobs_name, ', ') as jobs_name,
+          created_at,
+          updated_at
+        FROM indexed_data;
+    """
+    
+    for segment_num, segment_df in enumerate(
+        iter_keyset_frames(connection, segment_query, batch_size=rows_per_segment), 1
+    ):
         log(f"Exporting segment {segment_num}/{num_segments}...")
         
-        segment_query = f"""
-            WITH indexed_data AS (
-              SELECT
-                candidate_id,
-                first_name,
-                last_name,
-                full_name,
-                email,
-                phone_numbers,
-                addresses,
-                resume_links[1] as resume_url,
-                metadata_url,
-                resume_filenames[1] as resume_filename,
-                degrees,
-                jobs_name,
-                created_at,
-                updated_at,
-                ARRAY(
-                  SELECT title || '[' || (idx - 1)::text || ']'
-                  FROM unnest(employment_titles) WITH ORDINALITY AS t(title, idx)
-                ) AS employment_titles_indexed,
-                ARRAY(
-                  SELECT company || '[' || (idx - 1)::text || ']'
-                  FROM unnest(employment_companies) WITH ORDINALITY AS c(company, idx)
-                ) AS employment_companies_indexed
-              FROM gh.candidates
-              {where_clause}
-              ORDER BY candidate_id
-              LIMIT {rows_per_segment} OFFSET {offset}
-            )
-            SELECT
-              candidate_id,
-              first_name,
-              last_name,
-              full_name,
-              email,
-              phone_numbers,
-              addresses,
-              resume_url,
-              metadata_url,
-              resume_filename,
-              array_to_string(employment_titles_indexed, ', ') as employment_titles,
-              array_to_string(employment_companies_indexed, ', ') as employment_companies,
-              array_to_string(degrees, ', ') as degrees,
-              array_to_string(jobs_name, ', ') as jobs_name,
-              created_at,
-              updated_at
-            FROM indexed_data;
-        """
-        
-        segment_df = pd.read_sql_query(segment_query, connection)
-        
-        if len(segment_df) == 0:
-            break
-        
         # Track max candidate_id
         segment_max_id = segment_df['candidate_id'].max()
         if segment_max_id > max_candidate_id:
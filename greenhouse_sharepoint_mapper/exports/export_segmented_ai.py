@@ -16,6 +16,9 @@ import psycopg2
 from datetime import datetime
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from db_batches import iter_keyset_frames
+
 load_dotenv()
 
 # Database configuration
@@ -138,68 +141,64 @@ def export_segmented():
             log("")
             
             # Export in segments
-            segment_num = 1
-            offset = 0
             segment_files = []
             
-            while offset < total_count:
+            # Query for each segment (keyset paged: starts after the previous segment's last ID) (NO resume_content)
+            segment_query = """
+            WITH indexed_data AS (
+              SELECT
+                candidate_id,
+                first_name,
+                last_name,
+                full_name,
+                email,
+                phone_numbers,
+                addresses,
+                resume_links[1] as resume_url,
+                metadata_url,
+                resume_filenames[1] as resume_filename,
+                degrees,
+                jobs_name,
+                created_at,
+                updated_at,
+                ARRAY(
+                  SELECT title || '[' || (idx - 1)::text || ']'
+                  FROM unnest(employment_titles) WITH ORDINALITY AS t(title, idx)
+                ) AS employment_titles_indexed,
+                ARRAY(
+                  SELECT company || '[' || (idx - 1)::text || ']'
+                  FROM unnest(employment_companies) WITH ORDINALITY AS c(company, idx)
+                ) AS employment_companies_indexed
+              FROM gh.candidates
+              WHERE {keyset}
+              ORDER BY candidate_id
+              LIMIT %(batch_size)s
+            )
+            SELECT
+              candidate_id,
+              first_name,
+              last_name,
+              full_name,
+              email,
+              phone_numbers,
+              addresses,
+              resume_url,
+              metadata_url,
+              resume_filename,
+              array_to_string(employment_titles_indexed, ', ') as employment_titles,
+              array_to_string(employment_companies_indexed, ', ') as employment_companies,
+              array_to_string(degrees, ', ') as degrees,
+              array_to_string(jobs_name, ', ') as jobs_name,
+              created_at,
+              updated_at
+            FROM indexed_data;
+            """
+            
+            for segment_num, segment_df in enumerate(
+                iter_keyset_frames(connection, segment_query, batch_size=rows_per_segment), 1
+            ):
                 log(f"Exporting segment {segment_num}/{estimated_segments}...")
                 
-                # Query for this segment (NO resume_content)
-                segment_query = f"""
-                WITH indexed_data AS (
-                  SELECT
-                    candidate_id,
-                    first_name,
-                    last_name,
-                    full_name,
-                    email,
-                    phone_numbers,
-                    addresses,
-                    resume_links[1] as resume_url,
-                    metadata_url,
-                    resume_filenames[1] as resume_filename,
-                    degrees,
-                    jobs_name,
-                    created_at,
-                    updated_at,
-                    ARRAY(
-                      SELECT title || '[' || (idx - 1)::text || ']'
-                      FROM unnest(employment_titles) WITH ORDINALITY AS t(title, idx)
-                    ) AS employment_titles_indexed,
-                    ARRAY(
-                      SELECT company || '[' || (idx - 1)::text || ']'
-                      FROM unnest(employment_companies) WITH ORDINALITY AS c(company, idx)
-                    ) AS employment_companies_indexed
-                  FROM gh.candidates
-                  ORDER BY candidate_id
-                  LIMIT {rows_per_segment} OFFSET {offset}
-                )
-                SELECT
-                  candidate_id,
-                  first_name,
-                  last_name,
-                  full_name,
-                  email,
-                  phone_numbers,
-                  addresses,
-                  resume_url,
-                  metadata_url,
-                  resume_filename,
-                  array_to_string(employment_titles_indexed, ', ') as employment_titles,
-                  array_to_string(employment_companies_indexed, ', ') as employment_companies,
-                  array_to_string(degrees, ', ') as degrees,
-                  array_to_string(jobs_name, ', ') as jobs_name,
-                  created_at,
-                  updated_at
-                FROM indexed_data;
-                """
-                
-                segment_df = pd.read_sql_query(segment_query, connection)
-                
-                if len(segment_df) == 0:
-                    break
-                
                 # Generate filename
                 segment_filename = f"segment_{segment_num:03d}_of_{estimated_segments:03d}.csv"
                 segment_path = os.path.join(export_dir, segment_filename)
@@ -221,9 +220,6 @@ def export_segmented():
                     'size_mb': file_size_mb,
                     'id_range': f"{segment_df['candidate_id'].min()} to {segment_df['candidate_id'].max()}"
                 })
-                
-                offset += rows_per_segment
-                segment_num += 1
             
             cursor.close()
         
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Export a SQLite Snapshot of the AI Database (with FTS5 search)
+
+Builds one compact SQLite file from greenhouse_candidates_ai for AI agents:
+candidate fields, SharePoint links (resume_url, metadata_url) and normalized
+resume text, plus an FTS5 full-text index with column weights. Agents download
+a single file and run ranked keyword queries locally instead of fetching
+_metadata.json files one at a time or reading 45 MB CSV segments.
+
+The snapshot is published to AI_Access/ with a sha256 file next to it:
+
+    AI_Access/_candidates_ai.sqlite
+    AI_Access/_candidates_ai.sqlite.sha256      "<hex>  _candidates_ai.sqlite"
+
+(the leading underscore keeps the files out of the resume index). A working
+copy is kept in exports/ai_database/sqlite/. Later runs are incremental:
+Postgres hashes each exported row, the hashes are compared with the working
+copy in candidate_id order, and only new or changed candidates are fetched;
+deleted candidates are removed. Nothing changed means nothing is republished.
+
+Ranked query (weights are stored in the index, so ORDER BY rank uses them):
+
+    SELECT c.candidate_id, c.full_name, c.resume_url, c.metadata_url
+    FROM candidates_fts
+    JOIN candidates c ON c.candidate_id = candidates_fts.rowid
+    WHERE candidates_fts MATCH 'kubernetes AND "site reliability"'
+    ORDER BY rank
+    LIMIT 20;
+
+Usage:
+    python export_sqlite_snapshot.py                 # Incremental (full on the first run)
+    python export_sqlite_snapshot.py --full          # Rebuild from scratch
+    python export_sqlite_snapshot.py --no-publish    # Update the working copy only
+    python export_sqlite_snapshot.py --search 'python AND aws'   # Try a query on the working copy
+"""
+
+import os
+import sys
+import shutil
+import sqlite3
+import hashlib
+import argparse
+import psycopg2
+from datetime import datetime
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from db_batches import stream_rows
+from resume_chunks import normalize_text
+import ai_access_layout
+from graph_client import SHAREPOINT_DIRECT_UPLOAD
+
+load_dotenv()
+
+# Database configuration
+PG = {
+    "host": os.getenv("PGHOST", "localhost"),
+    "port": int(os.getenv("PGPORT", "5432")),
+    "dbname": "greenhouse_candidates_ai",
+    "user": os.getenv("PGUSER"),
+    "password": os.getenv("PGPASSWORD", "")
+}
+
+# Working copy - AI Database (SQLite snapshot)
+EXPORT_DIR = os.path.join(os.path.dirname(__file__), "ai_database", "sqlite")
+WORKING_FILE = os.path.join(EXPORT_DIR, "candidates_ai.sqlite")
+SNAPSHOT_NAME = "_candidates_ai.sqlite"
+
+SCHEMA_VERSION = 1
+FETCH_BATCH_SIZE = 1000
+
+# bm25 weight per indexed column: a match in the name or a job title outranks one in the resume body
+FTS_WEIGHTS = {
+    "full_name": 10.0,
+    "employment_titles": 5.0,
+    "employment_companies": 3.0,
+    "degrees": 2.0,
+    "jobs_name": 2.0,
+    "resume_text": 1.0,
+}
+
+COLUMNS = [
+    "candidate_id", "first_name", "last_name", "full_name", "email", "phone_numbers", "addresses",
+    "resume_url", "metadata_url", "resume_filename", "employment_titles", "employment_companies",
+    "degrees", "jobs_name", "created_at", "updated_at", "resume_text", "row_hash"
+]
+
+# One row per candidate; md5 over the whole row is the change detector for incremental runs
+EXPORT_ROWS = """
+    SELECT
+        candidate_id,
+        first_name,
+        last_name,
+        full_name,
+        email,
+        phone_numbers,
+        addresses,
+        resume_links[1] AS resume_url,
+        metadata_url,
+        resume_filenames[1] AS resume_filename,
+        array_to_string(employment_titles, ', ') AS employment_titles,
+        array_to_string(employment_companies, ', ') AS employment_companies,
+        array_to_string(degrees, ', ') AS degrees,
+        array_to_string(jobs_name, ', ') AS jobs_name,
+        created_at,
+        updated_at,
+        resume_content
+    FROM gh.candidates
+    {where}
+"""
+
+SNAPSHOT_QUERY = f"""
+    SELECT s.*, md5(s::text) AS row_hash
+    FROM ({EXPORT_ROWS}) s
+    ORDER BY s.candidate_id
+"""
+
+HASH_QUERY = f"""
+    SELECT s.candidate_id, md5(s::text)
+    FROM ({EXPORT_ROWS.format(where="")}) s
+    ORDER BY s.candidate_id
+"""
+
+SCHEMA = """
+    CREATE TABLE candidates (
+        candidate_id INTEGER PRIMARY KEY,
+        first_name TEXT,
+        last_name TEXT,
+        full_name TEXT,
+        email TEXT,
+        phone_numbers TEXT,
+        addresses TEXT,
+        resume_url TEXT,
+        metadata_url TEXT,
+        resume_filename TEXT,
+        employment_titles TEXT,
+        employment_companies TEXT,
+        degrees TEXT,
+        jobs_name TEXT,
+        created_at TEXT,
+        updated_at TEXT,
+        resume_text TEXT,
+        row_hash TEXT NOT NULL
+    );
+
+    CREATE TABLE snapshot_info (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+
+    CREATE VIRTUAL TABLE candidates_fts USING fts5(
+        full_name, employment_titles, employment_companies, degrees, jobs_name, resume_text,
+        content='candidates', content_rowid='candidate_id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    );
+"""
+
+FTS_COLUMNS = ", ".join(FTS_WEIGHTS)
+NEW_VALUES = ", ".join(f"new.{column}" for column in FTS_WEIGHTS)
+OLD_VALUES = ", ".join(f"old.{column}" for column in FTS_WEIGHTS)
+
+# Keep the external-content index in step with candidates (created after the bulk load of a full build)
+TRIGGERS = f"""
+    CREATE TRIGGER candidates_ai AFTER INSERT ON candidates BEGIN
+        INSERT INTO candidates_fts(rowid, {FTS_COLUMNS}) VALUES (new.candidate_id, {NEW_VALUES});
+    END;
+    CREATE TRIGGER candidates_ad AFTER DELETE ON candidates BEGIN
+        INSERT INTO candidates_fts(candidates_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.candidate_id, {OLD_VALUES});
+    END;
+    CREATE TRIGGER candidates_au AFTER UPDATE ON candidates BEGIN
+        INSERT INTO candidates_fts(candidates_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.candidate_id, {OLD_VALUES});
+        INSERT INTO candidates_fts(rowid, {FTS_COLUMNS}) VALUES (new.candidate_id, {NEW_VALUES});
+    END;
+"""
+
+def log(message):
+    """Simple logging with timestamp"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+def to_snapshot_row(row):
+    """Postgres export row -> candidates row (timestamps as ISO text, resume text normalized)"""
+    *fields, resume_content, row_hash = row
+    fields = [value.isoformat() if isinstance(value, datetime) else value for value in fields]
+    return (*fields, normalize_text(resume_content), row_hash)
+
+def insert_rows(sqlite_conn, rows):
+    placeholders = ", ".join("?" for _ in COLUMNS)
+    cursor = sqlite_conn.executemany(
+        f"INSERT INTO candidates ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+        (to_snapshot_row(row) for row in rows)
+    )
+    return cursor.rowcount
+
+def set_info(sqlite_conn, **values):
+    sqlite_conn.executemany(
+        "INSERT INTO snapshot_info (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        [(key, str(value)) for key, value in values.items()]
+    )
+
+def get_info(sqlite_conn, key):
+    try:
+        row = sqlite_conn.execute("SELECT value FROM snapshot_info WHERE key = ?", (key,)).fetchone()
+    except sqlite3.DatabaseError:
+        return None
+    return row[0] if row else None
+
+def build_full(pg_conn):
+    """Build a new snapshot next to the working copy, then swap it in"""
+    tmp_path = WORKING_FILE + ".tmp"
+    if os.path.exists(tmp_path):
+        os.unlink(tmp_path)
+
+    sqlite_conn = sqlite3.connect(tmp_path)
+    sqlite_conn.execute("PRAGMA journal_mode = OFF")
+    sqlite_conn.execute("PRAGMA synchronous = OFF")
+    sqlite_conn.executescript(SCHEMA)
+
+    # Weights are persisted in the index, so agents get weighted bm25 from ORDER BY rank
+    weights = ", ".join(str(weight) for weight in FTS_WEIGHTS.values())
+    sqlite_conn.execute("INSERT INTO candidates_fts (candidates_fts, rank) VALUES ('rank', ?)",
+                        (f"bm25({weights})",))
+
+    log("Streaming candidates from greenhouse_candidates_ai...")
+    total = 0
+    batch = []
+    for row in stream_rows(pg_conn, SNAPSHOT_QUERY.format(where="")):
+        batch.append(row)
+        if len(batch) >= FETCH_BATCH_SIZE:
+            total += insert_rows(sqlite_conn, batch)
+            batch = []
+            if total % 10000 == 0:
+                log(f"Progress: {total:,} candidates written...")
+    if batch:
+        total += insert_rows(sqlite_conn, batch)
+
+    # One bulk index build is much faster than indexing row by row through triggers
+    log(f"Building full-text index over {total:,} candidates...")
+    sqlite_conn.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('rebuild')")
+    sqlite_conn.executescript(TRIGGERS)
+    set_info(sqlite_conn, schema_version=SCHEMA_VERSION, built_at=datetime.now().isoformat())
+    sqlite_conn.commit()
+    sqlite_conn.close()
+
+    os.replace(tmp_path, WORKING_FILE)
+    return total, 0, 0
+
+def diff_hashes(pg_conn, sqlite_conn):
+    """Merge the sorted (candidate_id, row_hash) lists: ids to fetch and ids to delete"""
+    changed = []
+    removed = []
+    local = sqlite_conn.execute("SELECT candidate_id, row_hash FROM candidates ORDER BY candidate_id")
+    local_row = next(local, None)
+
+    for candidate_id, row_hash in stream_rows(pg_conn, HASH_QUERY):
+        while local_row and local_row[0] < candidate_id:
+            removed.append(local_row[0])
+            local_row = next(local, None)
+        if local_row and local_row[0] == candidate_id:
+            if local_row[1] != row_hash:
+                changed.append(candidate_id)
+            local_row = next(local, None)
+        else:
+            changed.append(candidate_id)
+
+    while local_row:
+        removed.append(local_row[0])
+        local_row = next(local, None)
+
+    return changed, removed
+
+def build_incremental(pg_conn):
+    """Apply new, changed and deleted candidates to the working copy"""
+    sqlite_conn = sqlite3.connect(WORKING_FILE)
+
+    log("Comparing row hashes with the working copy...")
+    changed, removed = diff_hashes(pg_conn, sqlite_conn)
+    log(f"  {len(changed):,} new or changed, {len(removed):,} deleted")
+
+    if changed or removed:
+        # Delete + insert rather than INSERT OR REPLACE: REPLACE does not fire the delete trigger
+        with sqlite_conn:
+            for start in range(0, len(removed), FETCH_BATCH_SIZE):
+                sqlite_conn.executemany("DELETE FROM candidates WHERE candidate_id = ?",
+                                        [(candidate_id,) for candidate_id in removed[start:start + FETCH_BATCH_SIZE]])
+
+            with pg_conn.cursor() as cursor:
+                for start in range(0, len(changed), FETCH_BATCH_SIZE):
+                    ids = changed[start:start + FETCH_BATCH_SIZE]
+                    cursor.execute(SNAPSHOT_QUERY.format(where="WHERE candidate_id = ANY(%s)"), (ids,))
+                    rows = cursor.fetchall()
+                    sqlite_conn.executemany("DELETE FROM candidates WHERE candidate_id = ?",
+                                            [(candidate_id,) for candidate_id in ids])
+                    insert_rows(sqlite_conn, rows)
+
+            sqlite_conn.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('optimize')")
+
+    total = sqlite_conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+    sqlite_conn.close()
+    return total, len(changed), len(removed)
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def publish():
+    """
+    Copy a compacted snapshot into AI_Access with its checksum
+
+    Returns:
+        bool: True if a new snapshot was published (False if AI_Access already has it)
+    """
+    os.makedirs(ai_access_layout.LOCAL_AI_ACCESS_DIR, exist_ok=True)
+    target = os.path.join(ai_access_layout.LOCAL_AI_ACCESS_DIR, SNAPSHOT_NAME)
+    checksum_path = target + ".sha256"
+
+    # VACUUM INTO writes a defragmented copy without free pages
+    compact_path = os.path.join(EXPORT_DIR, SNAPSHOT_NAME)
+    if os.path.exists(compact_path):
+        os.unlink(compact_path)
+    sqlite_conn = sqlite3.connect(WORKING_FILE)
+    sqlite_conn.execute("VACUUM INTO ?", (compact_path,))
+    sqlite_conn.close()
+
+    checksum = file_sha256(compact_path)
+    if os.path.exists(checksum_path) and os.path.exists(target):
+        with open(checksum_path, 'r', encoding='utf-8') as f:
+            if f.read().split()[0:1] == [checksum]:
+                os.unlink(compact_path)
+                return False
+
+    # Copy next to the target first so the final rename is atomic
+    shutil.move(compact_path, target + ".tmp")
+    os.replace(target + ".tmp", target)
+    with open(checksum_path + ".tmp", 'w', encoding='utf-8') as f:
+        f.write(f"{checksum}  {SNAPSHOT_NAME}\n")
+    os.replace(checksum_path + ".tmp", checksum_path)
+
+    if SHAREPOINT_DIRECT_UPLOAD:
+        from graph_client import GraphClient
+        graph_client = GraphClient()
+        for path in (target, checksum_path):
+            graph_client.upload_file(path, f"{ai_access_layout.AI_ACCESS_FOLDER}/{os.path.basename(path)}")
+        log("📤 Uploaded snapshot and checksum to SharePoint")
+
+    return True
+
+def search(query, limit=10):
+    """Run a ranked query against the working copy (a quick check of what agents will see)"""
+    sqlite_conn = sqlite3.connect(WORKING_FILE)
+    rows = sqlite_conn.execute("""
+        SELECT c.candidate_id, c.full_name, c.employment_titles, rank
+        FROM candidates_fts
+        JOIN candidates c ON c.candidate_id = candidates_fts.rowid
+        WHERE candidates_fts MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    """, (query, limit)).fetchall()
+    sqlite_conn.close()
+
+    log(f"Top {len(rows)} for: {query}")
+    for candidate_id, full_name, titles, score in rows:
+        log(f"  {candidate_id:>10}  {score:>8.2f}  {full_name or '-'}  {(titles or '')[:60]}")
+
+def export_sqlite_snapshot(full=False, publish_snapshot=True):
+    log("AI Database SQLite Snapshot Export")
+    log("="*60)
+
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+
+    if not full and not os.path.exists(WORKING_FILE):
+        log("No working copy yet - running a full build")
+        full = True
+    elif not full:
+        sqlite_conn = sqlite3.connect(WORKING_FILE)
+        version = get_info(sqlite_conn, "schema_version")
+        sqlite_conn.close()
+        if version != str(SCHEMA_VERSION):
+            log(f"Working copy has schema version {version}, expected {SCHEMA_VERSION} - running a full build")
+            full = True
+
+    try:
+        pg_conn = psycopg2.connect(**PG)
+        if full:
+            total, changed, removed = build_full(pg_conn)
+        else:
+            total, changed, removed = build_incremental(pg_conn)
+        pg_conn.close()
+    except Exception as e:
+        log(f"❌ Snapshot build failed: {e}")
+        return False
+
+    sqlite_conn = sqlite3.connect(WORKING_FILE)
+    with_text = sqlite_conn.execute("SELECT COUNT(*) FROM candidates WHERE resume_text IS NOT NULL").fetchone()[0]
+    # Left alone when nothing changed so the published checksum stays the same
+    if full or changed or removed:
+        with sqlite_conn:
+            set_info(sqlite_conn, updated_at=datetime.now().isoformat(), candidates=total,
+                     with_resume_text=with_text, fts_weights=", ".join(f"{k}={v}" for k, v in FTS_WEIGHTS.items()))
+    sqlite_conn.close()
+
+    published = False
+    if publish_snapshot:
+        if not ai_access_layout.LOCAL_RESUME_DIR:
+            log("⚠️  LOCAL_RESUME_DIR is not set - skipping publish to AI_Access")
+        else:
+            published = publish()
+
+    log("")
+    log("="*60)
+    log("✅ Snapshot completed successfully!")
+    log("="*60)
+    log(f"🏗️  Build: {'full' if full else 'incremental'}")
+    if not full:
+        log(f"🔄 Changed: {changed:,} candidates, deleted: {removed:,}")
+    log(f"📊 Candidates: {total:,} ({with_text:,} with resume text)")
+    log(f"📁 Working copy: {WORKING_FILE} ({os.path.getsize(WORKING_FILE) / 1024 / 1024:,.1f} MB)")
+    if publish_snapshot and ai_access_layout.LOCAL_RESUME_DIR:
+        if published:
+            log(f"📤 Published: {ai_access_layout.AI_ACCESS_FOLDER}/{SNAPSHOT_NAME} (+ .sha256)")
+        else:
+            log(f"⏭️  {ai_access_layout.AI_ACCESS_FOLDER}/{SNAPSHOT_NAME} is already up to date")
+    log("="*60)
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the AI database as a SQLite snapshot with FTS5 search')
+    parser.add_argument('--full', action='store_true', help='Rebuild the snapshot from scratch')
+    parser.add_argument('--no-publish', action='store_true', help='Update the working copy without publishing to AI_Access')
+    parser.add_argument('--search', metavar='QUERY', help='Run an FTS5 query against the working copy and exit')
+    args = parser.parse_args()
+
+    if args.search:
+        if not os.path.exists(WORKING_FILE):
+            log(f"❌ No snapshot at {WORKING_FILE} - run an export first")
+            sys.exit(1)
+        search(args.search)
+        return
+
+    if not export_sqlite_snapshot(full=args.full, publish_snapshot=not args.no_publish):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
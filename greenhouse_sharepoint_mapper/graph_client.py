@@ -2,20 +2,61 @@
 """
 Microsoft Graph API client for SharePoint operations
 Handles authentication and SharePoint file operations
+
+All calls go through one pooled requests.Session with a timeout, a cached
+access token (renewed shortly before it expires) and Retry-After aware
+backoff on throttling. Per-call latency and retry counters are kept in
+GraphClient.metrics for long mapping runs.
+
+upload_file()/submit_upload() push files straight to SharePoint (simple PUT
+for small files, resumable upload sessions for large ones) and return the
+driveItem, so URLs can be mapped without waiting for OneDrive to sync.
+
+Path lookups are answered from the local drive item cache (gh.drive_items,
+kept current by drive_item_cache.py) when it has been synced; only misses
+go to Graph.
 """
 
 import os
+import time
+import base64
+import random
+import threading
 import requests
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from msal import ConfidentialClientApplication
 from dotenv import load_dotenv
 from urllib.parse import quote
 
 load_dotenv()
 
+GRAPH_BASE_URL = "https://graph.microsoft.com/v1.0"
+BATCH_LIMIT = 20                                   # Graph allows at most 20 requests per $batch
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+BATCH_MAX_RETRIES = int(os.getenv("GRAPH_BATCH_MAX_RETRIES", "5"))
+
+# Transport settings
+GRAPH_TIMEOUT = float(os.getenv("GRAPH_TIMEOUT", "30"))               # Seconds per HTTP call
+GRAPH_MAX_RETRIES = int(os.getenv("GRAPH_MAX_RETRIES", "6"))          # Retries on 429/503/transient errors
+GRAPH_POOL_SIZE = int(os.getenv("GRAPH_POOL_SIZE", "16"))             # Keep-alive connections
+TOKEN_REFRESH_MARGIN = 300                                            # Renew token 5 min before expiry
+MAX_BACKOFF_SECONDS = 60
+
+# Resolve paths from gh.drive_items before asking Graph
+DRIVE_CACHE_ENABLED = os.getenv("DRIVE_CACHE_ENABLED", "true").lower() == "true"
+
+# Direct upload (instead of waiting for the OneDrive desktop client)
+SHAREPOINT_DIRECT_UPLOAD = os.getenv("SHAREPOINT_DIRECT_UPLOAD", "false").lower() == "true"
+UPLOAD_CONCURRENCY = int(os.getenv("GRAPH_UPLOAD_CONCURRENCY", "4"))     # Uploads in flight
+SIMPLE_UPLOAD_LIMIT = 4 * 1024 * 1024                                     # Graph simple PUT limit
+UPLOAD_CHUNK_SIZE = 10 * 320 * 1024                                       # Must be a multiple of 320 KiB
+
 class GraphClient:
     """Microsoft Graph API client for SharePoint operations"""
     
-    def __init__(self):
+    def __init__(self, use_cache=DRIVE_CACHE_ENABLED):
         self.tenant_id = os.getenv("AZURE_TENANT_ID")
         self.client_id = os.getenv("AZURE_CLIENT_ID")
         self.client_secret = os.getenv("AZURE_CLIENT_SECRET")
@@ -34,21 +75,42 @@ class GraphClient:
         )
         
         self.access_token = None
-    
-    def get_access_token(self):
-        """Get access token for Microsoft Graph API"""
-        # Always request a fresh token - MSAL handles caching and refresh internally
-        # This prevents token expiration issues during long-running processes
-        scopes = ["https://graph.microsoft.com/.default"]
+        self.token_expires_at = 0
+        self._token_lock = threading.Lock()
         
-        result = self.app.acquire_token_for_client(scopes=scopes)
+        # Pooled keep-alive connections shared by every call
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=GRAPH_POOL_SIZE, pool_maxsize=GRAPH_POOL_SIZE)
+        self.session.mount("https://", adapter)
         
-        if "access_token" in result:
-            self.access_token = result["access_token"]
-            return self.access_token
-        else:
-            error = result.get("error_description", result.get("error", "Unknown error"))
-            raise Exception(f"Failed to acquire access token: {error}")
+        self.use_cache = use_cache
+        self._cache = None
+        self._cache_lock = threading.Lock()
+        self._upload_executor = None
+        
+        self._metrics_lock = threading.Lock()
+        self.metrics = defaultdict(lambda: {
+            "calls": 0, "retries": 0, "throttled": 0, "errors": 0, "total_seconds": 0.0
+        })
+    
+    def get_access_token(self, force_refresh=False):
+        """Get access token for Microsoft Graph API (reused until shortly before expiry)"""
+        with self._token_lock:
+            if (not force_refresh and self.access_token
+                    and time.time() < self.token_expires_at - TOKEN_REFRESH_MARGIN):
+                return self.access_token
+            
+            scopes = ["https://graph.microsoft.com/.default"]
+            
+            result = self.app.acquire_token_for_client(scopes=scopes)
+            
+            if "access_token" in result:
+                self.access_token = result["access_token"]
+                self.token_expires_at = time.time() + int(result.get("expires_in", 3600))
+                return self.access_token
+            else:
+                error = result.get("error_description", result.get("error", "Unknown error"))
+                raise Exception(f"Failed to acquire access token: {error}")
     
     def get_headers(self):
         """Get headers for Graph API requests"""
@@ -58,19 +120,126 @@ class GraphClient:
             "Content-Type": "application/json"
         }
     
+    def request(self, method, url, name=None, **kwargs):
+        """
+        Send a Graph request through the pooled session
+        
+        Retries 429/503 (and other transient 5xx / connection errors) honouring
+        Retry-After with jittered exponential backoff, and renews the token
+        once on 401. The final response is returned without raise_for_status().
+        
+        Args:
+            method: HTTP method
+            url: Absolute Graph URL
+            name: Label for metrics (defaults to the method)
+        """
+        name = name or method.lower()
+        kwargs.setdefault("timeout", GRAPH_TIMEOUT)
+        extra_headers = kwargs.pop("headers", {})
+        token_refreshed = False
+        
+        for attempt in range(GRAPH_MAX_RETRIES + 1):
+            headers = {**self.get_headers(), **extra_headers}
+            started = time.monotonic()
+            
+            try:
+                response = self.session.request(method, url, headers=headers, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record(name, started, retried=attempt < GRAPH_MAX_RETRIES, error=True)
+                if attempt == GRAPH_MAX_RETRIES:
+                    raise
+                time.sleep(self._retry_delay({}, attempt))
+                continue
+            
+            if response.status_code == 401 and not token_refreshed:
+                self._record(name, started, retried=True)
+                self.get_access_token(force_refresh=True)
+                token_refreshed = True
+                continue
+            
+            if response.status_code in RETRYABLE_STATUS and attempt < GRAPH_MAX_RETRIES:
+                self._record(name, started, retried=True, throttled=response.status_code in (429, 503))
+                time.sleep(self._retry_delay(response.headers, attempt))
+                continue
+            
+            self._record(name, started, error=response.status_code >= 400 and response.status_code != 404)
+            return response
+        
+        return response
+    
+    def _record(self, name, started, retried=False, throttled=False, error=False):
+        """Update per-call latency and retry counters"""
+        elapsed = time.monotonic() - started
+        with self._metrics_lock:
+            stats = self.metrics[name]
+            stats["calls"] += 1
+            stats["total_seconds"] += elapsed
+            stats["retries"] += int(retried)
+            stats["throttled"] += int(throttled)
+            stats["errors"] += int(error)
+    
+    def metrics_summary(self):
+        """One line per call type: count, average latency, retries, throttling"""
+        with self._metrics_lock:
+            lines = []
+            for name, stats in sorted(self.metrics.items()):
+                if name == "cache":
+                    lines.append(f"cache: {stats['calls']:,} lookups, {stats.get('hits', 0):,} hits")
+                    continue
+                avg_ms = stats["total_seconds"] / stats["calls"] * 1000 if stats["calls"] else 0
+                lines.append(
+                    f"{name}: {stats['calls']:,} calls, avg {avg_ms:.0f} ms, "
+                    f"{stats['retries']:,} retries, {stats['throttled']:,} throttled, "
+                    f"{stats['errors']:,} errors"
+                )
+            return lines
+    
+    def get_cache(self):
+        """Drive item cache, or None if disabled / never synced / unreachable"""
+        # Upload workers call this too; only one thread may open the cache
+        with self._cache_lock:
+            if not self.use_cache:
+                return None
+            
+            if self._cache is None:
+                try:
+                    from drive_item_cache import DriveItemCache
+                    cache = DriveItemCache(self.site_id, self.resume_folder_path or "")
+                    if not cache.is_synced():
+                        print("Drive item cache not synced yet - using Graph lookups "
+                              "(run: python drive_item_cache.py)")
+                        self.use_cache = False
+                        return None
+                    self._cache = cache
+                except Exception as e:
+                    print(f"Drive item cache unavailable ({e}) - using Graph lookups")
+                    self.use_cache = False
+                    return None
+            
+            return self._cache
+    
+    def _count_cache(self, hits, misses):
+        with self._metrics_lock:
+            self.metrics["cache"]["calls"] += hits + misses
+            self.metrics["cache"]["hits"] = self.metrics["cache"].get("hits", 0) + hits
+    
     def get_site_info(self):
         """Get SharePoint site information"""
-        headers = self.get_headers()
         url = f"https://graph.microsoft.com/v1.0/sites/{self.site_id}"
         
-        response = requests.get(url, headers=headers)
+        response = self.request("GET", url, name="site_info")
         response.raise_for_status()
         
         return response.json()
     
     def find_file_by_path(self, relative_path):
         """Find a file in SharePoint by its relative path"""
-        headers = self.get_headers()
+        cache = self.get_cache()
+        if cache:
+            cached = cache.lookup_many([relative_path])[0]
+            self._count_cache(int(cached is not None), int(cached is None))
+            if cached:
+                return cached
         
         # Encode the path for URL
         encoded_path = quote(relative_path)
@@ -78,19 +247,297 @@ class GraphClient:
         # Try to get file info
         url = f"https://graph.microsoft.com/v1.0/sites/{self.site_id}/drive/root:/{self.resume_folder_path}/{encoded_path}"
         
+        response = self.request("GET", url, name="find_file")
+        if response.status_code == 404:
+            return None  # File not found
+        response.raise_for_status()
+        file_info = response.json()
+        
+        if cache:
+            cache.record(relative_path, file_info)
+        
+        return file_info
+    
+    def find_files_by_paths(self, relative_paths):
+        """
+        Look up many files with Graph JSON batching (20 lookups per HTTP request)
+        
+        Each item is handled on its own: 404s come back as None, and throttled
+        (429) or transient 5xx items are retried after Retry-After without
+        repeating the items that already succeeded.
+        
+        Args:
+            relative_paths: Paths relative to RESUME_FOLDER_PATH
+            
+        Returns:
+            list: file_info dict (or None if not found) for each path, in input order
+        """
+        results = [None] * len(relative_paths)
+        
+        # Local cache first; only misses cross the network
+        cache = self.get_cache()
+        if cache and relative_paths:
+            results = cache.lookup_many(relative_paths)
+        
+        missing = [i for i, file_info in enumerate(results) if file_info is None]
+        if cache:
+            self._count_cache(len(relative_paths) - len(missing), len(missing))
+        
+        for start in range(0, len(missing), BATCH_LIMIT):
+            positions = missing[start:start + BATCH_LIMIT]
+            chunk = [relative_paths[i] for i in positions]
+            for offset, file_info in self._batch_lookup(chunk).items():
+                results[positions[offset]] = file_info
+                if cache and file_info:
+                    cache.record(chunk[offset], file_info)
+        
+        return results
+    
+    def _batch_lookup(self, relative_paths):
+        """Run one $batch of up to 20 path lookups. Returns {position: file_info or None}."""
+        pending = {str(i): path for i, path in enumerate(relative_paths)}
+        found = {}
+        
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            batch_requests = [
+                {
+                    "id": request_id,
+                    "method": "GET",
+                    "url": f"/sites/{self.site_id}/drive/root:/{quote(f'{self.resume_folder_path}/{path}')}"
+                }
+                for request_id, path in pending.items()
+            ]
+            
+            # Whole-batch throttling is retried inside request()
+            response = self.request(
+                "POST",
+                f"{GRAPH_BASE_URL}/$batch",
+                name="batch",
+                json={"requests": batch_requests}
+            )
+            response.raise_for_status()
+            
+            retry_after = 0
+            for item in response.json().get("responses", []):
+                request_id = item.get("id")
+                status = item.get("status")
+                
+                if request_id not in pending:
+                    continue
+                
+                if status == 200:
+                    found[int(request_id)] = item.get("body")
+                    del pending[request_id]
+                elif status == 404:
+                    found[int(request_id)] = None
+                    del pending[request_id]
+                elif status in RETRYABLE_STATUS:
+                    retry_after = max(retry_after, self._retry_delay(item.get("headers") or {}, attempt))
+                else:
+                    error = (item.get("body") or {}).get("error", {}).get("message", "")
+                    print(f"Graph lookup failed for {pending[request_id]}: HTTP {status} {error}")
+                    found[int(request_id)] = None
+                    del pending[request_id]
+            
+            if not pending:
+                return found
+            
+            with self._metrics_lock:
+                self.metrics["batch_item"]["retries"] += len(pending)
+                self.metrics["batch_item"]["throttled"] += len(pending)
+            time.sleep(retry_after)
+        
+        raise Exception(f"Graph $batch still throttled after {BATCH_MAX_RETRIES} retries "
+                        f"({len(pending)} lookups pending)")
+    
+    @staticmethod
+    def _retry_delay(headers, attempt):
+        """Seconds to wait: Retry-After when Graph sends one, else jittered exponential backoff"""
+        retry_after = {k.lower(): v for k, v in headers.items()}.get("retry-after")
         try:
-            response = requests.get(url, headers=headers)
+            # Small jitter so parallel workers don't all resume at the same instant
+            return max(1, int(retry_after)) + random.uniform(0, 1)
+        except (TypeError, ValueError):
+            return random.uniform(0, min(2 ** (attempt + 1), MAX_BACKOFF_SECONDS))
+    
+    # ------------------------------------------------------------------
+    # Uploads
+    # ------------------------------------------------------------------
+    
+    def _item_url(self, relative_path):
+        return f"{GRAPH_BASE_URL}/sites/{self.site_id}/drive/root:/{quote(f'{self.resume_folder_path}/{relative_path}')}"
+    
+    def upload_file(self, local_file_path, relative_path):
+        """
+        Upload a local file to SharePoint, replacing any existing file
+        
+        Files up to 4 MB use a single PUT; larger files use a resumable
+        upload session sent in chunks.
+        
+        Args:
+            local_file_path: File to upload
+            relative_path: Destination path relative to RESUME_FOLDER_PATH
+            
+        Returns:
+            dict: The uploaded driveItem (includes id and webUrl)
+        """
+        size = os.path.getsize(local_file_path)
+        
+        if size <= SIMPLE_UPLOAD_LIMIT:
+            with open(local_file_path, 'rb') as f:
+                data = f.read()
+            
+            response = self.request(
+                "PUT",
+                f"{self._item_url(relative_path)}:/content?@microsoft.graph.conflictBehavior=replace",
+                name="upload",
+                data=data,
+                headers={"Content-Type": "application/octet-stream"}
+            )
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 404:
-                return None  # File not found
-            raise
+            item = response.json()
+        else:
+            item = self._upload_large_file(local_file_path, relative_path, size)
+        
+        cache = self.get_cache()
+        if cache:
+            cache.record(relative_path, item)
+        
+        return item
+    
+    def _create_upload_session(self, relative_path):
+        response = self.request(
+            "POST",
+            f"{self._item_url(relative_path)}:/createUploadSession",
+            name="upload_session",
+            json={"item": {"@microsoft.graph.conflictBehavior": "replace"}}
+        )
+        response.raise_for_status()
+        return response.json()["uploadUrl"]
+    
+    def _upload_large_file(self, local_file_path, relative_path, size):
+        """Chunked upload through an upload session, resuming after failed chunks"""
+        upload_url = self._create_upload_session(relative_path)
+        offset = 0
+        failures = 0
+        
+        with open(local_file_path, 'rb') as f:
+            while True:
+                f.seek(offset)
+                chunk = f.read(UPLOAD_CHUNK_SIZE)
+                end = offset + len(chunk) - 1
+                started = time.monotonic()
+                
+                try:
+                    # The upload URL is pre-authenticated - no Authorization header
+                    response = self.session.put(
+                        upload_url,
+                        data=chunk,
+                        headers={
+                            "Content-Length": str(len(chunk)),
+                            "Content-Range": f"bytes {offset}-{end}/{size}"
+                        },
+                        timeout=GRAPH_TIMEOUT
+                    )
+                    status = response.status_code
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    response, status = None, None
+                
+                if status in (200, 201):
+                    self._record("upload_chunk", started)
+                    return response.json()
+                
+                if status == 202:
+                    self._record("upload_chunk", started)
+                    ranges = response.json().get("nextExpectedRanges") or [f"{end + 1}-"]
+                    offset = int(ranges[0].split("-")[0])
+                    failures = 0
+                    continue
+                
+                failures += 1
+                self._record("upload_chunk", started, retried=True,
+                             throttled=status in (429, 503), error=status is None or status >= 400)
+                if failures > GRAPH_MAX_RETRIES:
+                    raise Exception(f"Upload of {relative_path} failed at byte {offset} (HTTP {status})")
+                
+                if status == 404:
+                    # Session expired - start a new one from the beginning
+                    upload_url = self._create_upload_session(relative_path)
+                    offset = 0
+                    continue
+                
+                time.sleep(self._retry_delay(response.headers if response is not None else {}, failures))
+                
+                # Ask the session where to resume
+                try:
+                    status_response = self.session.get(upload_url, timeout=GRAPH_TIMEOUT)
+                    if status_response.ok:
+                        ranges = status_response.json().get("nextExpectedRanges") or [f"{offset}-"]
+                        offset = int(ranges[0].split("-")[0])
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    pass
+    
+    def submit_upload(self, local_file_path, relative_path):
+        """
+        Queue an upload on the client's worker pool (GRAPH_UPLOAD_CONCURRENCY in flight)
+        
+        Returns:
+            Future: resolves to the driveItem, or raises the upload error
+        """
+        if self._upload_executor is None:
+            # Open the drive item cache before any worker needs it
+            self.get_cache()
+            self._upload_executor = ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY)
+        
+        return self._upload_executor.submit(self.upload_file, local_file_path, relative_path)
+    
+    def upload_files(self, uploads):
+        """
+        Upload many files concurrently
+        
+        Args:
+            uploads: list of (local_file_path, relative_path)
+            
+        Returns:
+            list: driveItem (or None on failure) for each upload, in input order
+        """
+        futures = [self.submit_upload(local, remote) for local, remote in uploads]
+        items = []
+        
+        for (local, remote), future in zip(uploads, futures):
+            try:
+                items.append(future.result())
+            except Exception as e:
+                print(f"Upload failed for {remote}: {e}")
+                items.append(None)
+        
+        return items
+    
+    def get_web_urls_by_paths(self, relative_paths):
+        """Batched webUrl lookup: list of webUrl (or None) in input order"""
+        return [
+            file_info.get("webUrl") if file_info else None
+            for file_info in self.find_files_by_paths(relative_paths)
+        ]
+    
+    def resolve_url(self, url):
+        """
+        Resolve a stored webUrl / sharing link to its driveItem (Graph /shares)
+        
+        Returns:
+            dict: driveItem, or None if the URL no longer resolves
+        """
+        share_id = "u!" + base64.urlsafe_b64encode(url.encode("utf-8")).decode("ascii").rstrip("=")
+        
+        response = self.request("GET", f"{GRAPH_BASE_URL}/shares/{share_id}/driveItem", name="resolve_url")
+        if response.status_code in (400, 403, 404):
+            return None
+        response.raise_for_status()
+        
+        return response.json()
     
     def create_sharing_link(self, file_id, link_type="view"):
         """Create a sharing link for a file"""
-        headers = self.get_headers()
-        
         url = f"https://graph.microsoft.com/v1.0/sites/{self.site_id}/drive/items/{file_id}/createLink"
         
         payload = {
@@ -98,7 +545,7 @@ class GraphClient:
             "scope": "organization"  # "anonymous", "organization", or "users"
         }
         
-        response = requests.post(url, headers=headers, json=payload)
+        response = self.request("POST", url, name="create_link", json=payload)
         response.raise_for_status()
         
         result = response.json()
@@ -141,6 +588,29 @@ class GraphClient:
             print(f"Error getting SharePoint URL for {local_file_path}: {e}")
             return None, None
     
+    def get_sharepoint_urls_for_local_files(self, local_file_paths):
+        """
+        Batched version of get_sharepoint_url_for_local_file
+        
+        Returns:
+            list: webUrl (or None) for each local path, in input order
+        """
+        local_resume_dir = os.getenv("LOCAL_RESUME_DIR")
+        urls = [None] * len(local_file_paths)
+        
+        # Only paths inside the resume folder can be looked up
+        positions = []
+        relative_paths = []
+        for i, local_file_path in enumerate(local_file_paths):
+            if local_file_path and local_file_path.startswith(local_resume_dir):
+                positions.append(i)
+                relative_paths.append(os.path.relpath(local_file_path, local_resume_dir).replace(os.sep, "/"))
+        
+        for i, web_url in zip(positions, self.get_web_urls_by_paths(relative_paths)):
+            urls[i] = web_url
+        
+        return urls
+    
     def test_connection(self):
         """Test the Graph API connection"""
         try:
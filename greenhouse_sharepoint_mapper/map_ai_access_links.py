@@ -4,15 +4,22 @@ Map AI Access Links to Database
 
 Maps all resumes in the flat AI_Access folder to SharePoint URLs
 and updates the greenhouse_candidates_ai database.
+
+Files SharePoint has no item for are remembered in the negative lookup cache
+and not looked up again until the (short) TTL expires or the local file changes.
 """
 
 import os
 import sys
-import json
 import psycopg2
 from datetime import datetime
 from dotenv import load_dotenv
 from graph_client import GraphClient
+from resume_index import get_resume_index
+from db_batches import iter_keyset_batches
+from negative_cache import NegativeCache, file_fingerprint, NEGATIVE_CACHE_SHAREPOINT_TTL_HOURS
+import master_index
+import ai_access_layout
 
 load_dotenv()
 
@@ -35,40 +42,35 @@ def log(message):
     print(f"[{timestamp}] {message}")
 
 def load_master_index():
-    """Load the master index file"""
-    index_path = os.path.join(LOCAL_AI_ACCESS_DIR, "_master_index.json")
+    """
+    Load the master index manifest (counts and shards, not the entries)
+    
+    Stream entries with master_index.iter_entries() or fetch one with
+    master_index.lookup(candidate_id).
+    """
+    manifest = master_index.load_manifest()
     
-    if not os.path.exists(index_path):
-        log(f"❌ Master index not found: {index_path}")
-        return None
+    if manifest is None:
+        log(f"❌ Master index not found: {master_index.MASTER_INDEX_DIR}")
     
-    with open(index_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return manifest
 
-def get_sharepoint_url_for_ai_file(graph_client, filename):
-    """Get SharePoint URL for a file in the AI_Access folder"""
+def get_sharepoint_urls_for_ai_files(graph_client, filenames):
+    """Get SharePoint URLs for files in the AI_Access folder (batched Graph lookups)"""
     try:
-        # The path in SharePoint is: Greenhouse/Greenhouse_Resumes/AI_Access/{filename}
-        relative_path = f"AI_Access/{filename}"
-        
-        file_info = graph_client.find_file_by_path(relative_path)
-        if not file_info:
-            return None
+        # The path in SharePoint is: Greenhouse/Greenhouse_Resumes/AI_Access/[shard/]{filename}
+        relative_paths = [ai_access_layout.storage_path_for_filename(f) for f in filenames]
         
-        # Use direct web URL
-        web_url = file_info.get("webUrl")
-        return web_url
+        # Use direct web URLs
+        return graph_client.get_web_urls_by_paths(relative_paths)
         
     except Exception as e:
-        return None
+        log(f"  ⚠️  Batch lookup failed: {e}")
+        return [None] * len(filenames)
 
 def find_local_resume_file(candidate_id):
-    """Find resume file in AI_Access folder"""
-    # Look for file starting with candidate_id in AI_Access folder
-    for file in os.listdir(LOCAL_AI_ACCESS_DIR):
-        if file.startswith(f"{candidate_id}_") and not file.endswith("_metadata.json") and not file.startswith("_"):
-            return os.path.join(LOCAL_AI_ACCESS_DIR, file)
-    return None
+    """Find resume file in AI_Access folder (via the resume index)"""
+    return get_resume_index().ai_access_path(candidate_id)
 
 def map_ai_access_links():
     """Map AI Access links and update database - same logic as original mapper"""
@@ -99,35 +101,43 @@ def map_ai_access_links():
             success_count = 0
             failed_count = 0
             no_resume_count = 0
-            batch_size = 100
+            known_miss_count = 0
+            processed = 0
+            negative_cache = NegativeCache("ai_access_url", ttl_hours=NEGATIVE_CACHE_SHAREPOINT_TTL_HOURS)
             
-            for offset in range(0, total, batch_size):
-                batch_num = (offset // batch_size) + 1
-                log(f"Processing batch {batch_num}: candidates {offset+1} to {min(offset+batch_size, total)}")
-                
-                with conn.cursor() as cur:
-                    cur.execute("""
-                        SELECT candidate_id, full_name, resume_filenames
-                        FROM gh.candidates
-                        ORDER BY candidate_id
-                        LIMIT %s OFFSET %s
-                    """, (batch_size, offset))
-                    
-                    candidates = cur.fetchall()
+            for batch_num, candidates in enumerate(iter_keyset_batches(conn, """
+                SELECT candidate_id, full_name, resume_filenames
+                FROM gh.candidates
+                WHERE {keyset}
+                ORDER BY candidate_id
+                LIMIT %(batch_size)s
+            """), 1):
+                log(f"Processing batch {batch_num}: candidates {candidates[0][0]} to {candidates[-1][0]}")
                 
+                # Find local files in AI_Access
+                found = []
                 for candidate_id, full_name, resume_filenames in candidates:
-                    # Find local file in AI_Access
                     local_file = find_local_resume_file(candidate_id)
                     
                     if not local_file:
                         no_resume_count += 1
                         continue
                     
-                    # Get SharePoint URL
-                    filename = os.path.basename(local_file)
-                    ai_url = get_sharepoint_url_for_ai_file(graph_client, filename)
+                    # Not in SharePoint last time and the file hasn't changed since
+                    file_key = file_fingerprint(local_file)
+                    if negative_cache.is_known_miss(candidate_id, file_key):
+                        known_miss_count += 1
+                        continue
                     
+                    found.append((candidate_id, full_name, os.path.basename(local_file), file_key))
+                
+                # Get SharePoint URLs (20 lookups per Graph request)
+                ai_urls = get_sharepoint_urls_for_ai_files(graph_client, [f[2] for f in found])
+                
+                for (candidate_id, full_name, filename, file_key), ai_url in zip(found, ai_urls):
                     if ai_url:
+                        negative_cache.record_hit(candidate_id)
+                        
                         # Update resume_links to point to AI_Access
                         with conn.cursor() as cur:
                             cur.execute("""
@@ -141,10 +151,13 @@ def map_ai_access_links():
                         if success_count % 10 == 0:
                             log(f"  ✅ Mapped candidate {candidate_id}: {full_name}")
                     else:
+                        negative_cache.record_miss(candidate_id, file_key, "not in SharePoint")
                         failed_count += 1
                 
                 conn.commit()
-                log(f"Progress: {min(offset+batch_size, total):,}/{total:,} ({(min(offset+batch_size, total)/total*100):.1f}%)")
+                negative_cache.flush()
+                processed += len(candidates)
+                log(f"Progress: {processed:,}/{total:,} ({processed/total*100:.1f}%)")
             
             log("\n" + "="*60)
             log("AI ACCESS MAPPING SUMMARY")
@@ -153,9 +166,14 @@ def map_ai_access_links():
             log(f"Successfully mapped: {success_count:,}")
             log(f"Failed to map: {failed_count:,}")
             log(f"No resume: {no_resume_count:,}")
-            log(f"Success rate: {(success_count/(total-no_resume_count)*100):.1f}%")
+            log(f"Skipped (known miss): {known_miss_count:,}")
+            log(f"Success rate: {(success_count/max(total-no_resume_count-known_miss_count, 1)*100):.1f}%")
+            log(negative_cache.summary())
+            for line in graph_client.metrics_summary():
+                log(f"Graph {line}")
             log("="*60)
             
+            negative_cache.close()
             return True
             
     except Exception as e:
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 """
 Map metadata JSON files to SharePoint URLs and add to database
+
+Metadata files SharePoint has no item for are skipped on later runs (negative
+lookup cache) until the (short) TTL expires or the file changes.
 """
 
 import os
@@ -8,6 +11,9 @@ import psycopg2
 from datetime import datetime
 from dotenv import load_dotenv
 from graph_client import GraphClient
+from resume_index import get_resume_index
+from db_batches import iter_keyset_batches
+from negative_cache import NegativeCache, file_fingerprint, NEGATIVE_CACHE_SHAREPOINT_TTL_HOURS
 
 # Load environment variables
 load_dotenv()
@@ -30,23 +36,18 @@ def log(message):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {message}")
 
-def get_sharepoint_url_for_metadata(graph_client, local_file_path):
-    """Get SharePoint URL for a metadata JSON file"""
+def get_sharepoint_urls_for_metadata(graph_client, local_file_paths):
+    """Get SharePoint URLs for metadata JSON files (batched Graph lookups)"""
     try:
-        # Get file info from SharePoint - returns (url, filename) tuple
-        url, filename = graph_client.get_sharepoint_url_for_local_file(local_file_path)
-        return url
+        return graph_client.get_sharepoint_urls_for_local_files(local_file_paths)
         
     except Exception as e:
-        return None
+        log(f"  ⚠️  Batch lookup failed: {e}")
+        return [None] * len(local_file_paths)
 
 def find_metadata_file(candidate_id):
-    """Find metadata JSON file for a candidate"""
-    # Look for metadata file in AI_Access folder
-    for file in os.listdir(LOCAL_AI_ACCESS_DIR):
-        if file.startswith(f"{candidate_id}_") and file.endswith("_metadata.json"):
-            return os.path.join(LOCAL_AI_ACCESS_DIR, file)
-    return None
+    """Find metadata JSON file for a candidate (via the resume index)"""
+    return get_resume_index().metadata_path(candidate_id)
 
 def add_metadata_column():
     """Add metadata_url column to database if it doesn't exist"""
@@ -115,60 +116,77 @@ def map_metadata_links():
             success_count = 0
             failed_count = 0
             no_metadata_count = 0
+            known_miss_count = 0
             batch_size = 100
+            negative_cache = NegativeCache("metadata_url", ttl_hours=NEGATIVE_CACHE_SHAREPOINT_TTL_HOURS)
             
-            for offset in range(0, total, batch_size):
-                with conn.cursor() as cur:
-                    # Fetch batch of candidates
-                    cur.execute("""
-                        SELECT candidate_id, full_name
-                        FROM gh.candidates
-                        WHERE resume_links IS NOT NULL 
-                        AND array_length(resume_links, 1) > 0
-                        AND (metadata_url IS NULL OR metadata_url = '')
-                        ORDER BY candidate_id
-                        LIMIT %s OFFSET %s
-                    """, (batch_size, offset))
+            processed = 0
+            
+            # Keyset paging: updated rows drop out of the filter without shifting later batches
+            for batch_num, candidates in enumerate(iter_keyset_batches(conn, """
+                SELECT candidate_id, full_name
+                FROM gh.candidates
+                WHERE resume_links IS NOT NULL 
+                AND array_length(resume_links, 1) > 0
+                AND (metadata_url IS NULL OR metadata_url = '')
+                AND {keyset}
+                ORDER BY candidate_id
+                LIMIT %(batch_size)s
+            """, batch_size=batch_size), 1):
+                if processed % 1000 == 0:
+                    log(f"Progress: {processed:,}/{total:,} ({processed/total*100:.1f}%)")
+                    log(f"Processing batch {batch_num}: candidates {candidates[0][0]} to {candidates[-1][0]}")
+                processed += len(candidates)
+                
+                # Find metadata files
+                found = []
+                for candidate_id, full_name in candidates:
+                    metadata_file = find_metadata_file(candidate_id)
                     
-                    candidates = cur.fetchall()
+                    if not metadata_file:
+                        no_metadata_count += 1
+                        if no_metadata_count % 100 == 0:
+                            log(f"  ⚠️  No metadata file found for {no_metadata_count} candidates so far")
+                        continue
                     
-                    if offset % 1000 == 0:
-                        log(f"Progress: {offset:,}/{total:,} ({offset/total*100:.1f}%)")
-                        log(f"Processing batch {offset//batch_size + 1}: candidates {offset+1} to {min(offset+batch_size, total)}")
+                    file_key = file_fingerprint(metadata_file)
+                    if negative_cache.is_known_miss(candidate_id, file_key):
+                        known_miss_count += 1
+                        continue
                     
-                    for candidate_id, full_name in candidates:
-                        try:
-                            # Find metadata file
-                            metadata_file = find_metadata_file(candidate_id)
-                            
-                            if not metadata_file:
-                                no_metadata_count += 1
-                                if no_metadata_count % 100 == 0:
-                                    log(f"  ⚠️  No metadata file found for {no_metadata_count} candidates so far")
-                                continue
+                    found.append((candidate_id, full_name, metadata_file, file_key))
+                
+                # Get SharePoint URLs (20 lookups per Graph request)
+                metadata_urls = get_sharepoint_urls_for_metadata(graph_client, [f[2] for f in found])
+                
+                for (candidate_id, full_name, metadata_file, file_key), metadata_url in zip(found, metadata_urls):
+                    try:
+                        if metadata_url:
+                            negative_cache.record_hit(candidate_id)
                             
-                            # Get SharePoint URL
-                            metadata_url = get_sharepoint_url_for_metadata(graph_client, metadata_file)
+                            # Update database
+                            with conn.cursor() as update_cur:
+                                update_cur.execute("""
+                                    UPDATE gh.candidates
+                                    SET metadata_url = %s
+                                    WHERE candidate_id = %s
+                                """, (metadata_url, candidate_id))
+                                conn.commit()
                             
-                            if metadata_url:
-                                # Update database
-                                with conn.cursor() as update_cur:
-                                    update_cur.execute("""
-                                        UPDATE gh.candidates
-                                        SET metadata_url = %s
-                                        WHERE candidate_id = %s
-                                    """, (metadata_url, candidate_id))
-                                    conn.commit()
-                                
-                                success_count += 1
-                                log(f"  ✅ Mapped candidate {candidate_id}: {full_name}")
-                            else:
-                                failed_count += 1
-                                
-                        except Exception as e:
+                            success_count += 1
+                            log(f"  ✅ Mapped candidate {candidate_id}: {full_name}")
+                        else:
+                            negative_cache.record_miss(candidate_id, file_key, "not in SharePoint")
                             failed_count += 1
-                            log(f"  ❌ Error mapping {candidate_id}: {e}")
-                            continue
+                            
+                    except Exception as e:
+                        failed_count += 1
+                        log(f"  ❌ Error mapping {candidate_id}: {e}")
+                        continue
+                
+                negative_cache.flush()
+            
+            negative_cache.close()
             
             # Final summary
             log("")
@@ -179,11 +197,15 @@ def map_metadata_links():
             log(f"Successfully mapped: {success_count:,}")
             log(f"Failed to map: {failed_count:,}")
             log(f"No metadata file: {no_metadata_count:,}")
+            log(f"Skipped (known miss): {known_miss_count:,}")
             
             if success_count > 0:
                 success_rate = (success_count / (success_count + failed_count)) * 100
                 log(f"Success rate: {success_rate:.1f}%")
             
+            log(negative_cache.summary())
+            for line in graph_client.metrics_summary():
+                log(f"Graph {line}")
             log("="*60)
             log("✅ Metadata links mapped successfully!")
             log("")
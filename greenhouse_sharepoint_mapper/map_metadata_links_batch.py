@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Map metadata JSON files to SharePoint URLs using batch approach
-Gets all files from AI_Access folder at once, then matches by filename
+Gets all files from AI_Access folder (every shard folder when sharded) at once,
+then matches by filename
 """
 
 import os
@@ -9,6 +10,8 @@ import psycopg2
 from datetime import datetime
 from dotenv import load_dotenv
 from graph_client import GraphClient
+import ai_access_layout
+from db_batches import iter_keyset_batches
 
 # Load environment variables
 load_dotenv()
@@ -61,45 +64,35 @@ def add_metadata_column():
         raise
 
 def get_all_ai_access_files(graph_client):
-    """Get all files from AI_Access folder in one API call"""
+    """Get all files from the AI_Access folder (and its shard folders, if sharded)"""
     log("Fetching all files from AI_Access folder...")
     
     try:
-        import requests
-        
-        # Use the Graph API to list all files in the AI_Access folder
-        ai_access_path = "Greenhouse/Greenhouse_Resumes/AI_Access"
-        
-        # Build the URL to list folder contents
-        url = f"https://graph.microsoft.com/v1.0/sites/{graph_client.site_id}/drive/root:/{ai_access_path}:/children"
-        
         all_files = {}
-        next_link = url
         page_count = 0
         
-        while next_link:
-            page_count += 1
-            log(f"  Fetching page {page_count}...")
-            
-            headers = graph_client.get_headers()
-            response = requests.get(next_link, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Process files in this page
-            for item in data.get('value', []):
-                if 'file' in item:  # It's a file, not a folder
-                    filename = item.get('name')
-                    web_url = item.get('webUrl')
-                    
-                    if filename and web_url:
-                        all_files[filename] = web_url
+        # Synced drive item cache answers this without listing anything; files
+        # uploaded since the last delta sync are picked up by lookup_missing_files()
+        cache = graph_client.get_cache()
+        if cache:
+            for folder in ai_access_layout.sharepoint_ai_access_folders():
+                all_files.update(cache.list_files(folder))
+            log(f"✅ Found {len(all_files):,} total files in AI_Access folder (drive item cache)")
+            return all_files
+        
+        # Flat layout pages through one huge folder; sharded layout lists many small ones
+        folders = ai_access_layout.sharepoint_ai_access_folders()
+        if len(folders) > 1:
+            log(f"  Sharded layout: listing {len(folders):,} folders")
+        
+        for folder in folders:
+            # Use the Graph API to list all files in this folder
+            ai_access_path = f"Greenhouse/Greenhouse_Resumes/{folder}"
             
-            # Check for next page
-            next_link = data.get('@odata.nextLink')
+            # Build the URL to list folder contents
+            url = f"https://graph.microsoft.com/v1.0/sites/{graph_client.site_id}/drive/root:/{ai_access_path}:/children"
             
-            if page_count % 10 == 0:
-                log(f"  Processed {len(all_files):,} files so far...")
+            page_count = list_folder_files(graph_client, url, all_files, page_count)
         
         log(f"✅ Found {len(all_files):,} total files in AI_Access folder")
         return all_files
@@ -108,6 +101,60 @@ def get_all_ai_access_files(graph_client):
         log(f"❌ Error fetching files: {e}")
         raise
 
+def list_folder_files(graph_client, url, all_files, page_count=0):
+    """Page through one folder's children, adding filename -> webUrl to all_files"""
+    next_link = url
+    
+    while next_link:
+        page_count += 1
+        log(f"  Fetching page {page_count}...")
+        
+        response = graph_client.request("GET", next_link, name="list_children")
+        if response.status_code == 404:
+            # Shard folder not synced yet (or empty and never created)
+            return page_count
+        response.raise_for_status()
+        data = response.json()
+        
+        # Process files in this page
+        for item in data.get('value', []):
+            if 'file' in item:  # It's a file, not a folder
+                filename = item.get('name')
+                web_url = item.get('webUrl')
+                
+                if filename and web_url:
+                    all_files[filename] = web_url
+        
+        # Check for next page
+        next_link = data.get('@odata.nextLink')
+        
+        if page_count % 10 == 0:
+            log(f"  Processed {len(all_files):,} files so far...")
+    
+    return page_count
+
+def lookup_missing_files(graph_client, filenames):
+    """
+    Ask Graph for AI_Access files the drive item cache doesn't know about yet
+    
+    The cache listing is only as fresh as the last delta sync, so files OneDrive
+    uploaded since then are looked up directly (and recorded in the cache).
+    
+    Returns:
+        dict: filename -> webUrl for the files that exist in SharePoint
+    """
+    if not filenames or not graph_client.get_cache():
+        return {}
+    
+    relative_paths = [ai_access_layout.storage_path_for_filename(f) for f in filenames]
+    results = graph_client.find_files_by_paths(relative_paths)
+    
+    return {
+        filename: file_info["webUrl"]
+        for filename, file_info in zip(filenames, results)
+        if file_info and file_info.get("webUrl")
+    }
+
 def map_metadata_links_batch():
     """Map metadata JSON files using batch approach"""
     log("="*60)
@@ -157,52 +204,57 @@ def map_metadata_links_batch():
             no_metadata_count = 0
             batch_size = 1000
             
-            for offset in range(0, total, batch_size):
-                with conn.cursor() as cur:
-                    # Fetch batch of candidates
-                    cur.execute("""
-                        SELECT candidate_id, full_name, resume_filenames[1]
-                        FROM gh.candidates
-                        WHERE resume_links IS NOT NULL 
-                        AND array_length(resume_links, 1) > 0
-                        ORDER BY candidate_id
-                        LIMIT %s OFFSET %s
-                    """, (batch_size, offset))
-                    
-                    candidates = cur.fetchall()
-                    
-                    if offset % 5000 == 0:
-                        log(f"Progress: {offset:,}/{total:,} ({offset/total*100:.1f}%)")
+            processed = 0
+            
+            for candidates in iter_keyset_batches(conn, """
+                SELECT candidate_id, full_name, resume_filenames[1]
+                FROM gh.candidates
+                WHERE resume_links IS NOT NULL 
+                AND array_length(resume_links, 1) > 0
+                AND {keyset}
+                ORDER BY candidate_id
+                LIMIT %(batch_size)s
+            """, batch_size=batch_size):
+                if processed % 5000 == 0:
+                    log(f"Progress: {processed:,}/{total:,} ({processed/total*100:.1f}%)")
+                processed += len(candidates)
+                
+                # Generate expected metadata filenames
+                # Remove extension and add _metadata.json
+                expected = [
+                    (candidate_id, f"{resume_filename.rsplit('.', 1)[0]}_metadata.json" if resume_filename else None)
+                    for candidate_id, full_name, resume_filename in candidates
+                ]
+                
+                # Cache listing may predate recent uploads - check those names with Graph
+                metadata_files.update(lookup_missing_files(graph_client, [
+                    name for _, name in expected if name and name not in metadata_files
+                ]))
+                
+                for candidate_id, metadata_filename in expected:
+                    if not metadata_filename:
+                        no_metadata_count += 1
+                        continue
                     
-                    for candidate_id, full_name, resume_filename in candidates:
-                        if not resume_filename:
-                            no_metadata_count += 1
-                            continue
+                    # Look up in our files dictionary
+                    if metadata_filename in metadata_files:
+                        metadata_url = metadata_files[metadata_filename]
+                        
+                        # Update database
+                        with conn.cursor() as update_cur:
+                            update_cur.execute("""
+                                UPDATE gh.candidates
+                                SET metadata_url = %s
+                                WHERE candidate_id = %s
+                            """, (metadata_url, candidate_id))
+                            conn.commit()
                         
-                        # Generate expected metadata filename
-                        # Remove extension and add _metadata.json
-                        base_name = resume_filename.rsplit('.', 1)[0]
-                        metadata_filename = f"{base_name}_metadata.json"
+                        success_count += 1
                         
-                        # Look up in our files dictionary
-                        if metadata_filename in metadata_files:
-                            metadata_url = metadata_files[metadata_filename]
-                            
-                            # Update database
-                            with conn.cursor() as update_cur:
-                                update_cur.execute("""
-                                    UPDATE gh.candidates
-                                    SET metadata_url = %s
-                                    WHERE candidate_id = %s
-                                """, (metadata_url, candidate_id))
-                                conn.commit()
-                            
-                            success_count += 1
-                            
-                            if success_count % 1000 == 0:
-                                log(f"  ✅ Mapped {success_count:,} metadata URLs so far")
-                        else:
-                            no_metadata_count += 1
+                        if success_count % 1000 == 0:
+                            log(f"  ✅ Mapped {success_count:,} metadata URLs so far")
+                    else:
+                        no_metadata_count += 1
             
             # Final summary
             log("")
@@ -217,6 +269,8 @@ def map_metadata_links_batch():
                 success_rate = (success_count / total) * 100
                 log(f"Success rate: {success_rate:.1f}%")
             
+            for line in graph_client.metrics_summary():
+                log(f"Graph {line}")
             log("="*60)
             log("✅ Metadata links mapped successfully!")
             log("")
@@ -4,16 +4,29 @@ SharePoint Link Mapper
 
 Maps original candidate database to SharePoint-enabled version.
 Replaces Greenhouse S3 URLs with SharePoint sharing links.
+
+The work list (candidates not yet mapped) is computed once. A pool of
+MAPPING_WORKERS threads resolves local files and SharePoint URLs in chunks,
+sharing one GraphClient, while the main thread writes results to the
+SharePoint database with batched statements.
+
+The `raw` Greenhouse payload never round-trips through Python: it is copied
+as text only when the target row is new or changed, and the resume
+attachment's url/filename/source/mapped_at are patched in place with
+jsonb_set.
 """
 
 import os
 import sys
-import json
 import time
 import psycopg2
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from psycopg2.extras import execute_values
 from datetime import datetime
 from dotenv import load_dotenv
 from graph_client import GraphClient
+from resume_index import get_resume_index
 
 # Load environment variables
 load_dotenv()
@@ -38,6 +51,17 @@ TARGET_PG = {
 LOCAL_RESUME_DIR = os.getenv("LOCAL_RESUME_DIR")
 SKIP_IF_ALREADY_MAPPED = os.getenv("SKIP_IF_ALREADY_MAPPED", "true").lower() == "true"
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "100"))
+MAPPING_WORKERS = int(os.getenv("MAPPING_WORKERS", "8"))      # Threads resolving files / URLs
+MAPPING_CHUNK_SIZE = 20                                        # Candidates per worker task (one Graph $batch)
+
+CANDIDATE_COLUMNS = [
+    "candidate_id", "first_name", "last_name", "full_name", "email",
+    "phone_numbers", "addresses", "created_at", "updated_at",
+    "resume_links", "resume_filenames", "degrees", "employment_titles",
+    "employment_companies", "jobs_name", "raw"
+]
+ARRAY_COLUMNS = {"resume_links", "resume_filenames", "degrees", "employment_titles",
+                 "employment_companies", "jobs_name"}
 
 def log(message):
     """Simple logging with timestamp"""
@@ -45,163 +69,220 @@ def log(message):
     print(f"[{timestamp}] {message}")
 
 def find_local_resume_file(candidate_id):
-    """Find the local resume file for a candidate"""
-    if not os.path.exists(LOCAL_RESUME_DIR):
-        return None
-    
-    # Search through organized directory structure
-    for root, dirs, files in os.walk(LOCAL_RESUME_DIR):
-        for file in files:
-            # Check if filename starts with candidate_id
-            if file.startswith(f"{candidate_id}_") and not file.startswith("FAILED_"):
-                return os.path.join(root, file)
-    
-    return None
-
-def update_raw_json_attachments(raw_json, sharepoint_url, sharepoint_filename):
-    """Update the raw JSON with SharePoint attachment info"""
-    if not raw_json or not isinstance(raw_json, dict):
-        return raw_json
-    
-    updated_json = raw_json.copy()
-    
-    # Update attachments array if it exists
-    if "attachments" in updated_json and isinstance(updated_json["attachments"], list):
-        for attachment in updated_json["attachments"]:
-            if attachment.get("type") == "resume":
-                # Update with SharePoint info
-                attachment["url"] = sharepoint_url
-                attachment["filename"] = sharepoint_filename
-                attachment["source"] = "sharepoint"
-                attachment["mapped_at"] = datetime.now().isoformat()
-                break
-    
-    return updated_json
+    """Find the local resume file for a candidate (organized folders, via the resume index)"""
+    return get_resume_index().organized_path(candidate_id)
 
-def map_candidate_to_sharepoint(candidate_data, graph_client):
-    """Map a single candidate to SharePoint version"""
-    candidate_id = candidate_data["candidate_id"]
-    
-    # Find local resume file
-    local_file_path = find_local_resume_file(candidate_id)
+def build_mapped_candidate(candidate_data, local_file_path, sharepoint_url):
+    """Mapped candidate row plus (status, local_path, error) for the audit table"""
+    mapped_candidate = candidate_data.copy()
     
     if not local_file_path:
         # No local resume file found
-        mapped_candidate = candidate_data.copy()
         mapped_candidate["resume_links"] = []
         mapped_candidate["resume_filenames"] = []
-        mapped_candidate["raw"] = candidate_data.get("raw", {})
-        
         return mapped_candidate, "no_resume", None, None
     
-    # Get SharePoint URL for the file
-    sharepoint_url, sharepoint_filename = graph_client.get_sharepoint_url_for_local_file(local_file_path)
-    
     if not sharepoint_url:
         # Failed to get SharePoint URL
-        mapped_candidate = candidate_data.copy()
         mapped_candidate["resume_links"] = []
         mapped_candidate["resume_filenames"] = []
-        mapped_candidate["raw"] = candidate_data.get("raw", {})
-        
         return mapped_candidate, "failed", local_file_path, "Could not generate SharePoint URL"
     
     # Successfully mapped to SharePoint
-    mapped_candidate = candidate_data.copy()
+    sharepoint_filename = os.path.basename(local_file_path)
     mapped_candidate["resume_links"] = [sharepoint_url]
     mapped_candidate["resume_filenames"] = [sharepoint_filename]
     
-    # Update raw JSON
-    updated_raw = update_raw_json_attachments(
-        candidate_data.get("raw", {}),
-        sharepoint_url,
-        sharepoint_filename
-    )
-    mapped_candidate["raw"] = updated_raw
-    
     return mapped_candidate, "success", local_file_path, None
 
-def record_mapping_attempt(conn, candidate_id, original_url, sharepoint_url, sharepoint_filename, 
-                          local_path, status, error_msg=None):
-    """Record mapping attempt in audit table"""
-    with conn.cursor() as cur:
-        cur.execute("""
-            INSERT INTO gh.sharepoint_mapping_audit (
-                candidate_id, original_resume_url, sharepoint_url, 
-                sharepoint_filename, local_file_path, mapping_status, error_message
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (candidate_id) DO UPDATE SET
-                original_resume_url = EXCLUDED.original_resume_url,
-                sharepoint_url = EXCLUDED.sharepoint_url,
-                sharepoint_filename = EXCLUDED.sharepoint_filename,
-                local_file_path = EXCLUDED.local_file_path,
-                mapping_status = EXCLUDED.mapping_status,
-                error_message = EXCLUDED.error_message,
-                mapped_at = NOW()
-        """, (
-            candidate_id, original_url, sharepoint_url, 
-            sharepoint_filename, local_path, status, error_msg
-        ))
-    conn.commit()
+def map_candidate_to_sharepoint(candidate_data, graph_client):
+    """Map a single candidate to SharePoint version"""
+    local_file_path = find_local_resume_file(candidate_data["candidate_id"])
+    
+    sharepoint_url = None
+    if local_file_path:
+        sharepoint_url, _ = graph_client.get_sharepoint_url_for_local_file(local_file_path)
+    
+    return build_mapped_candidate(candidate_data, local_file_path, sharepoint_url)
+
+def map_candidates_to_sharepoint(candidates, graph_client):
+    """
+    Map a chunk of candidates (worker task)
+    
+    Local files come from the resume index; their URLs are resolved with one
+    batched Graph lookup for the whole chunk.
+    
+    Returns:
+        list: (mapped_candidate, status, local_path, error_msg) per candidate
+    """
+    local_paths = [find_local_resume_file(c["candidate_id"]) for c in candidates]
+    
+    try:
+        urls = graph_client.get_sharepoint_urls_for_local_files(local_paths)
+    except Exception as e:
+        log(f"  ⚠️  Batch lookup failed ({e}), retrying candidates one by one")
+        return [map_candidate_to_sharepoint(c, graph_client) for c in candidates]
+    
+    return [
+        build_mapped_candidate(candidate, local_path, url)
+        for candidate, local_path, url in zip(candidates, local_paths, urls)
+    ]
+
+def record_mapping_attempts(cur, attempts):
+    """Record a batch of mapping attempts in the audit table"""
+    execute_values(cur, """
+        INSERT INTO gh.sharepoint_mapping_audit (
+            candidate_id, original_resume_url, sharepoint_url, 
+            sharepoint_filename, local_file_path, mapping_status, error_message
+        )
+        VALUES %s
+        ON CONFLICT (candidate_id) DO UPDATE SET
+            original_resume_url = EXCLUDED.original_resume_url,
+            sharepoint_url = EXCLUDED.sharepoint_url,
+            sharepoint_filename = EXCLUDED.sharepoint_filename,
+            local_file_path = EXCLUDED.local_file_path,
+            mapping_status = EXCLUDED.mapping_status,
+            error_message = EXCLUDED.error_message,
+            mapped_at = NOW()
+    """, attempts, page_size=BATCH_SIZE)
 
-def already_mapped(conn, candidate_id):
-    """Check if candidate is already mapped"""
+def load_mapped_ids(conn):
+    """Candidate IDs already mapped (skipped when SKIP_IF_ALREADY_MAPPED)"""
     if not SKIP_IF_ALREADY_MAPPED:
-        return False
+        return set()
     
     with conn.cursor() as cur:
         cur.execute("""
-            SELECT mapping_status FROM gh.sharepoint_mapping_audit 
-            WHERE candidate_id = %s AND mapping_status IN ('success', 'no_resume')
-        """, (candidate_id,))
-        return cur.fetchone() is not None
+            SELECT candidate_id FROM gh.sharepoint_mapping_audit 
+            WHERE mapping_status IN ('success', 'no_resume')
+        """)
+        return {row[0] for row in cur.fetchall()}
 
-def insert_mapped_candidate(conn, candidate_data):
-    """Insert mapped candidate into SharePoint database"""
-    with conn.cursor() as cur:
-        cur.execute("""
-            INSERT INTO gh.candidates (
-                candidate_id, first_name, last_name, full_name, email,
-                phone_numbers, addresses, created_at, updated_at,
-                resume_links, resume_filenames, degrees, employment_titles,
-                employment_companies, jobs_name, raw
+def insert_mapped_candidates(cur, candidates):
+    """Upsert a batch of mapped candidates into the SharePoint database"""
+    rows = []
+    for candidate_data in candidates:
+        row = []
+        for column in CANDIDATE_COLUMNS:
+            if column == "raw":
+                # Source payload as text, or None to keep the row's current raw
+                row.append(candidate_data.get("raw"))
+            elif column in ARRAY_COLUMNS:
+                row.append(candidate_data.get(column, []))
+            else:
+                row.append(candidate_data.get(column))
+        rows.append(tuple(row))
+    
+    updates = ",\n            ".join(
+        f"{column} = EXCLUDED.{column}" for column in CANDIDATE_COLUMNS
+        if column not in ("candidate_id", "raw")
+    )
+    
+    execute_values(cur, f"""
+        INSERT INTO gh.candidates ({", ".join(CANDIDATE_COLUMNS)})
+        VALUES %s
+        ON CONFLICT (candidate_id) DO UPDATE SET
+            {updates},
+            raw = COALESCE(EXCLUDED.raw, gh.candidates.raw)
+    """, rows, page_size=BATCH_SIZE)
+
+def patch_raw_attachments(cur, links):
+    """
+    Point each candidate's first resume attachment in `raw` at SharePoint
+    
+    Runs entirely in SQL (jsonb_set on the stored row); only the new link
+    fields are sent.
+    
+    Args:
+        links: list of (candidate_id, sharepoint_url, sharepoint_filename)
+    """
+    execute_values(cur, """
+        WITH links (candidate_id, url, filename) AS (VALUES %s),
+        targets AS (
+            SELECT c.candidate_id, l.url, l.filename,
+                   (SELECT a.ord - 1
+                    FROM jsonb_array_elements(c.raw -> 'attachments') WITH ORDINALITY AS a(attachment, ord)
+                    WHERE a.attachment ->> 'type' = 'resume'
+                    ORDER BY a.ord
+                    LIMIT 1) AS idx
+            FROM gh.candidates c
+            JOIN links l ON l.candidate_id = c.candidate_id
+            WHERE jsonb_typeof(c.raw -> 'attachments') = 'array'
+        )
+        UPDATE gh.candidates AS c
+        SET raw = jsonb_set(
+            c.raw,
+            ARRAY['attachments', t.idx::text],
+            (c.raw -> 'attachments' -> t.idx::int) || jsonb_build_object(
+                'url', t.url,
+                'filename', t.filename,
+                'source', 'sharepoint',
+                'mapped_at', to_jsonb(LOCALTIMESTAMP)
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (candidate_id) DO UPDATE SET
-                first_name = EXCLUDED.first_name,
-                last_name = EXCLUDED.last_name,
-                full_name = EXCLUDED.full_name,
-                email = EXCLUDED.email,
-                phone_numbers = EXCLUDED.phone_numbers,
-                addresses = EXCLUDED.addresses,
-                created_at = EXCLUDED.created_at,
-                updated_at = EXCLUDED.updated_at,
-                resume_links = EXCLUDED.resume_links,
-                resume_filenames = EXCLUDED.resume_filenames,
-                degrees = EXCLUDED.degrees,
-                employment_titles = EXCLUDED.employment_titles,
-                employment_companies = EXCLUDED.employment_companies,
-                jobs_name = EXCLUDED.jobs_name,
-                raw = EXCLUDED.raw
-        """, (
-            candidate_data["candidate_id"],
-            candidate_data.get("first_name"),
-            candidate_data.get("last_name"),
-            candidate_data.get("full_name"),
-            candidate_data.get("email"),
-            candidate_data.get("phone_numbers"),
-            candidate_data.get("addresses"),
-            candidate_data.get("created_at"),
-            candidate_data.get("updated_at"),
-            candidate_data.get("resume_links", []),
-            candidate_data.get("resume_filenames", []),
-            candidate_data.get("degrees", []),
-            candidate_data.get("employment_titles", []),
-            candidate_data.get("employment_companies", []),
-            candidate_data.get("jobs_name", []),
-            json.dumps(candidate_data.get("raw", {}))
-        ))
+        )
+        FROM targets t
+        WHERE c.candidate_id = t.candidate_id
+        AND t.idx IS NOT NULL
+    """, links, page_size=BATCH_SIZE)
+
+def load_target_versions(conn):
+    """candidate_id -> updated_at for rows already in the SharePoint database"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT candidate_id, updated_at FROM gh.candidates")
+        return dict(cur.fetchall())
+
+def fetch_candidates(conn, candidate_ids, target_versions):
+    """
+    Load source rows for a list of candidate IDs (as dicts, in ID order)
+    
+    `raw` is fetched as text, and only for candidates that are missing from
+    the SharePoint database or changed since they were copied; for the rest
+    it is None and the stored payload is kept.
+    """
+    columns = [column for column in CANDIDATE_COLUMNS if column != "raw"]
+    
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT {", ".join(columns)}
+            FROM gh.candidates
+            WHERE candidate_id = ANY(%s)
+            ORDER BY candidate_id
+        """, (list(candidate_ids),))
+        
+        candidates = []
+        for candidate_row in cur.fetchall():
+            candidate_data = dict(zip(columns, candidate_row))
+            for column in ARRAY_COLUMNS:
+                candidate_data[column] = candidate_data[column] or []
+            candidate_data["raw"] = None
+            candidates.append(candidate_data)
+        
+        stale_ids = [
+            c["candidate_id"] for c in candidates
+            if c["candidate_id"] not in target_versions
+            or target_versions[c["candidate_id"]] != c["updated_at"]
+        ]
+        
+        if stale_ids:
+            cur.execute("""
+                SELECT candidate_id, COALESCE(raw, '{}'::jsonb)::text
+                FROM gh.candidates
+                WHERE candidate_id = ANY(%s)
+            """, (stale_ids,))
+            raw_by_id = dict(cur.fetchall())
+            for candidate_data in candidates:
+                candidate_data["raw"] = raw_by_id.get(candidate_data["candidate_id"])
+        
+        return candidates
+
+def format_eta(seconds):
+    """Render seconds as 1h02m / 3m05s / 12s"""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
 
 def main():
     """Main mapping process"""
@@ -223,6 +304,9 @@ def main():
         log("Make sure Azure credentials are configured in .env file")
         sys.exit(1)
     
+    # Load the index before workers start so they share one instance
+    get_resume_index()
+    
     # Counters
     total_candidates = 0
     successful_mappings = 0
@@ -235,107 +319,108 @@ def main():
             with psycopg2.connect(**TARGET_PG) as target_conn:
                 log("Connected to databases")
                 
-                # Get total count
+                # Work list: computed once instead of checking the audit table per candidate
                 with source_conn.cursor() as cur:
-                    cur.execute("SELECT COUNT(*) FROM gh.candidates")
-                    total_count = cur.fetchone()[0]
-                    log(f"Total candidates to process: {total_count:,}")
+                    cur.execute("SELECT candidate_id FROM gh.candidates ORDER BY candidate_id")
+                    all_ids = [row[0] for row in cur.fetchall()]
                 
-                # Process candidates in batches
-                offset = 0
+                mapped_ids = load_mapped_ids(target_conn)
+                target_versions = load_target_versions(target_conn)
+                work_ids = [cid for cid in all_ids if cid not in mapped_ids]
+                skipped_count = len(all_ids) - len(work_ids)
                 
-                while True:
-                    with source_conn.cursor() as cur:
-                        cur.execute("""
-                            SELECT 
-                                candidate_id, first_name, last_name, full_name, email,
-                                phone_numbers, addresses, created_at, updated_at,
-                                resume_links, resume_filenames, degrees, employment_titles,
-                                employment_companies, jobs_name, raw
-                            FROM gh.candidates
-                            ORDER BY candidate_id
-                            LIMIT %s OFFSET %s
-                        """, (BATCH_SIZE, offset))
-                        
-                        candidates = cur.fetchall()
-                        
-                        if not candidates:
-                            break  # No more candidates
-                        
-                        log(f"Processing batch {offset//BATCH_SIZE + 1}: candidates {offset + 1} to {offset + len(candidates)}")
+                log(f"Total candidates: {len(all_ids):,}")
+                log(f"Skipped (already mapped): {skipped_count:,}")
+                log(f"Candidates to map: {len(work_ids):,} ({MAPPING_WORKERS} workers)")
+                
+                started = time.time()
+                last_progress = started
+                pending_candidates = []
+                pending_audit = []
+                pending_links = []
+                
+                def write_pending():
+                    """Single writer: flush mapped rows and audit rows in one transaction"""
+                    if not pending_candidates:
+                        return
+                    with target_conn.cursor() as cur:
+                        insert_mapped_candidates(cur, pending_candidates)
+                        if pending_links:
+                            patch_raw_attachments(cur, pending_links)
+                        record_mapping_attempts(cur, pending_audit)
+                    target_conn.commit()
+                    pending_candidates.clear()
+                    pending_audit.clear()
+                    pending_links.clear()
+                
+                with ThreadPoolExecutor(max_workers=MAPPING_WORKERS) as executor:
+                    in_flight = deque()
+                    max_in_flight = MAPPING_WORKERS * 2
+                    
+                    def collect(chunk, future):
+                        nonlocal total_candidates, successful_mappings, failed_mappings, no_resume_count
                         
-                        for candidate_row in candidates:
+                        for candidate_data, result in zip(chunk, future.result()):
+                            mapped_candidate, status, local_path, error_msg = result
                             total_candidates += 1
-                            
-                            # Convert row to dict
-                            candidate_data = {
-                                "candidate_id": candidate_row[0],
-                                "first_name": candidate_row[1],
-                                "last_name": candidate_row[2],
-                                "full_name": candidate_row[3],
-                                "email": candidate_row[4],
-                                "phone_numbers": candidate_row[5],
-                                "addresses": candidate_row[6],
-                                "created_at": candidate_row[7],
-                                "updated_at": candidate_row[8],
-                                "resume_links": candidate_row[9] or [],
-                                "resume_filenames": candidate_row[10] or [],
-                                "degrees": candidate_row[11] or [],
-                                "employment_titles": candidate_row[12] or [],
-                                "employment_companies": candidate_row[13] or [],
-                                "jobs_name": candidate_row[14] or [],
-                                "raw": candidate_row[15] or {}
-                            }
-                            
                             candidate_id = candidate_data["candidate_id"]
                             
-                            # Skip if already mapped
-                            if already_mapped(target_conn, candidate_id):
-                                skipped_count += 1
-                                continue
-                            
-                            # Get original resume URL for audit
-                            original_url = None
-                            if candidate_data["resume_links"]:
-                                original_url = candidate_data["resume_links"][0]
+                            # Original resume URL for audit
+                            original_url = candidate_data["resume_links"][0] if candidate_data["resume_links"] else None
                             
-                            # Map to SharePoint
-                            mapped_candidate, status, local_path, error_msg = map_candidate_to_sharepoint(
-                                candidate_data, graph_client
-                            )
-                            
-                            # Insert mapped candidate
-                            insert_mapped_candidate(target_conn, mapped_candidate)
-                            
-                            # Record mapping attempt
                             sharepoint_url = mapped_candidate["resume_links"][0] if mapped_candidate["resume_links"] else None
                             sharepoint_filename = mapped_candidate["resume_filenames"][0] if mapped_candidate["resume_filenames"] else None
                             
-                            record_mapping_attempt(
-                                target_conn, candidate_id, original_url, sharepoint_url,
+                            pending_candidates.append(mapped_candidate)
+                            pending_audit.append((
+                                candidate_id, original_url, sharepoint_url,
                                 sharepoint_filename, local_path, status, error_msg
-                            )
+                            ))
                             
                             # Update counters
                             if status == "success":
                                 successful_mappings += 1
-                                if total_candidates % 50 == 0:  # Log every 50 successful mappings
-                                    log(f"  ✅ Mapped candidate {candidate_id}: {mapped_candidate.get('full_name', 'Unknown')}")
+                                pending_links.append((candidate_id, sharepoint_url, sharepoint_filename))
                             elif status == "failed":
                                 failed_mappings += 1
                                 log(f"  ❌ Failed to map candidate {candidate_id}: {error_msg}")
                             elif status == "no_resume":
                                 no_resume_count += 1
-                            
-                            # Be gentle on the API
-                            time.sleep(0.1)
                         
-                        target_conn.commit()
-                        offset += BATCH_SIZE
+                        if len(pending_candidates) >= BATCH_SIZE:
+                            write_pending()
+                    
+                    for batch_start in range(0, len(work_ids), BATCH_SIZE):
+                        candidates = fetch_candidates(
+                            source_conn, work_ids[batch_start:batch_start + BATCH_SIZE], target_versions
+                        )
+                        
+                        for chunk_start in range(0, len(candidates), MAPPING_CHUNK_SIZE):
+                            chunk = candidates[chunk_start:chunk_start + MAPPING_CHUNK_SIZE]
+                            in_flight.append((chunk, executor.submit(map_candidates_to_sharepoint, chunk, graph_client)))
+                            
+                            # Bounded queue: results are written in submission order
+                            while len(in_flight) >= max_in_flight:
+                                collect(*in_flight.popleft())
                         
-                        # Progress update
-                        progress = (offset / total_count) * 100
-                        log(f"Progress: {progress:.1f}% ({offset:,}/{total_count:,})")
+                        now = time.time()
+                        if now - last_progress >= 10 and total_candidates:
+                            last_progress = now
+                            rate = total_candidates / (now - started)
+                            remaining = len(work_ids) - total_candidates
+                            log(f"Progress: {total_candidates:,}/{len(work_ids):,} "
+                                f"({total_candidates / len(work_ids) * 100:.1f}%) - "
+                                f"{rate:.1f} candidates/s, ETA {format_eta(remaining / rate)}")
+                    
+                    while in_flight:
+                        collect(*in_flight.popleft())
+                
+                write_pending()
+                
+                elapsed = time.time() - started
+                if total_candidates:
+                    log(f"Mapped {total_candidates:,} candidates in {format_eta(elapsed)} "
+                        f"({total_candidates / max(elapsed, 0.001):.1f} candidates/s)")
     
     except Exception as e:
         log(f"❌ Error during mapping process: {e}")
@@ -354,6 +439,9 @@ def main():
     success_rate = (successful_mappings / total_candidates * 100) if total_candidates > 0 else 0
     log(f"Success rate: {success_rate:.1f}%")
     
+    for line in graph_client.metrics_summary():
+        log(f"  {line}")
+    
     log(f"\nSharePoint database ready: {TARGET_PG['dbname']}")
     log("Next step: Run 'python export_sharepoint_csv.py' to generate CSV with SharePoint links")
 
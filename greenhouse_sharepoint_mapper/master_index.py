@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+AI_Access Master Index
+
+The master index lists every resume in AI_Access (candidate, filename,
+metadata file, whether text was extracted, logical and storage paths). It
+used to be one indented _master_index.json rewritten in full on every run,
+which OneDrive then re-uploaded in full and readers had to load in full.
+
+It is now a folder of line-delimited JSON shards plus a small manifest:
+
+    AI_Access/_master_index/manifest.json        counts, layout, sha256 per shard
+    AI_Access/_master_index/shard_00.ndjson      one entry per line
+    ...
+    AI_Access/_master_index/shard_63.ndjson
+
+A candidate's shard is candidate_id % MASTER_INDEX_SHARDS. A full rebuild
+(MasterIndexWriter) spools the shards to a temp folder and only replaces the
+shards whose SHA-256 changed, so a run that touches a handful of candidates
+rewrites (and OneDrive re-uploads) a handful of shards and the manifest.
+
+Readers never need the whole index in memory:
+
+    for entry in iter_entries():            # Streams shard by shard
+        ...
+    entry = lookup(candidate_id)            # Reads one shard
+
+Usage:
+    python master_index.py --status         # Manifest summary
+    python master_index.py --lookup 12345   # One candidate's entry
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import tempfile
+from datetime import datetime
+from dotenv import load_dotenv
+import ai_access_layout
+
+load_dotenv()
+
+MASTER_INDEX_DIR = os.path.join(ai_access_layout.LOCAL_AI_ACCESS_DIR, "_master_index")
+MANIFEST_FILE = "manifest.json"
+LEGACY_INDEX_FILE = "_master_index.json"       # Single-file index, replaced by the shards
+MASTER_INDEX_SHARDS = int(os.getenv("MASTER_INDEX_SHARDS", "64"))
+FORMAT_VERSION = 1
+
+def log(message):
+    """Simple logging with timestamp"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+def shard_file(shard):
+    return f"shard_{shard}.ndjson"
+
+def shard_for(candidate_id, fanout):
+    return ai_access_layout.shard_name(candidate_id, fanout)
+
+def encode_entry(entry):
+    """One NDJSON line"""
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+def load_manifest():
+    """The manifest, or None if the sharded index hasn't been written yet"""
+    manifest_path = os.path.join(MASTER_INDEX_DIR, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(manifest):
+    """Write the manifest atomically (readers never see half a file)"""
+    manifest_path = os.path.join(MASTER_INDEX_DIR, MANIFEST_FILE)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+def _iter_shard(shard):
+    path = os.path.join(MASTER_INDEX_DIR, shard_file(shard))
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def iter_entries():
+    """
+    Stream every entry, shard by shard
+
+    Falls back to the legacy _master_index.json (loaded whole) until the first
+    sharded index has been written.
+    """
+    manifest = load_manifest()
+    if manifest is None:
+        legacy_path = os.path.join(ai_access_layout.LOCAL_AI_ACCESS_DIR, LEGACY_INDEX_FILE)
+        if os.path.exists(legacy_path):
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                yield from json.load(f).get("resumes", [])
+        return
+
+    for shard in sorted(manifest["shards"]):
+        yield from _iter_shard(shard)
+
+def lookup(candidate_id):
+    """One candidate's entry (reads a single shard), or None"""
+    manifest = load_manifest()
+    if manifest is None:
+        return next((e for e in iter_entries() if e["candidate_id"] == int(candidate_id)), None)
+
+    for entry in _iter_shard(shard_for(candidate_id, manifest["fanout"])):
+        if entry["candidate_id"] == int(candidate_id):
+            return entry
+    return None
+
+def _remove_legacy_index():
+    legacy_path = os.path.join(ai_access_layout.LOCAL_AI_ACCESS_DIR, LEGACY_INDEX_FILE)
+    if os.path.exists(legacy_path):
+        os.unlink(legacy_path)
+        log(f"🗑️  Removed {LEGACY_INDEX_FILE} (replaced by {os.path.basename(MASTER_INDEX_DIR)}/)")
+
+def _totals(manifest):
+    shards = manifest["shards"].values()
+    manifest["total_resumes"] = sum(s["count"] for s in shards)
+    manifest["text_extracted_count"] = sum(s["text_extracted"] for s in shards)
+
+class MasterIndexWriter:
+    """
+    Full rebuild of the master index that only replaces shards whose content changed
+
+    Entries are spooled to one temp file per shard as they arrive (in the
+    caller's order, normally candidate_id), so memory stays flat however many
+    candidates there are.
+
+        writer = MasterIndexWriter()
+        for ...:
+            writer.add(entry)
+        changed = writer.commit()       # or writer.abort() to keep the index on disk as it is
+    """
+
+    def __init__(self, fanout=None):
+        self.fanout = fanout or MASTER_INDEX_SHARDS
+        self.spool_dir = tempfile.mkdtemp(prefix="master_index_")
+        self.files = {}
+        self.stats = {}         # shard -> {count, text_extracted, digest}
+
+    def add(self, entry):
+        shard = shard_for(entry["candidate_id"], self.fanout)
+        if shard not in self.files:
+            self.files[shard] = open(os.path.join(self.spool_dir, shard_file(shard)), 'w', encoding='utf-8')
+            self.stats[shard] = {"count": 0, "text_extracted": 0, "digest": hashlib.sha256()}
+
+        line = encode_entry(entry)
+        self.files[shard].write(line)
+        stats = self.stats[shard]
+        stats["count"] += 1
+        stats["text_extracted"] += 1 if entry.get("text_extracted") else 0
+        stats["digest"].update(line.encode("utf-8"))
+
+    def abort(self):
+        """Discard the spooled shards; the index on disk is left untouched"""
+        for f in self.files.values():
+            f.close()
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+    def commit(self):
+        """
+        Move changed shards into place, drop shards that are now empty, update the manifest
+
+        Returns:
+            int: Shards written
+        """
+        for f in self.files.values():
+            f.close()
+
+        os.makedirs(MASTER_INDEX_DIR, exist_ok=True)
+        old = load_manifest()
+        old_shards = old["shards"] if old and old.get("fanout") == self.fanout else {}
+        now = datetime.now().isoformat()
+
+        shards = {}
+        written = 0
+        for shard, stats in sorted(self.stats.items()):
+            digest = stats["digest"].hexdigest()
+            target = os.path.join(MASTER_INDEX_DIR, shard_file(shard))
+            previous = old_shards.get(shard)
+
+            if previous and previous["sha256"] == digest and os.path.exists(target):
+                shards[shard] = previous
+                continue
+
+            # Copy next to the target first so the final rename is atomic
+            shutil.move(os.path.join(self.spool_dir, shard_file(shard)), target + ".tmp")
+            os.replace(target + ".tmp", target)
+            shards[shard] = {"file": shard_file(shard), "count": stats["count"],
+                             "text_extracted": stats["text_extracted"], "sha256": digest, "updated_at": now}
+            written += 1
+
+        # Shards with no entries left (or from a different fanout)
+        removed = 0
+        for name in os.listdir(MASTER_INDEX_DIR):
+            if name.startswith("shard_") and name.endswith(".ndjson") and name[6:-7] not in shards:
+                os.unlink(os.path.join(MASTER_INDEX_DIR, name))
+                removed += 1
+
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+        if old is None or written or removed or old.get("fanout") != self.fanout:
+            manifest = {
+                "format": "ndjson-shards",
+                "version": FORMAT_VERSION,
+                "updated_at": now,
+                "layout": ai_access_layout.load_layout(),
+                "fanout": self.fanout,
+                "shards": shards
+            }
+            _totals(manifest)
+            save_manifest(manifest)
+
+        _remove_legacy_index()
+        return written + removed
+
+def main():
+    parser = argparse.ArgumentParser(description='AI_Access master index status and lookups')
+    parser.add_argument('--status', action='store_true', help='Show the manifest summary (default)')
+    parser.add_argument('--lookup', type=int, metavar='CANDIDATE_ID', help="Print one candidate's entry")
+    args = parser.parse_args()
+
+    if args.lookup:
+        entry = lookup(args.lookup)
+        if entry is None:
+            log(f"❌ Candidate {args.lookup} is not in the master index")
+            sys.exit(1)
+        print(json.dumps(entry, indent=2, ensure_ascii=False))
+        return
+
+    manifest = load_manifest()
+    if manifest is None:
+        log(f"❌ No sharded master index in {MASTER_INDEX_DIR} - run create_ai_access_folder.py")
+        sys.exit(1)
+
+    counts = [s["count"] for s in manifest["shards"].values()]
+    latest = max((s["updated_at"] for s in manifest["shards"].values()), default="-")
+    log("="*60)
+    log("AI_ACCESS MASTER INDEX")
+    log("="*60)
+    log(f"Resumes:          {manifest['total_resumes']:,} ({manifest['text_extracted_count']:,} with text)")
+    log(f"Shards:           {len(counts)} of {manifest['fanout']} "
+        f"({min(counts, default=0):,}-{max(counts, default=0):,} entries each)")
+    log(f"Last change:      {manifest['updated_at']} (newest shard {latest})")
+    log(f"AI_Access layout: {manifest['layout'].get('layout')}")
+    log("="*60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Migrate the AI_Access folder between flat and sharded layouts
+
+Sharded layout: AI_Access/<candidate_id % fanout>/<file>, recorded in
+AI_Access/_layout.json. The marker is written first so scripts that run during
+the move already write to the new location; lookups go through the resume
+index, which sees files in either place.
+
+Metadata files keep `ai_access_path` as the logical "AI_Access/<filename>";
+only `storage_path` is rewritten. SharePoint webUrls are path based, so once
+OneDrive has synced the moves run again with --remap-urls to refresh
+resume_links / metadata_url in the AI database (same URL format, new path).
+
+Usage:
+    python migrate_ai_access_layout.py                          # Dry run to sharded (fanout 256)
+    python migrate_ai_access_layout.py --execute                # Move files
+    python migrate_ai_access_layout.py --to flat --execute      # Move back to flat
+    python migrate_ai_access_layout.py --remap-urls             # Refresh DB URLs after sync
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import psycopg2
+from datetime import datetime
+from dotenv import load_dotenv
+from resume_index import get_resume_index
+import ai_access_layout
+
+load_dotenv()
+
+PG = {
+    "host": os.getenv("PGHOST", "localhost"),
+    "port": int(os.getenv("PGPORT", "5432")),
+    "dbname": os.getenv("PGDATABASE_AI", "greenhouse_candidates_ai"),
+    "user": os.getenv("PGUSER"),
+    "password": os.getenv("PGPASSWORD", "")
+}
+
+CANDIDATE_FILE_PATTERN = re.compile(r"^(\d+)_")
+BATCH_SIZE = 500
+
+def log(message):
+    """Simple logging with timestamp"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+def iter_ai_access_files():
+    """Yield (candidate_id, current_path) for every candidate file in AI_Access"""
+    for directory in ai_access_layout.all_ai_access_dirs():
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                match = CANDIDATE_FILE_PATTERN.match(entry.name)
+                if match:
+                    yield int(match.group(1)), entry.path
+
+def rewrite_storage_path(metadata_path, candidate_id):
+    """Point a moved metadata file's storage_path at its new location"""
+    try:
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return
+
+    resume_filename = metadata.get("original_filename")
+    if not resume_filename:
+        return
+
+    metadata["storage_path"] = ai_access_layout.storage_path(candidate_id, resume_filename)
+
+    with open(metadata_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+def migrate_files(target_layout, execute):
+    """Move every AI_Access file to its location under target_layout"""
+    current = ai_access_layout.load_layout()
+    log(f"Current layout: {current}")
+    log(f"Target layout:  {target_layout}")
+
+    if execute:
+        # Marker first: new writes land in the target location straight away
+        ai_access_layout.save_layout(target_layout)
+
+    moved = 0
+    already_in_place = 0
+    conflicts = 0
+
+    for candidate_id, path in iter_ai_access_files():
+        shard = ai_access_layout.shard_for(candidate_id, target_layout)
+        target_dir = os.path.join(ai_access_layout.LOCAL_AI_ACCESS_DIR, shard) if shard else ai_access_layout.LOCAL_AI_ACCESS_DIR
+        target_path = os.path.join(target_dir, os.path.basename(path))
+
+        if os.path.abspath(path) == os.path.abspath(target_path):
+            already_in_place += 1
+            continue
+
+        if os.path.exists(target_path):
+            conflicts += 1
+            if conflicts <= 10:
+                log(f"  ⚠️  Already exists at target, leaving in place: {path}")
+            continue
+
+        moved += 1
+        if not execute:
+            continue
+
+        os.makedirs(target_dir, exist_ok=True)
+        os.rename(path, target_path)
+
+        if target_path.endswith("_metadata.json"):
+            rewrite_storage_path(target_path, candidate_id)
+
+        if moved % 5000 == 0:
+            log(f"  Progress: {moved:,} files moved...")
+
+    if execute and target_layout.get("layout") == ai_access_layout.FLAT:
+        # Remove shard folders that are now empty
+        for directory in ai_access_layout.all_ai_access_dirs()[1:]:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
+
+    if execute:
+        resume_index = get_resume_index()
+        resume_index.rescan_tree(ai_access_layout.LOCAL_AI_ACCESS_DIR)
+        resume_index.save()
+
+    log("="*60)
+    log("AI_ACCESS LAYOUT MIGRATION SUMMARY" + ("" if execute else " (DRY RUN)"))
+    log("="*60)
+    log(f"Files {'moved' if execute else 'to move'}: {moved:,}")
+    log(f"Already in place: {already_in_place:,}")
+    log(f"Conflicts (left in place): {conflicts:,}")
+    log("="*60)
+
+    if execute:
+        log("📤 Next steps:")
+        log("1. Wait for OneDrive to sync the moves")
+        log("2. Run 'python migrate_ai_access_layout.py --remap-urls' to refresh database URLs")
+    else:
+        log("Run with --execute to move the files")
+
+def remap_urls():
+    """Re-resolve resume_links and metadata_url for the current layout"""
+    from graph_client import GraphClient
+
+    graph_client = GraphClient()
+    log(f"Remapping URLs for layout: {ai_access_layout.load_layout()}")
+
+    updated = 0
+    not_found = 0
+
+    with psycopg2.connect(**PG) as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT candidate_id, resume_filenames[1]
+                FROM gh.candidates
+                WHERE resume_filenames IS NOT NULL
+                AND array_length(resume_filenames, 1) > 0
+                ORDER BY candidate_id
+            """)
+            candidates = cur.fetchall()
+
+        log(f"Found {len(candidates):,} candidates with AI_Access files")
+
+        with conn.cursor() as cur:
+            for candidate_id, filename in candidates:
+                if not filename:
+                    continue
+
+                file_info = graph_client.find_file_by_path(
+                    ai_access_layout.storage_path(candidate_id, filename)
+                )
+                if not file_info or not file_info.get("webUrl"):
+                    not_found += 1
+                    continue
+
+                metadata_filename = f"{filename.rsplit('.', 1)[0]}_metadata.json"
+                metadata_info = graph_client.find_file_by_path(
+                    ai_access_layout.storage_path(candidate_id, metadata_filename)
+                )
+
+                cur.execute("""
+                    UPDATE gh.candidates
+                    SET resume_links = ARRAY[%s],
+                        metadata_url = COALESCE(%s, metadata_url)
+                    WHERE candidate_id = %s
+                """, (file_info["webUrl"], metadata_info.get("webUrl") if metadata_info else None, candidate_id))
+                updated += 1
+
+                if updated % BATCH_SIZE == 0:
+                    conn.commit()
+                    log(f"  Progress: {updated:,} candidates remapped...")
+
+        conn.commit()
+
+    log("="*60)
+    log(f"URLs remapped: {updated:,}")
+    log(f"Not found in SharePoint (not synced yet?): {not_found:,}")
+    log("="*60)
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate AI_Access between flat and sharded layouts')
+    parser.add_argument('--to', choices=[ai_access_layout.SHARDED, ai_access_layout.FLAT],
+                        default=ai_access_layout.SHARDED, help='Target layout (default: sharded)')
+    parser.add_argument('--fanout', type=int, default=ai_access_layout.DEFAULT_FANOUT,
+                        help=f'Number of shard folders (default: {ai_access_layout.DEFAULT_FANOUT})')
+    parser.add_argument('--execute', action='store_true', help='Actually move files (default: dry run)')
+    parser.add_argument('--remap-urls', action='store_true',
+                        help='Refresh database URLs for the current layout (after OneDrive sync)')
+    args = parser.parse_args()
+
+    if not os.path.isdir(ai_access_layout.LOCAL_AI_ACCESS_DIR):
+        log(f"❌ AI_Access folder not found: {ai_access_layout.LOCAL_AI_ACCESS_DIR}")
+        sys.exit(1)
+
+    if args.remap_urls:
+        remap_urls()
+        return
+
+    if args.to == ai_access_layout.SHARDED:
+        if args.fanout < 2:
+            log("❌ --fanout must be at least 2")
+            sys.exit(1)
+        target_layout = {"layout": ai_access_layout.SHARDED, "fanout": args.fanout}
+    else:
+        target_layout = {"layout": ai_access_layout.FLAT}
+
+    migrate_files(target_layout, args.execute)
+
+if __name__ == "__main__":
+    main()
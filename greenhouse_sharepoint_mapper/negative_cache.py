@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Negative Lookup Cache
+
+Mappers and backfills retry every miss from scratch on each run: candidates
+Greenhouse has no resume for, files Graph answers 404 for, metadata files with
+no extractable text. gh.negative_lookups (source database, next to the drive
+item cache) remembers those misses per (candidate_id, lookup kind) together
+with a fingerprint of the inputs the lookup depended on (filename, file
+size/mtime, candidate updated_at, ...).
+
+A known miss is skipped until NEGATIVE_CACHE_TTL_HOURS pass or the
+fingerprint changes, whichever comes first. A later hit clears the entry.
+SharePoint path lookups pass NEGATIVE_CACHE_SHAREPOINT_TTL_HOURS instead:
+a file copied moments ago is missing only until OneDrive uploads it.
+
+    cache = NegativeCache("ai_access_url")
+    key = file_fingerprint(local_file)
+    if cache.is_known_miss(candidate_id, key):
+        continue
+    ...
+    cache.record_miss(candidate_id, key, "not in SharePoint")   # or record_hit(candidate_id)
+    ...
+    cache.flush()
+    log(cache.summary())
+
+Usage:
+    python negative_cache.py --status          # Entries per lookup kind
+    python negative_cache.py --clear           # Forget every miss
+    python negative_cache.py --clear KIND      # Forget misses of one kind
+"""
+
+import os
+import sys
+import hashlib
+import psycopg2
+from psycopg2.extras import execute_values
+from datetime import datetime
+from dotenv import load_dotenv
+from db_batches import stream_rows
+
+load_dotenv()
+
+NEGATIVE_CACHE_PG = {
+    "host": os.getenv("PGHOST", "localhost"),
+    "port": int(os.getenv("PGPORT", "5432")),
+    "dbname": os.getenv("SOURCE_PGDATABASE", "greenhouse_candidates"),
+    "user": os.getenv("PGUSER"),
+    "password": os.getenv("PGPASSWORD", "")
+}
+
+NEGATIVE_CACHE_ENABLED = os.getenv("NEGATIVE_CACHE_ENABLED", "true").lower() == "true"
+NEGATIVE_CACHE_TTL_HOURS = float(os.getenv("NEGATIVE_CACHE_TTL_HOURS", "72"))
+# "Not in SharePoint" usually means OneDrive hasn't uploaded a fresh copy yet,
+# so those kinds expire much sooner than Greenhouse or metadata-content misses
+NEGATIVE_CACHE_SHAREPOINT_TTL_HOURS = float(os.getenv("NEGATIVE_CACHE_SHAREPOINT_TTL_HOURS", "2"))
+FLUSH_SIZE = 500
+
+def log(message):
+    """Simple logging with timestamp"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+def ensure_table(conn):
+    """Create the negative lookup table if needed"""
+    with conn.cursor() as cur:
+        cur.execute("CREATE SCHEMA IF NOT EXISTS gh")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS gh.negative_lookups (
+                candidate_id    BIGINT NOT NULL,
+                lookup_kind     TEXT NOT NULL,      -- e.g. 'greenhouse_resume', 'ai_access_url'
+                fingerprint     TEXT NOT NULL,      -- Hash of the inputs the lookup used
+                reason          TEXT,
+                attempts        INTEGER DEFAULT 1,
+                first_missed_at TIMESTAMPTZ DEFAULT NOW(),
+                last_missed_at  TIMESTAMPTZ DEFAULT NOW(),
+                expires_at      TIMESTAMPTZ NOT NULL,
+                PRIMARY KEY (candidate_id, lookup_kind)
+            )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_negative_lookups_kind_expiry ON gh.negative_lookups (lookup_kind, expires_at)")
+    conn.commit()
+
+def fingerprint(*parts):
+    """Short stable hash of the inputs a lookup depended on"""
+    return hashlib.sha1("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:16]
+
+def file_fingerprint(path):
+    """Fingerprint of a local file's name, size and mtime (changes when the file is replaced)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return fingerprint(os.path.basename(path), None)
+    return fingerprint(os.path.basename(path), stat.st_size, int(stat.st_mtime))
+
+class NegativeCache:
+    """Known misses for one lookup kind, loaded once and written back in batches"""
+
+    def __init__(self, kind, ttl_hours=None):
+        self.kind = kind
+        self.ttl_hours = NEGATIVE_CACHE_TTL_HOURS if ttl_hours is None else ttl_hours
+        self.enabled = NEGATIVE_CACHE_ENABLED and self.ttl_hours > 0
+        self.conn = None
+        self.misses = {}            # candidate_id -> fingerprint (unexpired entries)
+        self.skipped = 0
+        self.recorded = 0
+        self.cleared = 0
+        self._pending_misses = {}   # candidate_id -> (fingerprint, reason)
+        self._pending_hits = set()
+
+        if not self.enabled:
+            return
+
+        try:
+            self.conn = psycopg2.connect(**NEGATIVE_CACHE_PG)
+            ensure_table(self.conn)
+            self.misses = dict(stream_rows(self.conn, """
+                SELECT candidate_id, fingerprint
+                FROM gh.negative_lookups
+                WHERE lookup_kind = %s
+                AND expires_at > NOW()
+            """, (kind,)))
+            self.conn.commit()
+        except Exception as e:
+            print(f"Negative lookup cache unavailable ({e}) - every lookup will run")
+            self.enabled = False
+            self.misses = {}
+
+    def is_known_miss(self, candidate_id, key):
+        """True (and counted as skipped) if this exact lookup missed within the TTL"""
+        if self.enabled and self.misses.get(candidate_id) == key:
+            self.skipped += 1
+            return True
+        return False
+
+    def record_miss(self, candidate_id, key, reason=None):
+        if not self.enabled:
+            return
+        self.misses[candidate_id] = key
+        self._pending_hits.discard(candidate_id)
+        self._pending_misses[candidate_id] = (key, reason)
+        self.recorded += 1
+        if len(self._pending_misses) >= FLUSH_SIZE:
+            self.flush()
+
+    def record_hit(self, candidate_id):
+        """A lookup succeeded; drop any stored miss for the candidate"""
+        if not self.enabled:
+            return
+        if self.misses.pop(candidate_id, None) is not None:
+            self._pending_hits.add(candidate_id)
+            self.cleared += 1
+        self._pending_misses.pop(candidate_id, None)
+        if len(self._pending_hits) >= FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Write pending misses and hits"""
+        if not self.enabled or not (self._pending_misses or self._pending_hits):
+            return
+
+        with self.conn.cursor() as cur:
+            if self._pending_misses:
+                execute_values(cur, """
+                    INSERT INTO gh.negative_lookups
+                        (candidate_id, lookup_kind, fingerprint, reason, expires_at)
+                    VALUES %s
+                    ON CONFLICT (candidate_id, lookup_kind) DO UPDATE SET
+                        fingerprint = EXCLUDED.fingerprint,
+                        reason = EXCLUDED.reason,
+                        attempts = gh.negative_lookups.attempts + 1,
+                        last_missed_at = NOW(),
+                        expires_at = EXCLUDED.expires_at
+                """, [
+                    (candidate_id, self.kind, key, reason, self.ttl_hours)
+                    for candidate_id, (key, reason) in self._pending_misses.items()
+                ], template="(%s, %s, %s, %s, NOW() + %s * INTERVAL '1 hour')", page_size=FLUSH_SIZE)
+
+            if self._pending_hits:
+                cur.execute("""
+                    DELETE FROM gh.negative_lookups
+                    WHERE lookup_kind = %s
+                    AND candidate_id = ANY(%s)
+                """, (self.kind, list(self._pending_hits)))
+
+        self.conn.commit()
+        self._pending_misses.clear()
+        self._pending_hits.clear()
+
+    def summary(self):
+        """One-line report for script summaries"""
+        if not self.enabled:
+            return f"Negative cache ({self.kind}): disabled"
+        return (f"Negative cache ({self.kind}): {self.skipped:,} lookups avoided, "
+                f"{self.recorded:,} misses recorded, {self.cleared:,} cleared (TTL {self.ttl_hours:g}h)")
+
+    def close(self):
+        self.flush()
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+def get_cache_status():
+    """(lookup_kind, active, expired, oldest miss) per kind"""
+    with psycopg2.connect(**NEGATIVE_CACHE_PG) as conn:
+        ensure_table(conn)
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT lookup_kind,
+                       COUNT(*) FILTER (WHERE expires_at > NOW()),
+                       COUNT(*) FILTER (WHERE expires_at <= NOW()),
+                       MIN(first_missed_at)
+                FROM gh.negative_lookups
+                GROUP BY lookup_kind
+                ORDER BY lookup_kind
+            """)
+            return cur.fetchall()
+
+def clear_cache(kind=None):
+    """Forget stored misses (all kinds, or one)"""
+    with psycopg2.connect(**NEGATIVE_CACHE_PG) as conn:
+        ensure_table(conn)
+        with conn.cursor() as cur:
+            if kind:
+                cur.execute("DELETE FROM gh.negative_lookups WHERE lookup_kind = %s", (kind,))
+            else:
+                cur.execute("DELETE FROM gh.negative_lookups")
+            deleted = cur.rowcount
+        conn.commit()
+    return deleted
+
+def main():
+    if "--clear" in sys.argv:
+        args = sys.argv[sys.argv.index("--clear") + 1:]
+        kind = args[0] if args else None
+        deleted = clear_cache(kind)
+        log(f"🗑️  Cleared {deleted:,} negative lookups" + (f" ({kind})" if kind else ""))
+        return
+
+    rows = get_cache_status()
+    log("="*60)
+    log(f"NEGATIVE LOOKUP CACHE (TTL {NEGATIVE_CACHE_TTL_HOURS:g}h"
+        + ("" if NEGATIVE_CACHE_ENABLED else ", disabled") + ")")
+    log("="*60)
+    if not rows:
+        log("No misses recorded")
+    for kind, active, expired, oldest in rows:
+        log(f"{kind:<20} {active:>8,} active  {expired:>8,} expired   first miss: {oldest:%Y-%m-%d %H:%M}")
+    log("="*60)
+
+if __name__ == "__main__":
+    main()
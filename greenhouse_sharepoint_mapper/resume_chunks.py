@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Section-Aware Resume Chunks (gh.resume_chunks)
+
+Splits each candidate's resume_content into bounded chunks so agents and
+Zapier steps can fetch the part they need (skills, experience, ...) instead
+of the whole blob of up to 50k characters. Stored in the AI database:
+
+    candidate_id, chunk_index       one row per chunk, in reading order
+    section                         detected heading label (experience, skills, ...)
+    start_offset, end_offset        character range in the normalized text
+    token_estimate                  approximate tokens (characters / 4)
+    chunk_text                      the chunk itself
+
+Text is normalized first (NFKC, no control characters, single spaces, at most
+one blank line) - the same normalization as the SQLite snapshot - and offsets
+refer to that normalized text. A chunk never spans two sections; a section
+longer than CHUNK_MAX_CHARS is split on paragraph, line, sentence and finally
+word boundaries.
+
+Maintenance is incremental: each chunk row carries md5(resume_content) and the
+chunker version plus CHUNK_MAX_CHARS, so a run re-chunks only candidates whose
+resume_content changed (or who have none yet) and removes chunks for
+candidates whose text is gone. Bump CHUNKER_VERSION when the chunking rules
+change.
+
+Fetching one candidate's skills:
+
+    SELECT chunk_text FROM gh.resume_chunks
+    WHERE candidate_id = %s AND section = 'skills'
+    ORDER BY chunk_index
+
+Usage:
+    python resume_chunks.py                  # Re-chunk new and changed resumes
+    python resume_chunks.py --rebuild        # Re-chunk every resume
+    python resume_chunks.py --show 12345     # Print one candidate's chunks
+    python resume_chunks.py --status         # Table size and section breakdown
+"""
+
+import os
+import re
+import sys
+import argparse
+import unicodedata
+import psycopg2
+from psycopg2.extras import execute_values
+from datetime import datetime
+from dotenv import load_dotenv
+from db_batches import stream_rows
+
+load_dotenv()
+
+PG = {
+    "host": os.getenv("PGHOST", "localhost"),
+    "port": int(os.getenv("PGPORT", "5432")),
+    "dbname": os.getenv("PGDATABASE_AI", "greenhouse_candidates_ai"),
+    "user": os.getenv("PGUSER"),
+    "password": os.getenv("PGPASSWORD", "")
+}
+
+CHUNKER_VERSION = "1"           # Bump when chunking or normalization changes (forces re-chunking)
+CHUNK_MAX_CHARS = int(os.getenv("CHUNK_MAX_CHARS", "2000"))
+CHUNKER_SIGNATURE = f"{CHUNKER_VERSION}/{CHUNK_MAX_CHARS}"      # Stored per row; a new limit re-chunks too
+CHARS_PER_TOKEN = 4             # Rough average for English resume text
+COMMIT_BATCH_SIZE = 200         # Candidates per transaction
+
+# Text before the first recognized heading (name, contact details, headline)
+HEADER_SECTION = "header"
+
+# Section label -> headings that start it (compared lowercased, without trailing punctuation)
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "professional profile", "about me",
+                "objective", "career objective", "overview", "executive summary", "career summary"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history", "relevant experience"),
+    "education": ("education", "academic background", "education and training", "qualifications",
+                  "academic qualifications"),
+    "skills": ("skills", "technical skills", "core competencies", "competencies", "key skills",
+               "areas of expertise", "expertise", "technologies", "tools", "skills and abilities"),
+    "projects": ("projects", "key projects", "selected projects", "personal projects"),
+    "certifications": ("certifications", "certificates", "licenses", "licenses and certifications",
+                       "certifications and licenses", "training"),
+    "awards": ("awards", "honors", "honors and awards", "achievements", "accomplishments"),
+    "publications": ("publications", "patents", "presentations"),
+    "languages": ("languages",),
+    "volunteer": ("volunteer", "volunteering", "volunteer experience", "community involvement"),
+    "interests": ("interests", "hobbies", "hobbies and interests"),
+    "references": ("references",),
+}
+
+HEADING_LABELS = {heading: label for label, headings in SECTION_HEADINGS.items() for heading in headings}
+MAX_HEADING_CHARS = max(len(heading) for heading in HEADING_LABELS) + 4
+
+CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+INLINE_SPACE = re.compile(r"[^\S\n]+")
+BLANK_LINES = re.compile(r"\n{3,}")
+HEADING_PUNCTUATION = " :-–—|•*#_=."
+SENTENCE_END = re.compile(r"[.!?;][\s]")
+
+# SQL twin of "normalize_text() leaves something": resume_content that is only control characters and
+# (Unicode) whitespace has no chunks, so it is neither re-chunked on every run nor counted as removed
+HAS_CHUNKABLE_TEXT = r"""
+    c.resume_content IS NOT NULL
+    AND regexp_replace(c.resume_content,
+        '[[:cntrl:][:space:]\u0085\u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]', '', 'g') <> ''
+"""
+
+def log(message):
+    """Simple logging with timestamp"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+def normalize_text(text):
+    """Resume text for indexing: NFKC, no control characters, single spaces, at most one blank line"""
+    if not text:
+        return None
+    text = unicodedata.normalize("NFKC", text).replace("\r\n", "\n").replace("\r", "\n")
+    text = CONTROL_CHARS.sub(" ", text)
+    text = INLINE_SPACE.sub(" ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    text = BLANK_LINES.sub("\n\n", text).strip()
+    return text or None
+
+def section_label(line):
+    """Section label if the line is a heading on its own, else None"""
+    if len(line) > MAX_HEADING_CHARS:
+        return None
+    heading = line.strip(HEADING_PUNCTUATION).lower().replace("&", "and")
+    return HEADING_LABELS.get(" ".join(heading.split()))
+
+def split_sections(text):
+    """[(label, start, end)] covering the text; each section starts at its heading line"""
+    sections = []
+    label, start = HEADER_SECTION, 0
+    offset = 0
+    for line in text.split("\n"):
+        heading = section_label(line) if line else None
+        if heading and offset > start:
+            sections.append((label, start, offset))
+            label, start = heading, offset
+        elif heading:
+            label = heading
+        offset += len(line) + 1
+    sections.append((label, start, len(text)))
+    return sections
+
+def _split_point(text, start, end, max_chars):
+    """
+    Best place to cut text[start:end] at or before start + max_chars
+
+    Prefers a paragraph break, then a line break, a sentence end and a space,
+    taking the first kind found in the back half of the window so chunks don't
+    come out much smaller than max_chars.
+    """
+    limit = start + max_chars
+    sentence = None
+    for match in SENTENCE_END.finditer(text, start, limit):
+        sentence = match.start() + 1
+    candidates = [text.rfind("\n\n", start + 1, limit), text.rfind("\n", start + 1, limit),
+                  sentence or -1, text.rfind(" ", start + 1, limit)]
+
+    for cut in candidates:
+        if cut >= start + max_chars // 2:
+            return cut
+    return next((cut for cut in candidates if cut > start), limit)
+
+def chunk_text(text, max_chars=None):
+    """
+    Split normalized text into section-aware chunks
+
+    Args:
+        text: Normalized resume text (see normalize_text)
+        max_chars: Upper bound per chunk (default CHUNK_MAX_CHARS)
+
+    Returns:
+        list: dicts with chunk_index, section, start_offset, end_offset,
+            token_estimate and text (text == normalized[start_offset:end_offset])
+    """
+    max_chars = max_chars or CHUNK_MAX_CHARS
+    chunks = []
+    for label, start, end in split_sections(text):
+        while start < end:
+            # Separators between chunks belong to neither side
+            while start < end and text[start].isspace():
+                start += 1
+            if start >= end:
+                break
+            cut = end if end - start <= max_chars else _split_point(text, start, end, max_chars)
+            chunk_end = cut
+            while chunk_end > start and text[chunk_end - 1].isspace():
+                chunk_end -= 1
+            chunks.append({
+                "chunk_index": len(chunks),
+                "section": label,
+                "start_offset": start,
+                "end_offset": chunk_end,
+                "token_estimate": -(-(chunk_end - start) // CHARS_PER_TOKEN),
+                "text": text[start:chunk_end]
+            })
+            start = cut
+    return chunks
+
+def ensure_table(conn):
+    """Create gh.resume_chunks if needed"""
+    with conn.cursor() as cur:
+        cur.execute("CREATE SCHEMA IF NOT EXISTS gh")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS gh.resume_chunks (
+                candidate_id        BIGINT NOT NULL,
+                chunk_index         INTEGER NOT NULL,
+                section             TEXT NOT NULL,
+                start_offset        INTEGER NOT NULL,   -- In the normalized text
+                end_offset          INTEGER NOT NULL,
+                token_estimate      INTEGER NOT NULL,
+                chunk_text          TEXT NOT NULL,
+                content_md5         TEXT NOT NULL,      -- md5(resume_content) the chunks were built from
+                chunker_version     TEXT NOT NULL,
+                chunked_at          TIMESTAMPTZ DEFAULT NOW(),
+                PRIMARY KEY (candidate_id, chunk_index)     -- Also the index for fetching by candidate
+            )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_resume_chunks_section ON gh.resume_chunks (section, candidate_id)")
+    conn.commit()
+
+def _write_chunks(cur, batch):
+    """Replace the chunks of every candidate in batch [(candidate_id, resume_content, content_md5)]"""
+    rows = []
+    for candidate_id, resume_content, content_md5 in batch:
+        text = normalize_text(resume_content)
+        for chunk in chunk_text(text) if text else []:
+            rows.append((candidate_id, chunk["chunk_index"], chunk["section"], chunk["start_offset"],
+                         chunk["end_offset"], chunk["token_estimate"], chunk["text"], content_md5,
+                         CHUNKER_SIGNATURE))
+
+    cur.execute("DELETE FROM gh.resume_chunks WHERE candidate_id = ANY(%s)", ([row[0] for row in batch],))
+    if rows:
+        execute_values(cur, """
+            INSERT INTO gh.resume_chunks
+                (candidate_id, chunk_index, section, start_offset, end_offset, token_estimate,
+                 chunk_text, content_md5, chunker_version)
+            VALUES %s
+        """, rows, page_size=500)
+    return len(rows)
+
+def refresh_chunks(conn, rebuild=False):
+    """
+    Re-chunk candidates whose resume_content changed and drop chunks whose text is gone
+
+    Returns:
+        dict: candidates re-chunked, chunks written, candidates removed
+    """
+    ensure_table(conn)
+    stats = {"candidates": 0, "chunks": 0, "removed": 0}
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            WITH removed AS (
+                DELETE FROM gh.resume_chunks r
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM gh.candidates c
+                    WHERE c.candidate_id = r.candidate_id
+                    AND """ + HAS_CHUNKABLE_TEXT + """
+                )
+                RETURNING candidate_id
+            )
+            SELECT COUNT(DISTINCT candidate_id) FROM removed
+        """)
+        stats["removed"] = cur.fetchone()[0]
+    conn.commit()
+
+    # chunk_index 0 carries the hash and version for the whole candidate
+    stale_query = """
+        SELECT c.candidate_id, c.resume_content, md5(c.resume_content)
+        FROM gh.candidates c
+        LEFT JOIN gh.resume_chunks r ON r.candidate_id = c.candidate_id AND r.chunk_index = 0
+        WHERE """ + HAS_CHUNKABLE_TEXT + """
+        AND (%(rebuild)s OR r.candidate_id IS NULL
+             OR r.content_md5 <> md5(c.resume_content) OR r.chunker_version <> %(version)s)
+        ORDER BY c.candidate_id
+    """
+
+    batch = []
+    with conn.cursor() as cur:
+        # WITH HOLD: the scan survives the commit after each batch
+        for row in stream_rows(conn, stale_query, {"rebuild": rebuild, "version": CHUNKER_SIGNATURE}, withhold=True):
+            batch.append(row)
+            if len(batch) >= COMMIT_BATCH_SIZE:
+                stats["chunks"] += _write_chunks(cur, batch)
+                stats["candidates"] += len(batch)
+                conn.commit()
+                batch = []
+                if stats["candidates"] % 5000 == 0:
+                    log(f"Progress: {stats['candidates']:,} candidates re-chunked...")
+        if batch:
+            stats["chunks"] += _write_chunks(cur, batch)
+            stats["candidates"] += len(batch)
+    conn.commit()
+    return stats
+
+def show_candidate(conn, candidate_id):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT chunk_index, section, start_offset, end_offset, token_estimate, chunk_text
+            FROM gh.resume_chunks
+            WHERE candidate_id = %s
+            ORDER BY chunk_index
+        """, (candidate_id,))
+        rows = cur.fetchall()
+
+    if not rows:
+        log(f"❌ No chunks for candidate {candidate_id}")
+        sys.exit(1)
+    for chunk_index, section, start, end, tokens, text in rows:
+        print(f"--- #{chunk_index} {section} [{start}:{end}] ~{tokens} tokens")
+        print(text)
+
+def show_status(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT COUNT(DISTINCT candidate_id), COUNT(*), COALESCE(SUM(token_estimate), 0), MAX(chunked_at)
+            FROM gh.resume_chunks
+        """)
+        candidates, chunks, tokens, last = cur.fetchone()
+        cur.execute("""
+            SELECT section, COUNT(*), COUNT(DISTINCT candidate_id), AVG(token_estimate)
+            FROM gh.resume_chunks
+            GROUP BY section
+            ORDER BY 2 DESC
+        """)
+        sections = cur.fetchall()
+
+    log("="*60)
+    log("RESUME CHUNKS")
+    log("="*60)
+    log(f"Candidates:  {candidates:,}")
+    log(f"Chunks:      {chunks:,} (~{tokens:,} tokens)")
+    log(f"Last change: {last or '-'}")
+    log("")
+    log(f"{'Section':<16} {'Chunks':>9} {'Candidates':>11} {'Avg tokens':>11}")
+    for section, count, with_section, avg_tokens in sections:
+        log(f"{section:<16} {count:>9,} {with_section:>11,} {avg_tokens:>11.0f}")
+    log("="*60)
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain section-aware resume chunks in gh.resume_chunks')
+    parser.add_argument('--rebuild', action='store_true', help='Re-chunk every resume, not just changed ones')
+    parser.add_argument('--show', type=int, metavar='CANDIDATE_ID', help="Print one candidate's chunks")
+    parser.add_argument('--status', action='store_true', help='Show table size and section breakdown')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**PG)
+    try:
+        if args.show:
+            show_candidate(conn, args.show)
+            return
+        if args.status:
+            ensure_table(conn)
+            show_status(conn)
+            return
+
+        log(f"Chunking resume_content in {PG['dbname']} (max {CHUNK_MAX_CHARS:,} characters per chunk)...")
+        stats = refresh_chunks(conn, rebuild=args.rebuild)
+        log(f"✅ Re-chunked {stats['candidates']:,} candidates ({stats['chunks']:,} chunks)")
+        if stats["removed"]:
+            log(f"🗑️  Removed chunks for {stats['removed']:,} candidates without resume_content")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
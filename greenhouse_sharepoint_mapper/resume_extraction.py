@@ -0,0 +1,1274 @@
+#!/usr/bin/env python3
+"""
+Resume Text Extraction
+
+PDF / DOCX / DOC / RTF / TXT text extraction for the AI_Access scripts, and a
+process pool that runs any extractor on every core.
+
+Backends
+--------
+Files are routed by their detected type (leading bytes, then extension) to a
+backend from EXTRACTORS. Each type uses the first available backend in
+DEFAULT_BACKENDS unless EXTRACTION_BACKENDS picks one:
+
+    EXTRACTION_BACKENDS=pdf=pymupdf,docx=docx-paragraphs
+
+    pdf     pymupdf (PyMuPDF), pypdf2, pdfminer (pdfminer.six)
+    docx    docx-full (body, tables, text boxes, headers/footers), docx-paragraphs
+    doc     antiword, catdoc (command-line tools)
+    rtf     striprtf, rtf-basic (built in)
+    txt     text
+
+The chosen backends and their library versions are part of
+extractor_signature(), so switching backend re-extracts and uses fresh cache
+entries. utilities/analysis/benchmark_extraction.py compares backends on a
+local corpus.
+
+PyPDF2 and python-docx are pure Python and CPU bound, so threads don't help.
+iter_extracted() fans files out to EXTRACTION_WORKERS processes and yields
+results back in input order. Workers only extract; the parent process does
+every file and database write.
+
+Each worker handles one file at a time and is killed (and replaced) when the
+file runs longer than EXTRACTION_TIMEOUT_SECONDS or the worker's RSS passes
+EXTRACTION_MAX_RSS_MB, so one pathological PDF can't stall a run. The job
+comes back with an ExtractionKilled error (reason 'timeout' or 'oom').
+
+    jobs = ({"candidate_id": cid, "path": path} for cid, path in rows)
+    for job, text, error in iter_extracted(jobs, path_of=lambda job: job["path"]):
+        ...  # write metadata / update the database
+
+The extractor passed in must be a module-level function (it is pickled to the
+workers). Jobs whose path_of() is None pass straight through without
+extraction, keeping their place in the output order. path_of() may also return
+the file's bytes (e.g. a download held in memory): the default extractor reads
+those from a BytesIO, so small downloads never touch the disk. spool_download()
+collects a streamed download that way, spilling to a temp file only past
+EXTRACTION_SPOOL_MB.
+
+Extraction cache
+----------------
+The same resume bytes reach several scripts (AI_Access build, Greenhouse
+content sync after re-downloading, comprehensive_fix). gh.extraction_cache
+(source database) stores the result per (SHA-256 of the file, extractor
+signature), so each distinct file is parsed once per extractor version:
+
+    cache = ExtractionCache()
+    for job, text, error in iter_extracted(jobs, path_of=..., cache=cache):
+        ...
+    log(cache.summary())
+    cache.close()
+
+A hit is one primary-key lookup in the parent; only misses go to the pool.
+Empty results are cached too ('empty'), so unreadable scans aren't retried
+until the extractor changes. Exceptions are not cached.
+
+Every parse also leaves an outcome row in gh.extraction_outcomes: status,
+failure class (FAILURE_CLASSES: empty file, unrecognized type, corrupt,
+image-only PDF, timeout, ...), detected type, backend, page count, bytes,
+characters and duration. utilities/analysis/analyze_failed_extractions.py
+reports from those rows without opening any file.
+
+Slow lane
+---------
+With a cache, killed files are also recorded there ('timeout' / 'oom', so
+later runs skip them instantly) and queued in gh.extraction_slow_lane with a
+copy of the file in SLOW_LANE_DIR (next to the scripts by default, outside
+the OneDrive folder). The slow lane retries them one at a time with looser
+limits and fills the cache, so the next regular run gets a hit:
+
+    python resume_extraction.py --slow-lane             # Work through the queue
+    python resume_extraction.py --slow-lane --limit 50
+    python resume_extraction.py --status                # Queue and cache counts
+"""
+
+import os
+import io
+import re
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+import multiprocessing.connection
+import psycopg2
+from pathlib import Path
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+# Text extraction libraries (all optional)
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+try:
+    import pdfminer
+    from pdfminer.high_level import extract_text as pdfminer_extract_text
+    PDFMINER_AVAILABLE = True
+except ImportError:
+    PDFMINER_AVAILABLE = False
+
+try:
+    import docx
+    from docx import Document
+    DOCX_AVAILABLE = True
+except ImportError:
+    DOCX_AVAILABLE = False
+
+try:
+    from striprtf.striprtf import rtf_to_text
+    STRIPRTF_AVAILABLE = True
+except ImportError:
+    STRIPRTF_AVAILABLE = False
+
+ANTIWORD_PATH = shutil.which("antiword")
+CATDOC_PATH = shutil.which("catdoc")
+
+PDF_AVAILABLE = PYPDF2_AVAILABLE or PYMUPDF_AVAILABLE or PDFMINER_AVAILABLE
+
+load_dotenv()
+
+EXTRACTION_CACHE_PG = {
+    "host": os.getenv("PGHOST", "localhost"),
+    "port": int(os.getenv("PGPORT", "5432")),
+    "dbname": os.getenv("SOURCE_PGDATABASE", "greenhouse_candidates"),
+    "user": os.getenv("PGUSER"),
+    "password": os.getenv("PGPASSWORD", "")
+}
+
+EXTRACTOR_VERSION = "2"         # Bump when extraction or the metadata format changes (forces re-extraction)
+EXTRACTION_BACKENDS = os.getenv("EXTRACTION_BACKENDS", "")     # e.g. "pdf=pymupdf,docx=docx-full"
+COMMAND_TIMEOUT = 60            # Seconds for antiword / catdoc
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 1)))      # 0 = inline, no limits
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "120"))
+EXTRACTION_MAX_RSS_MB = int(os.getenv("EXTRACTION_MAX_RSS_MB", "1024"))
+SLOW_LANE_TIMEOUT_SECONDS = float(os.getenv("SLOW_LANE_TIMEOUT_SECONDS", "1800"))
+SLOW_LANE_MAX_RSS_MB = int(os.getenv("SLOW_LANE_MAX_RSS_MB", "4096"))
+SLOW_LANE_MAX_ATTEMPTS = 3
+# Next to the scripts, not under LOCAL_RESUME_DIR: OneDrive would upload the worst files to SharePoint
+SLOW_LANE_DIR = os.getenv("SLOW_LANE_DIR") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".extraction_slow_lane")
+POLL_INTERVAL = 0.25            # Seconds between limit checks
+KILLED_STATUSES = ("timeout", "oom")
+FAILURE_CLASSES = (
+    "missing",          # File gone before it could be read (outcome keyed by path, see missing_file_key)
+    "empty_file",       # 0 bytes
+    "unrecognized",     # Not a PDF/DOCX/DOC/RTF/text file (e.g. an HTML error page)
+    "no_backend",       # Known type, no extraction library installed
+    "corrupt",          # The backend raised
+    "image_only",       # PDF with pages but no text layer (OCR candidate)
+    "no_text",          # Parsed, but nothing in it
+    "timeout", "oom",   # Worker killed for a limit
+    "crash",            # Worker died for another reason
+)
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+QUEUE_DEPTH = 4                 # Jobs in flight per worker
+HASH_CHUNK_SIZE = 1024 * 1024
+EXTRACTION_SPOOL_MB = float(os.getenv("EXTRACTION_SPOOL_MB", "25"))   # Downloads above this go to a temp file
+CACHE_FLUSH_SIZE = 100          # Extracted texts per INSERT batch
+
+def log(message):
+    """Simple logging with timestamp"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+def file_sha256(path):
+    """Content hash of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def content_sha256(source):
+    """SHA-256 of a file path or of in-memory bytes"""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    return file_sha256(source)
+
+def missing_file_key(path):
+    """Outcome key for a file that couldn't be read: there are no bytes to hash, so use the path"""
+    return "missing:" + hashlib.sha256(os.path.abspath(path).encode("utf-8", "surrogateescape")).hexdigest()
+
+def spool_download(chunks, max_memory_mb=None):
+    """
+    Collect a streamed download in memory, spilling to a temp file when large
+
+    Args:
+        chunks: Iterable of bytes (e.g. response.iter_content(...))
+        max_memory_mb: Spill threshold (default EXTRACTION_SPOOL_MB)
+
+    Returns:
+        bytes, or the path of a temp file the caller must delete
+    """
+    limit = (EXTRACTION_SPOOL_MB if max_memory_mb is None else max_memory_mb) * 1024 * 1024
+    buffer = io.BytesIO()
+    spill = None
+
+    try:
+        for chunk in chunks:
+            if spill:
+                spill.write(chunk)
+                continue
+            buffer.write(chunk)
+            if buffer.tell() > limit:
+                spill = tempfile.NamedTemporaryFile(delete=False, prefix="resume_", suffix=".bin")
+                spill.write(buffer.getbuffer())
+                buffer = None
+    except Exception:
+        if spill:
+            spill.close()
+            os.unlink(spill.name)
+        raise
+
+    if spill:
+        spill.close()
+        return spill.name
+    return buffer.getvalue()
+
+def _open_binary(source):
+    """Binary file object over a path or in-memory bytes"""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return open(source, 'rb')
+
+def _read_bytes(source):
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    with open(source, 'rb') as f:
+        return f.read()
+
+@contextmanager
+def _as_path(source, suffix):
+    """A real path for tools that need one (in-memory bytes go to a short-lived temp file)"""
+    if not isinstance(source, (bytes, bytearray)):
+        yield source
+        return
+    with tempfile.NamedTemporaryFile(suffix=suffix) as f:
+        f.write(source)
+        f.flush()
+        yield f.name
+
+def _pdf_pypdf2(source):
+    """PyPDF2, page by page"""
+    text_content = []
+    with _open_binary(source) as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page in pdf_reader.pages:
+            text = page.extract_text()
+            if text:
+                text_content.append(text)
+        return "\n\n".join(text_content), len(pdf_reader.pages)
+
+def _pdf_pymupdf(source):
+    """PyMuPDF (MuPDF in C, much faster than the pure Python parsers)"""
+    if isinstance(source, (bytes, bytearray)):
+        pdf = fitz.open(stream=bytes(source), filetype="pdf")
+    else:
+        pdf = fitz.open(source)
+    with pdf:
+        return "\n\n".join(text for text in (page.get_text() for page in pdf) if text.strip()), pdf.page_count
+
+def _pdf_pdfminer(source):
+    """pdfminer.six layout analysis (slow, good with multi-column layouts)"""
+    with _open_binary(source) as file:
+        return pdfminer_extract_text(file)
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+def _docx_inline(node, text, boxes):
+    """Run text of a paragraph; text box contents go to boxes"""
+    for child in node.iterchildren():
+        if child.tag == MC_FALLBACK:
+            continue    # Legacy copy of the text box in mc:Choice
+        if child.tag == WORD_NS + "txbxContent":
+            _docx_blocks(child, boxes)
+        elif child.tag == WORD_NS + "t":
+            text.append(child.text or "")
+        elif child.tag == WORD_NS + "tab":
+            text.append("\t")
+        elif child.tag in (WORD_NS + "br", WORD_NS + "cr"):
+            text.append("\n")
+        else:
+            _docx_inline(child, text, boxes)
+
+def _docx_blocks(element, lines):
+    """Paragraphs, table rows and text boxes under element, in document order"""
+    for child in element.iterchildren():
+        if child.tag == WORD_NS + "p":
+            text, boxes = [], []
+            _docx_inline(child, text, boxes)
+            line = "".join(text).strip()
+            if line:
+                lines.append(line)
+            lines.extend(boxes)
+        elif child.tag == WORD_NS + "tbl":
+            for row in child.iterchildren(WORD_NS + "tr"):
+                cells = []
+                for cell in row.iterchildren(WORD_NS + "tc"):
+                    cell_lines = []
+                    _docx_blocks(cell, cell_lines)
+                    if cell_lines:
+                        cells.append(" ".join(cell_lines))
+                if cells:
+                    lines.append(" | ".join(cells))
+        elif child.tag in (WORD_NS + "sdt", WORD_NS + "sdtContent", WORD_NS + "customXml"):
+            _docx_blocks(child, lines)
+
+def _docx_full(source):
+    """Body paragraphs, tables and text boxes, plus section headers and footers"""
+    with _open_binary(source) as file:
+        doc = Document(file)
+
+    headers, footers, seen = [], [], set()
+    for section in doc.sections:
+        for attr, target in (("first_page_header", headers), ("header", headers),
+                             ("footer", footers), ("first_page_footer", footers)):
+            part = getattr(section, attr, None)
+            if part is None or part.is_linked_to_previous:
+                continue
+            part_lines = []
+            _docx_blocks(part._element, part_lines)
+            for line in part_lines:
+                if line not in seen:
+                    seen.add(line)
+                    target.append(line)
+
+    body = []
+    _docx_blocks(doc.element.body, body)
+    return "\n\n".join(headers + body + footers)
+
+def _docx_paragraphs(source):
+    """python-docx body paragraphs only (the original extractor)"""
+    with _open_binary(source) as file:
+        doc = Document(file)
+    return "\n\n".join(paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip())
+
+def _run_command(command):
+    result = subprocess.run(command, capture_output=True, timeout=COMMAND_TIMEOUT)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode("utf-8", "replace").strip() or f"exit {result.returncode}")
+    return result.stdout.decode("utf-8", "replace")
+
+def _doc_antiword(source):
+    """antiword for Word 97-2003 .doc"""
+    with _as_path(source, ".doc") as path:
+        return _run_command([ANTIWORD_PATH, "-w", "0", path])
+
+def _doc_catdoc(source):
+    """catdoc for Word 97-2003 .doc"""
+    with _as_path(source, ".doc") as path:
+        return _run_command([CATDOC_PATH, "-w", "-d", "utf-8", path])
+
+def _rtf_striprtf(source):
+    return rtf_to_text(_read_bytes(source).decode('latin-1'), errors="ignore")
+
+RTF_TOKEN = re.compile(r"\\([a-z]{1,32})(-?\d{1,10})? ?|\\'([0-9a-f]{2})|\\([^a-z])|([{}])|[\r\n]+|(.)", re.I)
+RTF_SKIP_DESTINATIONS = {
+    "fonttbl", "colortbl", "stylesheet", "info", "pict", "object", "header", "footer",
+    "headerl", "headerr", "headerf", "footerl", "footerr", "footerf", "listtable",
+    "listoverridetable", "rsidtbl", "generator", "themedata", "colorschememapping",
+    "latentstyles", "datastore", "xmlnstbl", "fldinst", "bkmkstart", "bkmkend"
+}
+RTF_BREAKS = {"par": "\n", "line": "\n", "sect": "\n\n", "page": "\n\n", "tab": "\t", "cell": " | ", "row": "\n"}
+
+def _rtf_basic(source):
+    """Minimal RTF reader: drops control words and non-text destinations"""
+    rtf = _read_bytes(source).decode('latin-1')
+
+    stack = []
+    skipping = False
+    unicode_skip = 1
+    pending_skip = 0
+    out = []
+
+    for match in RTF_TOKEN.finditer(rtf):
+        word, arg, hex_char, symbol, brace, char = match.groups()
+
+        if brace:
+            pending_skip = 0
+            if brace == "{":
+                stack.append((skipping, unicode_skip))
+            elif stack:
+                skipping, unicode_skip = stack.pop()
+        elif symbol:
+            pending_skip = 0
+            if symbol == "*":
+                skipping = True     # {\* ...} destinations are optional / unknown
+            elif not skipping and symbol in "\\{}":
+                out.append(symbol)
+            elif not skipping and symbol == "~":
+                out.append("\xa0")
+        elif word:
+            pending_skip = 0
+            word = word.lower()
+            if word in RTF_SKIP_DESTINATIONS:
+                skipping = True
+            elif skipping:
+                pass
+            elif word in RTF_BREAKS:
+                out.append(RTF_BREAKS[word])
+            elif word == "uc":
+                unicode_skip = int(arg or 1)
+            elif word == "u" and arg:
+                out.append(chr(int(arg) % 65536))
+                pending_skip = unicode_skip
+        elif hex_char:
+            if pending_skip:
+                pending_skip -= 1
+            elif not skipping:
+                out.append(bytes.fromhex(hex_char).decode("cp1252", "replace"))
+        elif char:
+            if pending_skip:
+                pending_skip -= 1
+            elif not skipping:
+                out.append(char)
+
+    # \cell leaves a separator after the last cell of each row
+    return "\n".join(line.rstrip(" |") for line in "".join(out).splitlines()).strip()
+
+def _text(source):
+    return _read_bytes(source).decode('utf-8')
+
+# name: (file type, function, available, version); functions return text, or (text, page count)
+EXTRACTORS = {
+    "pymupdf": ("pdf", _pdf_pymupdf, PYMUPDF_AVAILABLE,
+                getattr(fitz, "VersionBind", "unknown") if PYMUPDF_AVAILABLE else None),
+    "pypdf2": ("pdf", _pdf_pypdf2, PYPDF2_AVAILABLE,
+               getattr(PyPDF2, "__version__", "unknown") if PYPDF2_AVAILABLE else None),
+    "pdfminer": ("pdf", _pdf_pdfminer, PDFMINER_AVAILABLE,
+                 getattr(pdfminer, "__version__", "unknown") if PDFMINER_AVAILABLE else None),
+    "docx-full": ("docx", _docx_full, DOCX_AVAILABLE,
+                  getattr(docx, "__version__", "unknown") if DOCX_AVAILABLE else None),
+    "docx-paragraphs": ("docx", _docx_paragraphs, DOCX_AVAILABLE,
+                        getattr(docx, "__version__", "unknown") if DOCX_AVAILABLE else None),
+    "antiword": ("doc", _doc_antiword, bool(ANTIWORD_PATH), None),
+    "catdoc": ("doc", _doc_catdoc, bool(CATDOC_PATH), None),
+    "striprtf": ("rtf", _rtf_striprtf, STRIPRTF_AVAILABLE, None),
+    "rtf-basic": ("rtf", _rtf_basic, True, None),
+    "text": ("txt", _text, True, None),
+}
+
+# Preference order per file type; PyPDF2 stays first for PDFs until the benchmark says otherwise
+DEFAULT_BACKENDS = {
+    "pdf": ["pypdf2", "pymupdf", "pdfminer"],
+    "docx": ["docx-full", "docx-paragraphs"],
+    "doc": ["antiword", "catdoc"],
+    "rtf": ["striprtf", "rtf-basic"],
+    "txt": ["text"],
+}
+
+EXTENSION_TYPES = {".pdf": "pdf", ".docx": "docx", ".doc": "doc", ".rtf": "rtf", ".txt": "txt"}
+HTML_MARKERS = (b"<!doctype", b"<html", b"<?xml", b"<head")
+
+def detect_file_type(source):
+    """
+    File type of a path or in-memory bytes: leading bytes first, then the
+    extension, then plain UTF-8 text ('pdf', 'docx', 'doc', 'rtf', 'txt' or None)
+    """
+    if isinstance(source, (bytes, bytearray)):
+        head = bytes(source[:2048])
+        extension = None
+    else:
+        try:
+            with open(source, 'rb') as f:
+                head = f.read(2048)
+        except OSError:
+            return None
+        extension = EXTENSION_TYPES.get(Path(source).suffix.lower())
+
+    if b"%PDF-" in head[:1024]:
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "docx"
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        return "doc"
+    if head.lstrip().startswith(b"{\\rtf"):
+        return "rtf"
+    if extension:
+        return extension
+
+    # Error pages come back as HTML; anything else that decodes is plain text
+    if not head or b"\x00" in head or head.lstrip().lower().startswith(HTML_MARKERS):
+        return None
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        if e.start < len(head) - 4:    # Not just a character cut off at the end of the sample
+            return None
+    return "txt"
+
+def select_backends(spec=None):
+    """
+    Backend per file type: EXTRACTION_BACKENDS overrides, else the first available default
+
+    Returns:
+        dict: file type -> backend name (None if nothing is available)
+    """
+    overrides = {}
+    for item in (EXTRACTION_BACKENDS if spec is None else spec).split(","):
+        if "=" in item:
+            file_type, name = (part.strip() for part in item.split("=", 1))
+            overrides[file_type] = name
+
+    selected = {}
+    for file_type, names in DEFAULT_BACKENDS.items():
+        name = overrides.get(file_type)
+        if name and name in EXTRACTORS and EXTRACTORS[name][0] == file_type and EXTRACTORS[name][2]:
+            selected[file_type] = name
+            continue
+        if name:
+            log(f"⚠️  Extraction backend '{name}' for {file_type} is unknown or not installed - using the default")
+        selected[file_type] = next((n for n in names if EXTRACTORS[n][2]), None)
+    return selected
+
+SELECTED_BACKENDS = select_backends()
+
+def extractor_signature():
+    """EXTRACTOR_VERSION plus the backend (and library version) chosen per type; changing either re-extracts"""
+    parts = []
+    for file_type, name in sorted(SELECTED_BACKENDS.items()):
+        version = EXTRACTORS[name][3] if name else None
+        parts.append(f"{file_type}={name or 'none'}" + (f"-{version}" if version else ""))
+    return f"{EXTRACTOR_VERSION}/" + "/".join(parts)
+
+def _run_backend(backend, source):
+    """(text, page count) from one backend; page count is None where the format has no pages"""
+    result = EXTRACTORS[backend][1](source)
+    text, pages = result if isinstance(result, tuple) else (result, None)
+    return (text if text and text.strip() else None), pages
+
+def extract_with(backend, source):
+    """Run one named backend on a path or bytes; errors propagate (used by the benchmark)"""
+    return _run_backend(backend, source)[0]
+
+def _size_of(source):
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    return os.path.getsize(source)
+
+def extract_document(source):
+    """
+    Extract text and describe how it went (what the pool runs for extract_text_from_file)
+
+    Returns:
+        dict: text, status ('ok', 'empty' or 'error'), failure_class (None when
+              ok, else one of FAILURE_CLASSES), file_type, backend, pages,
+              size_bytes, duration_ms, detail (error message)
+    """
+    started = time.perf_counter()
+    outcome = {"text": None, "status": "empty", "failure_class": None, "file_type": None,
+               "backend": None, "pages": None, "size_bytes": None, "duration_ms": None, "detail": None}
+
+    try:
+        outcome["size_bytes"] = _size_of(source)
+    except OSError as e:
+        outcome["failure_class"] = "missing"
+        outcome["detail"] = str(e)
+
+    if outcome["size_bytes"] == 0:
+        outcome["failure_class"] = "empty_file"
+    elif outcome["size_bytes"]:
+        file_type = detect_file_type(source)
+        backend = SELECTED_BACKENDS.get(file_type)
+        outcome.update(file_type=file_type, backend=backend)
+
+        if not file_type:
+            outcome["failure_class"] = "unrecognized"
+        elif not backend:
+            outcome["failure_class"] = "no_backend"
+        else:
+            try:
+                text, pages = _run_backend(backend, source)
+                outcome.update(text=text, pages=pages)
+                if text:
+                    outcome["status"] = "ok"
+                else:
+                    outcome["failure_class"] = "image_only" if file_type == "pdf" and pages else "no_text"
+            except Exception as e:
+                name = "in-memory file" if isinstance(source, (bytes, bytearray)) else Path(source).name
+                log(f"  ⚠️  {backend} extraction failed for {name}: {e}")
+                outcome.update(status="error", failure_class="corrupt", detail=f"{type(e).__name__}: {e}"[:500])
+
+    outcome["duration_ms"] = round((time.perf_counter() - started) * 1000)
+    return outcome
+
+def extract_text_from_file(source):
+    """Extract text from a resume (path or bytes) with the selected backend for its detected type"""
+    return extract_document(source)["text"]
+
+class ExtractionCache:
+    """Extracted text per (file SHA-256, extractor signature) in gh.extraction_cache"""
+
+    def __init__(self, signature=None):
+        self.signature = signature or extractor_signature()
+        self.enabled = EXTRACTION_CACHE_ENABLED
+        self.conn = None
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.killed = {reason: 0 for reason in KILLED_STATUSES}
+        self._pending = {}      # content_hash -> (status, text)
+        self._outcomes = {}     # content_hash -> outcome row
+
+        if not self.enabled:
+            return
+
+        try:
+            self.conn = psycopg2.connect(**EXTRACTION_CACHE_PG)
+            self.ensure_table()
+        except Exception as e:
+            log(f"⚠️  Extraction cache unavailable ({e}) - every file will be parsed")
+            self.enabled = False
+            self.conn = None
+
+    def ensure_table(self):
+        """Create the extraction cache table if needed"""
+        with self.conn.cursor() as cur:
+            cur.execute("CREATE SCHEMA IF NOT EXISTS gh")
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS gh.extraction_cache (
+                    content_hash    TEXT NOT NULL,      -- SHA-256 of the file bytes
+                    extractor       TEXT NOT NULL,      -- extractor_signature()
+                    status          TEXT NOT NULL,      -- 'ok', 'empty', or 'timeout' / 'oom' (in the slow lane)
+                    text_content    TEXT,
+                    char_count      INTEGER DEFAULT 0,
+                    extracted_at    TIMESTAMPTZ DEFAULT NOW(),
+                    PRIMARY KEY (content_hash, extractor)
+                )
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS gh.extraction_slow_lane (
+                    content_hash    TEXT NOT NULL,
+                    extractor       TEXT NOT NULL,
+                    spool_path      TEXT,               -- Copy of the file in SLOW_LANE_DIR
+                    source_path     TEXT,               -- Where the file was when it was killed
+                    reason          TEXT NOT NULL,      -- 'timeout' or 'oom'
+                    detail          TEXT,
+                    state           TEXT DEFAULT 'queued',  -- queued / done / failed
+                    attempts        INTEGER DEFAULT 0,  -- Slow lane attempts
+                    queued_at       TIMESTAMPTZ DEFAULT NOW(),
+                    last_attempt_at TIMESTAMPTZ,
+                    PRIMARY KEY (content_hash, extractor)
+                )
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_extraction_slow_lane_state ON gh.extraction_slow_lane (state, queued_at)")
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS gh.extraction_outcomes (
+                    content_hash    TEXT NOT NULL,
+                    extractor       TEXT NOT NULL,
+                    status          TEXT NOT NULL,      -- ok / empty / error / timeout / oom
+                    failure_class   TEXT,               -- NULL when ok, else one of FAILURE_CLASSES
+                    file_type       TEXT,               -- Detected type (pdf, docx, doc, rtf, txt)
+                    backend         TEXT,
+                    page_count      INTEGER,            -- PDFs only
+                    size_bytes      BIGINT,
+                    char_count      INTEGER DEFAULT 0,
+                    duration_ms     INTEGER,            -- Extraction time in the worker (time to the kill for timeouts)
+                    detail          TEXT,               -- Error message
+                    extracted_at    TIMESTAMPTZ DEFAULT NOW(),
+                    PRIMARY KEY (content_hash, extractor)
+                )
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_extraction_outcomes_status ON gh.extraction_outcomes (extractor, status, file_type)")
+        self.conn.commit()
+
+    def lookup(self, content_hash):
+        """
+        Cached result for a file
+
+        Returns:
+            tuple: (status, text) or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        cached = self._pending.get(content_hash)
+        if cached is None:
+            with self.conn.cursor() as cur:
+                cur.execute("""
+                    SELECT status, text_content
+                    FROM gh.extraction_cache
+                    WHERE content_hash = %s AND extractor = %s
+                """, (content_hash, self.signature))
+                cached = cur.fetchone()
+            self.conn.commit()
+
+        if cached is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return cached
+
+    def store(self, content_hash, text, status=None):
+        """Remember an extraction result (written in batches)"""
+        if not self.enabled:
+            return
+        if status:
+            self._pending[content_hash] = (status, None)
+        elif text:
+            # PostgreSQL TEXT can't hold NUL bytes (some PDFs produce them)
+            self._pending[content_hash] = ("ok", text.replace("\x00", ""))
+        else:
+            self._pending[content_hash] = ("empty", None)
+        if len(self._pending) >= CACHE_FLUSH_SIZE:
+            self.flush()
+
+    def record_outcome(self, content_hash, outcome):
+        """Remember how an extraction went (status, failure class, pages, bytes, characters, duration)"""
+        if not self.enabled:
+            return
+        self._outcomes[content_hash] = (
+            outcome["status"], outcome["failure_class"], outcome["file_type"], outcome["backend"],
+            outcome["pages"], outcome["size_bytes"], len(outcome["text"] or ""),
+            outcome["duration_ms"], outcome["detail"]
+        )
+        if len(self._outcomes) >= CACHE_FLUSH_SIZE:
+            self.flush()
+
+    def record_killed(self, content_hash, path, error):
+        """Remember a file that blew its limits and queue a copy for the slow lane"""
+        if not self.enabled:
+            return
+        self.killed[error.reason] += 1
+        self.store(content_hash, None, status=error.reason)
+
+        in_memory = isinstance(path, (bytes, bytearray))
+        spool_path = None
+        try:
+            os.makedirs(SLOW_LANE_DIR, exist_ok=True)
+            spool_path = os.path.join(SLOW_LANE_DIR, f"{content_hash}.{detect_file_type(path) or 'bin'}")
+            if os.path.exists(spool_path):
+                pass        # Named by content hash, so already the same bytes (e.g. killed again in the slow lane)
+            elif in_memory:
+                with open(spool_path, 'wb') as f:
+                    f.write(path)
+            else:
+                shutil.copyfile(path, spool_path)
+        except OSError as e:
+            log(f"  ⚠️  Could not copy {content_hash[:12]} to the slow lane: {e}")
+            spool_path = None
+
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO gh.extraction_slow_lane
+                    (content_hash, extractor, spool_path, source_path, reason, detail)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON CONFLICT (content_hash, extractor) DO UPDATE SET
+                    spool_path = COALESCE(EXCLUDED.spool_path, gh.extraction_slow_lane.spool_path),
+                    source_path = EXCLUDED.source_path,
+                    reason = EXCLUDED.reason,
+                    detail = EXCLUDED.detail,
+                    state = 'queued',
+                    queued_at = NOW()
+            """, (content_hash, self.signature, spool_path, None if in_memory else path,
+                  error.reason, str(error)))
+        self.conn.commit()
+
+    def flush(self):
+        """Write pending results and outcomes"""
+        if not self.enabled or not (self._pending or self._outcomes):
+            return
+
+        with self.conn.cursor() as cur:
+            if self._pending:
+                execute_values(cur, """
+                    INSERT INTO gh.extraction_cache
+                        (content_hash, extractor, status, text_content, char_count)
+                    VALUES %s
+                    ON CONFLICT (content_hash, extractor) DO UPDATE SET
+                        status = EXCLUDED.status,
+                        text_content = EXCLUDED.text_content,
+                        char_count = EXCLUDED.char_count,
+                        extracted_at = NOW()
+                """, [
+                    (content_hash, self.signature, status, text, len(text) if text else 0)
+                    for content_hash, (status, text) in self._pending.items()
+                ], page_size=CACHE_FLUSH_SIZE)
+            if self._outcomes:
+                execute_values(cur, """
+                    INSERT INTO gh.extraction_outcomes
+                        (content_hash, extractor, status, failure_class, file_type, backend,
+                         page_count, size_bytes, char_count, duration_ms, detail)
+                    VALUES %s
+                    ON CONFLICT (content_hash, extractor) DO UPDATE SET
+                        status = EXCLUDED.status,
+                        failure_class = EXCLUDED.failure_class,
+                        file_type = EXCLUDED.file_type,
+                        backend = EXCLUDED.backend,
+                        page_count = EXCLUDED.page_count,
+                        size_bytes = EXCLUDED.size_bytes,
+                        char_count = EXCLUDED.char_count,
+                        duration_ms = EXCLUDED.duration_ms,
+                        detail = EXCLUDED.detail,
+                        extracted_at = NOW()
+                """, [
+                    (content_hash, self.signature) + row
+                    for content_hash, row in self._outcomes.items()
+                ], page_size=CACHE_FLUSH_SIZE)
+        self.conn.commit()
+        self.stored += len(self._pending)
+        self._pending.clear()
+        self._outcomes.clear()
+
+    def summary(self):
+        """One-line report for script summaries"""
+        if not self.enabled:
+            return "Extraction cache: disabled"
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0
+        summary = (f"Extraction cache ({self.signature}): {self.hits:,} hits, {self.misses:,} parsed "
+                   f"({rate:.1f}% hit rate), {self.stored:,} results stored")
+        if any(self.killed.values()):
+            summary += (f"; {self.killed['timeout']:,} timeouts and {self.killed['oom']:,} over memory "
+                        f"queued for the slow lane")
+        return summary
+
+    def close(self):
+        self.flush()
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+class ExtractionKilled(Exception):
+    """A worker was killed for exceeding its limits on a file (reason: 'timeout' or 'oom')"""
+
+    def __init__(self, reason, detail):
+        super().__init__(f"{reason}: {detail}")
+        self.reason = reason
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def _rss_mb(pid):
+    """Resident memory of a process from /proc (None where /proc isn't available)"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _worker_main(conn, extract):
+    """Worker loop: one path in, one (text, error) out, until the pipe closes"""
+    while True:
+        try:
+            path = conn.recv()
+        except EOFError:
+            return
+        if path is None:
+            return
+        try:
+            conn.send((extract(path), None))
+        except MemoryError:
+            conn.send((None, "oom"))
+        except Exception as e:
+            conn.send((None, f"{type(e).__name__}: {e}"))
+
+class _Entry:
+    """One job on its way through iter_extracted"""
+    __slots__ = ("job", "path", "content_hash", "done", "text", "error", "outcome", "seconds")
+
+    def __init__(self, job, path, content_hash=None):
+        self.job = job
+        self.path = path
+        self.content_hash = content_hash
+        self.done = path is None
+        self.text = None
+        self.error = None
+        self.outcome = None     # extract_document() result
+        self.seconds = None     # Time on a worker, for kills and crashes
+
+    def finish(self, result=None, error=None, seconds=None):
+        if isinstance(result, dict):
+            self.outcome = result
+            result = result["text"]
+        self.text = result
+        self.error = error
+        self.seconds = seconds
+        self.done = True
+
+class IsolatedPool:
+    """
+    Extraction workers that can be killed one at a time
+
+    ProcessPoolExecutor can't stop a running task, so a PDF that hangs PyPDF2
+    would hold its worker (and the ordered output) forever. Each worker here has
+    its own pipe and one file at a time; poll() kills and replaces a worker
+    whose file passes the wall-clock timeout or whose RSS passes max_rss_mb.
+    Workers are spawned (not forked) so their RSS is their own.
+    """
+
+    def __init__(self, workers, extract, timeout, max_rss_mb):
+        self.context = multiprocessing.get_context("spawn")
+        self.extract = extract
+        self.timeout = timeout
+        self.max_rss_mb = max_rss_mb
+        self.idle = [self._start() for _ in range(workers)]
+        self.busy = {}          # conn -> (process, entry, started)
+        self.waiting = deque()
+
+    def _start(self):
+        conn, child_conn = self.context.Pipe()
+        process = self.context.Process(target=_worker_main, args=(child_conn, self.extract), daemon=True)
+        process.start()
+        child_conn.close()
+        return process, conn
+
+    def _kill(self, process, conn):
+        """Stop a worker and put a fresh one in the idle list"""
+        if process.is_alive():
+            process.kill()
+        process.join()
+        conn.close()
+        self.idle.append(self._start())
+
+    def submit(self, entry):
+        self.waiting.append(entry)
+        self._dispatch()
+
+    def _dispatch(self):
+        while self.waiting and self.idle:
+            process, conn = self.idle.pop()
+            entry = self.waiting.popleft()
+            try:
+                conn.send(entry.path)
+            except (BrokenPipeError, OSError):
+                # Worker died while idle; replace it and try again
+                self.waiting.appendleft(entry)
+                self._kill(process, conn)
+                continue
+            self.busy[conn] = (process, entry, time.monotonic())
+
+    def poll(self):
+        """Collect finished files, enforce limits, hand out waiting files"""
+        if self.busy:
+            for conn in multiprocessing.connection.wait(list(self.busy), timeout=POLL_INTERVAL):
+                process, entry, started = self.busy.pop(conn)
+                try:
+                    text, error = conn.recv()
+                except (EOFError, OSError):
+                    # Died mid-file; SIGKILL from outside is almost always the kernel OOM killer
+                    process.join()
+                    seconds = time.monotonic() - started
+                    if process.exitcode == -9:
+                        entry.finish(error=ExtractionKilled("oom", "worker killed by the system"), seconds=seconds)
+                    else:
+                        entry.finish(error=RuntimeError(f"extraction worker exited with code {process.exitcode}"),
+                                     seconds=seconds)
+                    self._kill(process, conn)
+                    continue
+
+                if error == "oom":
+                    entry.finish(error=ExtractionKilled("oom", "MemoryError in worker"),
+                                 seconds=time.monotonic() - started)
+                    self._kill(process, conn)
+                elif error:
+                    entry.finish(error=RuntimeError(error))
+                    self.idle.append((process, conn))
+                else:
+                    entry.finish(text)
+                    self.idle.append((process, conn))
+
+            now = time.monotonic()
+            for conn, (process, entry, started) in list(self.busy.items()):
+                elapsed = now - started
+                rss = _rss_mb(process.pid)
+                if elapsed > self.timeout:
+                    error = ExtractionKilled("timeout", f"still running after {elapsed:.0f}s")
+                elif self.max_rss_mb and rss and rss > self.max_rss_mb:
+                    error = ExtractionKilled("oom", f"RSS {rss:.0f} MB over the {self.max_rss_mb} MB limit")
+                else:
+                    continue
+                del self.busy[conn]
+                entry.finish(error=error, seconds=elapsed)
+                self._kill(process, conn)
+
+        self._dispatch()
+
+    def wait_for(self, entry):
+        while not entry.done:
+            self.poll()
+
+    def close(self):
+        """Stop idle workers with a sentinel and busy ones hard"""
+        for process, conn in self.idle:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for conn, (process, entry, started) in self.busy.items():
+            process.kill()
+        workers = self.idle + [(process, conn) for conn, (process, _, _) in self.busy.items()]
+        for process, conn in workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            conn.close()
+        self.idle = []
+        self.busy = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _prepare(cache, job, path, hash_of, use_cached=True):
+    """Entry for a job, already finished when the cache has its result"""
+    entry = _Entry(job, path)
+    if path is None or cache is None or not cache.enabled:
+        return entry
+
+    try:
+        content_hash = hash_of(job) if hash_of else None
+        entry.content_hash = content_hash or content_sha256(path)
+    except OSError:
+        # The worker will report it as 'missing'; record that outcome under the path
+        entry.content_hash = missing_file_key(path)
+        return entry
+
+    cached = cache.lookup(entry.content_hash) if use_cached else None
+    if cached:
+        status, text = cached
+        if status in KILLED_STATUSES:
+            entry.finish(error=ExtractionKilled(status, "skipped, file is in the slow lane"))
+        else:
+            entry.finish(text)
+    return entry
+
+def _outcome(entry):
+    """Outcome of a finished entry: the worker's own, or built here when the worker was killed or died"""
+    if entry.outcome:
+        return entry.outcome
+
+    killed = isinstance(entry.error, ExtractionKilled)
+    file_type = detect_file_type(entry.path)
+    try:
+        size_bytes = _size_of(entry.path)
+    except OSError:
+        size_bytes = None
+    return {
+        "text": None,
+        "status": entry.error.reason if killed else "error",
+        "failure_class": entry.error.reason if killed else "crash",
+        "file_type": file_type,
+        "backend": SELECTED_BACKENDS.get(file_type),
+        "pages": None,
+        "size_bytes": size_bytes,
+        "duration_ms": round(entry.seconds * 1000) if entry.seconds is not None else None,
+        "detail": str(entry.error)[:500] if entry.error else None
+    }
+
+def _result(entry, cache, from_cache=False):
+    """(job, text, error) for a finished entry, recording it and its outcome in the cache"""
+    if entry.content_hash and cache is not None and not from_cache:
+        cache.record_outcome(entry.content_hash, _outcome(entry))
+        if entry.content_hash.startswith("missing:"):
+            pass    # Keyed by path (missing_file_key), not content: nothing to cache
+        elif isinstance(entry.error, ExtractionKilled):
+            cache.record_killed(entry.content_hash, entry.path, entry.error)
+        elif entry.error is None:
+            cache.store(entry.content_hash, entry.text)
+    return entry.job, entry.text, entry.error
+
+def iter_extracted(jobs, path_of=None, extract=extract_text_from_file, workers=None,
+                   cache=None, hash_of=None, timeout=None, max_rss_mb=None, use_cached=True):
+    """
+    Extract text for each job on a pool of isolated worker processes
+
+    Args:
+        jobs: Iterable of work items, consumed lazily (at most
+              workers * QUEUE_DEPTH are held at once)
+        path_of: job -> file path (or bytes) to extract, or None to pass the
+                 job through (default: the job is the path)
+        extract: Module-level function path -> text
+        workers: Process count (default EXTRACTION_WORKERS); 0 runs inline
+                 without time or memory limits
+        cache: ExtractionCache to consult before parsing and fill after
+               (results and their outcomes); only valid with the default
+               extractor
+        use_cached: False parses every file but still fills the cache
+        hash_of: job -> SHA-256 of the file when the caller already has it
+                 (default: hash the file)
+        timeout: Seconds per file (default EXTRACTION_TIMEOUT_SECONDS)
+        max_rss_mb: Worker RSS limit (default EXTRACTION_MAX_RSS_MB; 0 = none)
+
+    Yields:
+        (job, text, error) in input order; error is the exception raised by
+        extract, or ExtractionKilled when a limit was hit
+    """
+    path_of = path_of or (lambda job: job)
+    workers = EXTRACTION_WORKERS if workers is None else workers
+    timeout = timeout or EXTRACTION_TIMEOUT_SECONDS
+    max_rss_mb = EXTRACTION_MAX_RSS_MB if max_rss_mb is None else max_rss_mb
+
+    if cache is not None and extract is not extract_text_from_file:
+        raise ValueError("the extraction cache only holds extract_text_from_file results")
+
+    # Same text, plus the outcome (pages, bytes, duration, failure class) for the cache to record
+    if extract is extract_text_from_file:
+        extract = extract_document
+
+    if workers <= 0:
+        for job in jobs:
+            entry = _prepare(cache, job, path_of(job), hash_of, use_cached)
+            if entry.done:
+                yield _result(entry, cache, from_cache=True)
+                continue
+            try:
+                entry.finish(extract(entry.path))
+            except Exception as e:
+                entry.finish(error=e)
+            yield _result(entry, cache)
+        return
+
+    window = workers * QUEUE_DEPTH
+
+    with IsolatedPool(workers, extract, timeout, max_rss_mb) as pool:
+        in_flight = deque()     # (entry, answered from cache)
+
+        for job in jobs:
+            entry = _prepare(cache, job, path_of(job), hash_of, use_cached)
+            from_cache = entry.done
+            if not entry.done:
+                pool.submit(entry)
+            in_flight.append((entry, from_cache))
+
+            while len(in_flight) >= window:
+                entry, from_cache = in_flight.popleft()
+                pool.wait_for(entry)
+                yield _result(entry, cache, from_cache)
+
+        while in_flight:
+            entry, from_cache = in_flight.popleft()
+            pool.wait_for(entry)
+            yield _result(entry, cache, from_cache)
+
+def run_slow_lane(limit=None):
+    """
+    Retry queued files one at a time with the slow-lane limits
+
+    Successful (or empty) results go into gh.extraction_cache under the current
+    extractor signature, and every attempt's outcome into gh.extraction_outcomes;
+    files killed again stay queued until SLOW_LANE_MAX_ATTEMPTS, then are
+    marked failed.
+    """
+    cache = ExtractionCache()
+    if not cache.enabled:
+        log("❌ Slow lane needs the extraction cache database")
+        return
+
+    with cache.conn.cursor() as cur:
+        cur.execute("""
+            SELECT content_hash, spool_path, source_path, reason, attempts
+            FROM gh.extraction_slow_lane
+            WHERE state = 'queued' AND extractor = %s
+            ORDER BY queued_at
+            LIMIT %s
+        """, (cache.signature, limit))
+        queued = cur.fetchall()
+    cache.conn.commit()
+
+    log(f"Slow lane: {len(queued):,} queued files (timeout {SLOW_LANE_TIMEOUT_SECONDS:g}s, "
+        f"RSS limit {SLOW_LANE_MAX_RSS_MB} MB)")
+
+    def spooled(row):
+        path = row[1] if row[1] and os.path.exists(row[1]) else row[2]
+        return path if path and os.path.exists(path) else None
+
+    counts = {"done": 0, "queued": 0, "failed": 0}
+    # The cache says these were killed, so parse regardless and let the results overwrite that
+    for row, text, error in iter_extracted(queued, path_of=spooled, workers=1,
+                                           cache=cache, use_cached=False, hash_of=lambda row: row[0],
+                                           timeout=SLOW_LANE_TIMEOUT_SECONDS,
+                                           max_rss_mb=SLOW_LANE_MAX_RSS_MB):
+        content_hash, spool_path, source_path, reason, attempts = row
+        attempts += 1
+
+        if spooled(row) is None:
+            state, detail = "failed", "file no longer available"
+        elif error is None:
+            state, detail = "done", f"{len(text or ''):,} characters"
+        elif attempts >= SLOW_LANE_MAX_ATTEMPTS:
+            state, detail = "failed", str(error)
+        else:
+            state, detail = "queued", str(error)
+
+        counts[state] += 1
+        log(f"  {'✅' if state == 'done' else '⚠️ '} {content_hash[:12]} ({reason}): {state} - {detail}")
+
+        with cache.conn.cursor() as cur:
+            cur.execute("""
+                UPDATE gh.extraction_slow_lane
+                SET state = %s, detail = %s, attempts = %s, last_attempt_at = NOW()
+                WHERE content_hash = %s AND extractor = %s
+            """, (state, detail, attempts, content_hash, cache.signature))
+        cache.flush()
+
+        if state == "done" and spool_path and os.path.exists(spool_path):
+            os.unlink(spool_path)
+
+    cache.close()
+    log(f"Slow lane finished: {counts['done']:,} extracted, {counts['queued']:,} still queued, "
+        f"{counts['failed']:,} failed")
+
+def show_status():
+    """Print slow lane and cache counts for the current extractor"""
+    cache = ExtractionCache()
+    if not cache.enabled:
+        log("❌ Extraction cache database unavailable")
+        return
+
+    with cache.conn.cursor() as cur:
+        cur.execute("""
+            SELECT status, COUNT(*) FROM gh.extraction_cache
+            WHERE extractor = %s GROUP BY status ORDER BY status
+        """, (cache.signature,))
+        cached = cur.fetchall()
+        cur.execute("""
+            SELECT state, reason, COUNT(*) FROM gh.extraction_slow_lane
+            WHERE extractor = %s GROUP BY state, reason ORDER BY state, reason
+        """, (cache.signature,))
+        slow_lane = cur.fetchall()
+    cache.close()
+
+    log("="*60)
+    log(f"EXTRACTION STATUS ({cache.signature})")
+    log("="*60)
+    log(f"Limits: {EXTRACTION_TIMEOUT_SECONDS:g}s / {EXTRACTION_MAX_RSS_MB} MB per file "
+        f"(slow lane {SLOW_LANE_TIMEOUT_SECONDS:g}s / {SLOW_LANE_MAX_RSS_MB} MB)")
+    for status, count in cached:
+        log(f"cache       {status:<10} {count:>10,}")
+    for state, reason, count in slow_lane:
+        log(f"slow lane   {state:<10} {reason:<8} {count:>6,}")
+    log("="*60)
+
+def main():
+    parser = argparse.ArgumentParser(description='Resume extraction slow lane and cache status')
+    parser.add_argument('--slow-lane', action='store_true', help='Retry files killed for time or memory limits')
+    parser.add_argument('--limit', type=int, default=None, help='Maximum slow-lane files to process')
+    parser.add_argument('--status', action='store_true', help='Show cache and slow lane counts')
+    args = parser.parse_args()
+
+    if args.slow_lane:
+        run_slow_lane(args.limit)
+    else:
+        show_status()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Persistent Candidate -> Resume File Index
+
+Maps every candidate_id to its organized resume (YYYY/MM folders), its
+AI_Access copy and its _metadata.json file, with size and mtime for each.
+
+The index is built with a single scan of LOCAL_RESUME_DIR and saved to disk.
+Later runs only rescan directories whose mtime changed (new, renamed or
+deleted files), so scripts no longer walk the OneDrive tree once per candidate.
+A file rewritten in place doesn't touch its directory's mtime, so the indexed
+files of unchanged directories are re-stat'ed to keep their size and mtime.
+
+Usage:
+    python resume_index.py              # Incremental refresh + stats
+    python resume_index.py --rebuild    # Full rescan
+"""
+
+import os
+import re
+import sys
+import json
+import time
+from collections import defaultdict
+from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Configuration
+LOCAL_RESUME_DIR = os.getenv("LOCAL_RESUME_DIR")
+AI_ACCESS_FOLDER = "AI_Access"
+FAILED_FOLDER = "Failed_Downloads"
+
+# Kept next to the scripts (not in the OneDrive folder) so it never syncs
+RESUME_INDEX_PATH = os.getenv(
+    "RESUME_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".resume_index.json")
+)
+INDEX_VERSION = 1
+
+# Heartbeat file written by watch_resume_index.py while it is running
+WATCH_STATUS_PATH = f"{RESUME_INDEX_PATH}.watch"
+WATCH_STALE_SECONDS = int(os.getenv("WATCH_STALE_SECONDS", "60"))
+
+CANDIDATE_FILE_PATTERN = re.compile(r"^(\d+)_")
+METADATA_SUFFIX = "_metadata.json"
+IGNORED_SUFFIXES = (".part", ".tmp")
+
+# Entry kinds
+ORGANIZED = "organized"
+AI_ACCESS = "ai_access"
+METADATA = "metadata"
+
+def log(message):
+    """Simple logging with timestamp"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+def classify_file(rel_path):
+    """
+    Work out which candidate a file belongs to and what kind of file it is
+
+    Args:
+        rel_path: Path relative to LOCAL_RESUME_DIR
+
+    Returns:
+        tuple: (candidate_id, kind) or (None, None) for files we don't index
+    """
+    name = os.path.basename(rel_path)
+
+    if name.startswith(("FAILED_", "_", ".", "~$")) or name.endswith(IGNORED_SUFFIXES):
+        return None, None
+
+    match = CANDIDATE_FILE_PATTERN.match(name)
+    if not match:
+        return None, None
+
+    top_folder = rel_path.split(os.sep, 1)[0]
+
+    if top_folder == FAILED_FOLDER:
+        return None, None
+
+    if top_folder == AI_ACCESS_FOLDER:
+        kind = METADATA if name.endswith(METADATA_SUFFIX) else AI_ACCESS
+    else:
+        kind = ORGANIZED
+
+    return int(match.group(1)), kind
+
+class ResumeIndex:
+    """Candidate -> file index over LOCAL_RESUME_DIR, persisted as JSON"""
+
+    def __init__(self, root=LOCAL_RESUME_DIR, index_path=RESUME_INDEX_PATH):
+        self.root = root
+        self.index_path = index_path
+        self.dirs = {}          # rel_dir -> mtime_ns when last scanned
+        self.files = {}         # rel_path -> [candidate_id, kind, size, mtime]
+        self.updated_at = None
+        self.dirty = False
+        self.watched = False    # True when a live watcher owns the saved index
+        self._dir_files = defaultdict(set)
+        self._by_candidate = defaultdict(lambda: defaultdict(set))
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Load the saved index. Returns False if missing or built for another root."""
+        if not os.path.exists(self.index_path):
+            return False
+
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            log(f"⚠️  Could not read resume index ({e}), rebuilding")
+            return False
+
+        if data.get("version") != INDEX_VERSION or data.get("root") != self.root:
+            return False
+
+        self.dirs = data.get("dirs", {})
+        self.updated_at = data.get("updated_at")
+        self.files = {}
+        self._dir_files.clear()
+        self._by_candidate.clear()
+
+        for rel_path, entry in data.get("files", {}).items():
+            self._add(rel_path, *entry)
+
+        self.dirty = False
+        return True
+
+    def save(self):
+        """Write the index atomically"""
+        if self.watched:
+            # The watcher sees our writes too; saving here could clobber newer state
+            self.dirty = False
+            return
+
+        self.updated_at = datetime.now().isoformat()
+        data = {
+            "version": INDEX_VERSION,
+            "root": self.root,
+            "updated_at": self.updated_at,
+            "dirs": self.dirs,
+            "files": self.files
+        }
+
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+        self.dirty = False
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+
+    def build(self):
+        """Full rescan of the resume tree"""
+        self.dirs = {}
+        self.files = {}
+        self._dir_files.clear()
+        self._by_candidate.clear()
+        self.refresh()
+
+    def refresh(self):
+        """
+        Incrementally bring the index up to date
+
+        Every directory is stat'ed, but only directories whose mtime changed
+        since the last scan are listed again. In the others, the indexed files
+        are stat'ed instead, so in-place rewrites update their size and mtime.
+
+        Returns:
+            int: Number of directories rescanned (or with files rewritten in place)
+        """
+        if not self.root or not os.path.isdir(self.root):
+            return 0
+
+        children = defaultdict(list)
+        for rel_dir in self.dirs:
+            if rel_dir:
+                children[os.path.dirname(rel_dir)].append(rel_dir)
+
+        seen_dirs = set()
+        rescanned = 0
+        stack = [""]
+
+        while stack:
+            rel_dir = stack.pop()
+            abs_dir = os.path.join(self.root, rel_dir) if rel_dir else self.root
+
+            try:
+                mtime_ns = os.stat(abs_dir).st_mtime_ns
+            except FileNotFoundError:
+                continue
+
+            seen_dirs.add(rel_dir)
+
+            if self.dirs.get(rel_dir) != mtime_ns:
+                # Record mtime before listing so changes during the scan are caught next time
+                self.dirs[rel_dir] = mtime_ns
+                stack.extend(self._scan_dir(rel_dir))
+                rescanned += 1
+                self.dirty = True
+            else:
+                if self._restat_dir(rel_dir):
+                    rescanned += 1
+                    self.dirty = True
+                stack.extend(children.get(rel_dir, []))
+
+        for rel_dir in set(self.dirs) - seen_dirs:
+            self._forget_dir(rel_dir)
+            del self.dirs[rel_dir]
+            self.dirty = True
+
+        return rescanned
+
+    def _scan_dir(self, rel_dir):
+        """List one directory, replacing its file entries. Returns subdirectories."""
+        abs_dir = os.path.join(self.root, rel_dir) if rel_dir else self.root
+        self._forget_dir(rel_dir)
+        subdirs = []
+
+        try:
+            with os.scandir(abs_dir) as entries:
+                for entry in entries:
+                    rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith("."):
+                            subdirs.append(rel_path)
+                        continue
+
+                    candidate_id, kind = classify_file(rel_path)
+                    if candidate_id is None:
+                        continue
+
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+
+                    self._add(rel_path, candidate_id, kind, stat.st_size, stat.st_mtime)
+        except FileNotFoundError:
+            pass
+
+        return subdirs
+
+    def _restat_dir(self, rel_dir):
+        """Update size/mtime of a directory's indexed files. Returns True if any changed."""
+        changed = False
+
+        for rel_path in list(self._dir_files.get(rel_dir, ())):
+            candidate_id, kind, size, mtime = self.files[rel_path]
+            try:
+                stat = os.stat(self._abs(rel_path))
+            except FileNotFoundError:
+                # Deleted without the directory mtime moving (shouldn't happen, but be safe)
+                self._remove(rel_path)
+                changed = True
+                continue
+
+            if stat.st_size != size or stat.st_mtime != mtime:
+                self._add(rel_path, candidate_id, kind, stat.st_size, stat.st_mtime)
+                changed = True
+
+        return changed
+
+    def rescan_tree(self, path):
+        """Rescan a directory and everything below it (new or moved-in folder)"""
+        rel_root = self._rel(path)
+        scanned = []
+        stack = [rel_root]
+
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                mtime_ns = os.stat(self._abs(rel_dir)).st_mtime_ns
+            except FileNotFoundError:
+                continue
+
+            self.dirs[rel_dir] = mtime_ns
+            stack.extend(self._scan_dir(rel_dir))
+            scanned.append(rel_dir)
+
+        self.dirty = True
+        return scanned
+
+    def forget_tree(self, path):
+        """Drop a directory and everything below it (deleted or moved away)"""
+        rel_root = self._rel(path)
+        prefix = rel_root + os.sep if rel_root else ""
+
+        for rel_dir in [d for d in self.dirs if d == rel_root or d.startswith(prefix)]:
+            self._forget_dir(rel_dir)
+            del self.dirs[rel_dir]
+            self.dirty = True
+
+    # ------------------------------------------------------------------
+    # Entry bookkeeping
+    # ------------------------------------------------------------------
+
+    def _rel(self, path):
+        rel_path = os.path.relpath(path, self.root)
+        return "" if rel_path == "." else rel_path
+
+    def _abs(self, rel_path):
+        return os.path.join(self.root, rel_path) if rel_path else self.root
+
+    def _add(self, rel_path, candidate_id, kind, size, mtime):
+        if rel_path in self.files:
+            self._remove(rel_path)
+
+        self.files[rel_path] = [candidate_id, kind, size, mtime]
+        self._dir_files[os.path.dirname(rel_path)].add(rel_path)
+        self._by_candidate[candidate_id][kind].add(rel_path)
+
+    def _remove(self, rel_path):
+        entry = self.files.pop(rel_path, None)
+        if not entry:
+            return
+
+        candidate_id, kind = entry[0], entry[1]
+        self._dir_files[os.path.dirname(rel_path)].discard(rel_path)
+        self._by_candidate[candidate_id][kind].discard(rel_path)
+
+    def _forget_dir(self, rel_dir):
+        for rel_path in list(self._dir_files.get(rel_dir, ())):
+            self._remove(rel_path)
+        self._dir_files.pop(rel_dir, None)
+
+    def record_file(self, path):
+        """Add or update a single file (call after copying/writing into the tree)"""
+        rel_path = self._rel(path)
+        candidate_id, kind = classify_file(rel_path)
+
+        if candidate_id is None:
+            return False
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.forget_file(path)
+            return False
+
+        self._add(rel_path, candidate_id, kind, stat.st_size, stat.st_mtime)
+        self.dirty = True
+        return True
+
+    def forget_file(self, path):
+        """Drop a single file from the index (deleted or moved away)"""
+        rel_path = self._rel(path)
+        if rel_path not in self.files:
+            return False
+
+        self._remove(rel_path)
+        self.dirty = True
+        return True
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def entry(self, candidate_id, kind):
+        """
+        Get the newest file of a kind for a candidate
+
+        Returns:
+            dict: {"path", "size", "mtime"} with an absolute path, or None
+        """
+        rel_paths = self._by_candidate.get(int(candidate_id), {}).get(kind)
+        if not rel_paths:
+            return None
+
+        rel_path = max(rel_paths, key=lambda p: (self.files[p][3], p))
+        _, _, size, mtime = self.files[rel_path]
+        return {
+            "path": os.path.join(self.root, rel_path),
+            "size": size,
+            "mtime": mtime
+        }
+
+    def _path(self, candidate_id, kind):
+        found = self.entry(candidate_id, kind)
+        return found["path"] if found else None
+
+    def organized_path(self, candidate_id):
+        """Resume in the YYYY/MM organized folders"""
+        return self._path(candidate_id, ORGANIZED)
+
+    def ai_access_path(self, candidate_id):
+        """Resume copy in the AI_Access folder"""
+        return self._path(candidate_id, AI_ACCESS)
+
+    def metadata_path(self, candidate_id):
+        """_metadata.json file in the AI_Access folder"""
+        return self._path(candidate_id, METADATA)
+
+    def candidate_ids(self, kind):
+        """All candidate IDs that have at least one file of a kind"""
+        return {cid for cid, kinds in self._by_candidate.items() if kinds.get(kind)}
+
+    def stats(self):
+        """Counts of candidates per kind"""
+        return {
+            "files": len(self.files),
+            "directories": len(self.dirs),
+            ORGANIZED: len(self.candidate_ids(ORGANIZED)),
+            AI_ACCESS: len(self.candidate_ids(AI_ACCESS)),
+            METADATA: len(self.candidate_ids(METADATA))
+        }
+
+def read_watch_status():
+    """
+    Read the watcher heartbeat file
+
+    Returns:
+        dict: Watcher status with an added "age_seconds", or None if no watcher
+    """
+    try:
+        with open(WATCH_STATUS_PATH, 'r', encoding='utf-8') as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    status["age_seconds"] = time.time() - status.get("heartbeat_at", 0)
+    return status
+
+def watcher_is_live(status):
+    """True if the watcher for this root has written a recent heartbeat"""
+    return (
+        status is not None
+        and status.get("root") == LOCAL_RESUME_DIR
+        and status["age_seconds"] <= WATCH_STALE_SECONDS
+    )
+
+_resume_index = None
+
+def get_resume_index(rebuild=False):
+    """
+    Get the process-wide resume index, loaded from disk and refreshed
+
+    The first call loads the saved index (or builds it with one full scan),
+    rescans changed directories and saves the result.
+    """
+    global _resume_index
+
+    if _resume_index is not None and not rebuild:
+        return _resume_index
+
+    index = ResumeIndex()
+
+    if rebuild or not index.load():
+        log(f"Building resume index for {index.root} (one-time full scan)...")
+        index.build()
+    else:
+        watch_status = read_watch_status()
+
+        if watcher_is_live(watch_status):
+            # Watcher keeps the saved index current - no directory scan needed
+            index.watched = True
+            log(f"Resume index kept current by watcher (pid {watch_status.get('pid')}, "
+                f"{watch_status.get('mode')}, lag {watch_status.get('lag_seconds', 0):.1f}s)")
+        else:
+            rescanned = index.refresh()
+            if rescanned:
+                log(f"Resume index refreshed ({rescanned:,} changed directories rescanned)")
+
+    if index.dirty:
+        index.save()
+
+    _resume_index = index
+    return index
+
+def main():
+    """Refresh the index and print a summary"""
+    rebuild = "--rebuild" in sys.argv
+
+    if not LOCAL_RESUME_DIR or not os.path.exists(LOCAL_RESUME_DIR):
+        log(f"❌ Resume directory not found: {LOCAL_RESUME_DIR}")
+        sys.exit(1)
+
+    index = get_resume_index(rebuild=rebuild)
+    stats = index.stats()
+
+    log("="*60)
+    log("RESUME INDEX")
+    log("="*60)
+    log(f"Index file: {index.index_path}")
+    log(f"Directories tracked: {stats['directories']:,}")
+    log(f"Files indexed: {stats['files']:,}")
+    log(f"Candidates with organized resume: {stats[ORGANIZED]:,}")
+    log(f"Candidates with AI_Access resume: {stats[AI_ACCESS]:,}")
+    log(f"Candidates with metadata file: {stats[METADATA]:,}")
+
+    watch_status = read_watch_status()
+    if watcher_is_live(watch_status):
+        log(f"Watcher: running (pid {watch_status.get('pid')}, {watch_status.get('mode')}), "
+            f"lag {watch_status.get('lag_seconds', 0):.1f}s")
+    else:
+        log("Watcher: not running (start with: python watch_resume_index.py)")
+    log("="*60)
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ echo "=========================================="
 echo ""
 
 # Step 1: Update candidate data from Greenhouse
-echo "Step 1/6: Updating candidate data from Greenhouse..."
+echo "Step 1/7: Updating candidate data from Greenhouse..."
 cd ../greenhouse_candidate_dbBuilder
 source .venv/bin/activate
 python main.py
@@ -18,7 +18,7 @@ echo "✅ Candidate data updated"
 echo ""
 
 # Step 2: Download new resumes
-echo "Step 2/6: Downloading new resumes..."
+echo "Step 2/7: Downloading new resumes..."
 cd ../greenhouse_resume_downloader
 source .venv/bin/activate
 python download_resumes.py
@@ -26,7 +26,7 @@ echo "✅ New resumes downloaded"
 echo ""
 
 # Step 3: Copy new resumes to AI_Access folder
-echo "Step 3/6: Copying new resumes to AI_Access folder..."
+echo "Step 3/7: Copying new resumes to AI_Access folder..."
 cd ../greenhouse_sharepoint_mapper
 source .venv/bin/activate
 python create_ai_access_folder.py
@@ -34,19 +34,25 @@ echo "✅ AI_Access folder updated"
 echo ""
 
 # Step 4: Update human-friendly SharePoint links
-echo "Step 4/6: Updating human-friendly SharePoint links..."
+echo "Step 4/7: Updating human-friendly SharePoint links..."
 python update_sharepoint_links.py
 echo "✅ Human-friendly links updated"
 echo ""
 
 # Step 5: Update AI-friendly SharePoint links
-echo "Step 5/6: Updating AI-friendly SharePoint links..."
+echo "Step 5/7: Updating AI-friendly SharePoint links..."
 python update_ai_access_links.py
 echo "✅ AI-friendly links updated"
 echo ""
 
-# Step 6: Export CSVs
-echo "Step 6/6: Exporting CSVs..."
+# Step 6: Re-chunk changed resume_content
+echo "Step 6/7: Updating resume chunks..."
+python resume_chunks.py
+echo "✅ Resume chunks updated"
+echo ""
+
+# Step 7: Export CSVs
+echo "Step 7/7: Exporting CSVs..."
 python export_sharepoint_csv.py
 python export_ai_access_csv.py
 echo "✅ CSVs exported"
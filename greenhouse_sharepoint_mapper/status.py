@@ -10,6 +10,7 @@ import psycopg2
 from dotenv import load_dotenv
 from datetime import datetime
 from graph_client import GraphClient
+from drive_item_cache import get_cache_status
 
 load_dotenv()
 
@@ -155,6 +156,13 @@ def test_graph_connection():
             "error": str(e)
         }
 
+def get_drive_cache_stats():
+    """Get drive item cache (Graph delta mirror) statistics"""
+    try:
+        return get_cache_status()
+    except Exception as e:
+        return {'error': str(e)}
+
 def format_bytes(bytes_count):
     """Format bytes into human readable format"""
     if bytes_count == 0:
@@ -232,6 +240,21 @@ def main():
         print(f"   Error: {graph_test['error']}")
         print("   Check Azure credentials in .env file")
     
+    # Drive item cache stats
+    print("\n🗂️  Drive Item Cache:")
+    cache_stats = get_drive_cache_stats()
+    
+    if not cache_stats:
+        print("   Status: ❌ Never synced (mappers use live Graph lookups)")
+        print("   Run: python drive_item_cache.py")
+    elif 'error' in cache_stats:
+        print(f"   Error: {cache_stats['error']}")
+    else:
+        print(f"   Files cached: {cache_stats['files']:,}")
+        print(f"   Folders cached: {cache_stats['folders']:,}")
+        print(f"   Last sync: {cache_stats['last_sync_at']} ({cache_stats['items_changed']:,} changes)")
+        print(f"   Last full sync: {cache_stats['last_full_sync_at']}")
+    
     # Export file stats
     print("\n📄 Export Files Status:")
     export_stats = get_export_file_stats()
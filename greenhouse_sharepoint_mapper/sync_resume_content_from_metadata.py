@@ -4,6 +4,9 @@ Sync resume_content from metadata JSON files to AI database
 
 This script reads the resume_text from metadata JSON files and populates
 the resume_content field in the database for candidates missing it.
+
+Metadata files with no text (extraction failed) are remembered in the negative
+lookup cache and not re-read until the TTL expires or the file is rewritten.
 """
 
 import os
@@ -12,6 +15,9 @@ import psycopg2
 from datetime import datetime
 from dotenv import load_dotenv
 from pathlib import Path
+from resume_index import get_resume_index
+from db_batches import stream_rows
+from negative_cache import NegativeCache, file_fingerprint
 
 load_dotenv()
 
@@ -44,49 +50,54 @@ def sync_resume_content():
     
     # Get candidates with metadata_url but no resume_content
     log("Fetching candidates needing resume_content...")
-    cur.execute("""
-        SELECT candidate_id, full_name
+    needs_content = """
         FROM gh.candidates
         WHERE metadata_url IS NOT NULL AND metadata_url != ''
         AND (resume_content IS NULL OR resume_content = '')
-        ORDER BY candidate_id
-    """)
-    
-    candidates = cur.fetchall()
-    log(f"Found {len(candidates):,} candidates needing resume_content")
+    """
+    cur.execute(f"SELECT COUNT(*) {needs_content}")
+    total_candidates = cur.fetchone()[0]
+    log(f"Found {total_candidates:,} candidates needing resume_content")
     log("")
     
-    if not candidates:
+    if not total_candidates:
         log("✅ All candidates with metadata_url already have resume_content!")
         cur.close()
         conn.close()
         return
     
     log("Processing metadata files...")
+    resume_index = get_resume_index()
     updated = 0
     failed = 0
     no_file = 0
     no_text = 0
+    known_no_text = 0
+    negative_cache = NegativeCache("metadata_text")
+    
+    # Streamed; WITH HOLD keeps the cursor open across the periodic commits
+    candidates = stream_rows(conn, f"""
+        SELECT candidate_id, full_name
+        {needs_content}
+        ORDER BY candidate_id
+    """, withhold=True)
     
     for i, (cid, name) in enumerate(candidates, 1):
         if i % 100 == 0:
-            log(f"  Progress: {i:,} / {len(candidates):,} ({i/len(candidates)*100:.1f}%)")
+            log(f"  Progress: {i:,} / {total_candidates:,} ({i/total_candidates*100:.1f}%)")
         
         # Find metadata file
-        metadata_file = None
-        try:
-            for file in os.listdir(AI_ACCESS_DIR):
-                if file.startswith(f"{cid}_") and file.endswith("_metadata.json"):
-                    metadata_file = os.path.join(AI_ACCESS_DIR, file)
-                    break
-        except Exception as e:
-            failed += 1
-            continue
+        metadata_file = resume_index.metadata_path(cid)
         
         if not metadata_file or not os.path.exists(metadata_file):
             no_file += 1
             continue
         
+        file_key = file_fingerprint(metadata_file)
+        if negative_cache.is_known_miss(cid, file_key):
+            known_no_text += 1
+            continue
+        
         # Read metadata JSON and extract text_content
         try:
             with open(metadata_file, 'r', encoding='utf-8') as f:
@@ -102,27 +113,38 @@ def sync_resume_content():
                         WHERE candidate_id = %s
                     """, (resume_text, cid))
                     updated += 1
+                    negative_cache.record_hit(cid)
                     
                     if updated % 100 == 0:
                         conn.commit()
                 else:
                     no_text += 1
-        except Exception as e:
+                    negative_cache.record_miss(cid, file_key, "no text in metadata")
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            # Same bytes will fail the same way - remember it until the file changes
+            failed += 1
+            negative_cache.record_miss(cid, file_key, f"unreadable metadata: {e}")
+            continue
+        except Exception:
+            # Locked file, OneDrive placeholder, DB hiccup... try again next run
             failed += 1
             continue
     
     # Final commit
     conn.commit()
+    negative_cache.close()
     
     log("")
     log("="*70)
     log("SYNC COMPLETE!")
     log("="*70)
-    log(f"Total candidates processed: {len(candidates):,}")
+    log(f"Total candidates processed: {total_candidates:,}")
     log(f"Successfully updated: {updated:,}")
     log(f"No metadata file: {no_file:,}")
     log(f"No text in metadata: {no_text:,}")
+    log(f"Skipped (known no text): {known_no_text:,}")
     log(f"Failed: {failed:,}")
+    log(negative_cache.summary())
     log("")
     
     # Verify final coverage
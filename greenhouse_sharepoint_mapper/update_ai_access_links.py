@@ -13,6 +13,8 @@ import psycopg2
 from datetime import datetime
 from dotenv import load_dotenv
 from graph_client import GraphClient
+from resume_index import get_resume_index
+import ai_access_layout
 
 load_dotenv()
 
@@ -72,29 +74,18 @@ def record_sync_completion(conn, last_candidate_id):
     conn.commit()
 
 def find_local_resume_file(candidate_id):
-    """Find resume file in AI_Access folder"""
-    try:
-        for file in os.listdir(AI_ACCESS_DIR):
-            if file.startswith(f"{candidate_id}_") and not file.endswith("_metadata.json") and not file.startswith("_"):
-                return os.path.join(AI_ACCESS_DIR, file)
-    except:
-        pass
-    return None
+    """Find resume file in AI_Access folder (via the resume index)"""
+    return get_resume_index().ai_access_path(candidate_id)
 
-def get_sharepoint_url_for_ai_file(graph_client, filename):
-    """Get SharePoint URL for a file in the AI_Access folder"""
+def get_sharepoint_urls_for_ai_files(graph_client, filenames):
+    """Get SharePoint URLs for files in the AI_Access folder (batched Graph lookups)"""
     try:
-        relative_path = f"AI_Access/{filename}"
-        
-        file_info = graph_client.find_file_by_path(relative_path)
-        if not file_info:
-            return None
-        
-        web_url = file_info.get("webUrl")
-        return web_url
+        relative_paths = [ai_access_layout.storage_path_for_filename(f) for f in filenames]
+        return graph_client.get_web_urls_by_paths(relative_paths)
         
     except Exception as e:
-        return None
+        log(f"  ⚠️  Batch lookup failed: {e}")
+        return [None] * len(filenames)
 
 def update_new_candidates():
     """Update AI Access links for new candidates only"""
@@ -141,18 +132,29 @@ def update_new_candidates():
             no_resume_count = 0
             last_processed_id = last_synced_id
             
+            # Find local files in AI_Access, then resolve their SharePoint URLs
+            # up front with batched Graph lookups (20 per request)
+            local_filenames = {}
             for candidate_id, full_name, resume_filenames in new_candidates:
-                # Find local file in AI_Access
                 local_file = find_local_resume_file(candidate_id)
-                
-                if not local_file:
+                if local_file:
+                    local_filenames[candidate_id] = os.path.basename(local_file)
+            
+            log(f"Looking up {len(local_filenames):,} SharePoint URLs...")
+            ai_urls = dict(zip(
+                local_filenames,
+                get_sharepoint_urls_for_ai_files(graph_client, list(local_filenames.values()))
+            ))
+            
+            for candidate_id, full_name, resume_filenames in new_candidates:
+                if candidate_id not in local_filenames:
                     no_resume_count += 1
                     last_processed_id = candidate_id
                     continue
                 
                 # Get SharePoint URL
-                filename = os.path.basename(local_file)
-                ai_url = get_sharepoint_url_for_ai_file(graph_client, filename)
+                filename = local_filenames[candidate_id]
+                ai_url = ai_urls.get(candidate_id)
                 
                 if ai_url:
                     # Update or insert candidate
@@ -214,6 +216,8 @@ def update_new_candidates():
             if success_count > 0:
                 log(f"Success rate: {(success_count/(success_count+failed_count)*100):.1f}%")
             log(f"Last processed ID: {last_processed_id}")
+            for line in graph_client.metrics_summary():
+                log(f"Graph {line}")
             log("="*60)
             
             return True
@@ -10,6 +10,10 @@ and attempts to:
 4. Update their resume_links and resume_filenames
 
 This fixes candidates that were added without resumes.
+
+Candidates Greenhouse has no resume attachment for are recorded in the
+negative lookup cache and not fetched again until the TTL expires or their
+updated_at changes.
 """
 
 import os
@@ -22,7 +26,11 @@ import time
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
-from graph_client import GraphClient
+from graph_client import GraphClient, SHAREPOINT_DIRECT_UPLOAD, UPLOAD_CONCURRENCY
+from resume_index import get_resume_index
+from db_batches import stream_rows
+from negative_cache import NegativeCache, fingerprint
+import ai_access_layout
 
 # Add resume downloader utilities
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'greenhouse_resume_downloader'))
@@ -107,25 +115,9 @@ def build_filename(candidate_id, full_name, created_at, extension):
     return f"{candidate_id}_{safe_name}_{date_str}.{extension}"
 
 def find_resume_file(candidate_id):
-    """Find resume in AI_Access or organized folders"""
-    # Check AI_Access first
-    try:
-        for file in os.listdir(AI_ACCESS_DIR):
-            if file.startswith(f"{candidate_id}_") and not file.endswith("_metadata.json") and not file.startswith("_"):
-                return os.path.join(AI_ACCESS_DIR, file)
-    except:
-        pass
-    
-    # Check organized folders
-    for root, dirs, files in os.walk(LOCAL_RESUME_DIR):
-        if 'AI_Access' in root:
-            continue
-        
-        for file in files:
-            if file.startswith(f"{candidate_id}_") and not file.startswith("FAILED_"):
-                return os.path.join(root, file)
-    
-    return None
+    """Find resume in AI_Access or organized folders (via the resume index)"""
+    resume_index = get_resume_index()
+    return resume_index.ai_access_path(candidate_id) or resume_index.organized_path(candidate_id)
 
 def copy_to_ai_access(source_path, candidate_id, full_name, created_at):
     """Copy resume to AI_Access folder"""
@@ -134,13 +126,14 @@ def copy_to_ai_access(source_path, candidate_id, full_name, created_at):
     
     ext = source_path.split('.')[-1].lower()
     filename = build_filename(candidate_id, full_name, created_at, ext)
-    dest_path = os.path.join(AI_ACCESS_DIR, filename)
+    dest_path = ai_access_layout.local_ai_access_path(candidate_id, filename, create_dir=True)
     
     if not os.path.exists(dest_path) or os.path.getsize(source_path) != os.path.getsize(dest_path):
         max_retries = 3
         for attempt in range(max_retries):
             try:
                 shutil.copy2(source_path, dest_path)
+                get_resume_index().record_file(dest_path)
                 return filename
             except (TimeoutError, OSError) as e:
                 if attempt < max_retries - 1:
@@ -154,7 +147,7 @@ def copy_to_ai_access(source_path, candidate_id, full_name, created_at):
 def get_sharepoint_url(graph_client, filename):
     """Get SharePoint URL for file in AI_Access folder"""
     try:
-        relative_path = f"AI_Access/{filename}"
+        relative_path = ai_access_layout.storage_path_for_filename(filename)
         file_info = graph_client.find_file_by_path(relative_path)
         
         # Use permanent webUrl instead of temporary downloadUrl
@@ -166,6 +159,19 @@ def get_sharepoint_url(graph_client, filename):
     
     return None
 
+def update_candidate(cur, candidate_id, ai_url, ai_filename):
+    """Store the AI_Access filename and SharePoint URL for a candidate"""
+    cur.execute("""
+        UPDATE gh.candidates
+        SET resume_links = %s,
+            resume_filenames = %s
+        WHERE candidate_id = %s
+    """, (
+        [ai_url] if ai_url else None,
+        [ai_filename],
+        candidate_id
+    ))
+
 def main():
     log("="*70)
     log("UPDATE MISSING RESUMES IN AI ACCESS DATABASE")
@@ -177,18 +183,16 @@ def main():
     
     # Find candidates with NULL resume_links
     log("Finding candidates with missing resumes...")
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT candidate_id, full_name, first_name, last_name, created_at
+    missing_filter = """
         FROM gh.candidates
         WHERE resume_links IS NULL OR array_length(resume_links, 1) IS NULL
-        ORDER BY candidate_id
-    """)
-    
-    candidates = cur.fetchall()
-    log(f"Found {len(candidates):,} candidates with missing resumes")
+    """
+    cur = conn.cursor()
+    cur.execute(f"SELECT COUNT(*) {missing_filter}")
+    total_candidates = cur.fetchone()[0]
+    log(f"Found {total_candidates:,} candidates with missing resumes")
     
-    if len(candidates) == 0:
+    if total_candidates == 0:
         log("✅ No candidates need resume updates!")
         return
     
@@ -203,22 +207,64 @@ def main():
         return
     
     # Process candidates
-    log(f"\nProcessing {len(candidates):,} candidates...")
+    log(f"\nProcessing {total_candidates:,} candidates...")
+    if SHAREPOINT_DIRECT_UPLOAD:
+        log(f"📤 Direct upload enabled ({UPLOAD_CONCURRENCY} concurrent uploads)")
     
     updated = 0
     found_existing = 0
     downloaded_new = 0
     no_resume = 0
+    known_no_resume = 0
+    upload_failed = 0
+    pending_uploads = []   # (candidate_id, ai_filename, future)
+    negative_cache = NegativeCache("greenhouse_resume")
+    
+    def flush_uploads():
+        """Wait for queued uploads and store their webUrls"""
+        nonlocal updated, upload_failed
+        
+        for candidate_id, ai_filename, future in pending_uploads:
+            try:
+                ai_url = future.result().get('webUrl')
+            except Exception as e:
+                log(f"  ⚠️  Upload failed for {ai_filename}: {e}")
+                ai_url = None
+                upload_failed += 1
+            
+            try:
+                update_candidate(cur, candidate_id, ai_url, ai_filename)
+                updated += 1
+            except Exception as e:
+                log(f"  ❌ Failed to update {candidate_id}: {e}")
+        
+        pending_uploads.clear()
+        conn.commit()
     
-    for idx, (candidate_id, full_name, first_name, last_name, created_at) in enumerate(candidates, 1):
+    # Streamed from a server-side cursor; WITH HOLD keeps it open across the periodic commits
+    candidates = stream_rows(conn, f"""
+        SELECT candidate_id, full_name, first_name, last_name, created_at, updated_at
+        {missing_filter}
+        ORDER BY candidate_id
+    """, withhold=True)
+    
+    processed = 0
+    for idx, (candidate_id, full_name, first_name, last_name, created_at, updated_at) in enumerate(candidates, 1):
+        processed = idx
         if idx % 100 == 0:
-            log(f"Progress: {idx}/{len(candidates)} ({idx/len(candidates)*100:.1f}%)")
+            log(f"Progress: {idx}/{total_candidates} ({idx/total_candidates*100:.1f}%)")
         
         # Try to find existing resume
         resume_path = find_resume_file(candidate_id)
         
+        candidate_key = fingerprint(updated_at)
+        
         if resume_path:
             found_existing += 1
+            negative_cache.record_hit(candidate_id)
+        elif negative_cache.is_known_miss(candidate_id, candidate_key):
+            # Greenhouse had no resume last time and the candidate hasn't changed since
+            known_no_resume += 1
         else:
             # Try to download from Greenhouse with fresh URL
             fresh_data = get_fresh_candidate_data(candidate_id)
@@ -249,15 +295,28 @@ def main():
                                 f.write(chunk)
                         
                         resume_path = temp_path
+                        get_resume_index().record_file(temp_path)
                         downloaded_new += 1
                     except:
                         pass
+                elif not best_resume:
+                    negative_cache.record_miss(candidate_id, candidate_key, "no resume attachment")
         
         # If we have a resume, copy to AI_Access and update database
         if resume_path:
             ai_filename = copy_to_ai_access(resume_path, candidate_id, full_name, created_at)
             
-            if ai_filename:
+            if ai_filename and SHAREPOINT_DIRECT_UPLOAD:
+                # Upload now instead of waiting for OneDrive; the URL comes back with the item
+                future = graph_client.submit_upload(
+                    ai_access_layout.local_ai_access_path(candidate_id, ai_filename),
+                    ai_access_layout.storage_path_for_filename(ai_filename)
+                )
+                pending_uploads.append((candidate_id, ai_filename, future))
+                
+                if len(pending_uploads) >= UPLOAD_CONCURRENCY * 4:
+                    flush_uploads()
+            elif ai_filename:
                 ai_url = get_sharepoint_url(graph_client, ai_filename)
                 
                 if not ai_url:
@@ -266,17 +325,7 @@ def main():
                 
                 # Update database
                 try:
-                    cur.execute("""
-                        UPDATE gh.candidates
-                        SET resume_links = %s,
-                            resume_filenames = %s
-                        WHERE candidate_id = %s
-                    """, (
-                        [ai_url] if ai_url else None,
-                        [ai_filename],
-                        candidate_id
-                    ))
-                    
+                    update_candidate(cur, candidate_id, ai_url, ai_filename)
                     updated += 1
                     
                     if updated % 50 == 0:
@@ -287,17 +336,27 @@ def main():
             no_resume += 1
     
     # Final commit
+    flush_uploads()
     conn.commit()
+    negative_cache.close()
+    
+    resume_index = get_resume_index()
+    if resume_index.dirty:
+        resume_index.save()
     
     # Summary
     log("\n" + "="*70)
     log("UPDATE SUMMARY")
     log("="*70)
-    log(f"Total candidates processed: {len(candidates):,}")
+    log(f"Total candidates processed: {processed:,}")
     log(f"Successfully updated: {updated:,}")
     log(f"  - Found existing resumes: {found_existing:,}")
     log(f"  - Downloaded new resumes: {downloaded_new:,}")
     log(f"No resume available: {no_resume:,}")
+    log(f"  - Skipped Greenhouse fetch (known no-resume): {known_no_resume:,}")
+    if SHAREPOINT_DIRECT_UPLOAD:
+        log(f"Uploads failed (no URL stored): {upload_failed:,}")
+    log(negative_cache.summary())
     log("="*70)
     
     conn.close()
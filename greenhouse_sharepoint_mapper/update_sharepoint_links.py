@@ -13,6 +13,7 @@ import psycopg2
 from datetime import datetime
 from dotenv import load_dotenv
 from graph_client import GraphClient
+from resume_index import get_resume_index
 
 load_dotenv()
 
@@ -71,16 +72,8 @@ def record_sync_completion(conn, last_candidate_id):
     conn.commit()
 
 def find_local_resume_file(candidate_id):
-    """Find resume file in organized folder structure"""
-    for root, dirs, files in os.walk(LOCAL_RESUME_DIR):
-        # Skip AI_Access folder
-        if 'AI_Access' in root:
-            continue
-        
-        for file in files:
-            if file.startswith(f"{candidate_id}_") and not file.startswith("FAILED_"):
-                return os.path.join(root, file)
-    return None
+    """Find resume file in organized folder structure (via the resume index)"""
+    return get_resume_index().organized_path(candidate_id)
 
 def get_sharepoint_url_for_local_file(graph_client, local_file_path):
     """Get SharePoint URL for a local file"""
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+SharePoint Link Validator
+
+Checks the SharePoint URLs stored in the candidate databases (resume_links[1]
+and metadata_url) and records the result per link in gh.link_health:
+
+    ok          URL points at an existing file
+    moved       the expected file exists but under a different URL
+                (current_url holds the URL to use instead)
+    missing     neither the URL nor the expected file resolves
+    temporary   a downloadUrl with a tempauth token (expires within hours)
+
+Candidates are streamed with keyset batches; links are checked by a bounded
+pool of workers against the drive item cache first, then Graph. Only links
+never checked, changed since the last check, or older than
+LINK_RECHECK_HOURS are checked again.
+
+Usage:
+    python validate_links.py                    # AI database (resume + metadata links)
+    python validate_links.py --db sp            # SharePoint database (resume links)
+    python validate_links.py --max-age-hours 0  # Re-check everything
+    python validate_links.py --report           # Show stored results only
+"""
+
+import os
+import sys
+import time
+import argparse
+import psycopg2
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from psycopg2.extras import execute_values
+from datetime import datetime
+from dotenv import load_dotenv
+from graph_client import GraphClient
+from resume_index import get_resume_index
+from db_batches import iter_keyset_batches
+import ai_access_layout
+
+load_dotenv()
+
+DATABASES = {
+    "ai": os.getenv("PGDATABASE_AI", "greenhouse_candidates_ai"),
+    "sp": os.getenv("PGDATABASE", "greenhouse_candidates_sp")
+}
+
+LOCAL_RESUME_DIR = os.getenv("LOCAL_RESUME_DIR")
+LINK_CHECK_WORKERS = int(os.getenv("LINK_CHECK_WORKERS", "8"))        # Concurrent link checks
+LINK_RECHECK_HOURS = float(os.getenv("LINK_RECHECK_HOURS", "24"))     # Re-check links older than this
+BATCH_SIZE = 500
+CHUNK_SIZE = 20                                                       # Links per worker task (one Graph $batch)
+
+STATUSES = ("ok", "moved", "missing", "temporary")
+
+def log(message):
+    """Simple logging with timestamp"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+def pg_config(db):
+    return {
+        "host": os.getenv("PGHOST", "localhost"),
+        "port": int(os.getenv("PGPORT", "5432")),
+        "dbname": DATABASES[db],
+        "user": os.getenv("PGUSER"),
+        "password": os.getenv("PGPASSWORD", "")
+    }
+
+def ensure_table(conn):
+    """Create the link health table if needed"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS gh.link_health (
+                candidate_id    BIGINT NOT NULL,
+                link_type       TEXT NOT NULL,      -- 'resume' or 'metadata'
+                url             TEXT,               -- URL as stored when checked
+                status          TEXT NOT NULL,      -- ok / moved / missing / temporary
+                current_url     TEXT,               -- Replacement URL for moved / temporary links
+                checked_at      TIMESTAMPTZ DEFAULT NOW(),
+                PRIMARY KEY (candidate_id, link_type)
+            )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_link_health_status ON gh.link_health (status)")
+    conn.commit()
+
+def is_temporary(url):
+    """downloadUrls carry a short-lived tempauth token"""
+    return 'tempauth=' in url or 'download.aspx' in url
+
+def expected_path(db, candidate_id, filename, link_type):
+    """Where the linked file should be, relative to RESUME_FOLDER_PATH"""
+    if db == "sp":
+        local_file = get_resume_index().organized_path(candidate_id)
+        if not local_file or not LOCAL_RESUME_DIR:
+            return None
+        return os.path.relpath(local_file, LOCAL_RESUME_DIR).replace(os.sep, "/")
+
+    if not filename:
+        return None
+
+    if link_type == "metadata":
+        filename = f"{filename.rsplit('.', 1)[0]}_metadata.json"
+
+    return ai_access_layout.storage_path(candidate_id, filename)
+
+def check_links(links, graph_client):
+    """
+    Classify a chunk of links (worker task)
+
+    Args:
+        links: list of (candidate_id, link_type, url, expected_path)
+
+    Returns:
+        list: (candidate_id, link_type, url, status, current_url) per link
+    """
+    cache = graph_client.get_cache()
+    cached_urls = cache.lookup_urls([link[2] for link in links]) if cache else {}
+
+    # Expected files for everything the cache could not vouch for
+    lookups = [
+        i for i, (_, _, url, path) in enumerate(links)
+        if path and url not in cached_urls
+    ]
+    items = graph_client.find_files_by_paths([links[i][3] for i in lookups]) if lookups else []
+    expected_items = dict(zip(lookups, items))
+
+    results = []
+    for i, (candidate_id, link_type, url, path) in enumerate(links):
+        item = expected_items.get(i)
+        current_url = item.get("webUrl") if item else None
+
+        if is_temporary(url):
+            status = "temporary"
+        elif url in cached_urls or (current_url and current_url == url):
+            status = "ok"
+        elif current_url:
+            status = "moved"
+        elif graph_client.resolve_url(url):
+            # Not where we expected it, but the stored URL still opens a file
+            status = "ok"
+        else:
+            status = "missing"
+
+        results.append((
+            candidate_id, link_type, url, status,
+            current_url if status in ("moved", "temporary") else None
+        ))
+
+    return results
+
+def record_results(cur, results):
+    execute_values(cur, """
+        INSERT INTO gh.link_health (candidate_id, link_type, url, status, current_url, checked_at)
+        VALUES %s
+        ON CONFLICT (candidate_id, link_type) DO UPDATE SET
+            url = EXCLUDED.url,
+            status = EXCLUDED.status,
+            current_url = EXCLUDED.current_url,
+            checked_at = EXCLUDED.checked_at
+    """, results, template="(%s, %s, %s, %s, %s, NOW())", page_size=BATCH_SIZE)
+
+def stale_links_query(db):
+    """Keyset query: each candidate's links and whether each is due for a check"""
+    metadata_url = "c.metadata_url" if db == "ai" else "NULL::text"
+
+    return f"""
+        SELECT
+            c.candidate_id,
+            c.resume_links[1],
+            c.resume_filenames[1],
+            NULLIF({metadata_url}, ''),
+            NOT EXISTS (
+                SELECT 1 FROM gh.link_health h
+                WHERE h.candidate_id = c.candidate_id AND h.link_type = 'resume'
+                AND h.url = c.resume_links[1]
+                AND h.checked_at > NOW() - %(max_age_hours)s * INTERVAL '1 hour'
+            ) AS resume_due,
+            NOT EXISTS (
+                SELECT 1 FROM gh.link_health h
+                WHERE h.candidate_id = c.candidate_id AND h.link_type = 'metadata'
+                AND h.url = {metadata_url}
+                AND h.checked_at > NOW() - %(max_age_hours)s * INTERVAL '1 hour'
+            ) AS metadata_due
+        FROM gh.candidates c
+        WHERE {{keyset}}
+        ORDER BY c.candidate_id
+        LIMIT %(batch_size)s
+    """
+
+def show_report(conn, db):
+    """Print stored link health counts"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT link_type, status, COUNT(*), MIN(checked_at)
+            FROM gh.link_health
+            GROUP BY link_type, status
+            ORDER BY link_type, status
+        """)
+        rows = cur.fetchall()
+
+    log("="*60)
+    log(f"LINK HEALTH ({DATABASES[db]})")
+    log("="*60)
+    if not rows:
+        log("No links checked yet - run 'python validate_links.py'")
+    for link_type, status, count, oldest in rows:
+        log(f"{link_type:<10} {status:<10} {count:>8,}   oldest check: {oldest:%Y-%m-%d %H:%M}")
+    log("="*60)
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate stored SharePoint links')
+    parser.add_argument('--db', choices=sorted(DATABASES), default='ai',
+                        help='Database to validate (default: ai)')
+    parser.add_argument('--max-age-hours', type=float, default=LINK_RECHECK_HOURS,
+                        help=f'Re-check links last checked more than this long ago (default: {LINK_RECHECK_HOURS:g})')
+    parser.add_argument('--report', action='store_true', help='Show stored results without checking')
+    args = parser.parse_args()
+
+    with psycopg2.connect(**pg_config(args.db)) as conn:
+        ensure_table(conn)
+
+        if args.report:
+            show_report(conn, args.db)
+            return
+
+        log(f"Validating links in {DATABASES[args.db]} "
+            f"({LINK_CHECK_WORKERS} workers, re-check after {args.max_age_hours:g}h)")
+
+        try:
+            graph_client = GraphClient()
+            graph_client.get_site_info()
+        except Exception as e:
+            log(f"❌ Failed to connect to SharePoint: {e}")
+            sys.exit(1)
+
+        # Load shared state before workers start
+        graph_client.get_cache()
+        if args.db == "sp":
+            get_resume_index()
+
+        counts = {status: 0 for status in STATUSES}
+        started = time.time()
+        pending = []
+
+        def collect(future):
+            try:
+                results = future.result()
+            except Exception as e:
+                log(f"  ⚠️  Link check failed for a chunk ({e}); will retry next run")
+                return
+
+            for result in results:
+                counts[result[3]] += 1
+            pending.extend(results)
+
+            if len(pending) >= BATCH_SIZE:
+                with conn.cursor() as cur:
+                    record_results(cur, pending)
+                conn.commit()
+                pending.clear()
+
+        with ThreadPoolExecutor(max_workers=LINK_CHECK_WORKERS) as executor:
+            in_flight = deque()
+            links = []
+
+            def submit(chunk):
+                in_flight.append(executor.submit(check_links, chunk, graph_client))
+                while len(in_flight) >= LINK_CHECK_WORKERS * 2:
+                    collect(in_flight.popleft())
+
+            for rows in iter_keyset_batches(conn, stale_links_query(args.db),
+                                            {"max_age_hours": args.max_age_hours},
+                                            batch_size=BATCH_SIZE, key="c.candidate_id"):
+                for candidate_id, resume_url, resume_filename, metadata_url, resume_due, metadata_due in rows:
+                    if resume_url and resume_due:
+                        links.append((candidate_id, "resume", resume_url,
+                                      expected_path(args.db, candidate_id, resume_filename, "resume")))
+                    if metadata_url and metadata_due:
+                        links.append((candidate_id, "metadata", metadata_url,
+                                      expected_path(args.db, candidate_id, resume_filename, "metadata")))
+
+                while len(links) >= CHUNK_SIZE:
+                    submit(links[:CHUNK_SIZE])
+                    links = links[CHUNK_SIZE:]
+
+            if links:
+                submit(links)
+
+            while in_flight:
+                collect(in_flight.popleft())
+
+        if pending:
+            with conn.cursor() as cur:
+                record_results(cur, pending)
+            conn.commit()
+
+    checked = sum(counts.values())
+    elapsed = time.time() - started
+
+    log("="*60)
+    log("LINK VALIDATION SUMMARY")
+    log("="*60)
+    log(f"Links checked: {checked:,} in {elapsed:.0f}s ({checked / max(elapsed, 0.001):.1f}/s)")
+    log(f"✅ ok:        {counts['ok']:,}")
+    log(f"🔀 moved:     {counts['moved']:,}")
+    log(f"❌ missing:   {counts['missing']:,}")
+    log(f"⏳ temporary: {counts['temporary']:,}")
+    for line in graph_client.metrics_summary():
+        log(f"Graph {line}")
+    log("="*60)
+
+    if counts['moved'] or counts['temporary']:
+        log("Replacement URLs for moved/temporary links are in gh.link_health.current_url")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Resume Index Watcher
+
+Keeps the candidate -> file index (resume_index.py) current while OneDrive
+syncs and the downloader/AI_Access scripts write files. Create, rename and
+delete events under LOCAL_RESUME_DIR (including AI_Access/) are applied to the
+index as they happen, so mapper runs can start without any directory scan.
+
+Uses inotify on Linux (pip install inotify_simple). Anywhere else, or when
+inotify is unavailable, it falls back to polling with an incremental refresh.
+
+A heartbeat file (<index>.watch) records the watcher mode and how far the
+saved index lags behind the filesystem. get_resume_index() skips its own
+refresh while the heartbeat is fresh.
+
+Usage:
+    python watch_resume_index.py            # inotify if available, else polling
+    python watch_resume_index.py --poll     # Force polling mode
+    python watch_resume_index.py --status   # Show watcher status and lag
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+from datetime import datetime
+from dotenv import load_dotenv
+from resume_index import (
+    ResumeIndex, LOCAL_RESUME_DIR, WATCH_STATUS_PATH,
+    read_watch_status, watcher_is_live
+)
+
+try:
+    from inotify_simple import INotify, flags
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
+load_dotenv()
+
+# Configuration
+WATCH_POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", "30"))      # Seconds between polling scans
+WATCH_SAVE_INTERVAL = float(os.getenv("WATCH_SAVE_INTERVAL", "5"))       # Max seconds an event waits before save
+WATCH_HEARTBEAT_INTERVAL = float(os.getenv("WATCH_HEARTBEAT_INTERVAL", "10"))
+
+def log(message):
+    """Simple logging with timestamp"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+class IndexWatcher:
+    """Applies filesystem changes to a ResumeIndex and reports lag"""
+
+    def __init__(self, index, mode):
+        self.index = index
+        self.mode = mode
+        self.running = True
+        self.started_at = time.time()
+        self.events_applied = 0
+        self.oldest_unsaved_event = None   # When the oldest change not yet saved was seen
+        self.last_poll_started = None
+        self.last_save = time.time()
+        self.last_heartbeat = 0
+
+    # ------------------------------------------------------------------
+    # Lag / persistence
+    # ------------------------------------------------------------------
+
+    def lag_seconds(self):
+        """
+        How far the saved index may be behind the filesystem
+
+        inotify: age of the oldest change not yet written to disk.
+        polling: time since the last completed scan started - anything
+                 changed after that has not been seen yet.
+        """
+        now = time.time()
+
+        if self.mode == "polling":
+            return now - self.last_poll_started if self.last_poll_started else 0.0
+
+        return now - self.oldest_unsaved_event if self.oldest_unsaved_event else 0.0
+
+    def changed(self):
+        self.events_applied += 1
+        if self.oldest_unsaved_event is None:
+            self.oldest_unsaved_event = time.time()
+
+    def save_if_due(self, force=False):
+        now = time.time()
+
+        if self.index.dirty and (force or now - self.last_save >= WATCH_SAVE_INTERVAL):
+            self.index.save()
+            self.last_save = now
+            self.oldest_unsaved_event = None
+            self.write_heartbeat()
+        elif force or now - self.last_heartbeat >= WATCH_HEARTBEAT_INTERVAL:
+            self.write_heartbeat()
+
+    def write_heartbeat(self):
+        status = {
+            "pid": os.getpid(),
+            "root": self.index.root,
+            "mode": self.mode,
+            "started_at": self.started_at,
+            "heartbeat_at": time.time(),
+            "index_saved_at": self.index.updated_at,
+            "events_applied": self.events_applied,
+            "lag_seconds": round(self.lag_seconds(), 2),
+            "files_indexed": len(self.index.files)
+        }
+
+        tmp_path = f"{WATCH_STATUS_PATH}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(status, f, indent=2)
+        os.replace(tmp_path, WATCH_STATUS_PATH)
+
+        self.last_heartbeat = status["heartbeat_at"]
+
+    def stop(self, *_):
+        self.running = False
+
+    # ------------------------------------------------------------------
+    # Polling mode
+    # ------------------------------------------------------------------
+
+    def run_polling(self):
+        log(f"👀 Polling {self.index.root} every {WATCH_POLL_INTERVAL:g}s")
+
+        while self.running:
+            started = time.time()
+            rescanned = self.index.refresh()
+            self.last_poll_started = started
+
+            if rescanned:
+                self.events_applied += rescanned
+                log(f"🔄 Rescanned {rescanned:,} changed directories")
+
+            self.save_if_due(force=True)
+
+            # Sleep in short steps so signals stop us promptly
+            deadline = started + WATCH_POLL_INTERVAL
+            while self.running and time.time() < deadline:
+                time.sleep(min(1.0, max(0.0, deadline - time.time())))
+
+    # ------------------------------------------------------------------
+    # inotify mode
+    # ------------------------------------------------------------------
+
+    def run_inotify(self):
+        self.inotify = INotify()
+        self.watch_mask = (
+            flags.CREATE | flags.CLOSE_WRITE | flags.MOVED_TO |
+            flags.MOVED_FROM | flags.DELETE | flags.DELETE_SELF
+        )
+        self.wd_paths = {}
+
+        self.add_watches(self.index.root)
+        log(f"👀 Watching {len(self.wd_paths):,} directories under {self.index.root} (inotify)")
+
+        # Catch anything that changed between the initial refresh and the watches going live
+        if self.index.refresh():
+            self.changed()
+
+        while self.running:
+            for event in self.inotify.read(timeout=1000, read_delay=100):
+                self.handle_event(event)
+
+            self.save_if_due()
+
+    def add_watches(self, abs_dir):
+        """Watch a directory and all of its subdirectories"""
+        for root, dirs, _ in os.walk(abs_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            try:
+                wd = self.inotify.add_watch(root, self.watch_mask)
+                self.wd_paths[wd] = root
+            except OSError as e:
+                log(f"⚠️  Could not watch {root}: {e}")
+
+    def handle_event(self, event):
+        if event.mask & flags.Q_OVERFLOW:
+            # Kernel dropped events - fall back to an incremental refresh
+            log("⚠️  inotify queue overflow, refreshing index")
+            if self.index.refresh():
+                self.changed()
+            return
+
+        if event.mask & flags.IGNORED:
+            self.wd_paths.pop(event.wd, None)
+            return
+
+        parent = self.wd_paths.get(event.wd)
+        if parent is None or event.mask & flags.DELETE_SELF:
+            return
+
+        path = os.path.join(parent, event.name)
+
+        if event.mask & flags.ISDIR:
+            if event.name.startswith("."):
+                return
+
+            if event.mask & (flags.CREATE | flags.MOVED_TO):
+                self.add_watches(path)
+                self.index.rescan_tree(path)
+            else:
+                self.index.forget_tree(path)
+                # Moved-away directories keep their watches; drop them
+                prefix = path + os.sep
+                for wd, watched in list(self.wd_paths.items()):
+                    if watched == path or watched.startswith(prefix):
+                        try:
+                            self.inotify.rm_watch(wd)
+                        except OSError:
+                            pass
+                        self.wd_paths.pop(wd, None)
+            self.changed()
+            return
+
+        if event.mask & (flags.CREATE | flags.CLOSE_WRITE | flags.MOVED_TO):
+            if self.index.record_file(path):
+                self.changed()
+        elif event.mask & (flags.DELETE | flags.MOVED_FROM):
+            if self.index.forget_file(path):
+                self.changed()
+
+def show_status():
+    """Print watcher status and index lag"""
+    status = read_watch_status()
+
+    log("="*60)
+    log("RESUME INDEX WATCHER")
+    log("="*60)
+
+    if status is None:
+        log("❌ Watcher has never run (no heartbeat file)")
+    else:
+        state = "✅ running" if watcher_is_live(status) else "❌ stopped (stale heartbeat)"
+        log(f"State: {state}")
+        log(f"PID: {status.get('pid')}  Mode: {status.get('mode')}")
+        log(f"Last heartbeat: {status['age_seconds']:.0f}s ago")
+        log(f"Index saved at: {status.get('index_saved_at')}")
+        log(f"Index lag: {status.get('lag_seconds', 0):.1f}s")
+        log(f"Events applied: {status.get('events_applied', 0):,}")
+        log(f"Files indexed: {status.get('files_indexed', 0):,}")
+
+    log("="*60)
+
+def main():
+    if "--status" in sys.argv:
+        show_status()
+        return
+
+    if not LOCAL_RESUME_DIR or not os.path.exists(LOCAL_RESUME_DIR):
+        log(f"❌ Resume directory not found: {LOCAL_RESUME_DIR}")
+        sys.exit(1)
+
+    existing = read_watch_status()
+    if watcher_is_live(existing) and existing.get("pid") != os.getpid():
+        log(f"❌ Watcher already running (pid {existing.get('pid')})")
+        sys.exit(1)
+
+    use_inotify = INOTIFY_AVAILABLE and "--poll" not in sys.argv
+    if not use_inotify and "--poll" not in sys.argv:
+        log("⚠️  inotify_simple not installed, using polling fallback")
+
+    index = ResumeIndex()
+    if not index.load():
+        log("Building resume index (one-time full scan)...")
+        index.build()
+    else:
+        rescanned = index.refresh()
+        log(f"Loaded resume index ({rescanned:,} changed directories rescanned)")
+
+    watcher = IndexWatcher(index, "inotify" if use_inotify else "polling")
+    signal.signal(signal.SIGINT, watcher.stop)
+    signal.signal(signal.SIGTERM, watcher.stop)
+
+    watcher.save_if_due(force=True)
+
+    try:
+        if use_inotify:
+            watcher.run_inotify()
+        else:
+            watcher.run_polling()
+    finally:
+        if index.dirty:
+            index.save()
+        if os.path.exists(WATCH_STATUS_PATH):
+            os.remove(WATCH_STATUS_PATH)
+        log(f"🛑 Watcher stopped ({watcher.events_applied:,} changes applied)")
+
+if __name__ == "__main__":
+    main()
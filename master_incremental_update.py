@@ -148,6 +148,18 @@ def main():
     if not step_success:
         failed_steps.append("Step 3: Update AI_Access folder")
     
+    # =========================================================================
+    # STEP 3b: Refresh SharePoint drive item cache (Graph delta)
+    # =========================================================================
+    # Mappers resolve URLs from this cache; if it fails they fall back to Graph lookups
+    step_success = run_script(
+        "greenhouse_sharepoint_mapper/drive_item_cache.py",
+        "Step 3b: Sync SharePoint drive item cache (Graph delta)",
+        cwd=project_root
+    )
+    if not step_success:
+        failed_steps.append("Step 3b: Sync drive item cache")
+    
     # =========================================================================
     # STEP 4: Map SharePoint links for new resumes
     # =========================================================================
@@ -203,6 +215,18 @@ def main():
     if not step_success:
         failed_steps.append("Step 8: Update resume_content in Greenhouse")
     
+    # =========================================================================
+    # STEP 8b: Re-chunk resumes whose resume_content changed (gh.resume_chunks)
+    # =========================================================================
+    # Incremental: only candidates whose resume_content hash moved are re-chunked
+    step_success = run_script(
+        "greenhouse_sharepoint_mapper/resume_chunks.py",
+        "Step 8b: Update section-aware resume chunks",
+        cwd=project_root
+    )
+    if not step_success:
+        failed_steps.append("Step 8b: Update resume chunks")
+    
     # =========================================================================
     # STEP 9: Verify sync status
     # =========================================================================
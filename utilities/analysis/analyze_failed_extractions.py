@@ -1,328 +1,290 @@
 #!/usr/bin/env python3
 """
-Analyze candidates with failed text extraction to determine:
-1. File type distribution
-2. File integrity (size, readability)
-3. Potential recoverability (OCR candidates, corrupted files, etc.)
+Analyze failed text extractions from the recorded extraction outcomes
+
+Every parse through resume_extraction.iter_extracted() with an extraction
+cache leaves a row in gh.extraction_outcomes (source database): status,
+failure class, detected file type, backend, page count, bytes, characters and
+duration. This report is a handful of aggregate queries over those rows - no
+file is opened - covering:
+
+1. Coverage (candidates with resume files but no resume_content, AI database)
+2. Outcomes per file type
+3. Failure classes (missing, empty, unrecognized, corrupt, image-only PDF, ...)
+4. File size distribution of failures
+5. Latency percentiles per file type and backend
+6. Sample failures per class, with a candidate ID where known
+
+Files served from the extraction cache are not parsed, so files cached before
+outcomes were recorded have no row until they are parsed again (the next
+EXTRACTOR_VERSION bump or backend change).
+
+Usage:
+    python analyze_failed_extractions.py                    # Current extractor signature
+    python analyze_failed_extractions.py --all-extractors   # Every signature ever recorded
+    python analyze_failed_extractions.py --samples 25
 """
 
 import os
+import sys
+import argparse
 import psycopg2
 from pathlib import Path
 from dotenv import load_dotenv
-import json
-from collections import defaultdict
-import PyPDF2
-from docx import Document
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "greenhouse_sharepoint_mapper"))
+from resume_extraction import extractor_signature, FAILURE_CLASSES
 
 load_dotenv()
 
-def get_db_connection():
-    """Create database connection to AI Access database."""
-    return psycopg2.connect(
-        host=os.getenv('PGHOST', 'localhost'),
-        port=int(os.getenv('PGPORT', '5432')),
-        database='greenhouse_candidates_ai',
-        user=os.getenv('PGUSER'),
-        password=os.getenv('PGPASSWORD', '')
-    )
-
-def analyze_failed_extractions():
-    """Analyze candidates missing resume_content despite having resume files."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+SOURCE_PG = {
+    "host": os.getenv("PGHOST", "localhost"),
+    "port": int(os.getenv("PGPORT", "5432")),
+    "dbname": os.getenv("SOURCE_PGDATABASE", "greenhouse_candidates"),
+    "user": os.getenv("PGUSER"),
+    "password": os.getenv("PGPASSWORD", "")
+}
+
+AI_PG = dict(SOURCE_PG, dbname=os.getenv("PGDATABASE_AI", "greenhouse_candidates_ai"))
+
+SIZE_BUCKETS = """
+    CASE
+        WHEN size_bytes IS NULL THEN 'unknown'
+        WHEN size_bytes < 1024 THEN '0-1KB'
+        WHEN size_bytes < 10240 THEN '1-10KB'
+        WHEN size_bytes < 102400 THEN '10-100KB'
+        WHEN size_bytes < 1048576 THEN '100KB-1MB'
+        ELSE '1MB+'
+    END
+"""
+
+def pct(part, total):
+    return f"{part * 100 / total:.1f}%" if total else "-"
+
+def count_missing_content():
+    """Candidates with a resume file but no resume_content (None if the AI database is unreachable)"""
+    try:
+        with psycopg2.connect(**AI_PG) as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT
+                        COUNT(*) FILTER (WHERE array_length(resume_filenames, 1) > 0),
+                        COUNT(*) FILTER (WHERE array_length(resume_filenames, 1) > 0
+                                         AND (resume_content IS NULL OR resume_content = ''))
+                    FROM gh.candidates
+                """)
+                return cur.fetchone()
+    except Exception as e:
+        print(f"⚠️  Could not read coverage from {AI_PG['dbname']}: {e}")
+        return None
+
+def analyze_failed_extractions(extractor, samples):
+    """Print the report; extractor is a signature, or None for every signature"""
+    where = "extractor = %(extractor)s" if extractor else "TRUE"
+    params = {"extractor": extractor, "samples": samples}
+
     print("=" * 80)
     print("ANALYZING FAILED TEXT EXTRACTIONS")
     print("=" * 80)
+    print(f"Extractor: {extractor or 'all signatures'}")
     print()
-    
-    # Get candidates with resume_filename but no resume_content
-    cursor.execute("""
-        SELECT candidate_id, first_name, last_name, resume_filenames[1] as resume_filename, metadata_url
-        FROM gh.candidates
-        WHERE resume_filenames IS NOT NULL 
-        AND array_length(resume_filenames, 1) > 0
-        AND (resume_content IS NULL OR resume_content = '')
-        ORDER BY candidate_id
-    """)
-    
-    failed_candidates = cursor.fetchall()
-    total_failed = len(failed_candidates)
-    
-    print(f"📊 Found {total_failed:,} candidates with resume files but no resume_content")
-    print()
-    
-    if total_failed == 0:
-        print("✅ No failed extractions to analyze!")
-        cursor.close()
+
+    coverage = count_missing_content()
+    if coverage:
+        with_files, without_content = coverage
+        print(f"📊 {without_content:,} of {with_files:,} candidates with resume files have no resume_content "
+              f"({pct(without_content, with_files)})")
+        print()
+
+    conn = psycopg2.connect(**SOURCE_PG)
+    cur = conn.cursor()
+
+    cur.execute("SELECT to_regclass('gh.extraction_outcomes'), to_regclass('gh.extraction_state')")
+    outcomes_table, state_table = cur.fetchone()
+    if not outcomes_table:
+        print("No extraction outcomes recorded yet - they are written by create_ai_access_folder.py,")
+        print("the resume content sync and comprehensive_fix.py when the extraction cache is enabled")
         conn.close()
         return
-    
-    # Analysis variables
-    local_resume_dir = os.getenv('LOCAL_RESUME_DIR')
-    ai_access_folder = os.path.join(local_resume_dir, 'AI_Access')
-    file_stats = {
-        'total': total_failed,
-        'file_exists': 0,
-        'file_missing': 0,
-        'file_empty': 0,
-        'by_extension': defaultdict(int),
-        'by_size': {'0-1KB': 0, '1-10KB': 0, '10-100KB': 0, '100KB-1MB': 0, '1MB+': 0},
-        'pdf_analysis': {'total': 0, 'readable': 0, 'corrupted': 0, 'image_based': 0},
-        'docx_analysis': {'total': 0, 'readable': 0, 'corrupted': 0},
-        'has_metadata': 0,
-        'no_metadata': 0
-    }
-    
-    sample_issues = {
-        'corrupted_pdfs': [],
-        'image_pdfs': [],
-        'empty_files': [],
-        'missing_files': [],
-        'corrupted_docx': []
-    }
-    
-    print("Analyzing files...")
-    analyzed = 0
-    
-    for candidate_id, first_name, last_name, resume_filename, metadata_url in failed_candidates:
-        analyzed += 1
-        if analyzed % 500 == 0:
-            print(f"  Progress: {analyzed:,} / {total_failed:,} ({analyzed*100//total_failed}%)")
-        
-        # Check metadata
-        if metadata_url:
-            file_stats['has_metadata'] += 1
-        else:
-            file_stats['no_metadata'] += 1
-        
-        # Check if file exists
-        resume_path = os.path.join(ai_access_folder, resume_filename)
-        
-        if not os.path.exists(resume_path):
-            file_stats['file_missing'] += 1
-            if len(sample_issues['missing_files']) < 10:
-                sample_issues['missing_files'].append({
-                    'id': candidate_id,
-                    'name': f"{first_name} {last_name}",
-                    'filename': resume_filename
-                })
-            continue
-        
-        file_stats['file_exists'] += 1
-        
-        # Get file size
-        file_size = os.path.getsize(resume_path)
-        
-        if file_size == 0:
-            file_stats['file_empty'] += 1
-            if len(sample_issues['empty_files']) < 10:
-                sample_issues['empty_files'].append({
-                    'id': candidate_id,
-                    'name': f"{first_name} {last_name}",
-                    'filename': resume_filename
-                })
-            continue
-        
-        # Categorize by size
-        if file_size < 1024:
-            file_stats['by_size']['0-1KB'] += 1
-        elif file_size < 10240:
-            file_stats['by_size']['1-10KB'] += 1
-        elif file_size < 102400:
-            file_stats['by_size']['10-100KB'] += 1
-        elif file_size < 1048576:
-            file_stats['by_size']['100KB-1MB'] += 1
-        else:
-            file_stats['by_size']['1MB+'] += 1
-        
-        # Get file extension
-        ext = Path(resume_filename).suffix.lower()
-        file_stats['by_extension'][ext] += 1
-        
-        # Analyze PDF files
-        if ext == '.pdf':
-            file_stats['pdf_analysis']['total'] += 1
-            try:
-                with open(resume_path, 'rb') as f:
-                    pdf_reader = PyPDF2.PdfReader(f)
-                    num_pages = len(pdf_reader.pages)
-                    
-                    if num_pages > 0:
-                        # Try to extract text from first page
-                        first_page = pdf_reader.pages[0]
-                        text = first_page.extract_text().strip()
-                        
-                        if len(text) > 50:
-                            file_stats['pdf_analysis']['readable'] += 1
-                        else:
-                            # Likely image-based PDF
-                            file_stats['pdf_analysis']['image_based'] += 1
-                            if len(sample_issues['image_pdfs']) < 10:
-                                sample_issues['image_pdfs'].append({
-                                    'id': candidate_id,
-                                    'name': f"{first_name} {last_name}",
-                                    'filename': resume_filename,
-                                    'pages': num_pages,
-                                    'text_length': len(text)
-                                })
-                    else:
-                        file_stats['pdf_analysis']['corrupted'] += 1
-            except Exception as e:
-                file_stats['pdf_analysis']['corrupted'] += 1
-                if len(sample_issues['corrupted_pdfs']) < 10:
-                    sample_issues['corrupted_pdfs'].append({
-                        'id': candidate_id,
-                        'name': f"{first_name} {last_name}",
-                        'filename': resume_filename,
-                        'error': str(e)[:100]
-                    })
-        
-        # Analyze DOCX files
-        elif ext in ['.docx', '.doc']:
-            file_stats['docx_analysis']['total'] += 1
-            try:
-                doc = Document(resume_path)
-                text = '\n'.join([para.text for para in doc.paragraphs])
-                
-                if len(text.strip()) > 50:
-                    file_stats['docx_analysis']['readable'] += 1
-                else:
-                    file_stats['docx_analysis']['corrupted'] += 1
-            except Exception as e:
-                file_stats['docx_analysis']['corrupted'] += 1
-                if len(sample_issues['corrupted_docx']) < 10:
-                    sample_issues['corrupted_docx'].append({
-                        'id': candidate_id,
-                        'name': f"{first_name} {last_name}",
-                        'filename': resume_filename,
-                        'error': str(e)[:100]
-                    })
-    
-    print()
-    print("=" * 80)
-    print("ANALYSIS RESULTS")
-    print("=" * 80)
-    print()
-    
-    # File existence
-    print("📁 File Existence:")
-    print(f"  Files exist: {file_stats['file_exists']:,} ({file_stats['file_exists']*100//total_failed}%)")
-    print(f"  Files missing: {file_stats['file_missing']:,} ({file_stats['file_missing']*100//total_failed}%)")
-    print(f"  Files empty: {file_stats['file_empty']:,} ({file_stats['file_empty']*100//total_failed}%)")
-    print()
-    
-    # Metadata status
-    print("🔗 Metadata Status:")
-    print(f"  Has metadata_url: {file_stats['has_metadata']:,} ({file_stats['has_metadata']*100//total_failed}%)")
-    print(f"  No metadata_url: {file_stats['no_metadata']:,} ({file_stats['no_metadata']*100//total_failed}%)")
+
+    # Outcomes per file type
+    cur.execute(f"""
+        SELECT
+            COALESCE(file_type, 'unknown'),
+            COUNT(*),
+            COUNT(*) FILTER (WHERE status = 'ok'),
+            COUNT(*) FILTER (WHERE status = 'empty'),
+            COUNT(*) FILTER (WHERE status = 'error'),
+            COUNT(*) FILTER (WHERE status IN ('timeout', 'oom'))
+        FROM gh.extraction_outcomes
+        WHERE {where}
+        GROUP BY 1
+        ORDER BY 2 DESC
+    """, params)
+    by_type = cur.fetchall()
+    total = sum(row[1] for row in by_type)
+
+    if not total:
+        print("No outcomes recorded for this extractor signature (try --all-extractors)")
+        conn.close()
+        return
+
+    print(f"📄 Outcomes per file type ({total:,} files parsed):")
+    print(f"  {'Type':<8} {'Files':>9} {'OK':>9} {'Empty':>9} {'Error':>9} {'Killed':>9} {'Success':>9}")
+    for file_type, count, ok, empty, error, killed in by_type:
+        print(f"  {file_type:<8} {count:>9,} {ok:>9,} {empty:>9,} {error:>9,} {killed:>9,} {pct(ok, count):>9}")
     print()
-    
-    # File types
-    print("📄 File Type Distribution:")
-    for ext, count in sorted(file_stats['by_extension'].items(), key=lambda x: x[1], reverse=True):
-        pct = count * 100 // total_failed
-        print(f"  {ext}: {count:,} ({pct}%)")
+
+    # Failure classes
+    cur.execute(f"""
+        SELECT failure_class, COALESCE(file_type, '-'), COUNT(*), AVG(size_bytes), SUM(page_count)
+        FROM gh.extraction_outcomes
+        WHERE {where} AND failure_class IS NOT NULL
+        GROUP BY 1, 2
+        ORDER BY 3 DESC
+    """, params)
+    failures = cur.fetchall()
+    failed_total = sum(row[2] for row in failures)
+    by_class = {failure_class: 0 for failure_class in FAILURE_CLASSES}
+    image_only_pages = 0
+
+    print(f"❌ Failure classes ({failed_total:,} files, {pct(failed_total, total)} of parsed):")
+    for failure_class, file_type, count, avg_size, pages in failures:
+        by_class[failure_class] = by_class.get(failure_class, 0) + count
+        if failure_class == "image_only":
+            image_only_pages += pages or 0
+        avg_kb = f"{avg_size / 1024:,.0f} KB avg" if avg_size is not None else ""
+        print(f"  {failure_class:<14} {file_type:<6} {count:>9,} ({pct(count, failed_total):>6})  {avg_kb}")
     print()
-    
+
     # File sizes
-    print("📏 File Size Distribution:")
-    for size_range, count in file_stats['by_size'].items():
-        if count > 0:
-            pct = count * 100 // total_failed
-            print(f"  {size_range}: {count:,} ({pct}%)")
+    cur.execute(f"""
+        SELECT
+            {SIZE_BUCKETS} AS bucket,
+            COUNT(*) FILTER (WHERE status = 'ok'),
+            COUNT(*) FILTER (WHERE status <> 'ok')
+        FROM gh.extraction_outcomes
+        WHERE {where}
+        GROUP BY bucket
+        ORDER BY MIN(COALESCE(size_bytes, -1))
+    """, params)
+    print("📏 File size distribution:")
+    print(f"  {'Size':<10} {'OK':>9} {'Failed':>9} {'Fail rate':>10}")
+    for bucket, ok, failed in cur.fetchall():
+        print(f"  {bucket:<10} {ok:>9,} {failed:>9,} {pct(failed, ok + failed):>10}")
     print()
-    
-    # PDF analysis
-    if file_stats['pdf_analysis']['total'] > 0:
-        print("📕 PDF Analysis:")
-        pdf_total = file_stats['pdf_analysis']['total']
-        print(f"  Total PDFs: {pdf_total:,}")
-        print(f"  Readable (has text): {file_stats['pdf_analysis']['readable']:,} ({file_stats['pdf_analysis']['readable']*100//pdf_total}%)")
-        print(f"  Image-based (no text): {file_stats['pdf_analysis']['image_based']:,} ({file_stats['pdf_analysis']['image_based']*100//pdf_total}%)")
-        print(f"  Corrupted: {file_stats['pdf_analysis']['corrupted']:,} ({file_stats['pdf_analysis']['corrupted']*100//pdf_total}%)")
-        print()
-    
-    # DOCX analysis
-    if file_stats['docx_analysis']['total'] > 0:
-        print("📘 DOCX Analysis:")
-        docx_total = file_stats['docx_analysis']['total']
-        print(f"  Total DOCX: {docx_total:,}")
-        print(f"  Readable: {file_stats['docx_analysis']['readable']:,} ({file_stats['docx_analysis']['readable']*100//docx_total}%)")
-        print(f"  Corrupted: {file_stats['docx_analysis']['corrupted']:,} ({file_stats['docx_analysis']['corrupted']*100//docx_total}%)")
-        print()
-    
-    # Sample issues
-    print("=" * 80)
-    print("SAMPLE ISSUES (First 10 of each type)")
-    print("=" * 80)
+
+    # Latency per file type and backend (killed files count at the time they were killed)
+    cur.execute(f"""
+        SELECT
+            COALESCE(file_type, 'unknown'),
+            COALESCE(backend, '-'),
+            COUNT(*),
+            percentile_cont(ARRAY[0.5, 0.9, 0.99]) WITHIN GROUP (ORDER BY duration_ms),
+            MAX(duration_ms),
+            SUM(page_count)::float / NULLIF(SUM(duration_ms) FILTER (WHERE page_count IS NOT NULL), 0) * 1000
+        FROM gh.extraction_outcomes
+        WHERE {where} AND duration_ms IS NOT NULL
+        GROUP BY 1, 2
+        ORDER BY 3 DESC
+    """, params)
+    print("⏱️  Extraction latency (ms):")
+    print(f"  {'Type':<8} {'Backend':<16} {'Files':>9} {'p50':>8} {'p90':>8} {'p99':>8} {'Max':>9} {'Pages/s':>8}")
+    for file_type, backend, count, (p50, p90, p99), slowest, pages_per_second in cur.fetchall():
+        pages_rate = f"{pages_per_second:>8.1f}" if pages_per_second else f"{'-':>8}"
+        print(f"  {file_type:<8} {backend:<16} {count:>9,} {p50:>8.0f} {p90:>8.0f} {p99:>8.0f} "
+              f"{slowest:>9,} {pages_rate}")
     print()
-    
-    if sample_issues['missing_files']:
-        print("❌ Missing Files:")
-        for issue in sample_issues['missing_files']:
-            print(f"  ID {issue['id']}: {issue['name']} - {issue['filename']}")
-        print()
-    
-    if sample_issues['empty_files']:
-        print("⚠️  Empty Files:")
-        for issue in sample_issues['empty_files']:
-            print(f"  ID {issue['id']}: {issue['name']} - {issue['filename']}")
-        print()
-    
-    if sample_issues['image_pdfs']:
-        print("🖼️  Image-based PDFs (OCR candidates):")
-        for issue in sample_issues['image_pdfs']:
-            print(f"  ID {issue['id']}: {issue['name']} - {issue['filename']} ({issue['pages']} pages, {issue['text_length']} chars)")
-        print()
-    
-    if sample_issues['corrupted_pdfs']:
-        print("💔 Corrupted PDFs:")
-        for issue in sample_issues['corrupted_pdfs']:
-            print(f"  ID {issue['id']}: {issue['name']} - {issue['filename']}")
-            print(f"     Error: {issue['error']}")
-        print()
-    
-    if sample_issues['corrupted_docx']:
-        print("💔 Corrupted DOCX:")
-        for issue in sample_issues['corrupted_docx']:
-            print(f"  ID {issue['id']}: {issue['name']} - {issue['filename']}")
-            print(f"     Error: {issue['error']}")
+
+    # Samples per failure class
+    cur.execute(f"""
+        SELECT failure_class, content_hash, file_type, size_bytes, page_count, detail
+        FROM (
+            SELECT *, row_number() OVER (PARTITION BY failure_class ORDER BY extracted_at DESC) AS rank
+            FROM gh.extraction_outcomes
+            WHERE {where} AND failure_class IS NOT NULL
+        ) ranked
+        WHERE rank <= %(samples)s
+        ORDER BY failure_class, rank
+    """, params)
+    sample_rows = cur.fetchall()
+
+    candidates = {}
+    if state_table and sample_rows:
+        cur.execute("""
+            SELECT content_hash, MIN(candidate_id)
+            FROM gh.extraction_state
+            WHERE content_hash = ANY(%s)
+            GROUP BY content_hash
+        """, ([row[1] for row in sample_rows],))
+        candidates = dict(cur.fetchall())
+
+    if sample_rows:
+        print("=" * 80)
+        print(f"SAMPLE FAILURES (latest {samples} per class)")
+        print("=" * 80)
+        current_class = None
+        for failure_class, content_hash, file_type, size_bytes, pages, detail in sample_rows:
+            if failure_class != current_class:
+                if current_class:
+                    print()
+                print(f"{failure_class}:")
+                current_class = failure_class
+            who = f"ID {candidates[content_hash]}" if content_hash in candidates else f"sha {content_hash[:12]}"
+            size = f"{size_bytes:,} bytes" if size_bytes is not None else "size unknown"
+            page_info = f", {pages} pages" if pages else ""
+            print(f"  {who}: {file_type or '?'} {size}{page_info}")
+            if detail:
+                print(f"     {detail[:100]}")
         print()
-    
+
+    conn.close()
+
     # Recommendations
     print("=" * 80)
     print("RECOMMENDATIONS")
     print("=" * 80)
     print()
-    
-    ocr_candidates = file_stats['pdf_analysis']['image_based']
-    corrupted_total = (file_stats['pdf_analysis']['corrupted'] + 
-                      file_stats['docx_analysis']['corrupted'] + 
-                      file_stats['file_empty'] + 
-                      file_stats['file_missing'])
-    
-    if ocr_candidates > 0:
-        print(f"🔍 OCR Opportunity: {ocr_candidates:,} image-based PDFs could be processed with OCR")
-        print(f"   This would improve coverage by ~{ocr_candidates*100//total_failed}%")
+
+    if by_class["image_only"]:
+        print(f"🔍 OCR Opportunity: {by_class['image_only']:,} image-only PDFs ({image_only_pages:,} pages) "
+              f"could be processed with OCR")
+        print(f"   This would improve coverage by ~{pct(by_class['image_only'], total)} of parsed files")
+        print()
+
+    if by_class["no_backend"]:
+        print(f"📦 Missing backend: {by_class['no_backend']:,} files have a known type with no extraction library installed")
+        print("   See the optional backends in greenhouse_sharepoint_mapper/requirements.txt")
+        print()
+
+    killed = by_class["timeout"] + by_class["oom"]
+    if killed:
+        print(f"🐢 Slow lane: {killed:,} files hit the time or memory limit")
+        print("   Run: python greenhouse_sharepoint_mapper/resume_extraction.py --slow-lane")
         print()
-    
-    if corrupted_total > 0:
-        print(f"❌ Unrecoverable: {corrupted_total:,} files are corrupted, empty, or missing")
-        print(f"   These represent ~{corrupted_total*100//total_failed}% of failed extractions")
+
+    unrecoverable = sum(by_class[c] for c in ("missing", "empty_file", "unrecognized", "corrupt"))
+    if unrecoverable:
+        print(f"❌ Unrecoverable: {unrecoverable:,} files are missing, empty, not a document, or corrupted")
+        print(f"   These represent ~{pct(unrecoverable, failed_total)} of failed extractions")
         print()
-    
-    readable_but_failed = file_stats['pdf_analysis']['readable'] + file_stats['docx_analysis']['readable']
-    if readable_but_failed > 0:
-        print(f"⚠️  Unexpected: {readable_but_failed:,} files appear readable but extraction failed")
-        print(f"   These may need individual investigation")
+
+    if by_class["no_text"] or by_class["crash"]:
+        print(f"⚠️  Unexpected: {by_class['no_text']:,} files parsed with no text and {by_class['crash']:,} crashed a worker")
+        print("   These may need individual investigation")
         print()
-    
+
     print("=" * 80)
-    
-    cursor.close()
-    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Report on failed text extractions from recorded outcomes')
+    parser.add_argument('--extractor', help='Extractor signature to report on (default: the current one)')
+    parser.add_argument('--all-extractors', action='store_true', help='Report across every recorded signature')
+    parser.add_argument('--samples', type=int, default=10, help='Sample failures per class (default: 10)')
+    args = parser.parse_args()
+
+    extractor = None if args.all_extractors else (args.extractor or extractor_signature())
+    analyze_failed_extractions(extractor, args.samples)
 
 if __name__ == '__main__':
-    analyze_failed_extractions()
+    main()
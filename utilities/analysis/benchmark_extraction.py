@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark text extraction backends on a local resume corpus
+
+Runs every installed backend from resume_extraction.EXTRACTORS over the same
+files of its type and reports, per backend:
+
+    files/s, pages/s (PDF), characters/s, empty-result rate (errors count as
+    empty) and errors
+
+The corpus is fixed by sorting: the first --per-type files of each detected
+type under --corpus, so repeated runs (and runs on other machines with the
+same folder) compare like with like. Each file is read once up front so the
+OS cache is warm for every backend.
+
+Pick the fastest backend whose empty rate and output you are happy with, then
+set it with EXTRACTION_BACKENDS (e.g. "pdf=pymupdf").
+
+Usage:
+    python benchmark_extraction.py                                  # AI_Access folder, 200 files per type
+    python benchmark_extraction.py --corpus /path/to/resumes --per-type 500
+    python benchmark_extraction.py --backends pymupdf,pypdf2        # Only these backends
+    python benchmark_extraction.py --samples 3                      # Show the first characters per backend
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+from collections import defaultdict
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "greenhouse_sharepoint_mapper"))
+from resume_extraction import (
+    EXTRACTORS, SELECTED_BACKENDS, detect_file_type, extract_with,
+    PYMUPDF_AVAILABLE, PYPDF2_AVAILABLE
+)
+
+load_dotenv()
+
+LOCAL_RESUME_DIR = os.getenv("LOCAL_RESUME_DIR")
+DEFAULT_CORPUS = os.path.join(LOCAL_RESUME_DIR, "AI_Access") if LOCAL_RESUME_DIR else None
+SKIP_SUFFIXES = ("_metadata.json", ".json")
+
+def log(message):
+    """Simple logging with timestamp"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+def build_corpus(root, per_type):
+    """First per_type files of each detected type, in sorted path order"""
+    by_type = defaultdict(list)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.startswith(("_", ".")) or filename.endswith(SKIP_SUFFIXES):
+                continue
+            path = os.path.join(dirpath, filename)
+            file_type = detect_file_type(path)
+            if file_type and len(by_type[file_type]) < per_type:
+                by_type[file_type].append(path)
+    return by_type
+
+def count_pdf_pages(path):
+    """Page count, not timed (None if no PDF library can open it)"""
+    try:
+        if PYMUPDF_AVAILABLE:
+            import fitz
+            with fitz.open(path) as pdf:
+                return pdf.page_count
+        if PYPDF2_AVAILABLE:
+            import PyPDF2
+            with open(path, 'rb') as f:
+                return len(PyPDF2.PdfReader(f).pages)
+    except Exception:
+        pass
+    return None
+
+def run_backend(name, paths, samples):
+    """Extract every file with one backend; timing covers extraction only"""
+    chars = 0
+    empty = 0
+    errors = 0
+    elapsed = 0.0
+    previews = []
+
+    for path in paths:
+        started = time.perf_counter()
+        try:
+            text = extract_with(name, path)
+        except Exception:
+            text = None
+            errors += 1
+        elapsed += time.perf_counter() - started
+
+        if text:
+            chars += len(text)
+            if len(previews) < samples:
+                previews.append((Path(path).name, " ".join(text.split())[:120]))
+        else:
+            empty += 1
+
+    return {"seconds": elapsed, "chars": chars, "empty": empty, "errors": errors, "previews": previews}
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare text extraction backends on local resumes')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='Folder of resumes (default: LOCAL_RESUME_DIR/AI_Access)')
+    parser.add_argument('--per-type', type=int, default=200, help='Files per detected type (default: 200)')
+    parser.add_argument('--backends', help='Comma-separated backend names (default: all installed)')
+    parser.add_argument('--samples', type=int, default=0, help='Text previews to print per backend')
+    args = parser.parse_args()
+
+    if not args.corpus or not os.path.isdir(args.corpus):
+        log(f"❌ Corpus folder not found: {args.corpus}")
+        sys.exit(1)
+
+    wanted = set(args.backends.split(",")) if args.backends else None
+    unknown = (wanted or set()) - set(EXTRACTORS)
+    if unknown:
+        log(f"❌ Unknown backends: {', '.join(sorted(unknown))} (known: {', '.join(EXTRACTORS)})")
+        sys.exit(1)
+
+    log(f"Building corpus from {args.corpus} ({args.per_type} files per type)...")
+    corpus = build_corpus(args.corpus, args.per_type)
+    for file_type, paths in sorted(corpus.items()):
+        log(f"  {file_type:<5} {len(paths):>6,} files")
+
+    # Warm the OS cache so the first backend isn't charged for disk reads
+    for paths in corpus.values():
+        for path in paths:
+            with open(path, 'rb') as f:
+                while f.read(1024 * 1024):
+                    pass
+
+    pdf_pages = sum(count_pdf_pages(path) or 0 for path in corpus.get("pdf", []))
+
+    results = []
+    for name, (file_type, _, available, _) in EXTRACTORS.items():
+        if wanted and name not in wanted:
+            continue
+        paths = corpus.get(file_type)
+        if not paths:
+            continue
+        if not available:
+            log(f"⏭️  {name}: not installed")
+            continue
+
+        log(f"Running {name} on {len(paths):,} {file_type} files...")
+        result = run_backend(name, paths, args.samples)
+        result.update({"name": name, "type": file_type, "files": len(paths),
+                       "pages": pdf_pages if file_type == "pdf" else None})
+        results.append(result)
+
+    if not results:
+        log("❌ No installed backend matched the corpus")
+        sys.exit(1)
+
+    log("="*96)
+    log("EXTRACTION BACKEND BENCHMARK")
+    log("="*96)
+    log(f"{'Backend':<16} {'Type':<5} {'Files':>7} {'Seconds':>9} {'Files/s':>9} {'Pages/s':>9} "
+        f"{'Chars/s':>11} {'Empty':>7} {'Errors':>7}")
+    for r in results:
+        seconds = max(r["seconds"], 1e-9)
+        pages_rate = f"{r['pages'] / seconds:>9.1f}" if r["pages"] else f"{'-':>9}"
+        selected = " *" if SELECTED_BACKENDS.get(r["type"]) == r["name"] else ""
+        log(f"{r['name'] + selected:<16} {r['type']:<5} {r['files']:>7,} {r['seconds']:>9.2f} "
+            f"{r['files'] / seconds:>9.1f} {pages_rate} {r['chars'] / seconds:>11,.0f} "
+            f"{r['empty'] / r['files'] * 100:>6.1f}% {r['errors']:>7,}")
+    log("="*96)
+    log("* = backend currently selected (EXTRACTION_BACKENDS / defaults)")
+
+    if args.samples:
+        for r in results:
+            log("")
+            log(f"{r['name']}:")
+            for filename, preview in r["previews"]:
+                log(f"  {filename}: {preview}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark fetchall() vs server-side cursor streaming
+
+Builds a fixture table shaped like gh.candidates (id, name, raw JSONB payload)
+and scans it once per mode, each in its own subprocess so peak RSS is
+measured independently:
+
+    fetchall    cur.fetchall() then iterate (the old pattern)
+    stream      db_batches.stream_rows() with STREAM_ITERSIZE rows per round trip
+
+Usage:
+    python benchmark_streaming.py                       # 200k rows, ~4 KB raw each
+    python benchmark_streaming.py --rows 500000 --payload-kb 8
+    python benchmark_streaming.py --itersize 500        # Try a different batch size
+    python benchmark_streaming.py --drop                # Remove the fixture table
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import psycopg2
+from pathlib import Path
+from datetime import datetime
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "greenhouse_sharepoint_mapper"))
+from db_batches import stream_rows
+
+load_dotenv()
+
+PG = {
+    "host": os.getenv("PGHOST", "localhost"),
+    "port": int(os.getenv("PGPORT", "5432")),
+    "dbname": os.getenv("PGDATABASE_BENCH", "greenhouse_candidates"),
+    "user": os.getenv("PGUSER"),
+    "password": os.getenv("PGPASSWORD", "")
+}
+
+FIXTURE_TABLE = "gh.stream_benchmark_fixture"
+SCAN_QUERY = f"SELECT candidate_id, full_name, raw FROM {FIXTURE_TABLE} ORDER BY candidate_id"
+MODES = ("fetchall", "stream")
+
+def log(message):
+    """Simple logging with timestamp"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def build_fixture(conn, rows, payload_kb):
+    """Create the fixture table unless it already has the requested shape"""
+    with conn.cursor() as cur:
+        cur.execute("CREATE SCHEMA IF NOT EXISTS gh")
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {FIXTURE_TABLE} (
+                candidate_id    BIGINT PRIMARY KEY,
+                full_name       TEXT,
+                raw             JSONB
+            )
+        """)
+        cur.execute(f"SELECT COUNT(*), COALESCE(AVG(pg_column_size(raw)), 0) FROM {FIXTURE_TABLE}")
+        count, avg_size = cur.fetchone()
+
+        if count == rows and abs(avg_size / 1024 - payload_kb) < 1:
+            log(f"Fixture already present ({count:,} rows)")
+            return
+
+        log(f"Building fixture: {rows:,} rows with ~{payload_kb} KB raw each...")
+        cur.execute(f"TRUNCATE {FIXTURE_TABLE}")
+        # md5 chains are incompressible enough that TOAST doesn't shrink the payload away
+        cur.execute(f"""
+            INSERT INTO {FIXTURE_TABLE} (candidate_id, full_name, raw)
+            SELECT
+                g,
+                'Candidate ' || g,
+                jsonb_build_object(
+                    'id', g,
+                    'attachments', jsonb_build_array(jsonb_build_object(
+                        'type', 'resume', 'filename', g || '_resume.pdf',
+                        'url', 'https://example.invalid/' || md5(g::text)
+                    )),
+                    'notes', (
+                        SELECT string_agg(md5(g::text || ':' || n), '')
+                        FROM generate_series(1, %(chunks)s) n
+                    )
+                )
+            FROM generate_series(1, %(rows)s) g
+        """, {"rows": rows, "chunks": max(1, payload_kb * 1024 // 32)})
+    conn.commit()
+    log("✅ Fixture built")
+
+def run_scan(mode, itersize):
+    """Scan the fixture once and print a JSON result line (runs in a subprocess)"""
+    started = time.time()
+    rows = 0
+    payload_bytes = 0
+
+    with psycopg2.connect(**PG) as conn:
+        if mode == "fetchall":
+            with conn.cursor() as cur:
+                cur.execute(SCAN_QUERY)
+                result = cur.fetchall()
+            for candidate_id, full_name, raw in result:
+                rows += 1
+                payload_bytes += len(raw.get("notes", ""))
+        else:
+            for candidate_id, full_name, raw in stream_rows(conn, SCAN_QUERY, itersize=itersize):
+                rows += 1
+                payload_bytes += len(raw.get("notes", ""))
+
+    print(json.dumps({
+        "mode": mode,
+        "rows": rows,
+        "payload_mb": payload_bytes / (1024 * 1024),
+        "seconds": time.time() - started,
+        "peak_rss_mb": peak_rss_mb()
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare peak memory of fetchall() and streamed scans')
+    parser.add_argument('--rows', type=int, default=200000, help='Fixture rows (default: 200000)')
+    parser.add_argument('--payload-kb', type=int, default=4, help='Approximate raw JSONB size per row (default: 4)')
+    parser.add_argument('--itersize', type=int, default=None, help='Rows per round trip when streaming (default: STREAM_ITERSIZE)')
+    parser.add_argument('--drop', action='store_true', help='Drop the fixture table and exit')
+    parser.add_argument('--run', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_scan(args.run, args.itersize)
+        return
+
+    with psycopg2.connect(**PG) as conn:
+        if args.drop:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {FIXTURE_TABLE}")
+            conn.commit()
+            log(f"🗑️  Dropped {FIXTURE_TABLE}")
+            return
+
+        build_fixture(conn, args.rows, args.payload_kb)
+
+    results = []
+    for mode in MODES:
+        log(f"Scanning with {mode}...")
+        command = [sys.executable, __file__, "--run", mode]
+        if args.itersize:
+            command += ["--itersize", str(args.itersize)]
+        output = subprocess.run(command, capture_output=True, text=True)
+        if output.returncode != 0:
+            log(f"❌ {mode} scan failed:\n{output.stderr}")
+            sys.exit(1)
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    log("="*60)
+    log(f"STREAMING BENCHMARK ({PG['dbname']}, {results[0]['rows']:,} rows, "
+        f"{results[0]['payload_mb']:,.0f} MB of raw payload)")
+    log("="*60)
+    log(f"{'Mode':<10} {'Seconds':>10} {'Peak RSS (MB)':>15}")
+    for result in results:
+        log(f"{result['mode']:<10} {result['seconds']:>10.1f} {result['peak_rss_mb']:>15.1f}")
+    log("="*60)
+
+if __name__ == "__main__":
+    main()
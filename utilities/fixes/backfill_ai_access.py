@@ -10,6 +10,10 @@ but are missing from greenhouse_candidates_ai (AI Access), then:
 4. Inserts candidates into AI Access database
 
 This is a one-time backfill to sync the databases.
+
+Candidates Greenhouse has no resume attachment for are recorded in the
+negative lookup cache (shared with update_missing_resumes.py) and not fetched
+again until the TTL expires or their updated_at changes.
 """
 
 import os
@@ -22,7 +26,10 @@ import time
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
-from graph_client import GraphClient
+from graph_client import GraphClient, SHAREPOINT_DIRECT_UPLOAD, UPLOAD_CONCURRENCY
+from resume_index import get_resume_index
+from negative_cache import NegativeCache, fingerprint
+import ai_access_layout
 
 # Add resume downloader utilities
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'greenhouse_resume_downloader'))
@@ -160,17 +167,8 @@ def download_resume(url, save_path):
         return 0, str(e)
 
 def find_resume_in_organized_folders(candidate_id):
-    """Find resume in the organized year/month folders"""
-    for root, dirs, files in os.walk(LOCAL_RESUME_DIR):
-        # Skip AI_Access folder
-        if 'AI_Access' in root:
-            continue
-        
-        for file in files:
-            if file.startswith(f"{candidate_id}_") and not file.startswith("FAILED_"):
-                return os.path.join(root, file)
-    
-    return None
+    """Find resume in the organized year/month folders (via the resume index)"""
+    return get_resume_index().organized_path(candidate_id)
 
 def copy_to_ai_access(source_path, candidate_id, full_name, created_at):
     """Copy resume to AI_Access folder with standardized naming"""
@@ -182,7 +180,7 @@ def copy_to_ai_access(source_path, candidate_id, full_name, created_at):
     
     # Build target filename
     filename = build_filename(candidate_id, full_name, created_at, ext)
-    dest_path = os.path.join(AI_ACCESS_DIR, filename)
+    dest_path = ai_access_layout.local_ai_access_path(candidate_id, filename, create_dir=True)
     
     # Copy if doesn't exist or is different size
     if not os.path.exists(dest_path) or os.path.getsize(source_path) != os.path.getsize(dest_path):
@@ -191,6 +189,7 @@ def copy_to_ai_access(source_path, candidate_id, full_name, created_at):
         for attempt in range(max_retries):
             try:
                 shutil.copy2(source_path, dest_path)
+                get_resume_index().record_file(dest_path)
                 return filename
             except (TimeoutError, OSError) as e:
                 if attempt < max_retries - 1:
@@ -207,7 +206,7 @@ def copy_to_ai_access(source_path, candidate_id, full_name, created_at):
 def get_sharepoint_url(graph_client, filename):
     """Get SharePoint URL for file in AI_Access folder"""
     try:
-        relative_path = f"AI_Access/{filename}"
+        relative_path = ai_access_layout.storage_path_for_filename(filename)
         file_info = graph_client.find_file_by_path(relative_path)
         
         if file_info and '@microsoft.graph.downloadUrl' in file_info:
@@ -217,6 +216,24 @@ def get_sharepoint_url(graph_client, filename):
     
     return None
 
+def insert_candidate(cur_ai, row, ai_url, ai_filename):
+    """Insert a candidate into the AI Access database (with or without a resume)"""
+    candidate_id, full_name, first_name, last_name, email, phone_numbers, created_at = row
+    cur_ai.execute("""
+        INSERT INTO gh.candidates (
+            candidate_id, full_name, first_name, last_name,
+            email, phone_numbers, created_at,
+            resume_links, resume_filenames
+        )
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (candidate_id) DO NOTHING
+    """, (
+        candidate_id, full_name, first_name, last_name,
+        email, phone_numbers, created_at,
+        [ai_url] if ai_url else None,
+        [ai_filename] if ai_filename else None
+    ))
+
 def main():
     log("="*70)
     log("AI ACCESS DATABASE BACKFILL")
@@ -264,7 +281,36 @@ def main():
     resume_downloaded = 0
     resume_copied = 0
     no_resume = 0
+    known_no_resume = 0
     failed = 0
+    upload_failed = 0
+    pending_uploads = []   # (row, ai_filename, future)
+    negative_cache = NegativeCache("greenhouse_resume")
+    
+    if SHAREPOINT_DIRECT_UPLOAD:
+        log(f"📤 Direct upload enabled ({UPLOAD_CONCURRENCY} concurrent uploads)")
+    
+    def flush_uploads():
+        """Wait for queued uploads and insert their candidates with the returned webUrl"""
+        nonlocal success_count, failed, upload_failed
+        
+        for pending_row, pending_filename, future in pending_uploads:
+            try:
+                pending_url = future.result().get('webUrl')
+            except Exception as e:
+                log(f"  ⚠️  Upload failed for {pending_filename}: {e}")
+                pending_url = None
+                upload_failed += 1
+            
+            try:
+                insert_candidate(cur_ai, pending_row, pending_url, pending_filename)
+                success_count += 1
+            except Exception as e:
+                log(f"  ❌ Failed to insert {pending_row[0]}: {e}")
+                failed += 1
+        
+        pending_uploads.clear()
+        conn_ai.commit()
     
     for idx, candidate_id in enumerate(missing_ids, 1):
         if idx % 100 == 0:
@@ -273,7 +319,7 @@ def main():
         # Get candidate data from dbBuilder
         cur_db.execute("""
             SELECT candidate_id, full_name, first_name, last_name, 
-                   email, phone_numbers, created_at
+                   email, phone_numbers, created_at, updated_at
             FROM gh.candidates
             WHERE candidate_id = %s
         """, (candidate_id,))
@@ -282,13 +328,21 @@ def main():
         if not row:
             continue
         
+        # updated_at only keys the negative cache; the insert takes the rest
+        row, updated_at = row[:-1], row[-1]
         candidate_id, full_name, first_name, last_name, email, phone_numbers, created_at = row
+        candidate_key = fingerprint(updated_at)
         
         # Check if resume already downloaded
         resume_path = find_resume_in_organized_folders(candidate_id)
         
-        # If not downloaded, fetch FRESH data from Greenhouse API and download
-        if not resume_path:
+        if resume_path:
+            negative_cache.record_hit(candidate_id)
+        elif negative_cache.is_known_miss(candidate_id, candidate_key):
+            # Greenhouse had no resume last time and the candidate hasn't changed since
+            known_no_resume += 1
+        else:
+            # Not downloaded: fetch FRESH data from Greenhouse API and download
             fresh_data = get_fresh_candidate_data(candidate_id)
             
             if fresh_data:
@@ -317,6 +371,7 @@ def main():
                         
                         if not error:
                             resume_path = temp_path
+                            get_resume_index().record_file(temp_path)
                             resume_downloaded += 1
                             
                             # Record in audit table (skip if columns don't exist)
@@ -334,6 +389,8 @@ def main():
                         # Skip download errors (likely expired URLs) and continue
                         if '403' not in str(e):  # Only log non-403 errors
                             log(f"  ⚠️  Failed to download resume for {candidate_id}: {e}")
+                elif not best_resume:
+                    negative_cache.record_miss(candidate_id, candidate_key, "no resume attachment")
         
         # Copy to AI_Access if we have a resume
         ai_filename = None
@@ -342,6 +399,20 @@ def main():
         if resume_path:
             ai_filename = copy_to_ai_access(resume_path, candidate_id, full_name, created_at)
             
+            if ai_filename and SHAREPOINT_DIRECT_UPLOAD:
+                resume_copied += 1
+                
+                # Upload directly; the candidate is inserted once the webUrl is back
+                future = graph_client.submit_upload(
+                    ai_access_layout.local_ai_access_path(candidate_id, ai_filename),
+                    ai_access_layout.storage_path_for_filename(ai_filename)
+                )
+                pending_uploads.append((row, ai_filename, future))
+                
+                if len(pending_uploads) >= UPLOAD_CONCURRENCY * 4:
+                    flush_uploads()
+                continue
+            
             if ai_filename:
                 resume_copied += 1
                 
@@ -355,21 +426,7 @@ def main():
         
         # Insert ALL candidates into AI Access database (with or without resumes)
         try:
-            cur_ai.execute("""
-                INSERT INTO gh.candidates (
-                    candidate_id, full_name, first_name, last_name,
-                    email, phone_numbers, created_at,
-                    resume_links, resume_filenames
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (candidate_id) DO NOTHING
-            """, (
-                candidate_id, full_name, first_name, last_name,
-                email, phone_numbers, created_at,
-                [ai_url] if ai_url else None,
-                [ai_filename] if ai_filename else None
-            ))
-            
+            insert_candidate(cur_ai, row, ai_url, ai_filename)
             success_count += 1
             
             if success_count % 50 == 0:
@@ -384,7 +441,13 @@ def main():
             no_resume += 1
     
     # Final commit
+    flush_uploads()
     conn_ai.commit()
+    negative_cache.close()
+    
+    resume_index = get_resume_index()
+    if resume_index.dirty:
+        resume_index.save()
     
     # Summary
     log("\n" + "="*70)
@@ -395,7 +458,11 @@ def main():
     log(f"Resumes downloaded: {resume_downloaded:,}")
     log(f"Resumes copied to AI_Access: {resume_copied:,}")
     log(f"No resume available: {no_resume:,}")
+    log(f"  - Skipped Greenhouse fetch (known no-resume): {known_no_resume:,}")
     log(f"Failed: {failed:,}")
+    if SHAREPOINT_DIRECT_UPLOAD:
+        log(f"Uploads failed (inserted without URL): {upload_failed:,}")
+    log(negative_cache.summary())
     log("="*70)
     
     # Verify final counts
@@ -17,15 +17,15 @@ from pathlib import Path
 import sys
 
 # Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "greenhouse_sharepoint_mapper"))
 from graph_client import GraphClient
+from resume_index import get_resume_index
+from resume_extraction import iter_extracted, ExtractionCache, EXTRACTION_WORKERS
+import ai_access_layout
 
 load_dotenv()
 
 # Configuration
-LOCAL_RESUME_DIR = os.getenv("LOCAL_RESUME_DIR")
-AI_ACCESS_DIR = os.path.join(LOCAL_RESUME_DIR, "AI_Access")
-
 PG_AI = {
     "host": os.getenv("PGHOST", "localhost"),
     "port": int(os.getenv("PGPORT", "5432")),
@@ -39,39 +39,6 @@ def log(message):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {message}")
 
-def extract_text_from_pdf(pdf_path):
-    """Extract text from PDF file"""
-    try:
-        from PyPDF2 import PdfReader
-        reader = PdfReader(pdf_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
-    except Exception as e:
-        return None
-
-def extract_text_from_docx(docx_path):
-    """Extract text from DOCX file"""
-    try:
-        from docx import Document
-        doc = Document(docx_path)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text.strip()
-    except Exception as e:
-        return None
-
-def extract_text_from_file(file_path):
-    """Extract text from resume file based on extension"""
-    ext = Path(file_path).suffix.lower()
-    
-    if ext == '.pdf':
-        return extract_text_from_pdf(file_path)
-    elif ext in ['.docx', '.doc']:
-        return extract_text_from_docx(file_path)
-    else:
-        return None
-
 def fix_metadata_urls(graph_client, conn):
     """Map metadata_url for all candidates with metadata files but no URL"""
     log("="*70)
@@ -109,11 +76,7 @@ def fix_metadata_urls(graph_client, conn):
             log(f"  Progress: {i:,} / {len(candidates):,} ({i/len(candidates)*100:.1f}%)")
         
         # Find metadata file
-        metadata_file = None
-        for file in os.listdir(AI_ACCESS_DIR):
-            if file.startswith(f"{cid}_") and file.endswith("_metadata.json"):
-                metadata_file = os.path.join(AI_ACCESS_DIR, file)
-                break
+        metadata_file = get_resume_index().metadata_path(cid)
         
         if not metadata_file or not os.path.exists(metadata_file):
             no_file += 1
@@ -187,11 +150,7 @@ def sync_resume_content_from_metadata(conn):
             log(f"  Progress: {i:,} / {len(candidates):,} ({i/len(candidates)*100:.1f}%)")
         
         # Find metadata file
-        metadata_file = None
-        for file in os.listdir(AI_ACCESS_DIR):
-            if file.startswith(f"{cid}_") and file.endswith("_metadata.json"):
-                metadata_file = os.path.join(AI_ACCESS_DIR, file)
-                break
+        metadata_file = get_resume_index().metadata_path(cid)
         
         if not metadata_file or not os.path.exists(metadata_file):
             no_file += 1
@@ -263,25 +222,35 @@ def re_extract_text_for_empty_metadata(conn):
     no_file = 0
     failed = 0
     
-    for i, (cid, name, resume_filename) in enumerate(candidates, 1):
-        if i % 100 == 0:
-            log(f"  Progress: {i:,} / {len(candidates):,} ({i/len(candidates)*100:.1f}%)")
-        
-        if not resume_filename:
-            no_file += 1
-            continue
-        
-        # Find resume file in AI_Access
-        resume_path = os.path.join(AI_ACCESS_DIR, resume_filename)
-        
-        if not os.path.exists(resume_path):
-            no_file += 1
-            continue
+    def resume_files():
+        """(candidate_id, resume_path) for candidates whose file is present"""
+        nonlocal no_file
         
-        # Extract text
-        try:
-            text = extract_text_from_file(resume_path)
+        for i, (cid, name, resume_filename) in enumerate(candidates, 1):
+            if i % 100 == 0:
+                log(f"  Progress: {i:,} / {len(candidates):,} ({i/len(candidates)*100:.1f}%)")
             
+            if not resume_filename:
+                no_file += 1
+                continue
+            
+            # Find resume file in AI_Access (flat or sharded)
+            resume_path = ai_access_layout.local_ai_access_path(cid, resume_filename)
+            
+            if not os.path.exists(resume_path):
+                no_file += 1
+                continue
+            
+            yield cid, resume_path
+    
+    # Text is extracted in worker processes (or served from the extraction cache);
+    # database and metadata writes stay here
+    log(f"Extracting with {EXTRACTION_WORKERS} worker processes")
+    extraction_cache = ExtractionCache()
+    
+    for (cid, resume_path), text, error in iter_extracted(
+            resume_files(), path_of=lambda job: job[1], cache=extraction_cache):
+        try:
             if text:
                 # Update database
                 cur.execute("""
@@ -292,19 +261,17 @@ def re_extract_text_for_empty_metadata(conn):
                 extracted += 1
                 
                 # Also update metadata file
-                for file in os.listdir(AI_ACCESS_DIR):
-                    if file.startswith(f"{cid}_") and file.endswith("_metadata.json"):
-                        metadata_file = os.path.join(AI_ACCESS_DIR, file)
-                        try:
-                            with open(metadata_file, 'r', encoding='utf-8') as f:
-                                metadata = json.load(f)
-                            metadata['text_content'] = text
-                            metadata['text_extracted'] = True
-                            with open(metadata_file, 'w', encoding='utf-8') as f:
-                                json.dump(metadata, f, indent=2)
-                        except:
-                            pass
-                        break
+                metadata_file = get_resume_index().metadata_path(cid)
+                if metadata_file:
+                    try:
+                        with open(metadata_file, 'r', encoding='utf-8') as f:
+                            metadata = json.load(f)
+                        metadata['text_content'] = text
+                        metadata['text_extracted'] = True
+                        with open(metadata_file, 'w', encoding='utf-8') as f:
+                            json.dump(metadata, f, indent=2)
+                    except:
+                        pass
                 
                 if extracted % 100 == 0:
                     conn.commit()
@@ -315,10 +282,12 @@ def re_extract_text_for_empty_metadata(conn):
             continue
     
     conn.commit()
+    extraction_cache.close()
     
     log("")
     log(f"✅ Extracted text for {extracted:,} candidates")
     log(f"⚠️  No resume file: {no_file:,}")
+    log(extraction_cache.summary())
     log(f"❌ Failed extraction: {failed:,}")
     log("")
     
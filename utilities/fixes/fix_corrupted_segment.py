@@ -11,12 +11,18 @@ The fix: Truncate resume_content to a reasonable size (100KB) while preserving a
 """
 
 import os
+import re
 import sys
 import csv
 import psycopg2
+from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
 
+# Shared keyset pagination helper
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "greenhouse_sharepoint_mapper"))
+from db_batches import iter_keyset_batches
+
 # Increase CSV field size limit
 csv.field_size_limit(10 * 1024 * 1024)  # 10MB limit
 
@@ -35,6 +41,47 @@ def get_segment_range(segment_num, total_segments, total_candidates):
     
     return start_idx, end_idx
 
+def read_manifest_id_range(output_dir, segment_num):
+    """Candidate ID range for a segment from the export's _manifest.txt, if present"""
+    manifest_path = os.path.join(output_dir, "_manifest.txt")
+    if not os.path.exists(manifest_path):
+        return None
+    
+    pattern = re.compile(rf"^segment_{segment_num:03d}_of_\d+\S*\s.*IDs: (\d+) to (\d+)")
+    with open(manifest_path, 'r') as f:
+        for line in f:
+            match = pattern.match(line)
+            if match:
+                return int(match.group(1)), int(match.group(2))
+    
+    return None
+
+def find_id_range(conn, start_idx, end_idx):
+    """
+    First and last candidate_id at positions [start_idx, end_idx)
+    
+    Walks the ID column with keyset batches instead of OFFSET, so only the
+    (narrow) key index is read.
+    """
+    first_id = last_id = None
+    position = 0
+    
+    for rows in iter_keyset_batches(conn, """
+        SELECT candidate_id FROM gh.candidates
+        WHERE {keyset}
+        ORDER BY candidate_id
+        LIMIT %(batch_size)s
+    """, batch_size=10000):
+        for (candidate_id,) in rows:
+            if position == start_idx:
+                first_id = candidate_id
+            if position == end_idx - 1:
+                return first_id, candidate_id
+            position += 1
+            last_id = candidate_id
+    
+    return first_id, last_id
+
 def truncate_resume_content(content, max_length=100000):
     """Truncate resume content to a reasonable size"""
     if content and len(content) > max_length:
@@ -64,11 +111,23 @@ def regenerate_segment(segment_num, output_dir):
         
         # Determine segment range (assuming 27 segments based on your export)
         total_segments = 27
-        start_idx, end_idx = get_segment_range(segment_num, total_segments, total_candidates)
         
         print(f"Total candidates: {total_candidates:,}")
-        print(f"Segment range: {start_idx:,} to {end_idx:,}")
-        print(f"Candidates in segment: {end_idx - start_idx:,}")
+        
+        # Prefer the exact ID range recorded by the exporter
+        id_range = read_manifest_id_range(output_dir, segment_num)
+        if id_range:
+            print(f"Segment ID range (from manifest): {id_range[0]} to {id_range[1]}")
+        else:
+            start_idx, end_idx = get_segment_range(segment_num, total_segments, total_candidates)
+            print(f"Segment range: {start_idx:,} to {end_idx:,}")
+            print(f"Candidates in segment: {end_idx - start_idx:,}")
+            id_range = find_id_range(conn, start_idx, end_idx)
+            print(f"Segment ID range: {id_range[0]} to {id_range[1]}")
+        
+        if id_range[0] is None:
+            print("No candidates in this segment")
+            return None
         
         # Query for this segment's candidates
         query = """
@@ -91,12 +150,12 @@ def regenerate_segment(segment_num, output_dir):
                 created_at,
                 updated_at
             FROM gh.candidates
+            WHERE candidate_id <= %(last_id)s
+            AND {keyset}
             ORDER BY candidate_id
-            OFFSET %s LIMIT %s
+            LIMIT %(batch_size)s
         """
         
-        cursor.execute(query, (start_idx, end_idx - start_idx))
-        
         # Create output filename
         timestamp = datetime.now().strftime("%Y.%m.%d_%H.%M.%S")
         output_file = os.path.join(output_dir, f"segment_{segment_num:03d}_of_{total_segments:03d}_full_FIXED.csv")
@@ -119,7 +178,14 @@ def regenerate_segment(segment_num, output_dir):
             row_count = 0
             truncated_count = 0
             
-            for row in cursor:
+            rows = (
+                row
+                for batch in iter_keyset_batches(conn, query, {"last_id": id_range[1]},
+                                                 batch_size=1000, start_after=id_range[0] - 1)
+                for row in batch
+            )
+            
+            for row in rows:
                 # Truncate resume_content if too long and clean data
                 row_list = list(row)
                 
@@ -20,6 +20,8 @@ from dotenv import load_dotenv
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "greenhouse_sharepoint_mapper"))
 from graph_client import GraphClient
+from db_batches import stream_rows
+import ai_access_layout
 
 load_dotenv()
 
@@ -66,49 +68,39 @@ def has_tempauth_token(url):
         return False
     return 'tempauth=' in url or 'download.aspx' in url
 
-def get_permanent_url(graph_client, filename):
-    """Get permanent webUrl for a file"""
+def get_permanent_urls(graph_client, filenames):
+    """Get permanent webUrls for files (batched Graph lookups, input order)"""
     try:
-        relative_path = f"AI_Access/{filename}"
-        file_info = graph_client.find_file_by_path(relative_path)
-        
-        if file_info and 'webUrl' in file_info:
-            return file_info['webUrl']
+        relative_paths = [ai_access_layout.storage_path_for_filename(f) for f in filenames]
+        return graph_client.get_web_urls_by_paths(relative_paths)
     except Exception as e:
-        log(f"Error getting URL for {filename}: {e}", "ERROR")
+        log(f"Error looking up URLs: {e}", "ERROR")
     
-    return None
+    return [None] * len(filenames)
 
 def find_candidates_with_temp_links():
     """Find all candidates with temporary download links"""
     log("Scanning database for temporary SharePoint links...", "STEP")
     
     conn = psycopg2.connect(**PG)
-    cur = conn.cursor()
+    temp_link_candidates = []
     
-    cur.execute("""
-        SELECT candidate_id, full_name, resume_links, resume_filenames
+    # Streamed: only the first link/filename per candidate, never the whole table at once
+    for candidate_id, full_name, url, filename in stream_rows(conn, """
+        SELECT candidate_id, full_name, resume_links[1], resume_filenames[1]
         FROM gh.candidates
         WHERE resume_links IS NOT NULL 
         AND array_length(resume_links, 1) > 0
         ORDER BY candidate_id
-    """)
-    
-    candidates = cur.fetchall()
-    temp_link_candidates = []
-    
-    for candidate_id, full_name, resume_links, resume_filenames in candidates:
-        if resume_links and len(resume_links) > 0:
-            url = resume_links[0]
-            if has_tempauth_token(url):
-                temp_link_candidates.append({
-                    'candidate_id': candidate_id,
-                    'full_name': full_name,
-                    'old_url': url,
-                    'filename': resume_filenames[0] if resume_filenames else None
-                })
+    """):
+        if has_tempauth_token(url):
+            temp_link_candidates.append({
+                'candidate_id': candidate_id,
+                'full_name': full_name,
+                'old_url': url,
+                'filename': filename
+            })
     
-    cur.close()
     conn.close()
     
     return temp_link_candidates
@@ -131,6 +123,13 @@ def fix_candidate_links(candidates, dry_run=True):
     fixed_count = 0
     failed_count = 0
     
+    # Resolve all permanent URLs up front (20 lookups per Graph request)
+    with_filename = [c for c in candidates if c['filename']]
+    permanent_urls = dict(zip(
+        (c['candidate_id'] for c in with_filename),
+        get_permanent_urls(graph_client, [c['filename'] for c in with_filename])
+    ))
+    
     for idx, candidate in enumerate(candidates, 1):
         candidate_id = candidate['candidate_id']
         full_name = candidate['full_name']
@@ -142,7 +141,7 @@ def fix_candidate_links(candidates, dry_run=True):
             continue
         
         # Get permanent URL
-        new_url = get_permanent_url(graph_client, filename)
+        new_url = permanent_urls.get(candidate_id)
         
         if new_url:
             if dry_run:
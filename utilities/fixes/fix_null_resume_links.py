@@ -12,6 +12,7 @@ import psycopg2
 from datetime import datetime
 from dotenv import load_dotenv
 from graph_client import GraphClient
+import ai_access_layout
 
 load_dotenv()
 
@@ -30,20 +31,12 @@ def log(message):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {message}")
 
-def get_sharepoint_url_for_file(graph_client, filename):
-    """Get SharePoint URL for a file in the AI_Access folder"""
+def get_sharing_url(graph_client, file_info):
+    """Create a view sharing link (direct access link for AI agents) for a looked-up file"""
     try:
-        relative_path = f"AI_Access/{filename}"
-        
-        file_info = graph_client.find_file_by_path(relative_path)
-        if not file_info:
-            return None
-        
-        # Get the sharing link (direct access link for AI agents)
-        file_id = file_info.get("id")
+        file_id = file_info.get("id") if file_info else None
         if file_id:
-            sharing_url = graph_client.create_sharing_link(file_id, link_type="view")
-            return sharing_url
+            return graph_client.create_sharing_link(file_id, link_type="view")
         
         return None
         
@@ -51,25 +44,28 @@ def get_sharepoint_url_for_file(graph_client, filename):
         log(f"  ⚠️  Error getting SharePoint URL: {e}")
         return None
 
-def get_metadata_url(graph_client, candidate_id):
-    """Get SharePoint URL for metadata JSON file"""
+def lookup_files(graph_client, candidates):
+    """
+    Batched Graph lookups for each candidate's resume and metadata file
+    
+    Returns:
+        dict: candidate_id -> (resume_file_info, metadata_file_info)
+    """
+    relative_paths = []
+    for candidate_id, filename in candidates:
+        relative_paths.append(ai_access_layout.storage_path_for_filename(filename))
+        relative_paths.append(ai_access_layout.storage_path(candidate_id, f"{candidate_id}_metadata.json"))
+    
     try:
-        metadata_filename = f"{candidate_id}_metadata.json"
-        relative_path = f"AI_Access/{metadata_filename}"
-        
-        file_info = graph_client.find_file_by_path(relative_path)
-        if not file_info:
-            return None
-        
-        file_id = file_info.get("id")
-        if file_id:
-            sharing_url = graph_client.create_sharing_link(file_id, link_type="view")
-            return sharing_url
-        
-        return None
-        
+        file_infos = graph_client.find_files_by_paths(relative_paths)
     except Exception as e:
-        return None
+        log(f"  ⚠️  Batch lookup failed: {e}")
+        file_infos = [None] * len(relative_paths)
+    
+    return {
+        candidate_id: (file_infos[2 * i], file_infos[2 * i + 1])
+        for i, (candidate_id, _) in enumerate(candidates)
+    }
 
 def fix_null_resume_links():
     """Fix candidates with NULL resume_links"""
@@ -119,6 +115,7 @@ def fix_null_resume_links():
         failed = 0
         file_not_found = 0
         
+        to_fix = []
         for candidate_id, full_name, resume_filenames in null_link_candidates:
             if not resume_filenames or len(resume_filenames) == 0:
                 continue
@@ -126,19 +123,27 @@ def fix_null_resume_links():
             filename = resume_filenames[0]
             
             # Check if file exists locally in AI_Access
-            local_file = os.path.join(AI_ACCESS_DIR, filename)
+            local_file = ai_access_layout.local_ai_access_path(candidate_id, filename)
             if not os.path.exists(local_file):
                 file_not_found += 1
                 if file_not_found <= 5:
                     log(f"  ⚠️  File not found locally: {filename}")
                 continue
             
+            to_fix.append((candidate_id, filename))
+        
+        # Look up resume + metadata files 20 at a time instead of one request each
+        file_infos = lookup_files(graph_client, to_fix)
+        
+        for candidate_id, filename in to_fix:
+            resume_info, metadata_info = file_infos[candidate_id]
+            
             # Get SharePoint URL
-            sharepoint_url = get_sharepoint_url_for_file(graph_client, filename)
+            sharepoint_url = get_sharing_url(graph_client, resume_info)
             
             if sharepoint_url:
                 # Also try to get metadata URL
-                metadata_url = get_metadata_url(graph_client, candidate_id)
+                metadata_url = get_sharing_url(graph_client, metadata_info)
                 
                 # Update AI database
                 cur.execute("""
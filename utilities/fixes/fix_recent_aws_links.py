@@ -11,6 +11,7 @@ import psycopg2
 from datetime import datetime
 from dotenv import load_dotenv
 from graph_client import GraphClient
+from resume_index import get_resume_index
 
 load_dotenv()
 
@@ -29,25 +30,12 @@ def log(message):
     print(f"[{timestamp}] {message}")
 
 def find_resume_in_organized_folders(candidate_id):
-    """Find resume in YYYY/MM organized folders"""
-    for root, dirs, files in os.walk(LOCAL_RESUME_DIR):
-        if 'AI_Access' in root:
-            continue
-        for file in files:
-            if file.startswith(f"{candidate_id}_") and not file.startswith("FAILED_"):
-                return os.path.join(root, file)
-    return None
+    """Find resume in YYYY/MM organized folders (via the resume index)"""
+    return get_resume_index().organized_path(candidate_id)
 
 def find_resume_in_ai_access(candidate_id):
-    """Find resume in AI_Access flat folder"""
-    ai_access_dir = os.path.join(LOCAL_RESUME_DIR, "AI_Access")
-    if not os.path.exists(ai_access_dir):
-        return None
-    
-    for file in os.listdir(ai_access_dir):
-        if file.startswith(f"{candidate_id}_") and not file.startswith("FAILED_"):
-            return os.path.join(ai_access_dir, file)
-    return None
+    """Find resume in AI_Access flat folder (via the resume index)"""
+    return get_resume_index().ai_access_path(candidate_id)
 
 def get_sharepoint_url_for_file(graph_client, local_file_path):
     """Get SharePoint URL for a local file"""
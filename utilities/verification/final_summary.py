@@ -9,9 +9,10 @@ print("ANALYZING METADATA FILES")
 print("=" * 70)
 print()
 
-# Get all metadata files
+# Get all metadata files (flat AI_Access root plus numbered shard folders)
 pattern = os.path.join(LOCAL_AI_ACCESS_DIR, "*_metadata.json")
-metadata_files = glob.glob(pattern)
+shard_pattern = os.path.join(LOCAL_AI_ACCESS_DIR, "[0-9]*", "*_metadata.json")
+metadata_files = glob.glob(pattern) + glob.glob(shard_pattern)
 
 total_files = len(metadata_files)
 has_text = 0